@@ -0,0 +1,218 @@
+#ifndef MERCATOR_CSR_ADJACENCY_H
+#define MERCATOR_CSR_ADJACENCY_H
+
+#include <algorithm>
+#include <vector>
+
+/**
+ * Adjacency of a simple undirected graph in the compressed sparse row (CSR) format: the neighbors of
+ * vertex v are stored, sorted, in neighbors[offsets[v]] to neighbors[offsets[v+1]-1]. The neighbors of
+ * a vertex are accessed through a lightweight range offering the (read-only) interface of std::set.
+ */
+class csr_adjacency_t
+{
+  public:
+    typedef const int* iterator;
+    // Sorted neighbors of a vertex.
+    class neighbors_t
+    {
+      private:
+        iterator first;
+        iterator last;
+      public:
+        neighbors_t(iterator _first, iterator _last) : first(_first), last(_last) {};
+        iterator begin() const { return first; };
+        iterator end() const { return last; };
+        int size() const { return last - first; };
+        bool empty() const { return first == last; };
+        // Position of a neighbor (end() if absent), found by binary search.
+        iterator find(int v) const;
+    };
+
+  private:
+    // Position of the first neighbor of each vertex (nb_vertices + 1 values).
+    std::vector<int> offsets;
+    // Neighbors of all vertices.
+    std::vector<int> neighbors;
+
+  public:
+    // Sets the adjacency from CSR arrays (sorted neighbors, without duplicates).
+    void assign(std::vector<int> &&_offsets, std::vector<int> &&_neighbors);
+    // Sets the adjacency from a list of distinct edges (edge e links edges[2e] and edges[2e+1]),
+    //   reusing the memory already allocated.
+    void assign_edges(int nb_vertices, const std::vector<int> &edges);
+    void clear() { offsets.assign(1, 0); neighbors.clear(); };
+    // Number of vertices and of edge endpoints.
+    int size() const { return offsets.empty() ? 0 : offsets.size() - 1; };
+    int nb_endpoints() const { return neighbors.size(); };
+    // Neighbors of a vertex.
+    neighbors_t operator[](int v) const { return neighbors_t(neighbors.data() + offsets[v], neighbors.data() + offsets[v + 1]); };
+    // Number of common neighbors of two vertices with an ID larger than min_id (sorted merge).
+    int nb_common_neighbors(int v1, int v2, int min_id = -1) const;
+    // Number of triangles attached to every vertex (forward algorithm on the edges oriented by degree).
+    void count_triangles(std::vector<double> &nb_triangles, int nb_threads = 1) const;
+};
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+csr_adjacency_t::iterator csr_adjacency_t::neighbors_t::find(int v) const
+{
+  iterator it = std::lower_bound(first, last, v);
+  return (it != last && *it == v) ? it : last;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void csr_adjacency_t::assign(std::vector<int> &&_offsets, std::vector<int> &&_neighbors)
+{
+  offsets = std::move(_offsets);
+  neighbors = std::move(_neighbors);
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void csr_adjacency_t::assign_edges(int nb_vertices, const std::vector<int> &edges)
+{
+  // Counts the degrees.
+  offsets.assign(nb_vertices + 1, 0);
+  for(std::size_t e(0); e<edges.size(); ++e)
+  {
+    ++offsets[edges[e] + 1];
+  }
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    offsets[v + 1] += offsets[v];
+  }
+  // Places the neighbors, offsets[v] being used as the insertion cursor of vertex v.
+  neighbors.resize(edges.size());
+  for(std::size_t e(0); e<edges.size(); e+=2)
+  {
+    neighbors[offsets[edges[e]]++] = edges[e + 1];
+    neighbors[offsets[edges[e + 1]]++] = edges[e];
+  }
+  // The cursors now point at the first neighbor of the next vertex.
+  for(int v(nb_vertices); v>0; --v)
+  {
+    offsets[v] = offsets[v - 1];
+  }
+  offsets[0] = 0;
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    std::sort(neighbors.begin() + offsets[v], neighbors.begin() + offsets[v + 1]);
+  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+int csr_adjacency_t::nb_common_neighbors(int v1, int v2, int min_id) const
+{
+  iterator it1 = std::upper_bound(neighbors.data() + offsets[v1], neighbors.data() + offsets[v1 + 1], min_id);
+  iterator end1 = neighbors.data() + offsets[v1 + 1];
+  iterator it2 = std::upper_bound(neighbors.data() + offsets[v2], neighbors.data() + offsets[v2 + 1], min_id);
+  iterator end2 = neighbors.data() + offsets[v2 + 1];
+  int nb_common = 0;
+  while(it1 != end1 && it2 != end2)
+  {
+    if(*it1 < *it2)
+    {
+      ++it1;
+    }
+    else if(*it2 < *it1)
+    {
+      ++it2;
+    }
+    else
+    {
+      ++nb_common;
+      ++it1;
+      ++it2;
+    }
+  }
+  return nb_common;
+}
+
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void csr_adjacency_t::count_triangles(std::vector<double> &nb_triangles, [[maybe_unused]] int nb_threads) const
+{
+  const int nb_vertices = size();
+  nb_triangles.assign(nb_vertices, 0);
+  // Orients every edge toward its endpoint of larger degree (ties broken by the IDs). Every vertex then
+  //   keeps at most O(sqrt(E)) forward neighbors and every triangle is found from its lowest vertex only.
+  auto precedes = [this](int v1, int v2) {
+    const int d1 = offsets[v1 + 1] - offsets[v1];
+    const int d2 = offsets[v2 + 1] - offsets[v2];
+    return (d1 < d2) || (d1 == d2 && v1 < v2);
+  };
+  std::vector<int> forward_offsets(nb_vertices + 1, 0);
+  for(int v1(0); v1<nb_vertices; ++v1)
+  {
+    forward_offsets[v1 + 1] = forward_offsets[v1];
+    for(int i(offsets[v1]); i<offsets[v1 + 1]; ++i)
+    {
+      if(precedes(v1, neighbors[i]))
+      {
+        ++forward_offsets[v1 + 1];
+      }
+    }
+  }
+  // The forward neighbors inherit the sorting of the neighbors.
+  std::vector<int> forward_neighbors(forward_offsets[nb_vertices]);
+  for(int v1(0), j(0); v1<nb_vertices; ++v1)
+  {
+    for(int i(offsets[v1]); i<offsets[v1 + 1]; ++i)
+    {
+      if(precedes(v1, neighbors[i]))
+      {
+        forward_neighbors[j++] = neighbors[i];
+      }
+    }
+  }
+  // Merges the forward neighbors of the endpoints of every oriented edge (v1, v2). The counts are
+  //   integers, hence identical whatever the number of threads and the order of the increments.
+  const int *forward = forward_neighbors.data();
+  #pragma omp parallel for schedule(dynamic, 64) num_threads(nb_threads) if(nb_threads > 1)
+  for(int v1=0; v1<nb_vertices; ++v1)
+  {
+    double nb_triangles_v1 = 0;
+    for(int i(forward_offsets[v1]); i<forward_offsets[v1 + 1]; ++i)
+    {
+      const int v2 = forward[i];
+      iterator it1 = forward + forward_offsets[v1];
+      iterator end1 = forward + forward_offsets[v1 + 1];
+      iterator it2 = forward + forward_offsets[v2];
+      iterator end2 = forward + forward_offsets[v2 + 1];
+      while(it1 != end1 && it2 != end2)
+      {
+        if(*it1 < *it2)
+        {
+          ++it1;
+        }
+        else if(*it2 < *it1)
+        {
+          ++it2;
+        }
+        else
+        {
+          ++nb_triangles_v1;
+          #pragma omp atomic
+          nb_triangles[v2] += 1;
+          #pragma omp atomic
+          nb_triangles[*it1] += 1;
+          ++it1;
+          ++it2;
+        }
+      }
+    }
+    #pragma omp atomic
+    nb_triangles[v1] += nb_triangles_v1;
+  }
+}
+
+#endif // MERCATOR_CSR_ADJACENCY_H
@@ -0,0 +1,343 @@
+#ifndef MERCATOR_EDGE_SAMPLER_H
+#define MERCATOR_EDGE_SAMPLER_H
+
+#include <algorithm>
+#include <cmath>
+#include <cstdint>
+#include <random>
+#include <utility>
+#include <vector>
+// OpenMP
+#ifdef _OPENMP
+  #include <omp.h>
+#endif
+
+/**
+ * Samples graphs of the S^D model, in which two vertices are connected with probability
+ * 1 / (1 + chi^beta) with chi = R * dtheta / (mu * kappa1 * kappa2)^(1/D), in near-linear time.
+ *
+ * The vertices are split into bins of similar hidden degrees (kappas), and the vertices of every bin
+ * are sorted along the hierarchy of "cube-sphere" cells of sphere_cells_t (Morton order on each face)
+ * such that every cell is a contiguous range of vertices. For each vertex, the cells of every bin are
+ * visited from the roots and the probability of connection with the vertices of a cell is bounded
+ * using the smallest possible angular distance (given the measured angular radius of the cell) and
+ * the largest kappa of the bin. The children of a cell are only visited when this bound predicts
+ * more than one edge in the cell; otherwise candidates are drawn with the bounded probability by
+ * geometric jumps over the range and accepted with the ratio of their exact probability to the
+ * bound. Every pair is thus connected with its exact probability while the number of operations
+ * scales with the number of edges (times the depth of the hierarchy).
+ *
+ * Vertices are processed in parallel by blocks of fixed size, each block using its own random engine
+ * seeded from the seed of the graph, such that the graph does not depend on the number of threads.
+ */
+class edge_sampler_t
+{
+  public:
+    // Target number of vertices per cell of the finest level.
+    int NB_POINTS_PER_CELL = 2;
+    // Largest ratio between the kappas of the vertices of a bin.
+    double KAPPA_BIN_RATIO = 4;
+    // Number of consecutive vertices sharing a random engine.
+    int NB_VERTICES_PER_BLOCK = 256;
+    // Number of threads (0: OpenMP default).
+    int NB_THREADS = 0;
+
+  private:
+    // Cell of the hierarchy containing the vertices first to last-1 of its bin, whose children are
+    //   the cells first_child to first_child+nb_children-1, and largest angular distance between its
+    //   center and its vertices.
+    struct cell_t
+    {
+      double max_angle;
+      int first;
+      int last;
+      int level;
+      int first_child;
+      int nb_children;
+    };
+    // Vertices with similar kappas.
+    struct bin_t
+    {
+      // Largest value of kappa^(1/D) in the bin.
+      double max_kappa_root = 0;
+      // Vertices sorted by cell.
+      std::vector<int> vertices;
+      // Cells (the roots first) and unit vectors pointing to their centers.
+      std::vector<cell_t> cells;
+      std::vector<double> centers;
+      int nb_roots = 0;
+    };
+    // Parameters of the model.
+    int dim = 0;
+    int nb_vertices = 0;
+    double beta = 0;
+    // chi = scale * dtheta / (kappa1 * kappa2)^(1/D), with scale = R / mu^(1/D).
+    double scale = 0;
+    // Unit vectors of the positions (one row of D+1 values per vertex) and kappa^(1/D).
+    std::vector<double> units;
+    std::vector<double> kappa_roots;
+    std::vector<bin_t> bins;
+
+  public:
+    // Sets the positions (any norm, one row of D+1 values per vertex), the kappas and the parameters.
+    void build(int _dim, int _nb_vertices, const double *positions, const std::vector<double> &kappas, double _radius, double mu, double _beta);
+    // Samples a graph (edge e links edges[2e] < edges[2e+1]).
+    std::vector<int> sample(unsigned int seed) const;
+
+  private:
+    // Connection probability given the angular distance and the product of the kappa^(1/D).
+    double probability(double angle, double kappa_root_product) const;
+    // Angular distance between a vertex and a unit vector.
+    double angle(int v, const double *unit) const;
+    // Sorts the vertices of a bin along the cells and builds the hierarchy.
+    void build_cells(bin_t &bin);
+    // Samples the edges between v1 and the vertices of larger ID in a cell, or in a range of vertices
+    //   with a bound p_max on the probability of connection.
+    void sample_cell(int v1, const bin_t &bin, int c, std::mt19937 &engine, std::vector<int> &edges) const;
+    void sample_range(int v1, const bin_t &bin, int first, int last, double p_max, std::mt19937 &engine, std::vector<int> &edges) const;
+};
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void edge_sampler_t::build(int _dim, int _nb_vertices, const double *positions, const std::vector<double> &kappas, double _radius, double mu, double _beta)
+{
+  dim = _dim;
+  nb_vertices = _nb_vertices;
+  beta = _beta;
+  scale = _radius / std::pow(mu, 1.0 / dim);
+  // Unit vectors and kappas.
+  units.assign(positions, positions + static_cast<long>(nb_vertices) * (dim + 1));
+  kappa_roots.resize(nb_vertices);
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    double norm = 0;
+    for(int i(0); i<dim+1; ++i)
+      norm += units[v * (dim + 1) + i] * units[v * (dim + 1) + i];
+    norm = std::sqrt(norm);
+    for(int i(0); i<dim+1; ++i)
+      units[v * (dim + 1) + i] /= norm;
+    kappa_roots[v] = std::pow(kappas[v], 1.0 / dim);
+  }
+  // Splits the vertices into bins of kappas.
+  bins.clear();
+  if(nb_vertices == 0)
+    return;
+  const double kappa_min = *std::min_element(kappas.begin(), kappas.end());
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    const int b = std::max(0, static_cast<int>(std::floor(std::log(kappas[v] / kappa_min) / std::log(KAPPA_BIN_RATIO))));
+    if(b >= static_cast<int>(bins.size()))
+      bins.resize(b + 1);
+    bins[b].vertices.push_back(v);
+    bins[b].max_kappa_root = std::max(bins[b].max_kappa_root, kappa_roots[v]);
+  }
+  for(auto &bin : bins)
+    build_cells(bin);
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void edge_sampler_t::build_cells(bin_t &bin)
+{
+  const int n = bin.vertices.size();
+  const int nb_faces = 2 * (dim + 1);
+  bin.cells.clear();
+  bin.centers.clear();
+  bin.nb_roots = 0;
+  if(n == 0)
+    return;
+  // Finds the finest level such that cells contain about NB_POINTS_PER_CELL vertices.
+  int nb_levels = 0;
+  while(nb_faces * std::pow(2.0, (nb_levels + 1) * dim) * NB_POINTS_PER_CELL <= n && (nb_levels + 1) * dim < 24)
+    ++nb_levels;
+  // Key of every vertex: face of the cube followed by the interleaved bits of its coordinates on the face.
+  const int side = 1 << nb_levels;
+  std::vector<std::pair<std::uint64_t, int>> keys(n);
+  std::vector<int> coords(dim);
+  for(int i(0); i<n; ++i)
+  {
+    const double *x = &units[bin.vertices[i] * (dim + 1)];
+    int axis = 0;
+    for(int j(1); j<dim+1; ++j)
+      if(std::fabs(x[j]) > std::fabs(x[axis]))
+        axis = j;
+    for(int j(0), k(0); j<dim+1; ++j)
+    {
+      if(j == axis)
+        continue;
+      const int g = (x[j] / std::fabs(x[axis]) + 1) / 2 * side;
+      coords[k++] = std::max(0, std::min(side - 1, g));
+    }
+    std::uint64_t key = 2 * axis + ((x[axis] < 0) ? 1 : 0);
+    for(int b(nb_levels - 1); b>=0; --b)
+      for(int j(0); j<dim; ++j)
+        key = (key << 1) | ((coords[j] >> b) & 1);
+    keys[i] = std::make_pair(key, bin.vertices[i]);
+  }
+  std::sort(keys.begin(), keys.end());
+  for(int i(0); i<n; ++i)
+    bin.vertices[i] = keys[i].second;
+  // Prefix of the key identifying the cell of level l containing the i-th vertex.
+  auto prefix = [&](int i, int l) { return keys[i].first >> ((nb_levels - l) * dim); };
+  // Builds the cells level by level, such that the children of a cell are contiguous.
+  auto add_cells = [&](int first, int last, int level) {
+    for(int i(first), j; i<last; i=j)
+    {
+      for(j = i + 1; j<last && prefix(j, level) == prefix(i, level); ++j);
+      bin.cells.push_back({0, i, j, level, -1, 0});
+      // Center of the cell (see sphere_cells_t::cell_center).
+      const std::uint64_t p = prefix(i, level);
+      const int face = p >> (level * dim);
+      const int axis = face / 2;
+      std::vector<double> center(dim + 1);
+      double norm = 1;
+      for(int k(0), m(0); k<dim+1; ++k)
+      {
+        if(k == axis)
+        {
+          center[k] = (face % 2 == 0) ? 1 : -1;
+          continue;
+        }
+        // Extracts the bits of the m-th coordinate from the interleaved code.
+        int coord = 0;
+        for(int b(level - 1); b>=0; --b)
+          coord = (coord << 1) | ((p >> (b * dim + dim - 1 - m)) & 1);
+        center[k] = -1 + (2.0 * coord + 1) / (1 << level);
+        norm += center[k] * center[k];
+        ++m;
+      }
+      for(auto &c : center)
+        bin.centers.push_back(c / std::sqrt(norm));
+      // Angular radius of the cell.
+      const double *unit = &bin.centers[bin.centers.size() - (dim + 1)];
+      for(int k(i); k<j; ++k)
+        bin.cells.back().max_angle = std::max(bin.cells.back().max_angle, angle(bin.vertices[k], unit));
+    }
+  };
+  add_cells(0, n, 0);
+  bin.nb_roots = bin.cells.size();
+  for(int c(0); c<static_cast<int>(bin.cells.size()); ++c)
+  {
+    if(bin.cells[c].level == nb_levels)
+      continue;
+    bin.cells[c].first_child = bin.cells.size();
+    add_cells(bin.cells[c].first, bin.cells[c].last, bin.cells[c].level + 1);
+    bin.cells[c].nb_children = bin.cells.size() - bin.cells[c].first_child;
+  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double edge_sampler_t::probability(double angle, double kappa_root_product) const
+{
+  if(angle <= 0)
+    return 1;
+  return 1 / (1 + std::pow(scale * angle / kappa_root_product, beta));
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double edge_sampler_t::angle(int v, const double *unit) const
+{
+  const double *x = &units[v * (dim + 1)];
+  double cosine = 0;
+  for(int i(0); i<dim+1; ++i)
+    cosine += x[i] * unit[i];
+  // Cosines closer to 1 than 1e-10 correspond to an angular distance of zero (as in positions_SD_t).
+  if(std::fabs(cosine - 1) < 1e-10)
+    return 0;
+  return std::acos(std::max(-1.0, std::min(1.0, cosine)));
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+std::vector<int> edge_sampler_t::sample(unsigned int seed) const
+{
+  // Seeds of the blocks of vertices.
+  const int nb_blocks = (nb_vertices + NB_VERTICES_PER_BLOCK - 1) / NB_VERTICES_PER_BLOCK;
+  std::mt19937 seeder(seed);
+  std::vector<unsigned int> seeds(nb_blocks);
+  for(auto &s : seeds)
+    s = seeder();
+#ifdef _OPENMP
+  const int nb_threads = (NB_THREADS > 0) ? NB_THREADS : omp_get_max_threads();
+#endif
+  std::vector<std::vector<int>> block_edges(nb_blocks);
+  #pragma omp parallel num_threads(nb_threads)
+  {
+    std::mt19937 engine;
+    #pragma omp for schedule(dynamic)
+    for(int k=0; k<nb_blocks; ++k)
+    {
+      engine.seed(seeds[k]);
+      const int v_f = std::min(nb_vertices, (k + 1) * NB_VERTICES_PER_BLOCK);
+      for(int v1(k * NB_VERTICES_PER_BLOCK); v1<v_f; ++v1)
+        for(const auto &bin : bins)
+          for(int c(0); c<bin.nb_roots; ++c)
+            sample_cell(v1, bin, c, engine, block_edges[k]);
+    }
+  }
+  // Gathers the edges in the order of the blocks.
+  std::size_t nb_values = 0;
+  for(const auto &e : block_edges)
+    nb_values += e.size();
+  std::vector<int> edges;
+  edges.reserve(nb_values);
+  for(const auto &e : block_edges)
+    edges.insert(edges.end(), e.begin(), e.end());
+  return edges;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void edge_sampler_t::sample_cell(int v1, const bin_t &bin, int c, std::mt19937 &engine, std::vector<int> &edges) const
+{
+  const cell_t &cell = bin.cells[c];
+  // Bound on the probability of connection with the vertices of the cell.
+  const double min_angle = std::max(0.0, angle(v1, &bin.centers[c * (dim + 1)]) - cell.max_angle);
+  const double p_max = probability(min_angle, kappa_roots[v1] * bin.max_kappa_root);
+  // Visits the children if more than one edge may be found in the cell.
+  if(cell.nb_children == 0 || (cell.last - cell.first) * p_max <= 1)
+  {
+    sample_range(v1, bin, cell.first, cell.last, p_max, engine, edges);
+    return;
+  }
+  for(int child(cell.first_child); child<cell.first_child+cell.nb_children; ++child)
+    sample_cell(v1, bin, child, engine, edges);
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void edge_sampler_t::sample_range(int v1, const bin_t &bin, int first, int last, double p_max, std::mt19937 &engine, std::vector<int> &edges) const
+{
+  std::uniform_real_distribution<double> uniform_01;
+  const double log_q = std::log1p(-p_max);
+  const double *unit1 = &units[v1 * (dim + 1)];
+  // Candidates are separated by geometrically distributed jumps of parameter p_max.
+  for(int i(first - 1); ; )
+  {
+    const double jump = (p_max < 1) ? std::floor(std::log(uniform_01(engine)) / log_q) : 0;
+    if(jump >= last - i - 1)
+      break;
+    i += 1 + static_cast<int>(jump);
+    // Pairs are sampled from the vertex with the lowest ID.
+    const int v2 = bin.vertices[i];
+    if(v2 <= v1)
+      continue;
+    const double p = probability(angle(v2, unit1), kappa_roots[v1] * kappa_roots[v2]);
+    if(uniform_01(engine) * p_max < p)
+    {
+      edges.push_back(v1);
+      edges.push_back(v2);
+    }
+  }
+}
+
+#endif // MERCATOR_EDGE_SAMPLER_H
@@ -0,0 +1,340 @@
+#ifndef MERCATOR_EDGELIST_H
+#define MERCATOR_EDGELIST_H
+
+#include <algorithm>
+#include <cstdint>
+#include <cstring>
+#include <exception>
+#include <fstream>
+#include <iostream>
+#include <string>
+#include <string_view>
+#include <unordered_map>
+#include <vector>
+// Memory-mapped files.
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+/**
+ * Edges of a graph as pairs of numerical IDs (in order of first appearance) along with the names of
+ * the vertices. Edgelists are loaded either from a text file (two names per line, memory-mapped and
+ * tokenized in place) or from the compact binary format
+ *
+ *   8 bytes               magic string "DMEDGE01"
+ *   int32                 number of vertices N
+ *   int64                 number of edges E
+ *   2 x E int32           pairs of numerical IDs (in [0, N))
+ *   N strings (optional)  names of the vertices, each terminated by '\0' (numerical IDs if absent)
+ *
+ * written in the native byte order. The edges are finally compressed into a sorted CSR adjacency.
+ */
+class edgelist_t
+{
+  public:
+    // Magic string at the beginning of binary edgelists.
+    static constexpr char BINARY_MAGIC[8] = {'D', 'M', 'E', 'D', 'G', 'E', '0', '1'};
+
+  public:
+    // Names of the vertices (indexed by their numerical ID).
+    std::vector<std::string> names;
+    // Pairs of numerical IDs (edge e links edges[2e] and edges[2e+1]).
+    std::vector<int> edges;
+
+  public:
+    // Number of vertices and of (possibly duplicated) edges.
+    int nb_vertices() const { return names.size(); };
+    std::size_t nb_pairs() const { return edges.size() / 2; };
+    // Loads an edgelist from a file, in the binary format or else in the text format.
+    void load(const std::string &filename);
+    void load_text(const std::string &filename);
+    void load_binary(const std::string &filename);
+    // Loads the edges from arrays of IDs (the vertices are named after their ID).
+    template<typename T> void load(const T *sources, const T *targets, std::size_t nb_pairs);
+    // Writes the edgelist in the binary format.
+    void save_binary(const std::string &filename) const;
+    // Is the file a binary edgelist?
+    static bool is_binary(const std::string &filename);
+    // Builds the CSR adjacency (neighbors of v in neighbors[offsets[v]] to neighbors[offsets[v+1]-1],
+    //   sorted and without duplicates or self-loops).
+    void build_csr(std::vector<int> &offsets, std::vector<int> &neighbors) const;
+};
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void edgelist_t::load(const std::string &filename)
+{
+  if(is_binary(filename))
+  {
+    load_binary(filename);
+  }
+  else
+  {
+    load_text(filename);
+  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void edgelist_t::load_text(const std::string &filename)
+{
+  // Resets the containers.
+  names.clear();
+  edges.clear();
+  // Opens the file and terminates if the operation did not succeed.
+  int fd = open(filename.c_str(), O_RDONLY);
+  struct stat file_stat;
+  if(fd == -1 || fstat(fd, &file_stat) == -1)
+  {
+    std::cerr << "Could not open file: " << filename << "." << std::endl;
+    std::terminate();
+  }
+  const std::size_t size = file_stat.st_size;
+  if(size == 0)
+  {
+    close(fd);
+    return;
+  }
+  // Maps the whole file in memory.
+  void *mapped = mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0);
+  close(fd);
+  if(mapped == MAP_FAILED)
+  {
+    std::cerr << "Could not map file: " << filename << "." << std::endl;
+    std::terminate();
+  }
+  madvise(mapped, size, MADV_SEQUENTIAL);
+  const char *p = static_cast<const char*>(mapped);
+  const char *end = p + size;
+  // Object mapping the names (pointing directly into the mapped file) to the numerical IDs.
+  std::unordered_map<std::string_view, int> Name2Num;
+  Name2Num.reserve(size / 16);
+  auto is_blank = [](char c) { return c == ' ' || c == '\t' || c == '\r' || c == '\v' || c == '\f'; };
+  auto next_token = [&](const char *&q) {
+    while(q < end && is_blank(*q)) { ++q; }
+    const char *first = q;
+    while(q < end && !is_blank(*q) && *q != '\n') { ++q; }
+    return std::string_view(first, q - first);
+  };
+  int ids[2];
+  // Reads the file line by line.
+  while(p < end)
+  {
+    std::string_view name1 = next_token(p);
+    // Skips empty lines and lines of comment.
+    if(name1.empty() || name1 == "#")
+    {
+      p = static_cast<const char*>(std::memchr(p, '\n', end - p));
+      p = (p == nullptr) ? end : p + 1;
+      continue;
+    }
+    std::string_view name2 = next_token(p);
+    // Ignores the rest of the line.
+    p = static_cast<const char*>(std::memchr(p, '\n', end - p));
+    p = (p == nullptr) ? end : p + 1;
+    // Does not consider self-loops nor incomplete lines.
+    if(name2.empty() || name1 == name2)
+    {
+      continue;
+    }
+    for(int i(0); i<2; ++i)
+    {
+      // Is the vertex new?
+      auto added = Name2Num.emplace((i == 0) ? name1 : name2, static_cast<int>(names.size()));
+      if(added.second)
+      {
+        names.emplace_back(added.first->first);
+      }
+      ids[i] = added.first->second;
+    }
+    edges.push_back(ids[0]);
+    edges.push_back(ids[1]);
+  }
+  // Unmaps the file (the names have been copied).
+  munmap(mapped, size);
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void edgelist_t::load_binary(const std::string &filename)
+{
+  // Opens the stream and terminates if the operation did not succeed.
+  std::ifstream edgelist_file(filename.c_str(), std::ios_base::in | std::ios_base::binary);
+  if( !edgelist_file.is_open() )
+  {
+    std::cerr << "Could not open file: " << filename << "." << std::endl;
+    std::terminate();
+  }
+  // Reads the header.
+  char magic[sizeof(BINARY_MAGIC)];
+  int32_t nb_vertices_in_file;
+  int64_t nb_edges_in_file;
+  edgelist_file.read(magic, sizeof(magic));
+  edgelist_file.read(reinterpret_cast<char*>(&nb_vertices_in_file), sizeof(nb_vertices_in_file));
+  edgelist_file.read(reinterpret_cast<char*>(&nb_edges_in_file), sizeof(nb_edges_in_file));
+  if(!edgelist_file || std::memcmp(magic, BINARY_MAGIC, sizeof(magic)) != 0 || nb_vertices_in_file < 0 || nb_edges_in_file < 0)
+  {
+    std::cerr << "Invalid header in binary edgelist: " << filename << "." << std::endl;
+    std::terminate();
+  }
+  // Reads the pairs of numerical IDs.
+  edges.resize(2 * nb_edges_in_file);
+  edgelist_file.read(reinterpret_cast<char*>(edges.data()), edges.size() * sizeof(int32_t));
+  if(!edgelist_file)
+  {
+    std::cerr << "Truncated binary edgelist: " << filename << "." << std::endl;
+    std::terminate();
+  }
+  for(auto v : edges)
+  {
+    if(v < 0 || v >= nb_vertices_in_file)
+    {
+      std::cerr << "Invalid vertex ID (" << v << ") in binary edgelist: " << filename << "." << std::endl;
+      std::terminate();
+    }
+  }
+  // Reads the names of the vertices (or uses the numerical IDs).
+  names.resize(nb_vertices_in_file);
+  for(int v(0); v<nb_vertices_in_file; ++v)
+  {
+    if(!std::getline(edgelist_file, names[v], '\0'))
+    {
+      if(v != 0)
+      {
+        std::cerr << "Truncated name table in binary edgelist: " << filename << "." << std::endl;
+        std::terminate();
+      }
+      for(int u(0); u<nb_vertices_in_file; ++u)
+      {
+        names[u] = std::to_string(u);
+      }
+      break;
+    }
+  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+template<typename T>
+void edgelist_t::load(const T *sources, const T *targets, std::size_t nb_pairs)
+{
+  // Resets the containers.
+  names.clear();
+  edges.clear();
+  edges.reserve(2 * nb_pairs);
+  // Object mapping the IDs of the vertices to their numerical ID.
+  std::unordered_map<T, int> ID2Num;
+  ID2Num.reserve(nb_pairs);
+  for(std::size_t e(0); e<nb_pairs; ++e)
+  {
+    // Does not consider self-loops.
+    if(sources[e] == targets[e])
+    {
+      continue;
+    }
+    for(const T id : {sources[e], targets[e]})
+    {
+      // Is the vertex new (named after its ID)?
+      auto added = ID2Num.emplace(id, static_cast<int>(names.size()));
+      if(added.second)
+      {
+        names.push_back(std::to_string(id));
+      }
+      edges.push_back(added.first->second);
+    }
+  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void edgelist_t::save_binary(const std::string &filename) const
+{
+  // Opens the stream and terminates if the operation did not succeed.
+  std::ofstream edgelist_file(filename.c_str(), std::ios_base::out | std::ios_base::binary);
+  if( !edgelist_file.is_open() )
+  {
+    std::cerr << "Could not open file: " << filename << "." << std::endl;
+    std::terminate();
+  }
+  // Writes the header, the pairs and the name table.
+  const int32_t nb_vertices_in_file = names.size();
+  const int64_t nb_edges_in_file = nb_pairs();
+  edgelist_file.write(BINARY_MAGIC, sizeof(BINARY_MAGIC));
+  edgelist_file.write(reinterpret_cast<const char*>(&nb_vertices_in_file), sizeof(nb_vertices_in_file));
+  edgelist_file.write(reinterpret_cast<const char*>(&nb_edges_in_file), sizeof(nb_edges_in_file));
+  edgelist_file.write(reinterpret_cast<const char*>(edges.data()), edges.size() * sizeof(int32_t));
+  for(const auto &name : names)
+  {
+    edgelist_file.write(name.c_str(), name.size() + 1);
+  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+bool edgelist_t::is_binary(const std::string &filename)
+{
+  std::ifstream edgelist_file(filename.c_str(), std::ios_base::in | std::ios_base::binary);
+  char magic[sizeof(BINARY_MAGIC)];
+  edgelist_file.read(magic, sizeof(magic));
+  return edgelist_file && std::memcmp(magic, BINARY_MAGIC, sizeof(magic)) == 0;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void edgelist_t::build_csr(std::vector<int> &offsets, std::vector<int> &neighbors) const
+{
+  const int n = nb_vertices();
+  const std::size_t m = nb_pairs();
+  // Counts the number of endpoints of each vertex.
+  offsets.assign(n + 1, 0);
+  for(std::size_t e(0); e<m; ++e)
+  {
+    if(edges[2 * e] != edges[2 * e + 1])
+    {
+      ++offsets[edges[2 * e] + 1];
+      ++offsets[edges[2 * e + 1] + 1];
+    }
+  }
+  for(int v(0); v<n; ++v)
+  {
+    offsets[v + 1] += offsets[v];
+  }
+  // Places the endpoints.
+  neighbors.resize(offsets[n]);
+  std::vector<int> position(offsets.begin(), offsets.end() - 1);
+  for(std::size_t e(0); e<m; ++e)
+  {
+    const int v1 = edges[2 * e];
+    const int v2 = edges[2 * e + 1];
+    if(v1 != v2)
+    {
+      neighbors[position[v1]++] = v2;
+      neighbors[position[v2]++] = v1;
+    }
+  }
+  // Sorts the neighbors and removes the multiedges (compacting the arrays in place).
+  int first = 0;
+  for(int v(0), last, k = 0; v<n; ++v)
+  {
+    last = offsets[v + 1];
+    std::sort(neighbors.begin() + first, neighbors.begin() + last);
+    auto unique_end = std::unique(neighbors.begin() + first, neighbors.begin() + last);
+    const int nb_unique = unique_end - (neighbors.begin() + first);
+    std::copy(neighbors.begin() + first, unique_end, neighbors.begin() + k);
+    k += nb_unique;
+    first = last;
+    offsets[v + 1] = k;
+  }
+  neighbors.resize(offsets[n]);
+  neighbors.shrink_to_fit();
+}
+
+#endif // MERCATOR_EDGELIST_H
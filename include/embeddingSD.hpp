@@ -33,7 +33,7 @@
 // Standard Template Library
 #include <algorithm>
 // #include <execution>
-// #include <chrono>
+#include <chrono>
 #include <cmath>
 #include <ctime>
 #include <complex>
@@ -46,20 +46,34 @@
 #include <random>
 #include <set>
 #include <sstream>
+#include <stdexcept>
 #include <string>
+#include <unordered_map>
 #include <utility>
 #include <vector>
 #include <filesystem>
+// OpenMP
+#ifdef _OPENMP
+  #include <omp.h>
+#endif
 // Eigen library
 #include "Eigen/Core"
 #include "Eigen/SparseCore"
 // Spectra library
 #include "Spectra/GenEigsSolver.h"
+#include "Spectra/SymEigsShiftSolver.h"
 #include "Spectra/MatOp/SparseGenMatProd.h"
+#include "Spectra/MatOp/SparseSymShiftSolve.h"
 // Custom library for specific Gaussian hypergeometric functions.
+#include "csr_adjacency.hpp"
+#include "edge_sampler.hpp"
+#include "edgelist.hpp"
 #include "hyp2f1.hpp"
 #include "integrate_expected_degree.hpp"
+#include "pkk_table.hpp"
+#include "positions_SD.hpp"
 #include "readjust_positions.hpp"
+#include "sphere_cells.hpp"
 
 class embeddingSD_t
 {
@@ -68,6 +82,8 @@ class embeddingSD_t
     const double PI = 3.141592653589793238462643383279502884197;
   // Flags controlling options.
   public:
+    // Approximates the log-likelihood of far away vertices using a spatial index (S^D refinement only).
+    bool APPROXIMATE_LIKELIHOOD_MODE = false;
     // Characterizes the inferred ensemble (generates CHARACTERIZATION_NB_GRAPHS graphs and measure
     //   various structural properties).
     bool CHARACTERIZATION_MODE = false;
@@ -75,6 +91,9 @@ class embeddingSD_t
     bool CLEAN_RAW_OUTPUT_MODE = false;
     // Has a custom value for beta been provided?
     bool CUSTOM_BETA = false;
+    // Writes checkpoints from which an interrupted embedding can be resumed (after the inference of the
+    //   parameters, after the initial positions and during the refinement of the positions).
+    bool CHECKPOINT_MODE = false;
     // Indicates whether the number of graphs generated during the characterization phase is the default value ot not.
     bool CUSTOM_CHARACTERIZATION_NB_GRAPHS = false;
     // Using already inferred coordinates.
@@ -83,16 +102,44 @@ class embeddingSD_t
     bool CUSTOM_OUTPUT_ROOTNAME_MODE = false;
     // Has a custom value for the seed been provided?
     bool CUSTOM_SEED = false;
+    // Updates the kappas of the degree classes with a deterministic fixed-point iteration (S^D).
+    bool DETERMINISTIC_KAPPA_UPDATE_MODE = false;
     // Will the kappas be adjusted after the angular positions inferred?
     bool KAPPA_POST_INFERENCE_MODE = true;
     // To adjust both kappas and beta after the angular positions inferred?
     bool KAPPA_BETA_POST_INFERENCE_MODE = false;
+    // Keeps the graph and the results in memory (no file is read nor written, the log is printed on
+    //   screen only in the verbose mode).
+    bool IN_MEMORY_MODE = false;
+    // Embeds the largest connected component directly if the graph has several of them, instead of
+    //   saving it into a new edgelist and exiting.
+    bool LARGEST_COMPONENT_MODE = false;
     // Will or will not position the vertices to maximize the log-likelihood.
     bool MAXIMIZATION_MODE = true;
+    // Searches beta with secant steps on the clustering and warm starts the kappas of every value of
+    //   beta tried from those of the closest value already solved (S^D).
+    bool MEMOIZED_BETA_SEARCH_MODE = true;
+    // Approximates the eigenvectors giving the initial positions with a multilevel scheme (the weights
+    //   matrix is coarsened, the eigenvectors of the coarsest one are prolonged and smoothed).
+    bool MULTILEVEL_MODE = false;
+    // Saves the connected components other than the largest one (with at least
+    //   OTHER_COMPONENTS_MIN_SIZE vertices) into their own edgelists such that they can be embedded
+    //   after the largest one (see get_other_components()).
+    bool OTHER_COMPONENTS_MODE = false;
+    // Refines the positions of non-adjacent vertices concurrently.
+    bool PARALLEL_REFINEMENT_MODE = false;
     // Does not provide any information during the embedding process.
     bool QUIET_MODE = false;
     // Refining only the already inferred positions.
     bool REFINE_MODE = false;
+    // Resumes an interrupted embedding from a checkpoint.
+    bool RESUME_MODE = false;
+    // Finds the initial positions with a symmetric Lanczos eigensolver (shift-invert mode with a sparse
+    //   Cholesky factorization) applied to the normalized Laplacian, instead of the non-symmetric solver.
+    bool SYMMETRIC_EIGENSOLVER_MODE = false;
+    // Interpolates the integrals of the connection probability in S^D from lookup tables instead of
+    //   computing them for every pair of kappas.
+    bool TABULATED_INTEGRALS_MODE = true;
     // Provides various files that characterize the inferred ensemble.
     bool VALIDATION_MODE = false;
     // Print information about the embedding process on screen instead than on the log file.
@@ -105,19 +152,42 @@ class embeddingSD_t
   public:
     // Name of the file containing the previously inferred parameters.
     std::string ALREADY_INFERRED_PARAMETERS_FILENAME;
+    // Opening ratio of the approximate log-likelihood: a group of vertices is aggregated when its
+    //   angular radius is smaller than this ratio times its angular distance (lower is more accurate).
+    double APPROXIMATE_LIKELIHOOD_ACCURACY = 0.5;
     // Minimal/maximal value of beta that the program can handle (bounds).
     const double BETA_ABS_MAX = 25;
     const double BETA_ABS_MIN = 1.01;
     // Number of graphs to generate during the characterization of the inferred ensemble.
     int CHARACTERIZATION_NB_GRAPHS = 100;
+    // Number of ranges of vertices refined between two checkpoints.
+    int CHECKPOINT_INTERVAL = 1;
     // Number of new positions to try.
     const int MIN_NB_ANGLES_TO_TRY = 100;
+    // Number of vertices per block when scoring the new positions to try.
+    const int LOGLIKELIHOOD_BLOCK_SIZE = 256;
+    // Largest number of vertices of the coarsest level in the multilevel mode.
+    int MULTILEVEL_COARSEST_SIZE = 5000;
+    // Number of smoothing steps applied at every level in the multilevel mode.
+    int MULTILEVEL_NB_SMOOTHING_STEPS = 10;
+    // Number of threads used in the parallel refinement mode (0: OpenMP default).
+    int NB_THREADS = 0;
+    // Smallest number of vertices of the other connected components to embed.
+    int OTHER_COMPONENTS_MIN_SIZE = 10;
     // // Parameter governing the refined search for optimal position during the maximization phase.
     // int CLOSE_ANGULAR_RANGE_FACTOR = 2;
     // Edgelist filename.
     std::string EDGELIST_FILENAME;
-    // Number of points for MC integration in the calculation of expected clustering.
-    const int EXP_CLUST_NB_INTEGRATION_MC_STEPS = 600;
+    // File from which the eigenvectors of a previous run are read to warm start the eigensolver, and to
+    //   which the new eigenvectors are written (not used if empty).
+    std::string EIGENVECTORS_FILENAME;
+    // Largest number of points for MC integration in the calculation of expected clustering of a degree class.
+    const int EXP_CLUST_MAX_NB_INTEGRATION_MC_STEPS = 20000;
+    // Number of points drawn per batch for MC integration in the calculation of expected clustering
+    //   (batches are drawn until the standard error is below the target).
+    const int EXP_CLUST_NB_INTEGRATION_MC_STEPS = 200;
+    // Target standard error of the MC integration of the expected average clustering.
+    double EXP_CLUST_TARGET_STANDARD_ERROR = 2.5e-3;
     // Number of steps for integration for the expected distance between adjacent vertices.
     const int EXP_DIST_NB_INTEGRATION_STEPS = 1000;
     // Maximal number of attempts to reach convergence of the updated values of kappa.
@@ -144,6 +214,8 @@ class embeddingSD_t
     const double NUMERICAL_ZERO = 1e-10;
     // // Parameter governing the refinied search for optimal position during the maximization phase.
     // int REFINED_MAX_STEP_LENGTH_DIVISOR = 5;
+    // Name of the checkpoint file from which the embedding is resumed.
+    std::string RESUME_FILENAME;
     // Rootname of output files.
     std::string ROOTNAME_OUTPUT;
     // Random number generator seed.
@@ -153,6 +225,13 @@ class embeddingSD_t
     std::string_view VERSION = "0.9";
     // Tab.
     std::string_view TAB = "    ";
+    // Signature of the checkpoint files.
+    static constexpr char CHECKPOINT_MAGIC[] = "DMCKPT01";
+    // Stages of the embedding recorded in the checkpoints.
+    enum { CHECKPOINT_NONE = 0, CHECKPOINT_PARAMETERS = 1, CHECKPOINT_INITIAL_POSITIONS = 2, CHECKPOINT_REFINEMENT = 3 };
+    // Stage reached and number of vertices already refined when the embedding was resumed.
+    int resumed_stage = CHECKPOINT_NONE;
+    int resumed_cursor = 0;
 
   // General internal objects.
   private:
@@ -163,18 +242,28 @@ class embeddingSD_t
     // Objects mapping the name and the numerical ID of vertices.
     std::map< std::string, int > Name2Num;
     std::vector<std::string> Num2Name;
+    // Edgelist filenames and output rootnames of the connected components other than the largest one
+    //   (other components mode).
+    std::vector< std::pair<std::string, std::string> > other_components;
     // List of degree classes.
     std::set<int> degree_class;
     // Cumulative probability used for the calculation of clustering using MC integration.
     std::map<int, std::map<double, int, std::less<>>> cumul_prob_kgkp;
     // List containing the order in which the vertices will be considered in the maximization phase.
     std::vector<int> ordered_list_of_vertices;
+    // Spatial index over the positions used by the approximate log-likelihood.
+    sphere_cells_t position_cells;
+    // Color of the vertices (adjacent vertices have different colors) used to build the batches of
+    //   vertices refined concurrently.
+    std::vector<int> refinement_color;
     // Time stamps.
     double time0, time1, time2, time3, time4, time5, time6, time7;
     time_t time_started, time_ended;
     // Stream used to output the log to file.
     std::ofstream logfile;
-    std::streambuf *old_rdbuf;
+    // Stream of the log of this embedding (on screen through the buffer of std::clog in the verbose
+    //   mode, or into logfile), which allows several embeddings to run concurrently.
+    std::ostream logstream{std::clog.rdbuf()};
     // Widths of the columns in output file.
     int width_names;
     int width_values;
@@ -194,8 +283,11 @@ class embeddingSD_t
     std::vector<double> sum_degree_of_neighbors;
     // Local clustering.
     std::vector<double> nbtriangles;
-    // Adjacency list.
-    std::vector< std::set<int> > adjacency_list;
+    // Coreness and layer of the vertices in the onion decomposition.
+    std::vector<int> onion_coreness;
+    std::vector<int> onion_layer;
+    // Adjacency list (CSR format with sorted neighbors).
+    csr_adjacency_t adjacency_list;
     // Degree.
     std::vector<int> degree;
     // ID of vertices in each degree class.
@@ -208,8 +300,9 @@ class embeddingSD_t
   private:
     // Average degree of the inferred ensemble.
     double random_ensemble_average_degree;
-    // Average local clustering coefficient of the inferred ensemble.
+    // Average local clustering coefficient of the inferred ensemble and standard error of its MC integration.
     double random_ensemble_average_clustering;
+    double random_ensemble_average_clustering_error = 0;
     // Maps containing the expected degree of each degree class.
     std::map<int, double> random_ensemble_expected_degree_per_degree_class;
     // Expected degrees in the inferred ensemble (analytical, no finite-size effect).
@@ -218,39 +311,48 @@ class embeddingSD_t
     std::map<int, double> random_ensemble_kappa_per_degree_class;
     // Parameter mu (average degree).
     double mu;
+    // Kappas of the degree classes and ensemble clustering obtained for the values of beta tried
+    //   while inferring the parameters (S^D).
+    struct beta_trial_t
+    {
+      std::vector<double> kappas;
+      double clustering = -1;
+    };
+    std::map<double, beta_trial_t> beta_trials;
     // Hidden variables of the vertices.
     std::vector<double> kappa;
     // Positions of the vertices.
     std::vector<double> theta;
-    // Positions of the vertices in S^D
-    std::vector<std::vector<double>> d_positions;
+    // Positions of the vertices in S^D (contiguous N x (D+1) buffer with cached unit vectors).
+    positions_SD_t d_positions;
+    // kappa^(-1/D) used when scoring the new positions to try during the refinement.
+    std::vector<double> inverse_kappa_root;
+    // Lookup tables of the integrals giving the connection probability and the expected angular
+    //   distance between two vertices in S^D (for the current dimension and beta).
+    pkk_table_t pkk_table;
+    pkk_table_t pkk_theta_table;
     // sinus and cosinus of theta.
     // std::vector<double> sin_theta;
     // std::vector<double> cos_theta;
 
   // Objects related to the characterization of the inferred ensemble (by simulations).
   private:
-    // Simulated adjacency list.
-    std::vector< std::set<int> > simulated_adjacency_list;
-    // Simulated degrees (one instance).
-    std::vector<double> simulated_degree;
-    // Simulated average degree of neighbors (one instance).
-    std::vector<double> simulated_sum_degree_of_neighbors;
-    // Simulated clustering coefficients (one instance).
-    std::vector<double> simulated_nb_triangles;
-    // Simulated degree distribution (one instance).
-    std::map<int, double> simulated_stat_degree;
-    // Simulated average sum of degree of neighbors by degree class.
-    std::map<int, double> simulated_stat_sum_degree_neighbors;
-    // Simulated average average degree of neighbors by degree class.
-    std::map<int, double> simulated_stat_avg_degree_neighbors;
-    // Simulated average number of triangles gathered by degree class.
-    std::map<int, double> simulated_stat_nb_triangles;
-    // Simulated average clustering coefficient by degree class.
-    std::map<int, double> simulated_stat_clustering;
-    // Characterization of vertices (all instances).
+    // Simulated graph (one instance): edges, adjacency list and properties of the vertices.
+    struct simulated_graph_t
+    {
+      std::vector<int> edges;
+      csr_adjacency_t adjacency_list;
+      std::vector<double> degree;
+      std::vector<double> sum_degree_of_neighbors;
+      std::vector<double> nb_triangles;
+    };
+    // Simulated graphs analyzed concurrently (one per thread, reused from one instance to the next such
+    //   that the memory does not grow with the number of instances).
+    std::vector<simulated_graph_t> simulated_graphs;
+    // Characterization of vertices (running mean and sum of squared deviations over all instances).
     std::vector< std::vector< std::vector<double> > > characterizing_inferred_ensemble_vprops;
-    // Vertices statistics characterization (all instances).
+    // Vertices statistics characterization (running means and sums of squared deviations over all
+    //   instances, followed by the number of instances in which the degree class is observed).
     std::map< int, std::vector<double> > characterizing_inferred_ensemble_vstat;
 
   // Internal functions.
@@ -262,9 +364,14 @@ class embeddingSD_t
     void compute_clustering();
     // Loads the graph from an edgelist in a file.
     void load_edgelist();
+    // Builds the (CSR) adjacency list from the loaded edges.
+    void build_adjacency_list(edgelist_t &edgelist);
     // Loads the already inferred parameters.
     void load_already_inferred_parameters();
     void load_already_inferred_parameters(int dim);
+    // Writes/reads a checkpoint (binary) of the state of the embedding.
+    void save_checkpoint(int dim, int stage, int cursor);
+    void load_checkpoint(int dim);
     // === Infering parameters ===
     // Builds the cumulative distribution to choose degree classes in the calculation of clustering.
     void build_cumul_dist_for_mc_integration();
@@ -273,8 +380,17 @@ class embeddingSD_t
     void compute_random_ensemble_average_degree();
     void compute_random_ensemble_clustering(int dim);
     void compute_random_ensemble_clustering();
-    double compute_random_ensemble_clustering_for_degree_class(int d1, int dim);
-    double compute_random_ensemble_clustering_for_degree_class(int d1);
+    double compute_random_ensemble_clustering_for_degree_class(int d1, int dim, double target_error, double &error);
+    double compute_random_ensemble_clustering_for_degree_class(int d1, double target_error, double &error);
+    // MC integration of the local clustering coefficient by batches of samples drawn in parallel (each
+    //   sample gets its own seed) until the standard error is below target_error.
+    double integrate_clustering_by_batches(const std::function<double(std::mt19937 &, std::vector<double> &)> &sample, double target_error, double &error);
+    // Computes the integrals of the connection probability and of the expected angular distance
+    //   between two vertices in S^D (from the lookup tables if TABULATED_INTEGRALS_MODE).
+    double integral_expected_degree(int dim, double radius, double kappa1, double kappa2);
+    double integral_expected_theta(int dim, double radius, double kappa1, double kappa2);
+    // Fills the lookup table for every pair of kappas of the degree classes.
+    void prepare_integral_tables(int dim, double radius);
     // Infers the values of kappa.
     void infer_kappas_given_beta_for_all_vertices();
     void infer_kappas_given_beta_for_all_vertices(int dim);
@@ -283,11 +399,25 @@ class embeddingSD_t
 
     void infer_kappas_given_beta_for_degree_class();
     void infer_kappas_given_beta_for_degree_class(int dim);
+    // Next value of beta to try given the current bounds (beta_max = -1 if no upper bound yet).
+    double propose_beta(double beta_min, double beta_max);
     // === Embedding ===
     // Computes the log-likelihood between two vertices.
     double compute_pairwise_loglikelihood(int v1, double t1, int v2, double t2, bool neighbors);
-    double compute_pairwise_loglikelihood(int dim, int v1, std::vector<double> pos1, int v2, std::vector<double> pos2, bool neighbors, double radius);
+    // Computes the log-likelihood of a vertex placed at each of the candidate positions (unit vectors
+    //   stored as columns), exactly or approximately.
+    Eigen::VectorXd compute_candidates_loglikelihood(int dim, int v1, const Eigen::MatrixXd &candidates, double radius);
+    double compute_approximate_vertex_loglikelihood(int dim, int v1, const std::vector<double> &pos1, double radius);
     // Finds the initial ordering of vertices based on the Eigen Map method.
+    Eigen::MatrixXd compute_laplacian_eigenvectors(Eigen::SparseMatrix<double> &L, const std::vector<double> &strength, const std::vector<int> &newID, int nb_vectors, int ncv);
+    Eigen::MatrixXd solve_laplacian_eigenproblem(Eigen::SparseMatrix<double> &L, const std::vector<double> &strength, int nb_vectors, int ncv, Eigen::VectorXd init_resid);
+    // Multilevel approximation of the eigenvectors (coarsening, solution on the coarsest level,
+    //   prolongation and smoothing).
+    Eigen::MatrixXd compute_multilevel_laplacian_eigenvectors(const Eigen::SparseMatrix<double> &L, const std::vector<double> &strength, int nb_vectors, int ncv, Eigen::VectorXd init_resid);
+    int coarsen_weights_matrix(const Eigen::SparseMatrix<double> &W, const std::vector<double> &strength, std::vector<int> &aggregate, Eigen::SparseMatrix<double> &coarse_W, std::vector<double> &coarse_strength);
+    void orthonormalize_eigenvectors(Eigen::MatrixXd &V, const std::vector<double> &strength);
+    Eigen::VectorXd load_eigenvectors(const std::vector<int> &newID, int nb_vectors);
+    void save_eigenvectors(const Eigen::MatrixXd &evectors, const std::vector<int> &newID);
     void find_initial_ordering(std::vector<int> &ordering, std::vector<double> &raw_theta);
     void find_initial_ordering(std::vector<std::vector<double>> &positions, int dim);
     void infer_initial_positions();
@@ -299,6 +429,13 @@ class embeddingSD_t
     int refine_angle(int v1);
     void refine_positions(int dim);
     int refine_angle(int dim, int v1, double radius);
+    // Finds the best position of a vertex without moving it.
+    int propose_angle(int v1, double &best_angle, std::mt19937 &_engine, std::normal_distribution<double> &_normal_01);
+    int propose_position(int dim, int v1, double radius, std::vector<double> &best_position, std::mt19937 &_engine, std::normal_distribution<double> &_normal_01);
+    // Refines the positions of a range of ordered_list_of_vertices by batches of non-adjacent vertices.
+    void color_vertices_for_parallel_refinement();
+    int refine_angles_in_parallel(int v_i, int v_f);
+    int refine_angles_in_parallel(int dim, int v_i, int v_f, double radius);
     
     // void infer_optimal_positions();
     void finalize();
@@ -314,9 +451,15 @@ class embeddingSD_t
     void compute_inferred_ensemble_expected_degrees();
     void compute_inferred_ensemble_expected_degrees(int dim, double radius);
     // === Characterization of the inferred ensemble using simulations ===
-    void analyze_simulated_adjacency_list();
-    void generate_simulated_adjacency_list();
-    void generate_simulated_adjacency_list(int dim, bool random_positions);
+    // Builds the adjacency list of a simulated graph from its edges and computes the degree, the sum
+    //   of the degree of neighbors and the number of triangles of the vertices.
+    void analyze_simulated_graph(simulated_graph_t &graph);
+    // Generates and analyzes several graphs of the inferred ensemble, a few of them in parallel, and
+    //   passes them to accumulate in their order of generation (the positions are drawn anew for every
+    //   graph if random_positions).
+    void generate_simulated_graphs(int nb_graphs, const std::function<void(const simulated_graph_t &)> &accumulate);
+    void generate_simulated_graphs(int dim, bool random_positions, int nb_graphs, const std::function<void(const simulated_graph_t &)> &accumulate);
+    void sample_simulated_graphs(int dim, const double *positions, double radius, bool random_positions, int nb_graphs, const std::function<void(const simulated_graph_t &)> &accumulate);
     // === Miscellaneous ===
     // Extracts the onion decomposition.
     void extract_onion_decomposition(std::vector<int> &coreness, std::vector<int> &od_layer);
@@ -341,16 +484,23 @@ class embeddingSD_t
     int get_root(int i, std::vector<int> &clust_id);
     void merge_clusters(std::vector<int> &size, std::vector<int> &clust_id);
     void check_connected_components();
+    // Restricts the graph to the vertices of a connected component.
+    void extract_component(const std::vector<int> &component, int c);
+    // Writes the edges of a connected component into a file.
+    void save_component_edgelist(const std::vector<int> &component, int c, const std::string &edgelist_filename);
+    // Computes the radius of the hyperbolic disk/ball (adjusted if some radial positions are negative).
+    double compute_hyperbolic_radius(bool &adjusted) const;
+    double compute_hyperbolic_radius(int dim, bool &adjusted) const;
     // Calculate mu which controls average degree
     inline double calculateMu() const;
     // Gets the degree of the random vertex and computes probability of being connected
     // See 2.i. point from A.3 part in Mercator paper
-    std::pair<int, double> degree_of_random_vertex_and_prob_conn(int d1, double R);
-    std::pair<int, double> degree_of_random_vertex_and_prob_conn(int d1, double R, int dim);
+    std::pair<int, double> degree_of_random_vertex_and_prob_conn(int d1, double R, std::mt19937 &_engine);
+    std::pair<int, double> degree_of_random_vertex_and_prob_conn(int d1, double R, int dim, std::mt19937 &_engine);
     // Draw random angular distance between nodes with degree d1 and d2, which are connected with probability p12
     // See Eq. (A3) in Mercator paper
-    double draw_random_angular_distance(int d1, int d2, double R, double p12);
-    double draw_random_angular_distance(int d1, int d2, double R, double p12, int dim);
+    double draw_random_angular_distance(int d1, int d2, double R, double p12, std::mt19937 &_engine);
+    double draw_random_angular_distance(int d1, int d2, double R, double p12, int dim, std::mt19937 &_engine);
     // Compute the radius in S^D model with a given network size.
     inline double compute_radius(int dim, int N) const;
     // Calculate mu in D-dimension
@@ -381,6 +531,30 @@ class embeddingSD_t
     void embed();
     void embed(int dim); // Perform the embedding in D dimension
     void embed(std::string edgelist_filename) { EDGELIST_FILENAME = edgelist_filename; embed(); };
+    // Loads the graph from arrays of source/target vertex IDs (activates the in-memory mode).
+    template<typename T> void load_edgelist(const T *sources, const T *targets, std::size_t nb_pairs);
+    // Inferred positions in S^D (one row per vertex, following the order of get_vertex_names()).
+    positions_SD_t& get_positions() { return d_positions; };
+    // Names of the vertices.
+    const std::vector<std::string>& get_vertex_names() const { return Num2Name; };
+    // Inferred hidden degrees, angular positions (S^1) and parameters.
+    const std::vector<double>& get_kappas() const { return kappa; };
+    const std::vector<double>& get_thetas() const { return theta; };
+    double get_mu() const { return mu; };
+    double get_radius() const { return (DIMENSION > 1) ? compute_radius(DIMENSION, nb_vertices) : nb_vertices / (2 * PI); };
+    // Radial positions of the vertices in the hyperbolic disk/ball (as in the .inf_coord file).
+    std::vector<double> get_hyperbolic_radii() const;
+    // Number of triangles attached to every vertex of the original graph.
+    const std::vector<double>& get_nb_triangles() const { return nbtriangles; };
+    // Coreness and layer of every vertex in the onion decomposition of the original graph.
+    const std::vector<int>& get_coreness() const { return onion_coreness; };
+    const std::vector<int>& get_od_layer() const { return onion_layer; };
+    // Connected components other than the largest one saved in the other components mode, as pairs of
+    //   edgelist filename and output rootname (by decreasing size).
+    const std::vector< std::pair<std::string, std::string> >& get_other_components() const { return other_components; };
+    // Sets the edgelist and the output rootname to those of one of these components (the options
+    //   referring to the files of the whole graph are deactivated).
+    void set_component(const std::pair<std::string, std::string> &component);
 };
 
 
@@ -405,7 +579,7 @@ void embeddingSD_t::analyze_degrees()
   }
   // Populates the list of degrees, the average degree and
   //   the list of vertices of each degree class.
-  std::set<int>::iterator it, end;
+  csr_adjacency_t::iterator it, end;
   for(int n(0), k; n<nb_vertices; ++n)
   {
     k = adjacency_list[n].size();
@@ -434,119 +608,38 @@ void embeddingSD_t::analyze_degrees()
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
-void embeddingSD_t::analyze_simulated_adjacency_list()
+void embeddingSD_t::analyze_simulated_graph(simulated_graph_t &graph)
 {
+  // Builds the adjacency list in the buffers of the previous instance.
+  const csr_adjacency_t &adjacency = graph.adjacency_list;
+  graph.adjacency_list.assign_edges(nb_vertices, graph.edges);
   // Initializes the containers.
-  simulated_degree.clear();
-  simulated_degree.resize(nb_vertices);
-  simulated_sum_degree_of_neighbors.clear();
-  simulated_sum_degree_of_neighbors.resize(nb_vertices, 0);
-  simulated_nb_triangles.clear();
-  simulated_nb_triangles.resize(nb_vertices, 0);
-  simulated_stat_degree.clear();
-  simulated_stat_sum_degree_neighbors.clear();
-  simulated_stat_avg_degree_neighbors.clear();
-  simulated_stat_nb_triangles.clear();
-  simulated_stat_clustering.clear();
+  graph.degree.assign(nb_vertices, 0);
+  graph.sum_degree_of_neighbors.assign(nb_vertices, 0);
   // Analyzes the degree and the average degree of neighbors.
-  std::set<int>::iterator it, end;
-  for(int v1(0), d1; v1<nb_vertices; ++v1)
+  for(int v1(0); v1<nb_vertices; ++v1)
   {
-    d1 = simulated_adjacency_list[v1].size();
-    simulated_degree[v1] = d1;
-    it = simulated_adjacency_list[v1].begin();
-    end = simulated_adjacency_list[v1].end();
-    for(; it!=end; ++it)
-    {
-      simulated_sum_degree_of_neighbors[*it] += d1;
-    }
+    graph.degree[v1] = adjacency[v1].size();
   }
-  // Computes the clustering.
-  // Variables.
-  double nb_triangles, tmp_val;
-  // Vector objects.
-  std::vector<int> intersection;
-  // Set objects.
-  std::set<int> neighbors_v2;
-  // Iterator objects.
-  std::set<int>::iterator it1, end1, it2, end2;
-  std::map<int, std::vector<int> >::iterator it3, end3;
-  std::vector<int>::iterator it4;
-  // Computes the intersection for the in- and out- neighbourhoods of each vertex.
-  for(int v1(0), d1; v1<nb_vertices; ++v1)
+  for(int v1(0); v1<nb_vertices; ++v1)
   {
-    // Resets the local clustering coefficient.
-    nb_triangles = 0;
-    // Performs the calculation only if degree > 1.
-    d1 = simulated_degree[v1];
-    if( d1 > 1 )
+    for(int v2 : adjacency[v1])
     {
-      // Loops over the neighbors of vertex v1.
-      it1 = simulated_adjacency_list[v1].begin();
-      end1 = simulated_adjacency_list[v1].end();
-      for(; it1!=end1; ++it1)
-      {
-        // Performs the calculation only if degree > 1.
-        if( simulated_degree[*it1] > 1 )
-        {
-          // Builds an ordered list of the neighbourhood of v2
-          it2 = simulated_adjacency_list[*it1].begin();
-          end2 = simulated_adjacency_list[*it1].end();
-          neighbors_v2.clear();
-          for(; it2!=end2; ++it2)
-          {
-            if(*it1 < *it2) // Ensures that triangles will be counted only once.
-            {
-              neighbors_v2.insert(*it2);
-            }
-          }
-          // Counts the number of triangles.
-          if(neighbors_v2.size() > 0)
-          {
-            intersection.clear();
-            intersection.resize(std::min(simulated_adjacency_list[v1].size(), neighbors_v2.size()));
-            it4 = std::set_intersection(simulated_adjacency_list[v1].begin(), simulated_adjacency_list[v1].end(),
-                                        neighbors_v2.begin(), neighbors_v2.end(), intersection.begin());
-            intersection.resize(it4-intersection.begin());
-            nb_triangles += intersection.size();
-          }
-        }
-      }
-      // Adds the contribution of vertex v1 to the average clustering coefficient.
-      // tmp_val = 2 * nb_triangles / (d1 * (d1 - 1));
-      simulated_nb_triangles[v1] = nb_triangles;
-      // simulated_nb_triangles[v1] = tmp_val;
+      graph.sum_degree_of_neighbors[v1] += graph.degree[v2];
     }
   }
-  //
-  for(int v1(0), d1; v1<nb_vertices; ++v1)
+  // Counts the triangles attached to every vertex, in parallel unless several graphs already are.
+  int nb_threads = 1;
+#ifdef _OPENMP
+  if(!omp_in_parallel())
   {
-    // Gets the degree of the vertex in the current generated graph.
-    d1 = simulated_degree[v1];
-    // Adds the key to the various map containers if this degree class has not been encountered yet.
-    if( simulated_stat_degree.find(d1) == simulated_stat_degree.end() )
-    {
-      simulated_stat_degree[d1] = 0;
-      simulated_stat_sum_degree_neighbors[d1] = 0;
-      simulated_stat_avg_degree_neighbors[d1] = 0;
-      simulated_stat_nb_triangles[d1] = 0;
-      simulated_stat_clustering[d1] = 0;
-    }
-    // Compiles the average quantities by degree class.
-    simulated_stat_degree[d1] += 1;
-    if(d1 > 0)
-    {
-      simulated_stat_sum_degree_neighbors[d1] += simulated_sum_degree_of_neighbors[v1];
-      simulated_stat_avg_degree_neighbors[d1] += simulated_sum_degree_of_neighbors[v1] / d1;
-    }
-    if(d1 > 1)
-    {
-      simulated_stat_nb_triangles[d1] += simulated_nb_triangles[v1];
-      simulated_stat_clustering[d1] += 2 * simulated_nb_triangles[v1] / d1 / (d1 - 1);
-    }
+    nb_threads = (NB_THREADS > 0) ? NB_THREADS : omp_get_max_threads();
   }
+#endif
+  adjacency.count_triangles(graph.nb_triangles, nb_threads);
 }
 
+
 void embeddingSD_t::build_cumul_dist_for_mc_integration(int dim) {
   int v1;
   double tmp_val, tmp_cumul;
@@ -581,7 +674,7 @@ void embeddingSD_t::build_cumul_dist_for_mc_integration(int dim) {
     for(; it2!=end2; ++it2) {
       const auto kappa1 = random_ensemble_kappa_per_degree_class[*it1];
       const auto kappa2 = random_ensemble_kappa_per_degree_class[*it2];
-      tmp_val = compute_integral_expected_degree_dimensions(dim, R, mu, beta, kappa1, kappa2);
+      tmp_val = integral_expected_degree(dim, R, kappa1, kappa2);
       nkkp[*it2] = degree2vertices[*it2].size() * tmp_val / random_ensemble_expected_degree_per_degree_class[*it1];
     }
 
@@ -675,70 +768,20 @@ void embeddingSD_t::build_cumul_dist_for_mc_integration()
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::compute_clustering()
 {
+  // Counts the triangles attached to every vertex.
+  int nb_threads = 1;
+#ifdef _OPENMP
+  nb_threads = (NB_THREADS > 0) ? NB_THREADS : omp_get_max_threads();
+#endif
+  adjacency_list.count_triangles(nbtriangles, nb_threads);
+  // Computes the average local clustering coefficient (over the vertices of degree > 1).
   average_clustering = 0;
-  // Variables.
-  double nb_triangles, tmp_val;
-  // Vector objects.
-  std::vector<int> intersection;
-  // Set objects.
-  std::set<int> neighbors_v2;
-  // Iterator objects.
-  std::vector<int>::iterator it;
-  std::set<int>::iterator it1, end1, it2, end2;
-  std::map<int, std::vector<int> >::iterator it3, end3;
-  if(VALIDATION_MODE)
-  {
-    // Initializes the individual clustering coefficients.
-    nbtriangles.clear();
-    nbtriangles.resize(nb_vertices, 0);
-  }
-  // Computes the intersection for the in- and out- neighbourhoods of each vertex.
   for(int v1(0), d1; v1<nb_vertices; ++v1)
   {
-    // Resets the local clustering coefficient.
-    nb_triangles = 0;
-    // Performs the calculation only if degree > 1.
     d1 = degree[v1];
     if( d1 > 1 )
     {
-      // Loops over the neighbors of vertex v1.
-      it1 = adjacency_list[v1].begin();
-      end1 = adjacency_list[v1].end();
-      for(; it1!=end1; ++it1)
-      {
-        // Performs the calculation only if degree > 1.
-        if( degree[*it1] > 1 )
-        {
-          // Builds an ordered list of the neighbourhood of v2
-          it2 = adjacency_list[*it1].begin();
-          end2 = adjacency_list[*it1].end();
-          neighbors_v2.clear();
-          for(; it2!=end2; ++it2)
-          {
-            if(*it1 < *it2) // Ensures that triangles will be counted only once.
-            {
-              neighbors_v2.insert(*it2);
-            }
-          }
-          // Counts the number of triangles.
-          if(neighbors_v2.size() > 0)
-          {
-            intersection.clear();
-            intersection.resize(std::min(adjacency_list[v1].size(), neighbors_v2.size()));
-            it = std::set_intersection(adjacency_list[v1].begin(), adjacency_list[v1].end(),
-                                  neighbors_v2.begin(), neighbors_v2.end(), intersection.begin());
-            intersection.resize(it-intersection.begin());
-            nb_triangles += intersection.size();
-          }
-        }
-      }
-      // Adds the contribution of vertex v1 to the average clustering coefficient.
-      tmp_val = 2 * nb_triangles / (d1 * (d1 - 1));
-      average_clustering += tmp_val;
-      if(VALIDATION_MODE)
-      {
-        nbtriangles[v1] = nb_triangles;
-      }
+      average_clustering += 2 * nbtriangles[v1] / d1 / (d1 - 1);
     }
   }
   // Completes the calculation of the average local clustering coefficient.
@@ -752,7 +795,7 @@ void embeddingSD_t::compute_inferred_ensemble_expected_degrees(int dim, double r
   inferred_ensemble_expected_degree.resize(nb_vertices, 0);
   for(int v1=0; v1<nb_vertices; ++v1) {
     for(int v2(v1 + 1); v2<nb_vertices; ++v2) {
-      const auto dtheta = compute_angle_d_vectors(d_positions[v1], d_positions[v2]);
+      const auto dtheta = d_positions.angle(v1, v2);
       const auto chi = radius * dtheta / std::pow(mu * kappa[v1] * kappa[v2], 1.0 / dim);
       const auto prob = 1 / (1 + std::pow(chi, beta));
       inferred_ensemble_expected_degree[v1] += prob;
@@ -802,18 +845,27 @@ void embeddingSD_t::compute_random_ensemble_clustering(int dim)
 {
   // Reinitializes the average clustering for the ensemble.
   random_ensemble_average_clustering = 0;
+  // Fills the lookup table beforehand since it is read concurrently.
+  prepare_integral_tables(dim, compute_radius(dim, nb_vertices));
   // Computes the inferred ensemble clustering spectrum for all degree classes over 1.
   auto it = degree_class.begin();
   auto end = degree_class.end();
   while(*it < 2) { ++it; }
+  double variance = 0;
   for(; it!=end; ++it)
   {
-    // Computes the clustering coefficient for the degree class and updates the average value.
-    double p23 = compute_random_ensemble_clustering_for_degree_class(*it, dim);
+    // Computes the clustering coefficient for the degree class and updates the average value. The
+    //   target error of a class scales as 1/sqrt(weight) such that the error of the average is
+    //   below EXP_CLUST_TARGET_STANDARD_ERROR.
+    const double weight = static_cast<double>(degree2vertices[*it].size()) / nb_vertices_degree_gt_one;
+    double error;
+    double p23 = compute_random_ensemble_clustering_for_degree_class(*it, dim, EXP_CLUST_TARGET_STANDARD_ERROR / std::sqrt(weight), error);
     random_ensemble_average_clustering += p23 * degree2vertices[*it].size();
+    variance += weight * weight * error * error;
   }
   // Completes the calculation of the average clustering coefficient of the inferred ensemble.
   random_ensemble_average_clustering /= nb_vertices_degree_gt_one;
+  random_ensemble_average_clustering_error = std::sqrt(variance);
 }
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
@@ -826,36 +878,46 @@ void embeddingSD_t::compute_random_ensemble_clustering()
   auto it = degree_class.begin();
   auto end = degree_class.end();
   while(*it < 2) { ++it; }
+  double variance = 0;
   for(; it!=end; ++it)
   {
-    // Computes the clustering coefficient for the degree class and updates the average value.
-    double p23 = compute_random_ensemble_clustering_for_degree_class(*it);
+    // Computes the clustering coefficient for the degree class and updates the average value. The
+    //   target error of a class scales as 1/sqrt(weight) such that the error of the average is
+    //   below EXP_CLUST_TARGET_STANDARD_ERROR.
+    const double weight = static_cast<double>(degree2vertices[*it].size()) / nb_vertices_degree_gt_one;
+    double error;
+    double p23 = compute_random_ensemble_clustering_for_degree_class(*it, EXP_CLUST_TARGET_STANDARD_ERROR / std::sqrt(weight), error);
     // ensemble_clustering_spectrum[*it] = p23;
     random_ensemble_average_clustering += p23 * degree2vertices[*it].size();
+    variance += weight * weight * error * error;
   }
   // Completes the calculation of the average clustering coefficient of the inferred ensemble.
   random_ensemble_average_clustering /= nb_vertices_degree_gt_one;
+  random_ensemble_average_clustering_error = std::sqrt(variance);
 }
 
-std::pair<int, double> embeddingSD_t::degree_of_random_vertex_and_prob_conn(int d1, double R, int dim)
+std::pair<int, double> embeddingSD_t::degree_of_random_vertex_and_prob_conn(int d1, double R, int dim, std::mt19937 &_engine)
 {
-  auto d = cumul_prob_kgkp[d1].lower_bound(uniform_01(engine))->second;
+  std::uniform_real_distribution<double> _uniform_01;
+  auto d = cumul_prob_kgkp[d1].lower_bound(_uniform_01(_engine))->second;
   const auto kappa1 = random_ensemble_kappa_per_degree_class[d1];
   const auto kappa2 = random_ensemble_kappa_per_degree_class[d];
-  auto p = compute_integral_expected_degree_dimensions(dim, R, mu, beta, kappa1, kappa2);
+  auto p = integral_expected_degree(dim, R, kappa1, kappa2);
   return std::make_pair(d, p);
 }
 
-std::pair<int, double> embeddingSD_t::degree_of_random_vertex_and_prob_conn(int d1, double R)
+std::pair<int, double> embeddingSD_t::degree_of_random_vertex_and_prob_conn(int d1, double R, std::mt19937 &_engine)
 {
-  auto d = cumul_prob_kgkp[d1].lower_bound(uniform_01(engine))->second;
+  std::uniform_real_distribution<double> _uniform_01;
+  auto d = cumul_prob_kgkp[d1].lower_bound(_uniform_01(_engine))->second;
   auto p = hyp2f1a(beta, -std::pow((PI * R) / (mu * random_ensemble_kappa_per_degree_class[d1] * random_ensemble_kappa_per_degree_class[d]), beta));
   return std::make_pair(d, p);
 }
 
-double embeddingSD_t::draw_random_angular_distance(int d1, int d2, double R, double p12, int dim)
+double embeddingSD_t::draw_random_angular_distance(int d1, int d2, double R, double p12, int dim, std::mt19937 &_engine)
 {
-  double pc = uniform_01(engine);
+  std::uniform_real_distribution<double> _uniform_01;
+  double pc = _uniform_01(_engine);
   double zmin = 0, zmax = PI, z, pz;
   const auto kappa1 = random_ensemble_kappa_per_degree_class[d1];
   const auto kappa2 = random_ensemble_kappa_per_degree_class[d2];
@@ -871,9 +933,10 @@ double embeddingSD_t::draw_random_angular_distance(int d1, int d2, double R, dou
   return (zmax + zmin) / 2;
 }
 
-double embeddingSD_t::draw_random_angular_distance(int d1, int d2, double R, double p12)
+double embeddingSD_t::draw_random_angular_distance(int d1, int d2, double R, double p12, std::mt19937 &_engine)
 {
-  double pc = uniform_01(engine);
+  std::uniform_real_distribution<double> _uniform_01;
+  double pc = _uniform_01(_engine);
   double zmin = 0, zmax = PI, z, pz;
   while((zmax - zmin) > NUMERICAL_CONVERGENCE_THRESHOLD_2)
   {
@@ -889,100 +952,271 @@ double embeddingSD_t::draw_random_angular_distance(int d1, int d2, double R, dou
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
-double embeddingSD_t::compute_random_ensemble_clustering_for_degree_class(int d1, int dim)
+double embeddingSD_t::compute_random_ensemble_clustering_for_degree_class(int d1, int dim, double target_error, double &error)
 {
-  // Variables.
-  double z12, z13, da;
   // Parameters.
-  double p23 = 0;
-  const int nb_points = EXP_CLUST_NB_INTEGRATION_MC_STEPS;
   const double R = compute_radius(dim, nb_vertices);
   mu = calculate_mu(dim);
-  // MC integration.
-#pragma omp parallel for default(shared) reduction(+:p23)
-  for(int i=0; i<nb_points; ++i)
+  // Contribution of one sample (normals holds the random components of the directions of vertices 2 and 3).
+  auto sample = [&](std::mt19937 &_engine, std::vector<double> &normals)
   {
     // Gets the degree of vertex 2 and 3; and Computes their probability of being connected (A.3.2.i).
-    const auto [d2, p12] = degree_of_random_vertex_and_prob_conn(d1, R, dim);
-    const auto [d3, p13] = degree_of_random_vertex_and_prob_conn(d1, R, dim);
+    const auto [d2, p12] = degree_of_random_vertex_and_prob_conn(d1, R, dim, _engine);
+    const auto [d3, p13] = degree_of_random_vertex_and_prob_conn(d1, R, dim, _engine);
 
     // Random angular distances between vertex (1, 2) and (1, 3) (A.3.2.ii).
-    z12 = draw_random_angular_distance(d1, d2, R, p12, dim);
-    z13 = draw_random_angular_distance(d1, d3, R, p13, dim);
-
-    // Draw two random D+1 vector with first coordinate constrained by angle and compute distance between them
-    const auto v1 = generate_random_d_vector_with_first_coordinate(dim, z12, R);
-    const auto v2 = generate_random_d_vector_with_first_coordinate(dim, z13, R);
-    const auto d_angle = compute_angle_d_vectors(v1, v2);
-    if (d_angle < NUMERICAL_ZERO) {
-      p23 += 1;
-    } else {
-      const auto kappa1 = random_ensemble_kappa_per_degree_class[d2];
-      const auto kappa2 = random_ensemble_kappa_per_degree_class[d3];
-      const auto inside = (R * d_angle / std::pow(mu * kappa1 * kappa2, 1.0 / dim));
-      p23 += 1.0 / (1 + std::pow(inside, beta));
+    const double z12 = draw_random_angular_distance(d1, d2, R, p12, dim, _engine);
+    const double z13 = draw_random_angular_distance(d1, d3, R, p13, dim, _engine);
+
+    // Vertices 2 and 3 lie at angular distances z12 and z13 from vertex 1, in random directions u2 and u3
+    //   orthogonal to it, such that cos(z23) = cos(z12) cos(z13) + sin(z12) sin(z13) u2.u3.
+    std::normal_distribution<double> _normal_01;
+    normals.resize(2 * dim);
+    for(auto &x : normals)
+      x = _normal_01(_engine);
+    double dot = 0, norm2 = 0, norm3 = 0;
+    for(int i(0); i<dim; ++i)
+    {
+      dot += normals[i] * normals[dim + i];
+      norm2 += normals[i] * normals[i];
+      norm3 += normals[dim + i] * normals[dim + i];
     }
-  }
+    const double cos_angle = std::cos(z12) * std::cos(z13) + std::sin(z12) * std::sin(z13) * dot / std::sqrt(norm2 * norm3);
+    if(std::fabs(cos_angle - 1) < NUMERICAL_ZERO)
+      return 1.0;
+    const auto d_angle = std::acos(std::max(-1.0, std::min(1.0, cos_angle)));
+    const auto kappa1 = random_ensemble_kappa_per_degree_class[d2];
+    const auto kappa2 = random_ensemble_kappa_per_degree_class[d3];
+    const auto inside = (R * d_angle / std::pow(mu * kappa1 * kappa2, 1.0 / dim));
+    return 1.0 / (1 + std::pow(inside, beta));
+  };
   // Returns the value of the local clustering coefficient for this degree class (A.3.2.iv).
-  return p23 / nb_points;
+  return integrate_clustering_by_batches(sample, target_error, error);
 }
 
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
-double embeddingSD_t::compute_random_ensemble_clustering_for_degree_class(int d1)
+double embeddingSD_t::compute_random_ensemble_clustering_for_degree_class(int d1, double target_error, double &error)
 {
-  // Variables.
-  double z12, z13, da;
-  double p23 = 0;
   // Parameters.
-  int nb_points = EXP_CLUST_NB_INTEGRATION_MC_STEPS;
   const double R = nb_vertices / (2 * PI);
   mu = calculateMu();
-  // MC integration.
-#pragma omp parallel for default(shared) reduction(+:p23)
-  for(int i=0; i<nb_points; ++i)
+  // Contribution of one sample.
+  auto sample = [&](std::mt19937 &_engine, std::vector<double> &)
   {
     // Gets the degree of vertex 2 and 3; and Computes their probability of being connected (A.3.2.i).
-    const auto [d2, p12] = degree_of_random_vertex_and_prob_conn(d1, R);
-    const auto [d3, p13] = degree_of_random_vertex_and_prob_conn(d1, R);
+    const auto [d2, p12] = degree_of_random_vertex_and_prob_conn(d1, R, _engine);
+    const auto [d3, p13] = degree_of_random_vertex_and_prob_conn(d1, R, _engine);
 
     // Random angular distances between vertex (1, 2) and (1, 3) (A.3.2.ii).
-    z12 = draw_random_angular_distance(d1, d2, R, p12);
-    z13 = draw_random_angular_distance(d1, d3, R, p13);
+    const double z12 = draw_random_angular_distance(d1, d2, R, p12, _engine);
+    const double z13 = draw_random_angular_distance(d1, d3, R, p13, _engine);
 
     // Set the angular distances (A.3.2.iii)
-    if(uniform_01(engine) < 0.5)
+    std::uniform_real_distribution<double> _uniform_01;
+    double da;
+    if(_uniform_01(_engine) < 0.5)
       da = std::fabs(z12 + z13);
     else
       da = std::fabs(z12 - z13);
 
     da = std::min(da, (2.0 * PI) - da);
     if(da < NUMERICAL_ZERO)
-      p23 += 1;
-    else
-      p23 += 1.0 / (1.0 + std::pow((da * R) / (mu * random_ensemble_kappa_per_degree_class[d2] * random_ensemble_kappa_per_degree_class[d3]), beta));
-  }
+      return 1.0;
+    return 1.0 / (1.0 + std::pow((da * R) / (mu * random_ensemble_kappa_per_degree_class[d2] * random_ensemble_kappa_per_degree_class[d3]), beta));
+  };
   // Returns the value of the local clustering coefficient for this degree class (A.3.2.iv).
-  return p23 / nb_points;
+  return integrate_clustering_by_batches(sample, target_error, error);
 }
 
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
-double embeddingSD_t::compute_pairwise_loglikelihood(int dim, int v1, std::vector<double> pos1, int v2, std::vector<double> pos2, bool neighbors, double radius)
+double embeddingSD_t::integrate_clustering_by_batches(const std::function<double(std::mt19937 &, std::vector<double> &)> &sample, double target_error, double &error)
 {
-  // Avoids to compute the pairwise loglikelihood of the vertex with itself.
-  if(v1 == v2)
-    return 0;
-  const auto dtheta = compute_angle_d_vectors(pos1, pos2);
-  const auto chi = radius * dtheta / std::pow(mu * kappa[v1] * kappa[v2], 1.0 / dim);
-  const auto prob = 1 / (1 + std::pow(chi, beta));
-  if (neighbors) { // TODO: Is it correct ??
-    return std::log(prob);
-  } else {
-    return std::log(1 - prob);
-  }  
+  const int batch_size = EXP_CLUST_NB_INTEGRATION_MC_STEPS;
+#ifdef _OPENMP
+  const int nb_threads = (NB_THREADS > 0) ? NB_THREADS : omp_get_max_threads();
+#endif
+  std::vector<unsigned int> seeds(batch_size);
+  std::vector<double> values(batch_size);
+  double sum = 0, sum_of_squares = 0;
+  int nb_points = 0;
+  do
+  {
+    // Seeds are drawn sequentially such that the outcome does not depend on the scheduling of the threads.
+    for(auto &seed : seeds)
+      seed = engine();
+    #pragma omp parallel num_threads(nb_threads)
+    {
+      std::mt19937 thread_engine;
+      std::vector<double> buffer;
+      #pragma omp for schedule(dynamic)
+      for(int i=0; i<batch_size; ++i)
+      {
+        thread_engine.seed(seeds[i]);
+        values[i] = sample(thread_engine, buffer);
+      }
+    }
+    // Accumulates the values of the batch in a fixed order.
+    for(const auto &value : values)
+    {
+      sum += value;
+      sum_of_squares += value * value;
+    }
+    nb_points += batch_size;
+    const double mean = sum / nb_points;
+    error = std::sqrt(std::max(0.0, sum_of_squares / nb_points - mean * mean) / (nb_points - 1));
+  } while(error > target_error && nb_points < EXP_CLUST_MAX_NB_INTEGRATION_MC_STEPS);
+  return sum / nb_points;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+Eigen::VectorXd embeddingSD_t::compute_candidates_loglikelihood(int dim, int v1, const Eigen::MatrixXd &candidates, double radius)
+{
+  const int nb_candidates = candidates.cols();
+  Eigen::VectorXd loglikelihood = Eigen::VectorXd::Zero(nb_candidates);
+  if(APPROXIMATE_LIKELIHOOD_MODE)
+  {
+    std::vector<double> position(dim + 1);
+    for(int c(0); c<nb_candidates; ++c)
+    {
+      Eigen::VectorXd::Map(position.data(), dim + 1) = candidates.col(c);
+      loglikelihood(c) = compute_approximate_vertex_loglikelihood(dim, v1, position, radius);
+    }
+    return loglikelihood;
+  }
+  // chi = R * dtheta / (mu * k1 * k2)^(1/D) = prefactor * dtheta * k2^(-1/D).
+  const double prefactor = radius / std::pow(mu * kappa[v1], 1.0 / dim);
+  // Every pair contributes log(1 - p) = -log(1 + chi^(-beta)). The cosines between the candidates
+  //   and the vertices are obtained by blocks through a matrix product.
+  const int block_size = std::min(nb_vertices, LOGLIKELIHOOD_BLOCK_SIZE);
+  Eigen::MatrixXd cosines(block_size, nb_candidates);
+  for(int v_i(0), n; v_i<nb_vertices; v_i+=n)
+  {
+    n = std::min(block_size, nb_vertices - v_i);
+    cosines.topRows(n).noalias() = d_positions.units().middleRows(v_i, n) * candidates;
+    for(int c(0); c<nb_candidates; ++c)
+    {
+      const double *cosine = cosines.col(c).data();
+      double sum = 0;
+      for(int i(0); i<n; ++i)
+      {
+        // Avoids to compute the pairwise loglikelihood of the vertex with itself.
+        if(v_i + i == v1)
+          continue;
+        sum -= std::log1p(std::pow(prefactor * inverse_kappa_root[v_i + i] * d_positions.angle_from_cosine(cosine[i]), -beta));
+      }
+      loglikelihood(c) += sum;
+    }
+  }
+  // Neighbors further contribute log(p) = -log(1 + chi^beta).
+  const int nb_neighbors = adjacency_list[v1].size();
+  if(nb_neighbors > 0)
+  {
+    positions_SD_t::matrix_t neighbors(nb_neighbors, dim + 1);
+    const int *neighbor_ids = adjacency_list[v1].begin();
+    for(int j(0); j<nb_neighbors; ++j)
+      neighbors.row(j) = d_positions.units().row(neighbor_ids[j]);
+    Eigen::MatrixXd neighbor_cosines = neighbors * candidates;
+    for(int c(0); c<nb_candidates; ++c)
+    {
+      for(int j(0); j<nb_neighbors; ++j)
+      {
+        loglikelihood(c) -= std::log1p(std::pow(prefactor * inverse_kappa_root[neighbor_ids[j]] * d_positions.angle_from_cosine(neighbor_cosines(j, c)), beta));
+      }
+    }
+  }
+  return loglikelihood;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double embeddingSD_t::integral_expected_degree(int dim, double radius, double kappa1, double kappa2)
+{
+  if(!TABULATED_INTEGRALS_MODE)
+  {
+    return compute_integral_expected_degree_dimensions(dim, radius, mu, beta, kappa1, kappa2);
+  }
+  // The table only depends on the dimension and beta.
+  pkk_table.reset(dim, beta);
+  return pkk_table(radius / std::pow(mu * kappa1 * kappa2, 1.0 / dim));
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double embeddingSD_t::integral_expected_theta(int dim, double radius, double kappa1, double kappa2)
+{
+  if(!TABULATED_INTEGRALS_MODE)
+  {
+    return compute_integral_expected_theta(dim, radius, mu, beta, kappa1, kappa2);
+  }
+  // The table only depends on the dimension and beta.
+  pkk_theta_table.reset(dim, beta, true);
+  return pkk_theta_table(radius / std::pow(mu * kappa1 * kappa2, 1.0 / dim));
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::prepare_integral_tables(int dim, double radius)
+{
+  if(!TABULATED_INTEGRALS_MODE)
+  {
+    return;
+  }
+  auto minmax = std::minmax_element(random_ensemble_kappa_per_degree_class.begin(), random_ensemble_kappa_per_degree_class.end(),
+                                    [](const auto &a, const auto &b) { return a.second < b.second; });
+  const double kappa_min = minmax.first->second;
+  const double kappa_max = minmax.second->second;
+  pkk_table.reset(dim, beta);
+  pkk_table.prepare(radius / std::pow(mu * kappa_max * kappa_max, 1.0 / dim), radius / std::pow(mu * kappa_min * kappa_min, 1.0 / dim));
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double embeddingSD_t::compute_approximate_vertex_loglikelihood(int dim, int v1, const std::vector<double> &pos1, double radius)
+{
+  // Unit vector of the position.
+  std::vector<double> unit(pos1);
+  normalize_and_rescale_vector(unit, 1);
+  // chi = R * dtheta / (mu * k1 * k2)^(1/D) = chi_prefactor * dtheta * k2^(-1/D).
+  const double chi_prefactor = radius / std::pow(mu * kappa[v1], 1.0 / dim);
+  // For far away vertices, log(1 - p) = -log(1 + (mu * k1 * k2)^(beta/D) / (R * dtheta)^beta). The
+  //   weight of each vertex in position_cells is k2^(beta/D) such that the contribution of a cell
+  //   is evaluated at the centroid of its vertices using the average weight.
+  const double prefactor = std::pow(mu * kappa[v1], beta / dim) / std::pow(radius, beta);
+  double loglikelihood = 0;
+  // The vertex itself is left out of the cells (it is still stored in them when the vertices of a batch
+  //   are refined in parallel).
+  position_cells.traverse(unit.data(), APPROXIMATE_LIKELIHOOD_ACCURACY, v1,
+    [&](int v2)
+    {
+      loglikelihood -= std::log1p(std::pow(chi_prefactor * inverse_kappa_root[v2] * d_positions.angle(v2, unit.data()), -beta));
+    },
+    [&](int count, double weight, const double *centroid)
+    {
+      double dot = 0, norm = 0;
+      for(int i(0); i<dim+1; ++i)
+      {
+        dot += unit[i] * centroid[i];
+        norm += centroid[i] * centroid[i];
+      }
+      const double dtheta = std::acos(std::max(-1.0, std::min(1.0, dot / std::sqrt(norm))));
+      loglikelihood -= count * std::log(1 + prefactor * (weight / count) / std::pow(dtheta, beta));
+    });
+  // Neighbors are always considered exactly.
+  for(const auto &v2 : adjacency_list[v1])
+  {
+    loglikelihood -= std::log1p(std::pow(chi_prefactor * inverse_kappa_root[v2] * d_positions.angle(v2, unit.data()), beta));
+  }
+  return loglikelihood;
 }
 
 
@@ -1019,7 +1253,7 @@ void embeddingSD_t::embed()
 {
   if (DIMENSION > 1) {
     embed(DIMENSION);
-    exit(0);
+    return;
   }
   // Gets current time.
   time0 = time_since_epoch_in_seconds();
@@ -1047,17 +1281,30 @@ void embeddingSD_t::embed()
     // Loads the parameters from the .inf_coord file.
     load_already_inferred_parameters();
   }
-  if(!REFINE_MODE)
+  if(RESUME_MODE)
+  {
+    // Restores the state of the embedding from the checkpoint.
+    load_checkpoint(1);
+  }
+  if(!REFINE_MODE && resumed_stage < CHECKPOINT_PARAMETERS)
   {
     // Pre-processing: infers the parameters used for the embedding.
     infer_parameters();
+    if(CHECKPOINT_MODE)
+    {
+      save_checkpoint(1, CHECKPOINT_PARAMETERS, 0);
+    }
   }
   // Gets current time.
   time2 = time_since_epoch_in_seconds();
-  if(!REFINE_MODE)
+  if(!REFINE_MODE && resumed_stage < CHECKPOINT_INITIAL_POSITIONS)
   {
     // First phase: educated guess of the positions.
     infer_initial_positions();
+    if(CHECKPOINT_MODE)
+    {
+      save_checkpoint(1, CHECKPOINT_INITIAL_POSITIONS, 0);
+    }
   }
   // Gets current time.
   time3 = time_since_epoch_in_seconds();
@@ -1082,16 +1329,19 @@ void embeddingSD_t::embed()
   // Gets the current time.
   time5 = time_since_epoch_in_seconds();
   time_ended = std::time(nullptr);
-  // Saves the inferred coordinates in a file.
-  save_inferred_coordinates();
-  if(VALIDATION_MODE)
+  if(!IN_MEMORY_MODE)
+  {
+    // Saves the inferred coordinates in a file.
+    save_inferred_coordinates();
+  }
+  if(VALIDATION_MODE && !IN_MEMORY_MODE)
   {
     save_inferred_theta_density();
     save_inferred_connection_probability();
   }
   // Gets the current time.
   time6 = time_since_epoch_in_seconds();
-  if(CHARACTERIZATION_MODE)
+  if(CHARACTERIZATION_MODE && !IN_MEMORY_MODE)
   {
     save_inferred_ensemble_characterization();
   }
@@ -1129,17 +1379,30 @@ void embeddingSD_t::embed(int dim)
     // Loads the parameters from the .inf_coord file.
     load_already_inferred_parameters(dim);
   }
-  if(!REFINE_MODE)
+  if(RESUME_MODE)
+  {
+    // Restores the state of the embedding from the checkpoint.
+    load_checkpoint(dim);
+  }
+  if(!REFINE_MODE && resumed_stage < CHECKPOINT_PARAMETERS)
   {
     // Pre-processing: infers the parameters used for the embedding.
     infer_parameters(dim);
+    if(CHECKPOINT_MODE)
+    {
+      save_checkpoint(dim, CHECKPOINT_PARAMETERS, 0);
+    }
   }
   // Gets current time.
   time2 = time_since_epoch_in_seconds();
-  if(!REFINE_MODE)
+  if(!REFINE_MODE && resumed_stage < CHECKPOINT_INITIAL_POSITIONS)
   {
     // First phase: educated guess of the positions.
     infer_initial_positions(dim);
+    if(CHECKPOINT_MODE)
+    {
+      save_checkpoint(dim, CHECKPOINT_INITIAL_POSITIONS, 0);
+    }
   }
   time3 = time_since_epoch_in_seconds();
   
@@ -1159,14 +1422,17 @@ void embeddingSD_t::embed(int dim)
     infer_kappas_beta_for_all_vertices(dim);
   }
   time5 = time_since_epoch_in_seconds();
-  save_inferred_coordinates(dim);
-  if(VALIDATION_MODE)
+  if(!IN_MEMORY_MODE)
+  {
+    save_inferred_coordinates(dim);
+  }
+  if(VALIDATION_MODE && !IN_MEMORY_MODE)
   {
     //save_inferred_theta_density();
     save_inferred_connection_probability(dim);
   }
   time6 = time_since_epoch_in_seconds();
-  if (CHARACTERIZATION_MODE)
+  if (CHARACTERIZATION_MODE && !IN_MEMORY_MODE)
   {
     save_inferred_ensemble_characterization(dim, false);
   }
@@ -1180,73 +1446,69 @@ void embeddingSD_t::embed(int dim)
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::extract_onion_decomposition(std::vector<int> &coreness, std::vector<int> &od_layer)
 {
-  // Builds two lists (std::vector, std::set) of the degree of the vertices.
-  std::vector<int> DegreeVec(nb_vertices);
-  std::set<std::pair<int, int> > DegreeSet;
+  coreness.resize(nb_vertices);
+  od_layer.resize(nb_vertices);
+  // Sorts the vertices by degree in an array in which the vertices of "effective" degree d occupy the
+  //   positions bin[d] to bin[d+1]-1 (bucket queue of Batagelj and Zaversnik).
+  int v1, d1, d2;
+  const int d_max = *std::max_element(degree.begin(), degree.end());
+  std::vector<int> DegreeVec(degree);
+  std::vector<int> bin(d_max + 2, 0);
+  std::vector<int> vert(nb_vertices);
+  std::vector<int> pos(nb_vertices);
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    ++bin[DegreeVec[v] + 1];
+  }
+  for(int d(0); d<=d_max; ++d)
+  {
+    bin[d + 1] += bin[d];
+  }
+  std::vector<int> cursor(bin.begin(), bin.end() - 1);
   for(int v(0); v<nb_vertices; ++v)
   {
-    DegreeSet.insert(std::make_pair(degree[v], v));
-    DegreeVec[v] = degree[v];
+    pos[v] = cursor[DegreeVec[v]]++;
+    vert[pos[v]] = v;
   }
 
   // Determines the coreness and the layer based on the modified algorithm of Batagelj and
-  //   Zaversnik by Hébert-Dufresne, Grochow and Allard.
-  int v1, v2, d1, d2;
+  //   Zaversnik by Hébert-Dufresne, Grochow and Allard. The vertices before position i have been
+  //   removed, and the layer consists of all the remaining vertices of minimal "effective" degree.
   int current_layer = 0;
-  // int current_core = 0;
-  std::set<int>::iterator it1, end;
-  std::set< std::pair<int, int> > LayerSet;
-  // std::set< std::pair<int, int> > order_in_layer;
-  std::set< std::pair<int, int> >::iterator m_it;
-  // std::set< std::pair<int, int> >::iterator o_it, o_end;
-  while(!DegreeSet.empty())
-  {
-    // Populates the set containing the vertices belonging to the same layer.
-    m_it = DegreeSet.begin();
-    d1 = m_it->first;
+  for(int i(0), end; i<nb_vertices; i = end)
+  {
+    d1 = DegreeVec[vert[i]];
+    end = bin[d1 + 1];
     // Increases the layer id.
     current_layer += 1;
     // Sets the coreness and the layer the vertices with the same degree.
-    while(m_it->first == d1 && m_it != DegreeSet.end())
-    {
-      // Sets the coreness and the layer.
-      v1 = m_it->second;
-      coreness[v1] = d1;
-      od_layer[v1] = current_layer;
-      // Looks at the next vertex.
-      ++m_it;
-    }
-    // Adds the vertices of the layer to the set.
-    LayerSet.insert(DegreeSet.begin(), m_it);
-    // Removes the vertices of the current layer.
-    DegreeSet.erase(DegreeSet.begin(), m_it);
-    // Modifies the "effective" degree of the neighbors of the vertices in the layer.
-    while(!LayerSet.empty())
-    {
-      // Gets information about the next vertex of the layer.
-      v1 = LayerSet.begin()->second;
-      // Reduces the "effective" degree of its neighbours.
-      it1 = adjacency_list[v1].begin();
-      end = adjacency_list[v1].end();
-      for(; it1!=end; ++it1)
+    for(int j(i); j<end; ++j)
+    {
+      coreness[vert[j]] = d1;
+      od_layer[vert[j]] = current_layer;
+    }
+    // Modifies the "effective" degree of the remaining neighbors of the vertices in the layer.
+    for(int j(i); j<end; ++j)
+    {
+      v1 = vert[j];
+      for(int v2 : adjacency_list[v1])
       {
-        // Identifies the neighbor.
-        v2 = *it1;
         d2 = DegreeVec[v2];
-        // Finds the neighbor in the list "effective" degrees.
-        m_it = DegreeSet.find(std::make_pair(d2, v2));
-        if(m_it != DegreeSet.end())
+        if(pos[v2] >= end && d2 > d1)
         {
-          if(d2 > d1)
-          {
-            DegreeVec[v2] = d2 - 1;
-            DegreeSet.erase(m_it);
-            DegreeSet.insert(std::make_pair(d2 - 1, v2));
-          }
+          // Moves the neighbor to the first position of its bin, which then becomes the last position
+          //   of the previous bin (beyond the current layer, even if d2 - 1 == d1).
+          const int p1 = pos[v2];
+          const int p2 = bin[d2];
+          const int v3 = vert[p2];
+          vert[p1] = v3;
+          pos[v3] = p1;
+          vert[p2] = v2;
+          pos[v2] = p2;
+          ++bin[d2];
+          DegreeVec[v2] = d2 - 1;
         }
       }
-      // Removes the vertices from the LayerSet.
-      LayerSet.erase(LayerSet.begin());
     }
   }
 }
@@ -1256,256 +1518,667 @@ void embeddingSD_t::extract_onion_decomposition(std::vector<int> &coreness, std:
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::finalize()
 {
-  // Resets the formating of std::clog.
-  std::clog << std::resetiosflags(std::ios::floatfield | std::ios::fixed | std::ios::showpoint);
+  // Resets the formating of logstream.
+  logstream << std::resetiosflags(std::ios::floatfield | std::ios::fixed | std::ios::showpoint);
   // Writes the parameters used in the log for reproductibility.
   if (!QUIET_MODE) {
-      std::clog << std::endl;
-      std::clog << "Internal parameters and options" << std::endl;
-      std::clog << TAB << "ALREADY_INFERRED_PARAMETERS_FILENAME   " << ALREADY_INFERRED_PARAMETERS_FILENAME
+      logstream << std::endl;
+      logstream << "Internal parameters and options" << std::endl;
+      logstream << TAB << "ALREADY_INFERRED_PARAMETERS_FILENAME   " << ALREADY_INFERRED_PARAMETERS_FILENAME
+                << std::endl;
+      logstream << TAB << "APPROXIMATE_LIKELIHOOD_ACCURACY        " << APPROXIMATE_LIKELIHOOD_ACCURACY << std::endl;
+      logstream << TAB << "APPROXIMATE_LIKELIHOOD_MODE            " << (APPROXIMATE_LIKELIHOOD_MODE ? "true" : "false")
                 << std::endl;
-      std::clog << TAB << "BETA_ABS_MAX                           " << BETA_ABS_MAX << std::endl;
-      std::clog << TAB << "BETA_ABS_MIN                           " << BETA_ABS_MIN << std::endl;
-      std::clog << TAB << "CHARACTERIZATION_MODE                  " << (CHARACTERIZATION_MODE ? "true" : "false")
+      logstream << TAB << "BETA_ABS_MAX                           " << BETA_ABS_MAX << std::endl;
+      logstream << TAB << "BETA_ABS_MIN                           " << BETA_ABS_MIN << std::endl;
+      logstream << TAB << "CHARACTERIZATION_MODE                  " << (CHARACTERIZATION_MODE ? "true" : "false")
                 << std::endl;
-      std::clog << TAB << "CHARACTERIZATION_NB_GRAPHS             " << CHARACTERIZATION_NB_GRAPHS << std::endl;
-      std::clog << TAB << "CLEAN_RAW_OUTPUT_MODE                  " << (CLEAN_RAW_OUTPUT_MODE ? "true" : "false")
+      logstream << TAB << "CHARACTERIZATION_NB_GRAPHS             " << CHARACTERIZATION_NB_GRAPHS << std::endl;
+      logstream << TAB << "CHECKPOINT_INTERVAL                    " << CHECKPOINT_INTERVAL << std::endl;
+      logstream << TAB << "CHECKPOINT_MODE                        " << (CHECKPOINT_MODE ? "true" : "false") << std::endl;
+      logstream << TAB << "CLEAN_RAW_OUTPUT_MODE                  " << (CLEAN_RAW_OUTPUT_MODE ? "true" : "false")
                 << std::endl;
-      // std::clog << TAB << "CLOSE_ANGULAR_RANGE_FACTOR             " << CLOSE_ANGULAR_RANGE_FACTOR  << std::endl;
-      std::clog << TAB << "CUSTOM_BETA                            " << (CUSTOM_BETA ? "true" : "false") << std::endl;
-      std::clog << TAB << "CUSTOM_CHARACTERIZATION_NB_GRAPHS      "
+      // logstream << TAB << "CLOSE_ANGULAR_RANGE_FACTOR             " << CLOSE_ANGULAR_RANGE_FACTOR  << std::endl;
+      logstream << TAB << "CUSTOM_BETA                            " << (CUSTOM_BETA ? "true" : "false") << std::endl;
+      logstream << TAB << "CUSTOM_CHARACTERIZATION_NB_GRAPHS      "
                 << (CUSTOM_CHARACTERIZATION_NB_GRAPHS ? "true" : "false") << std::endl;
-      std::clog << TAB << "CUSTOM_INFERRED_COORDINATES            " << (CUSTOM_INFERRED_COORDINATES ? "true" : "false")
+      logstream << TAB << "CUSTOM_INFERRED_COORDINATES            " << (CUSTOM_INFERRED_COORDINATES ? "true" : "false")
                 << std::endl;
-      std::clog << TAB << "CUSTOM_OUTPUT_ROOTNAME_MODE            " << (CUSTOM_OUTPUT_ROOTNAME_MODE ? "true" : "false")
+      logstream << TAB << "CUSTOM_OUTPUT_ROOTNAME_MODE            " << (CUSTOM_OUTPUT_ROOTNAME_MODE ? "true" : "false")
                 << std::endl;
-      std::clog << TAB << "CUSTOM_SEED                            " << (CUSTOM_SEED ? "true" : "false") << std::endl;
-      std::clog << TAB << "EDGELIST_FILENAME:                     " << EDGELIST_FILENAME << std::endl;
-      std::clog << TAB << "EXP_CLUST_NB_INTEGRATION_MC_STEPS      " << EXP_CLUST_NB_INTEGRATION_MC_STEPS << std::endl;
-      std::clog << TAB << "EXP_DIST_NB_INTEGRATION_STEPS          " << EXP_DIST_NB_INTEGRATION_STEPS << std::endl;
-      std::clog << TAB << "KAPPA_MAX_NB_ITER_CONV                 " << KAPPA_MAX_NB_ITER_CONV << std::endl;
-      std::clog << TAB << "KAPPA_POST_INFERENCE_MODE              " << (KAPPA_POST_INFERENCE_MODE ? "true" : "false")
+      logstream << TAB << "CUSTOM_SEED                            " << (CUSTOM_SEED ? "true" : "false") << std::endl;
+      logstream << TAB << "DETERMINISTIC_KAPPA_UPDATE_MODE        " << (DETERMINISTIC_KAPPA_UPDATE_MODE ? "true" : "false")
                 << std::endl;
-      // std::clog << TAB << "LIMIT_FOR_CONVERGENCE_CRITERION        " << LIMIT_FOR_CONVERGENCE_CRITERION << std::endl;
-      // std::clog << TAB << "MAX_NB_ITER_MAXIMIZATION               " << MAX_NB_ITER_MAXIMIZATION << std::endl;
-      std::clog << TAB << "MAXIMIZATION_MODE                      " << (MAXIMIZATION_MODE ? "true" : "false")
+      logstream << TAB << "EDGELIST_FILENAME:                     " << EDGELIST_FILENAME << std::endl;
+      logstream << TAB << "EIGENVECTORS_FILENAME:                 " << EIGENVECTORS_FILENAME << std::endl;
+      logstream << TAB << "EXP_CLUST_MAX_NB_INTEGRATION_MC_STEPS  " << EXP_CLUST_MAX_NB_INTEGRATION_MC_STEPS << std::endl;
+      logstream << TAB << "EXP_CLUST_NB_INTEGRATION_MC_STEPS      " << EXP_CLUST_NB_INTEGRATION_MC_STEPS << std::endl;
+      logstream << TAB << "EXP_CLUST_TARGET_STANDARD_ERROR        " << EXP_CLUST_TARGET_STANDARD_ERROR << std::endl;
+      logstream << TAB << "EXP_DIST_NB_INTEGRATION_STEPS          " << EXP_DIST_NB_INTEGRATION_STEPS << std::endl;
+      logstream << TAB << "IN_MEMORY_MODE                         " << (IN_MEMORY_MODE ? "true" : "false") << std::endl;
+      logstream << TAB << "KAPPA_MAX_NB_ITER_CONV                 " << KAPPA_MAX_NB_ITER_CONV << std::endl;
+      logstream << TAB << "KAPPA_POST_INFERENCE_MODE              " << (KAPPA_POST_INFERENCE_MODE ? "true" : "false")
                 << std::endl;
-      // std::clog << TAB << "MINIMAL_ANGULAR_CONVERGENCE_THRESHOLD  " << MINIMAL_ANGULAR_CONVERGENCE_THRESHOLD << std::endl;
-      // std::clog << TAB << "MINIMAL_ANGULAR_RESOLUTION             " << MINIMAL_ANGULAR_RESOLUTION << std::endl;
-      // std::clog << TAB << "NB_VERTICES_IN_CORE                    " << NB_VERTICES_IN_CORE << std::endl;
-      std::clog << TAB << "MIN_NB_ANGLES_TO_TRY                   " << MIN_NB_ANGLES_TO_TRY << std::endl;
-      std::clog << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_1      " << NUMERICAL_CONVERGENCE_THRESHOLD_1 << std::endl;
-      std::clog << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_2      " << NUMERICAL_CONVERGENCE_THRESHOLD_2 << std::endl;
-      std::clog << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_3      " << NUMERICAL_CONVERGENCE_THRESHOLD_3 << std::endl;
-      std::clog << TAB << "NUMERICAL_ZERO                         " << NUMERICAL_ZERO << std::endl;
-      std::clog << TAB << "QUIET_MODE                             " << (QUIET_MODE ? "true" : "false") << std::endl;
-      std::clog << TAB << "REFINE_MODE                            " << (REFINE_MODE ? "true" : "false") << std::endl;
-      // std::clog << TAB << "REFINED_MAX_STEP_LENGTH_DIVISOR        " << REFINED_MAX_STEP_LENGTH_DIVISOR << std::endl;
-      std::clog << TAB << "ROOTNAME_OUTPUT:                       " << ROOTNAME_OUTPUT << std::endl;
-      std::clog << TAB << "SEED                                   " << SEED << std::endl;
-      std::clog << TAB << "VALIDATION_MODE                        " << (VALIDATION_MODE ? "true" : "false")
+      logstream << TAB << "LARGEST_COMPONENT_MODE                 " << (LARGEST_COMPONENT_MODE ? "true" : "false") << std::endl;
+      logstream << TAB << "LOGLIKELIHOOD_BLOCK_SIZE               " << LOGLIKELIHOOD_BLOCK_SIZE << std::endl;
+      // logstream << TAB << "LIMIT_FOR_CONVERGENCE_CRITERION        " << LIMIT_FOR_CONVERGENCE_CRITERION << std::endl;
+      // logstream << TAB << "MAX_NB_ITER_MAXIMIZATION               " << MAX_NB_ITER_MAXIMIZATION << std::endl;
+      logstream << TAB << "MAXIMIZATION_MODE                      " << (MAXIMIZATION_MODE ? "true" : "false")
                 << std::endl;
-      std::clog << TAB << "VERBOSE_MODE                           " << (VERBOSE_MODE ? "true" : "false") << std::endl;
-      std::clog << TAB << "VERSION                                " << VERSION << std::endl;
-      std::clog << std::endl;
-      std::clog << "Ended on: " << format_time(time_ended) << std::endl;
-      std::clog << "Elapsed CPU time (embedding):            " << std::setw(10) << std::fixed << time5 - time0
+      // logstream << TAB << "MINIMAL_ANGULAR_CONVERGENCE_THRESHOLD  " << MINIMAL_ANGULAR_CONVERGENCE_THRESHOLD << std::endl;
+      // logstream << TAB << "MINIMAL_ANGULAR_RESOLUTION             " << MINIMAL_ANGULAR_RESOLUTION << std::endl;
+      // logstream << TAB << "NB_VERTICES_IN_CORE                    " << NB_VERTICES_IN_CORE << std::endl;
+      logstream << TAB << "MEMOIZED_BETA_SEARCH_MODE              " << (MEMOIZED_BETA_SEARCH_MODE ? "true" : "false") << std::endl;
+      logstream << TAB << "MIN_NB_ANGLES_TO_TRY                   " << MIN_NB_ANGLES_TO_TRY << std::endl;
+      logstream << TAB << "MULTILEVEL_COARSEST_SIZE               " << MULTILEVEL_COARSEST_SIZE << std::endl;
+      logstream << TAB << "MULTILEVEL_MODE                        " << (MULTILEVEL_MODE ? "true" : "false") << std::endl;
+      logstream << TAB << "MULTILEVEL_NB_SMOOTHING_STEPS          " << MULTILEVEL_NB_SMOOTHING_STEPS << std::endl;
+      logstream << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_1      " << NUMERICAL_CONVERGENCE_THRESHOLD_1 << std::endl;
+      logstream << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_2      " << NUMERICAL_CONVERGENCE_THRESHOLD_2 << std::endl;
+      logstream << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_3      " << NUMERICAL_CONVERGENCE_THRESHOLD_3 << std::endl;
+      logstream << TAB << "NB_THREADS                             " << NB_THREADS << std::endl;
+      logstream << TAB << "NUMERICAL_ZERO                         " << NUMERICAL_ZERO << std::endl;
+      logstream << TAB << "OTHER_COMPONENTS_MIN_SIZE              " << OTHER_COMPONENTS_MIN_SIZE << std::endl;
+      logstream << TAB << "OTHER_COMPONENTS_MODE                  " << (OTHER_COMPONENTS_MODE ? "true" : "false") << std::endl;
+      logstream << TAB << "PARALLEL_REFINEMENT_MODE               " << (PARALLEL_REFINEMENT_MODE ? "true" : "false")
+                << std::endl;
+      logstream << TAB << "QUIET_MODE                             " << (QUIET_MODE ? "true" : "false") << std::endl;
+      logstream << TAB << "REFINE_MODE                            " << (REFINE_MODE ? "true" : "false") << std::endl;
+      logstream << TAB << "RESUME_FILENAME:                       " << RESUME_FILENAME << std::endl;
+      logstream << TAB << "RESUME_MODE                            " << (RESUME_MODE ? "true" : "false") << std::endl;
+      // logstream << TAB << "REFINED_MAX_STEP_LENGTH_DIVISOR        " << REFINED_MAX_STEP_LENGTH_DIVISOR << std::endl;
+      logstream << TAB << "ROOTNAME_OUTPUT:                       " << ROOTNAME_OUTPUT << std::endl;
+      logstream << TAB << "SEED                                   " << SEED << std::endl;
+      logstream << TAB << "SYMMETRIC_EIGENSOLVER_MODE             " << (SYMMETRIC_EIGENSOLVER_MODE ? "true" : "false")
+                << std::endl;
+      logstream << TAB << "TABULATED_INTEGRALS_MODE               " << (TABULATED_INTEGRALS_MODE ? "true" : "false")
+                << std::endl;
+      logstream << TAB << "VALIDATION_MODE                        " << (VALIDATION_MODE ? "true" : "false")
+                << std::endl;
+      logstream << TAB << "VERBOSE_MODE                           " << (VERBOSE_MODE ? "true" : "false") << std::endl;
+      logstream << TAB << "VERSION                                " << VERSION << std::endl;
+      logstream << std::endl;
+      logstream << "Ended on: " << format_time(time_ended) << std::endl;
+      logstream << "Elapsed CPU time (embedding):            " << std::setw(10) << std::fixed << time5 - time0
                 << " seconds" << std::endl;
-      std::clog << TAB << "initialization:                      " << std::setw(10) << std::fixed << time1 - time0
+      logstream << TAB << "initialization:                      " << std::setw(10) << std::fixed << time1 - time0
                 << " seconds" << std::endl;
 
       if (!REFINE_MODE) {
-          std::clog << TAB << "parameters inference:                " << std::setw(10) << std::fixed << time2 - time1 << " seconds" << std::endl;
-          std::clog << TAB << "initial positions:                   " << std::setw(10) << std::fixed << time3 - time2 << " seconds" << std::endl;
+          logstream << TAB << "parameters inference:                " << std::setw(10) << std::fixed << time2 - time1 << " seconds" << std::endl;
+          logstream << TAB << "initial positions:                   " << std::setw(10) << std::fixed << time3 - time2 << " seconds" << std::endl;
       }
 
       if (REFINE_MODE)
-          std::clog << TAB << "loading previous positions:          " << std::setw(10) << std::fixed << time3 - time1 << " seconds" << std::endl;
+          logstream << TAB << "loading previous positions:          " << std::setw(10) << std::fixed << time3 - time1 << " seconds" << std::endl;
 
       if (MAXIMIZATION_MODE)
-          std::clog << TAB << "refining positions:                  " << std::setw(10) << std::fixed << time4 - time3 << " seconds" << std::endl;
+          logstream << TAB << "refining positions:                  " << std::setw(10) << std::fixed << time4 - time3 << " seconds" << std::endl;
 
-      std::clog << TAB << "adjusting kappas:                    " << std::setw(10) << std::fixed << time5 - time4 << " seconds" << std::endl;
+      logstream << TAB << "adjusting kappas:                    " << std::setw(10) << std::fixed << time5 - time4 << " seconds" << std::endl;
 
       if (VALIDATION_MODE || CHARACTERIZATION_MODE)
-          std::clog << "Elapsed CPU time (validation):           " << std::setw(10) << std::fixed << time7 - time5 << " seconds" << std::endl;
+          logstream << "Elapsed CPU time (validation):           " << std::setw(10) << std::fixed << time7 - time5 << " seconds" << std::endl;
 
       if (VALIDATION_MODE)
-          std::clog << TAB << "validating embedding:                " << std::setw(10) << std::fixed << time6 - time5 << " seconds" << std::endl;
+          logstream << TAB << "validating embedding:                " << std::setw(10) << std::fixed << time6 - time5 << " seconds" << std::endl;
 
       if (CHARACTERIZATION_MODE)
-          std::clog << TAB << "characterizing ensemble:             " << std::setw(10) << std::fixed << time7 - time6 << " seconds" << std::endl;
+          logstream << TAB << "characterizing ensemble:             " << std::setw(10) << std::fixed << time7 - time6 << " seconds" << std::endl;
 
-      std::clog << "===========================================================================================" << std::endl;
+      logstream << "===========================================================================================" << std::endl;
 
-      // Puts the streams back into place (to avoid a segmentation fault when exiting program).
+      // Closes the log file and points the log back to std::clog.
       if (!VERBOSE_MODE) {
           logfile.close();
-          // Reset the rdbuf of clog.
-          std::clog.rdbuf(old_rdbuf);
+          logstream.rdbuf(std::clog.rdbuf());
       }
   }
 }
 
 
-void embeddingSD_t::find_initial_ordering(std::vector<std::vector<double>> &positions, int dim)
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+Eigen::MatrixXd embeddingSD_t::compute_laplacian_eigenvectors(Eigen::SparseMatrix<double> &L, const std::vector<double> &strength, const std::vector<int> &newID, int nb_vectors, int ncv)
 {
-  const auto radius = compute_radius(dim, nb_vertices);
-  mu = calculate_mu(dim);
-  if(!QUIET_MODE) { std::clog << std::endl << TAB << "Building the weights matrix..."; }
-  // Initializes the sparse matrix.
-  Eigen::SparseMatrix<double> L(nb_vertices_degree_gt_one, nb_vertices_degree_gt_one);
-  L.reserve(Eigen::VectorXi::Constant(nb_vertices_degree_gt_one, 3));
-  // ASSUMES THAT THERE IS ONLY ONE CONNECTED COMPONENT.
-
-  // Sets contiguous IDs excluding vertices with degree 1.
-  // For D dimension also include degree 1
-  std::vector<int> newID(nb_vertices, -1);
-  int n=0;
-  for(int v=0; v<nb_vertices; ++v)
+  // Finds the eigenvectors of the generalized eigenvalue problem (S - W) v = lambda S v, where W is
+  //   the weights matrix (stored in L) and S is the diagonal matrix of the strengths. The trivial
+  //   eigenvector (lambda = 0) is not returned.
+  if(!QUIET_MODE) { logstream << std::endl; }
+  // Initial residual vector of the eigensolver (empty if no warm start).
+  Eigen::VectorXd init_resid;
+  if(!EIGENVECTORS_FILENAME.empty())
   {
-    if(degree[v] > 1)
+    init_resid = load_eigenvectors(newID, nb_vectors);
+  }
+  // Containers for the eigenvectors (columns sorted by decreasing eigenvalue).
+  Eigen::MatrixXd evectors;
+  if(MULTILEVEL_MODE && L.rows() > MULTILEVEL_COARSEST_SIZE)
+  {
+    evectors = compute_multilevel_laplacian_eigenvectors(L, strength, nb_vectors, ncv, init_resid);
+  }
+  else
+  {
+    evectors = solve_laplacian_eigenproblem(L, strength, nb_vectors, ncv, init_resid);
+  }
+  if(!EIGENVECTORS_FILENAME.empty())
+  {
+    save_eigenvectors(evectors, newID);
+  }
+  return evectors;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+Eigen::MatrixXd embeddingSD_t::solve_laplacian_eigenproblem(Eigen::SparseMatrix<double> &L, const std::vector<double> &strength, int nb_vectors, int ncv, Eigen::VectorXd init_resid)
+{
+  // The trivial eigenvector (lambda = 0) is also computed but is not returned. L is modified.
+  const int n = L.rows();
+  const int nev = nb_vectors + 1;
+  ncv = std::min(ncv, n);
+  // Containers for the eigenvectors (columns sorted by decreasing eigenvalue).
+  Eigen::MatrixXd evectors;
+  if(SYMMETRIC_EIGENSOLVER_MODE)
+  {
+    // Builds the normalized Laplacian I - S^(-1/2) W S^(-1/2), which is symmetric and whose
+    //   eigenvectors u are related to the generalized ones by v = S^(-1/2) u.
+    for(int k(0), kk(L.outerSize()); k<kk; ++k)
     {
-      newID[v] = n;
-      ++n;
+      for(Eigen::SparseMatrix<double>::InnerIterator it(L, k); it; ++it)
+      {
+        it.valueRef() = -1 * it.value() / std::sqrt(strength[it.row()] * strength[it.col()]);
+      }
     }
-  } 
-  if(n != nb_vertices_degree_gt_one)
-    std::cout << "There is something wrong here." << std::endl;
-
-  // First, fills the matrix with the expected distance between connected vertices according to S^D.
-  double k1, k2, expected_distance, val, t(0), norm(0);
-  for(int v1(0), v2, d1, d2, n1, n2; v1<nb_vertices; ++v1)
-  {
-    n1 = newID[v1];
-    if(n1 != -1)
+    for(int v1(0); v1<n; ++v1)
+      L.insert(v1, v1) = 1;
+    L.makeCompressed();
+    if(init_resid.size() > 0)
     {
-      // Gets the degree and kappa of the first vertex.
-      d1 = degree[v1];
-      k1 = random_ensemble_kappa_per_degree_class[d1];
-      // Loops over its neighbors.
-      auto it  = adjacency_list[v1].begin();
-      auto end = adjacency_list[v1].end();
-      for(; it!=end; ++it)
+      for(int v1(0); v1<n; ++v1)
+        init_resid(v1) *= std::sqrt(strength[v1]);
+    }
+    // The normalized Laplacian being positive semi-definite, a slightly negative shift yields a positive
+    //   definite matrix to factorize and the eigenvalues closest to it are the smallest ones.
+    const double shift = -1e-3;
+    Spectra::SparseSymShiftSolve<double> op(L);
+    bool keep_going = true;
+    while(keep_going)
+    {
+      // Constructs eigen solver object (the Cholesky factorization is computed here).
+      if(!QUIET_MODE) { logstream << TAB << "Computing eigenvectors (Lanczos, shift-invert) using Spectra parameter ncv = " << ncv << "..."; }
+      auto time_start = std::chrono::steady_clock::now();
+      Spectra::SymEigsShiftSolver< double, Spectra::LARGEST_MAGN, Spectra::SparseSymShiftSolve<double> > eigs(&op, nev, ncv, shift);
+      double factorization_time = std::chrono::duration<double>(std::chrono::steady_clock::now() - time_start).count();
+      // Initializes and computes.
+      if(init_resid.size() > 0)
+        eigs.init(init_resid.data());
+      else
+        eigs.init();
+      eigs.compute();
+      double total_time = std::chrono::duration<double>(std::chrono::steady_clock::now() - time_start).count();
+      bool converged = (eigs.info() == Spectra::SUCCESSFUL);
+      if(!QUIET_MODE)
       {
-        // Identifies the second vertex.
-        v2 = *it;
-        n2 = newID[v2];
-        if(n2 != -1)
+        logstream << (converged ? " Convergence reached" : " Convergence not reached") << " after "
+                  << eigs.num_iterations() << " iterations and " << eigs.num_operations() << " operations ("
+                  << total_time << " seconds, including " << factorization_time << " seconds for the factorization)." << std::endl;
+      }
+      if(converged)
+      {
+        // Recovers the generalized eigenvectors (unit norm, as returned by the non-symmetric solver).
+        evectors = eigs.eigenvectors().leftCols(nb_vectors);
+        for(int i(0); i<nb_vectors; ++i)
         {
-          // Ensures that every edge is looked only once.
-          if(v1 < v2)
-          {
-            // Gets the degree and kappa of the second vertex.
-            d2 = degree[v2];
-            k2 = random_ensemble_kappa_per_degree_class[d2];
-            // Computes the expected arc length distance between connected pairs of vertices.
-            const auto top_expected_distance = compute_integral_expected_theta(dim, radius, mu, beta, k1, k2);
-            const auto bottom_expected_distance = compute_integral_expected_degree_dimensions(dim, radius, mu, beta, k1, k2);
-            expected_distance = top_expected_distance / bottom_expected_distance;
-            if(expected_distance < 0 || expected_distance > PI)
-            {
-              // Just a verification.
-              std::cerr << "Warning. Expected angular distance out of range." << std::endl;
-              std::terminate();
-            }
-            // Transforms the arc length distance into Euclidean distances (unit circle).
-            expected_distance = 2 * std::sin(expected_distance / 2);
-            // Fills the matrix.
-            L.insert(n1, n2) = expected_distance;
-            L.insert(n2, n1) = expected_distance;
-            // Scaling factor of the weights (see below).
-            t += 2 * expected_distance * expected_distance;
-            norm += 2;
-          }
+          for(int v1(0); v1<n; ++v1)
+            evectors(v1, i) /= std::sqrt(strength[v1]);
+          evectors.col(i).normalize();
         }
+        keep_going = false;
+      }
+      else
+      {
+        // Checks that the convergence parameter has not reached its maximal value.
+        if(ncv == n)
+        {
+          std::cerr << std::endl << "The algorithm computing the eigenvectors (Spectra library) cannot converge at all... Exiting." << std::endl << std::endl;
+          std::terminate();
+        }
+        // Increases the convergence parameter.
+        ncv = std::min(static_cast<int>(std::pow(ncv, 1.5)), n);
       }
     }
   }
-  t /= norm;
-  // Second, takes the appropriate scaled exponential of each entry and computes the "strengths".
-  double value;
-  std::vector<double> strength(nb_vertices_degree_gt_one, 0);
-  for(int k(0), kk(L.outerSize()), v1, v2; k<kk; ++k)
+  else
   {
-    for(Eigen::SparseMatrix<double>::InnerIterator it(L, k); it; ++it)
+    // Multiply by the left with the inverse matrix of the strengths to transform the generalized
+    //   eigenvalue problem into a "regular" eigenvalue problem.
+    for(int k(0), kk(L.outerSize()); k<kk; ++k)
     {
-      v1 = it.row();
-      v2 = it.col();
-      value = it.value();
-      value = std::exp(-1 * value * value / t);
-      L.coeffRef(v1, v2) = value;
-      strength[v1] += value;
+      for(Eigen::SparseMatrix<double>::InnerIterator it(L, k); it; ++it)
+      {
+        it.valueRef() = -1 * it.value() / strength[it.row()];
+      }
+    }
+    // Fills the diagonal.
+    for(int v1(0); v1<n; ++v1)
+      L.insert(v1, v1) = 1;
+    // Constructs matrix operation object.
+    Spectra::SparseGenMatProd<double> op(L);
+    bool keep_going = true;
+    while(keep_going)
+    {
+      // Constructs eigen solver object.
+      Spectra::GenEigsSolver< double, Spectra::SMALLEST_MAGN, Spectra::SparseGenMatProd<double> > eigs(&op, nev, ncv);
+      // Initializes and computes.
+      if(!QUIET_MODE) { logstream << TAB << "Computing eigenvectors using Spectra parameter ncv = " << ncv << "..."; }
+      auto time_start = std::chrono::steady_clock::now();
+      if(init_resid.size() > 0)
+        eigs.init(init_resid.data());
+      else
+        eigs.init();
+      eigs.compute();
+      double total_time = std::chrono::duration<double>(std::chrono::steady_clock::now() - time_start).count();
+      bool converged = (eigs.info() == Spectra::SUCCESSFUL);
+      if(!QUIET_MODE)
+      {
+        logstream << (converged ? " Convergence reached" : " Convergence not reached") << " after "
+                  << eigs.num_iterations() << " iterations and " << eigs.num_operations() << " operations ("
+                  << total_time << " seconds)." << std::endl;
+      }
+      if(converged)
+      {
+        // Retrieves the eigenvectors (sorted by decreasing magnitude of the eigenvalues).
+        evectors = eigs.eigenvectors().leftCols(nb_vectors).real();
+        keep_going = false;
+      }
+      else
+      {
+        // Checks that the convergence parameter has not reached its maximal value.
+        if(ncv == n)
+        {
+          std::cerr << std::endl << "The algorithm computing the eigenvectors (Spectra library) cannot converge at all... Exiting." << std::endl << std::endl;
+          std::terminate();
+        }
+        // Increases the convergence parameter.
+        ncv = std::min(static_cast<int>(std::pow(ncv, 1.5)), n);
+      }
     }
   }
-  // Third, multiply by the left with the inverse matrix of the strengths to transform the
-  //   generalized eigenvalue problem into a "regular" eigenvalue problem.
-  for(int k(0), kk(L.outerSize()), v1, v2; k<kk; ++k)
+  return evectors;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+int embeddingSD_t::coarsen_weights_matrix(const Eigen::SparseMatrix<double> &W, const std::vector<double> &strength, std::vector<int> &aggregate, Eigen::SparseMatrix<double> &coarse_W, std::vector<double> &coarse_strength)
+{
+  const int n = W.rows();
+  // Visits the vertices by increasing strength such that the periphery is collapsed first.
+  std::vector<int> order(n);
+  for(int v1(0); v1<n; ++v1)
+    order[v1] = v1;
+  std::stable_sort(order.begin(), order.end(), [&strength](int v1, int v2) { return strength[v1] < strength[v2]; });
+  // Matches every vertex with its heaviest unmatched neighbor or, if none is left, adds it to the
+  //   aggregate of its heaviest neighbor.
+  aggregate.assign(n, -1);
+  int nb_aggregates = 0;
+  for(int v1 : order)
+  {
+    if(aggregate[v1] != -1)
+      continue;
+    int heaviest_unmatched = -1, heaviest = -1;
+    double weight_unmatched = -1, weight = -1;
+    for(Eigen::SparseMatrix<double>::InnerIterator it(W, v1); it; ++it)
+    {
+      const int v2 = it.row();
+      if(v2 == v1)
+        continue;
+      if(aggregate[v2] == -1 && it.value() > weight_unmatched)
+      {
+        heaviest_unmatched = v2;
+        weight_unmatched = it.value();
+      }
+      if(it.value() > weight)
+      {
+        heaviest = v2;
+        weight = it.value();
+      }
+    }
+    if(heaviest_unmatched != -1)
+    {
+      aggregate[v1] = nb_aggregates;
+      aggregate[heaviest_unmatched] = nb_aggregates;
+      ++nb_aggregates;
+    }
+    else if(heaviest != -1)
+    {
+      aggregate[v1] = aggregate[heaviest];
+    }
+    else
+    {
+      aggregate[v1] = nb_aggregates;
+      ++nb_aggregates;
+    }
+  }
+  // Sums the weights between aggregates (the weights within aggregates are dropped).
+  std::vector< Eigen::Triplet<double> > triplets;
+  triplets.reserve(W.nonZeros());
+  for(int k(0), kk(W.outerSize()); k<kk; ++k)
   {
-    for(Eigen::SparseMatrix<double>::InnerIterator it(L, k); it; ++it)
+    for(Eigen::SparseMatrix<double>::InnerIterator it(W, k); it; ++it)
     {
-      v1 = it.row();
-      v2 = it.col();
-      value = it.value();
-      L.coeffRef(v1, v2) = -1 * value / strength[v1];
+      if(aggregate[it.row()] != aggregate[it.col()])
+        triplets.emplace_back(aggregate[it.row()], aggregate[it.col()], it.value());
     }
   }
-  // Fourth, fills the diagonal.
-  for(int v1(0); v1<nb_vertices_degree_gt_one; ++v1)
-    L.insert(v1, v1) = 1;
+  coarse_W.resize(nb_aggregates, nb_aggregates);
+  coarse_W.setFromTriplets(triplets.begin(), triplets.end());
+  coarse_strength.assign(nb_aggregates, 0);
+  for(int k(0), kk(coarse_W.outerSize()); k<kk; ++k)
+  {
+    for(Eigen::SparseMatrix<double>::InnerIterator it(coarse_W, k); it; ++it)
+      coarse_strength[it.row()] += it.value();
+  }
+  return nb_aggregates;
+}
 
-  if(!QUIET_MODE) { std::clog << " Matrix built." << std::endl; }
 
-  // Finds the D+2 eigenvectors associated with the D+1 smallest eigenvalues.
-  // Constructs matrix operation object.
-  Spectra::SparseGenMatProd<double> op(L);
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::orthonormalize_eigenvectors(Eigen::MatrixXd &V, const std::vector<double> &strength)
+{
+  // Gram-Schmidt process with respect to the inner product weighted by the strengths, the vectors
+  //   being also made orthogonal to the trivial (constant) eigenvector.
+  Eigen::Map<const Eigen::VectorXd> S(strength.data(), strength.size());
+  const double total_strength = S.sum();
+  for(int i(0); i<V.cols(); ++i)
+  {
+    V.col(i).array() -= S.dot(V.col(i)) / total_strength;
+    for(int j(0); j<i; ++j)
+      V.col(i) -= V.col(j).cwiseProduct(S).dot(V.col(i)) * V.col(j);
+    V.col(i) /= std::sqrt(V.col(i).cwiseProduct(S).dot(V.col(i)));
+  }
+}
 
-  // Containers for the eigenvectors.
-  Eigen::MatrixXcd evectors;
 
-  // Convergence parameter.
-  int ncv = 10 + dim;
-  // Initializes and computes.
-  // if(!QUIET_MODE) { std::clog << std::endl << TAB << "Using Spectra parameter ncv = " << ncv << " to compute eigenvectors...";}
-  // eigs.init();
-  // int nconv = eigs.compute();
-  // Flag indicating whether another iteration is required.
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  bool keep_going = true;
-  while(keep_going)
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+Eigen::MatrixXd embeddingSD_t::compute_multilevel_laplacian_eigenvectors(const Eigen::SparseMatrix<double> &L, const std::vector<double> &strength, int nb_vectors, int ncv, Eigen::VectorXd init_resid)
+{
+  // Builds the hierarchy of coarser weights matrices (level 0 being the original one).
+  std::vector< Eigen::SparseMatrix<double> > coarse_W;
+  std::vector< std::vector<double> > coarse_strength;
+  std::vector< std::vector<int> > aggregates;
+  auto level_W = [&](int l) -> const Eigen::SparseMatrix<double>& { return (l == 0) ? L : coarse_W[l - 1]; };
+  auto level_strength = [&](int l) -> const std::vector<double>& { return (l == 0) ? strength : coarse_strength[l - 1]; };
+  if(!QUIET_MODE) { logstream << TAB << "Coarsening the weights matrix: " << L.rows() << " vertices"; }
+  auto time_start = std::chrono::steady_clock::now();
+  while(level_W(aggregates.size()).rows() > MULTILEVEL_COARSEST_SIZE)
+  {
+    const int l = aggregates.size();
+    Eigen::SparseMatrix<double> W;
+    std::vector<double> S;
+    std::vector<int> aggregate;
+    const int nb_aggregates = coarsen_weights_matrix(level_W(l), level_strength(l), aggregate, W, S);
+    // Stops if the coarsening stalls.
+    if(nb_aggregates > 0.9 * level_W(l).rows())
+      break;
+    // Restricts the initial residual vector (weighted average over every aggregate).
+    if(init_resid.size() > 0)
+    {
+      Eigen::VectorXd coarse_resid = Eigen::VectorXd::Zero(nb_aggregates);
+      for(int v1(0); v1<level_W(l).rows(); ++v1)
+        coarse_resid(aggregate[v1]) += level_strength(l)[v1] * init_resid(v1);
+      for(int a(0); a<nb_aggregates; ++a)
+        coarse_resid(a) /= S[a];
+      init_resid.swap(coarse_resid);
+    }
+    aggregates.push_back(std::move(aggregate));
+    coarse_W.push_back(std::move(W));
+    coarse_strength.push_back(std::move(S));
+    if(!QUIET_MODE) { logstream << " -> " << nb_aggregates; }
+  }
+  if(!QUIET_MODE)
   {
-    // Constructs eigen solver object.
-    Spectra::GenEigsSolver< double, Spectra::SMALLEST_MAGN, Spectra::SparseGenMatProd<double> > eigs(&op, dim + 2, ncv);
-
-    // Initializes and computes.
-    if(!QUIET_MODE) { std::clog << TAB << "Computing eigenvectors using Spectra parameter ncv = " << ncv << "..."; }
-    eigs.init();
-    int nconv = eigs.compute();
+    logstream << " (" << aggregates.size() << " levels, "
+              << std::chrono::duration<double>(std::chrono::steady_clock::now() - time_start).count() << " seconds)." << std::endl;
+  }
+  // Solves the eigenvalue problem on the coarsest level.
+  const int nb_levels = aggregates.size();
+  Eigen::MatrixXd V;
+  if(nb_levels == 0)
+  {
+    Eigen::SparseMatrix<double> W(L);
+    return solve_laplacian_eigenproblem(W, strength, nb_vectors, ncv, init_resid);
+  }
+  V = solve_laplacian_eigenproblem(coarse_W.back(), coarse_strength.back(), nb_vectors, ncv, init_resid);
+  // Orders the vectors by increasing eigenvalue (the most important first).
+  V = V.rowwise().reverse().eval();
+  // Prolongs the vectors level by level and smoothes them with a few steps of the lazy random walk
+  //   (S + W) / 2S, which damps the local errors while preserving the smooth eigenvectors.
+  time_start = std::chrono::steady_clock::now();
+  for(int l(nb_levels - 1); l>=0; --l)
+  {
+    const auto &W = level_W(l);
+    const auto &S = level_strength(l);
+    const auto &aggregate = aggregates[l];
+    Eigen::MatrixXd fine_V(W.rows(), nb_vectors);
+    for(int v1(0); v1<W.rows(); ++v1)
+      fine_V.row(v1) = V.row(aggregate[v1]);
+    V.swap(fine_V);
+    orthonormalize_eigenvectors(V, S);
+    for(int step(0); step<MULTILEVEL_NB_SMOOTHING_STEPS; ++step)
+    {
+      Eigen::MatrixXd WV = W * V;
+      for(int v1(0); v1<W.rows(); ++v1)
+        V.row(v1) = 0.5 * (V.row(v1) + WV.row(v1) / S[v1]);
+      orthonormalize_eigenvectors(V, S);
+    }
+  }
+  // Orders the vectors by decreasing Rayleigh quotient and normalizes them, as returned by the
+  //   eigensolvers.
+  Eigen::MatrixXd WV = L * V;
+  std::vector< std::pair<double, int> > rayleigh_quotients;
+  for(int i(0); i<nb_vectors; ++i)
+    rayleigh_quotients.push_back(std::make_pair(1 - V.col(i).dot(WV.col(i)), i));
+  std::sort(rayleigh_quotients.rbegin(), rayleigh_quotients.rend());
+  Eigen::MatrixXd evectors(V.rows(), nb_vectors);
+  for(int i(0); i<nb_vectors; ++i)
+    evectors.col(i) = V.col(rayleigh_quotients[i].second).normalized();
+  if(!QUIET_MODE)
+  {
+    logstream << TAB << "Prolongation and smoothing over " << nb_levels << " levels ("
+              << std::chrono::duration<double>(std::chrono::steady_clock::now() - time_start).count() << " seconds). Eigenvalues:";
+    for(int i(nb_vectors - 1); i>=0; --i)
+      logstream << " " << rayleigh_quotients[i].first;
+    logstream << std::endl;
+  }
+  return evectors;
+}
 
-    // Retrieves the eigenvectors.
-    evectors = eigs.eigenvectors();
 
-    // Checks whether another iteration is required.
-    if(eigs.info() != Spectra::SUCCESSFUL)
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+Eigen::VectorXd embeddingSD_t::load_eigenvectors(const std::vector<int> &newID, int nb_vectors)
+{
+  // Warm start: the initial residual vector of the eigensolver is the sum of the eigenvectors of a
+  //   previous run (matched by the names of the vertices) and of the trivial eigenvector.
+  const int n = *std::max_element(newID.begin(), newID.end()) + 1;
+  Eigen::VectorXd init_resid;
+  std::fstream eigenvectors_file(EIGENVECTORS_FILENAME.c_str(), std::fstream::in);
+  if( !eigenvectors_file.is_open() )
+  {
+    if(!QUIET_MODE) { logstream << TAB << "No eigenvectors to warm start from in " << EIGENVECTORS_FILENAME << "." << std::endl; }
+    return init_resid;
+  }
+  std::unordered_map<std::string, int> name2newID;
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    if(newID[v] != -1)
+      name2newID[Num2Name[v]] = newID[v];
+  }
+  Eigen::MatrixXd evectors = Eigen::MatrixXd::Zero(n, nb_vectors);
+  std::string full_line, name;
+  int nb_found = 0;
+  while( std::getline(eigenvectors_file, full_line) )
+  {
+    if(full_line.empty() || full_line[0] == '#')
+      continue;
+    std::stringstream one_line(full_line);
+    one_line >> name;
+    auto it = name2newID.find(name);
+    if(it == name2newID.end())
+      continue;
+    for(int i(0); i<nb_vectors; ++i)
     {
-      // Checks that the convergence parameter has not reached its maximal value.
-      if(ncv == nb_vertices)
+      if( !(one_line >> evectors(it->second, i)) )
       {
-        std::cerr << std::endl << "The algorithm computing the eigenvectors (Spectra library) cannot converge at all... Exiting." << std::endl << std::endl;
-        std::terminate();
+        if(!QUIET_MODE) { logstream << TAB << "The eigenvectors in " << EIGENVECTORS_FILENAME << " do not match the dimension. No warm start." << std::endl; }
+        return init_resid;
       }
-      if(!QUIET_MODE) { std::clog << " Convergence not reached." << std::endl; }
-      // Increases the convergence parameter.
-      ncv = std::pow(ncv, 1.5);
-      if(ncv > nb_vertices)
+    }
+    ++nb_found;
+  }
+  eigenvectors_file.close();
+  if(nb_found == 0)
+  {
+    if(!QUIET_MODE) { logstream << TAB << "No vertex found in " << EIGENVECTORS_FILENAME << ". No warm start." << std::endl; }
+    return init_resid;
+  }
+  init_resid = Eigen::VectorXd::Constant(n, 1 / std::sqrt(n));
+  for(int i(0); i<nb_vectors; ++i)
+  {
+    if(evectors.col(i).norm() > 0)
+      init_resid += evectors.col(i).normalized();
+  }
+  if(!QUIET_MODE) { logstream << TAB << "Warm start from the eigenvectors of " << nb_found << " vertices found in " << EIGENVECTORS_FILENAME << "." << std::endl; }
+  return init_resid;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::save_eigenvectors(const Eigen::MatrixXd &evectors, const std::vector<int> &newID)
+{
+  std::fstream eigenvectors_file(EIGENVECTORS_FILENAME.c_str(), std::fstream::out);
+  if( !eigenvectors_file.is_open() )
+  {
+    std::cerr << "Could not open file: " << EIGENVECTORS_FILENAME << "." << std::endl;
+    std::terminate();
+  }
+  eigenvectors_file << "# Eigenvectors of the Laplacian used to find the initial positions" << std::endl;
+  eigenvectors_file << "# Vertex name, then one component per eigenvector" << std::endl;
+  eigenvectors_file << std::scientific << std::setprecision(17);
+  for(int v(0), n1; v<nb_vertices; ++v)
+  {
+    n1 = newID[v];
+    if(n1 != -1)
+    {
+      eigenvectors_file << Num2Name[v];
+      for(int i(0); i<evectors.cols(); ++i)
+        eigenvectors_file << " " << evectors(n1, i);
+      eigenvectors_file << std::endl;
+    }
+  }
+  eigenvectors_file.close();
+}
+
+
+void embeddingSD_t::find_initial_ordering(std::vector<std::vector<double>> &positions, int dim)
+{
+  const auto radius = compute_radius(dim, nb_vertices);
+  mu = calculate_mu(dim);
+  if(!QUIET_MODE) { logstream << std::endl << TAB << "Building the weights matrix..."; }
+  // Initializes the sparse matrix.
+  Eigen::SparseMatrix<double> L(nb_vertices_degree_gt_one, nb_vertices_degree_gt_one);
+  L.reserve(Eigen::VectorXi::Constant(nb_vertices_degree_gt_one, 3));
+  // ASSUMES THAT THERE IS ONLY ONE CONNECTED COMPONENT.
+
+  // Sets contiguous IDs excluding vertices with degree 1.
+  // For D dimension also include degree 1
+  std::vector<int> newID(nb_vertices, -1);
+  int n=0;
+  for(int v=0; v<nb_vertices; ++v)
+  {
+    if(degree[v] > 1)
+    {
+      newID[v] = n;
+      ++n;
+    }
+  } 
+  if(n != nb_vertices_degree_gt_one)
+    std::cout << "There is something wrong here." << std::endl;
+
+  // First, fills the matrix with the expected distance between connected vertices according to S^D.
+  double k1, k2, expected_distance, val, t(0), norm(0);
+  for(int v1(0), v2, d1, d2, n1, n2; v1<nb_vertices; ++v1)
+  {
+    n1 = newID[v1];
+    if(n1 != -1)
+    {
+      // Gets the degree and kappa of the first vertex.
+      d1 = degree[v1];
+      k1 = random_ensemble_kappa_per_degree_class[d1];
+      // Loops over its neighbors.
+      auto it  = adjacency_list[v1].begin();
+      auto end = adjacency_list[v1].end();
+      for(; it!=end; ++it)
       {
-        ncv = nb_vertices;
+        // Identifies the second vertex.
+        v2 = *it;
+        n2 = newID[v2];
+        if(n2 != -1)
+        {
+          // Ensures that every edge is looked only once.
+          if(v1 < v2)
+          {
+            // Gets the degree and kappa of the second vertex.
+            d2 = degree[v2];
+            k2 = random_ensemble_kappa_per_degree_class[d2];
+            // Computes the expected arc length distance between connected pairs of vertices.
+            const auto top_expected_distance = integral_expected_theta(dim, radius, k1, k2);
+            const auto bottom_expected_distance = integral_expected_degree(dim, radius, k1, k2);
+            expected_distance = top_expected_distance / bottom_expected_distance;
+            if(expected_distance < 0 || expected_distance > PI)
+            {
+              // Just a verification.
+              std::cerr << "Warning. Expected angular distance out of range." << std::endl;
+              std::terminate();
+            }
+            // Transforms the arc length distance into Euclidean distances (unit circle).
+            expected_distance = 2 * std::sin(expected_distance / 2);
+            // Fills the matrix.
+            L.insert(n1, n2) = expected_distance;
+            L.insert(n2, n1) = expected_distance;
+            // Scaling factor of the weights (see below).
+            t += 2 * expected_distance * expected_distance;
+            norm += 2;
+          }
+        }
       }
     }
-    else
-      keep_going = false;
   }
-  if(!QUIET_MODE) { std::clog << " Convergence reached." << std::endl; } 
+  t /= norm;
+  // Second, takes the appropriate scaled exponential of each entry and computes the "strengths".
+  double value;
+  std::vector<double> strength(nb_vertices_degree_gt_one, 0);
+  for(int k(0), kk(L.outerSize()), v1, v2; k<kk; ++k)
+  {
+    for(Eigen::SparseMatrix<double>::InnerIterator it(L, k); it; ++it)
+    {
+      v1 = it.row();
+      v2 = it.col();
+      value = it.value();
+      value = std::exp(-1 * value * value / t);
+      L.coeffRef(v1, v2) = value;
+      strength[v1] += value;
+    }
+  }
+  if(!QUIET_MODE) { logstream << " Matrix built." << std::endl; }
+
+  // Finds the D+1 eigenvectors associated with the D+1 smallest non-trivial eigenvalues.
+  Eigen::MatrixXd evectors = compute_laplacian_eigenvectors(L, strength, newID, dim + 1, 10 + dim);
 
   std::vector<std::pair<std::vector<double>, int>> ordering_set;
   positions.clear();
@@ -1518,7 +2191,7 @@ void embeddingSD_t::find_initial_ordering(std::vector<std::vector<double>> &posi
       std::vector<double> pos;
       double norm = 0;
       for (int i=0; i<dim+1; ++i) {
-        const auto v = evectors(n1, i).real();
+        const auto v = evectors(n1, i);
         pos.push_back(v);
       }
       // Ensure that the norm of the vector is equal to one and the points are spread on the sphere (when D=2)
@@ -1550,8 +2223,8 @@ void embeddingSD_t::find_initial_ordering(std::vector<std::vector<double>> &posi
       // Draw value from the distribution of angular distance \Delta\theta 
       // between two connected nodes with hidden degrees kappa1 and kappa2
       const auto kappa1 = kappa[list_neigh_degree_one[v]];
-      const auto p12 = compute_integral_expected_degree_dimensions(dim, radius, mu, beta, kappa1, kappa2);
-      const auto random_angle = draw_random_angular_distance(degree[v1], 1, radius, p12, dim);
+      const auto p12 = integral_expected_degree(dim, radius, kappa1, kappa2);
+      const auto random_angle = draw_random_angular_distance(degree[v1], 1, radius, p12, dim, engine);
       // Generate random vector with a given angular seperation
 
       // Create rotation matrix -  positions[v1] -> (1, 0, 0, ...)
@@ -1574,7 +2247,7 @@ void embeddingSD_t::find_initial_ordering(std::vector<std::vector<double>> &posi
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::find_initial_ordering(std::vector<int> &ordering, std::vector<double> &raw_theta)
 {
-  if(!QUIET_MODE) { std::clog << std::endl << TAB << "Building the weights matrix..."; }
+  if(!QUIET_MODE) { logstream << std::endl << TAB << "Building the weights matrix..."; }
   // Initializes the sparse matrix.
   Eigen::SparseMatrix<double> L(nb_vertices_degree_gt_one, nb_vertices_degree_gt_one);
   L.reserve(Eigen::VectorXi::Constant(nb_vertices_degree_gt_one, 3));
@@ -1659,81 +2332,10 @@ void embeddingSD_t::find_initial_ordering(std::vector<int> &ordering, std::vecto
       strength[v1] += value;
     }
   }
-  // Third, multiply by the left with the inverse matrix of the strengths to transform the
-  //   generalized eigenvalue problem into a "regular" eigenvalue problem.
-  for(int k(0), kk(L.outerSize()), v1, v2; k<kk; ++k)
-  {
-    for(Eigen::SparseMatrix<double>::InnerIterator it(L, k); it; ++it)
-    {
-      v1 = it.row();
-      v2 = it.col();
-      value = it.value();
-      L.coeffRef(v1, v2) = -1 * value / strength[v1];
-    }
-  }
-  // Fourth, fills the diagonal.
-  for(int v1(0); v1<nb_vertices_degree_gt_one; ++v1)
-    L.insert(v1, v1) = 1;
-
-  if(!QUIET_MODE) { std::clog << " Matrix built." << std::endl; }
-
-  // Finds the 3 eigenvectors associated with the 3 smallest eigenvalues.
-  // Constructs matrix operation object.
-  Spectra::SparseGenMatProd<double> op(L);
-  // Containers for the eigenvectors.
-  Eigen::MatrixXcd evectors;
-  // Convergence parameter.
-  int ncv = 7;
-  // Initializes and computes.
-  // if(!QUIET_MODE) { std::clog << std::endl << TAB << "Using Spectra parameter ncv = " << ncv << " to compute eigenvectors...";}
-  // eigs.init();
-  // int nconv = eigs.compute();
-  // Flag indicating whether another iteration is required.
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  bool keep_going = true;
-  while(keep_going)
-  {
-    // // Checks for errors.
-    // if(eigs.info() != Spectra::SUCCESSFUL)
-    // {
-    //   if(eigs.info() == Spectra::NOT_COMPUTED)
-    //     std::cerr << "NOT_COMPUTED" << std::endl;
-    //   if(eigs.info() == Spectra::NOT_CONVERGING)
-    //     std::cerr << "NOT_CONVERGING" << std::endl;
-    //   if(eigs.info() == Spectra::NUMERICAL_ISSUE)
-    //     std::cerr << "NUMERICAL_ISSUE" << std::endl;
-    //   std::terminate();
-    // }
-    // Constructs eigen solver object.
-    Spectra::GenEigsSolver< double, Spectra::SMALLEST_MAGN, Spectra::SparseGenMatProd<double> > eigs(&op, 3, ncv);
-    // Initializes and computes.
-    if(!QUIET_MODE) { std::clog << TAB << "Computing eigenvectors using Spectra parameter ncv = " << ncv << "..."; }
-    eigs.init();
-    int nconv = eigs.compute();
-    // Retrieves the eigenvectors.
-    evectors = eigs.eigenvectors();
-
-    // Checks whether another iteration is required.
-    if(eigs.info() != Spectra::SUCCESSFUL)
-    {
-      // Checks that the convergence parameter has not reached its maximal value.
-      if(ncv == nb_vertices)
-      {
-        std::cerr << std::endl << "The algorithm computing the eigenvectors (Spectra library) cannot converge at all... Exiting." << std::endl << std::endl;
-        std::terminate();
-      }
-      if(!QUIET_MODE) { std::clog << " Convergence not reached." << std::endl; }
-      // Increases the convergence parameter.
-      ncv = std::pow(ncv, 1.5);
-      if(ncv > nb_vertices)
-      {
-        ncv = nb_vertices;
-      }
-    }
-    else
-      keep_going = false;
-  }
-  if(!QUIET_MODE) { std::clog << " Convergence reached." << std::endl; }
+  if(!QUIET_MODE) { logstream << " Matrix built." << std::endl; }
+
+  // Finds the 2 eigenvectors associated with the 2 smallest non-trivial eigenvalues.
+  Eigen::MatrixXd evectors = compute_laplacian_eigenvectors(L, strength, newID, 2, 7);
 
   /*TEST*/// Initializes the container for the raw angular positions.
   /*TEST*/raw_theta.clear();
@@ -1748,7 +2350,7 @@ void embeddingSD_t::find_initial_ordering(std::vector<int> &ordering, std::vecto
     if(n1 != -1)
     {
       // Positions the vertex into the ordered list.
-      angle = std::atan2(evectors(n1, 0).real(), evectors(n1, 1).real()) + PI;
+      angle = std::atan2(evectors(n1, 0), evectors(n1, 1)) + PI;
       ordering_set.insert(std::make_pair(angle, v1));
       /*TEST*/raw_theta[v1] = angle;
     }
@@ -1817,72 +2419,95 @@ std::string embeddingSD_t::format_time(time_t _time)
 }
 
 
-void embeddingSD_t::generate_simulated_adjacency_list(int dim, bool random_positions=true)
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::generate_simulated_graphs(int dim, bool random_positions, int nb_graphs, const std::function<void(const simulated_graph_t &)> &accumulate)
 {
-  // 1. For each node generate vector of size D+1
-  const auto radius = compute_radius(dim, nb_vertices);
-  if (random_positions) {
-    d_positions.clear();
-    d_positions.resize(nb_vertices);
-    for (int i = 0; i < nb_vertices; ++i)
-      d_positions[i] = generate_random_d_vector(dim, radius);
-  }
   mu = calculate_mu(dim);
+  sample_simulated_graphs(dim, d_positions.units().data(), compute_radius(dim, nb_vertices), random_positions, nb_graphs, accumulate);
+}
 
-  // Initializes the container.
-  simulated_adjacency_list.clear();
-  simulated_adjacency_list.resize(nb_vertices);
-  // Generates the adjacency list.
-  // TODO: for large networks it could be parallelized by splitting vertices into groups
-  //  and computing probability inside each of them.
-  for (int v1=0; v1 < nb_vertices; ++v1) {
-    const auto positions1 = d_positions[v1];
-    for (int v2 = v1 + 1; v2 < nb_vertices; ++v2) {
-      const auto dtheta = compute_angle_d_vectors(positions1, d_positions[v2]);
-      const auto chi = radius * dtheta / std::pow(mu * kappa[v1] * kappa[v2], 1.0 / dim);
-      const auto prob = 1 / (1 + std::pow(chi, beta));
-      if (uniform_01(engine) < prob) {
-        simulated_adjacency_list[v1].insert(v2);
-        simulated_adjacency_list[v2].insert(v1);
-      }
-    }
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::generate_simulated_graphs(int nb_graphs, const std::function<void(const simulated_graph_t &)> &accumulate)
+{
+  // Positions on the circle.
+  std::vector<double> positions(2 * nb_vertices);
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    positions[2 * v] = std::cos(theta[v]);
+    positions[2 * v + 1] = std::sin(theta[v]);
   }
+  sample_simulated_graphs(1, positions.data(), nb_vertices / (2 * PI), false, nb_graphs, accumulate);
 }
 
+
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
-void embeddingSD_t::generate_simulated_adjacency_list()
+void embeddingSD_t::sample_simulated_graphs(int dim, const double *positions, double radius, bool random_positions, int nb_graphs, const std::function<void(const simulated_graph_t &)> &accumulate)
 {
-  // Initializes the container.
-  simulated_adjacency_list.clear();
-  simulated_adjacency_list.resize(nb_vertices);
-  // Generates the adjacency list.
-  double kappa1, theta1, dtheta, prob;
-  double prefactor = nb_vertices / (2 * PI * mu);
-  for(int v1(0); v1<nb_vertices; ++v1)
-  {
-    kappa1 = kappa[v1];
-    theta1 = theta[v1];
-    for(int v2(v1 + 1); v2<nb_vertices; ++v2)
+  int nb_threads = 1;
+#ifdef _OPENMP
+  nb_threads = (NB_THREADS > 0) ? NB_THREADS : omp_get_max_threads();
+#endif
+  edge_sampler_t sampler;
+  sampler.NB_THREADS = NB_THREADS;
+  if(!random_positions)
+    sampler.build(dim, nb_vertices, positions, kappa, radius, mu, beta);
+  // Graphs are generated and analyzed by groups of one per thread, each in its own reused buffers. A
+  //   single graph is generated with its vertices processed in parallel instead.
+  const int nb_slots = std::max(1, std::min(nb_threads, nb_graphs));
+  if(static_cast<int>(simulated_graphs.size()) < nb_slots)
+    simulated_graphs.resize(nb_slots);
+  std::vector<unsigned int> seeds(nb_slots);
+  for(int g_i(0), g_f; g_i<nb_graphs; g_i=g_f)
+  {
+    g_f = std::min(g_i + nb_slots, nb_graphs);
+    // Seeds are drawn sequentially such that the graphs do not depend on the scheduling of the threads.
+    for(int g(g_i); g<g_f; ++g)
+      seeds[g - g_i] = engine();
+    #pragma omp parallel for schedule(dynamic) num_threads(nb_threads) if(g_f - g_i > 1)
+    for(int s=0; s<g_f - g_i; ++s)
     {
-      dtheta = PI - std::fabs(PI - std::fabs(theta1 - theta[v2]));
-      prob = 1 / (1 + std::pow((prefactor * dtheta) / (kappa1 * kappa[v2]), beta));
-      if(uniform_01(engine) < prob)
+      simulated_graph_t &graph = simulated_graphs[s];
+      if(!random_positions)
+      {
+        graph.edges = sampler.sample(seeds[s]);
+      }
+      else
       {
-        simulated_adjacency_list[v1].insert(v2);
-        simulated_adjacency_list[v2].insert(v1);
+        // Draws uniformly distributed positions for this graph.
+        std::mt19937 graph_engine(seeds[s]);
+        std::normal_distribution<double> graph_normal_01;
+        std::vector<double> graph_positions(static_cast<long>(nb_vertices) * (dim + 1));
+        for(auto &x : graph_positions)
+          x = graph_normal_01(graph_engine);
+        edge_sampler_t graph_sampler;
+        graph_sampler.NB_THREADS = NB_THREADS;
+        graph_sampler.build(dim, nb_vertices, graph_positions.data(), kappa, radius, mu, beta);
+        graph.edges = graph_sampler.sample(graph_engine());
       }
+      analyze_simulated_graph(graph);
     }
+    // The graphs are accumulated in their order of generation.
+    for(int s(0); s<g_f - g_i; ++s)
+      accumulate(simulated_graphs[s]);
   }
 }
 
+
 void embeddingSD_t::infer_initial_positions(int dim)
 {
   if(!QUIET_MODE) {
-    std::clog << "Finding initial positions/ordering...";
-    std::clog.flush();
+    logstream << "Finding initial positions/ordering...";
+    logstream.flush();
   }
-  find_initial_ordering(d_positions, dim);
+  std::vector<std::vector<double>> positions;
+  find_initial_ordering(positions, dim);
+  d_positions.resize(nb_vertices, dim);
+  for(int v(0); v<nb_vertices; ++v)
+    d_positions.set(v, positions[v]);
 }
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
@@ -1890,8 +2515,8 @@ void embeddingSD_t::infer_initial_positions(int dim)
 void embeddingSD_t::infer_initial_positions()
 {
   if(!QUIET_MODE) {
-    std::clog << "Finding initial positions/ordering...";
-    std::clog.flush();
+    logstream << "Finding initial positions/ordering...";
+    logstream.flush();
   }
   // Gets the original ordering of vertices.
   std::vector<int> ordering;
@@ -1965,7 +2590,7 @@ void embeddingSD_t::infer_initial_positions()
 
     v0 = v1;
   }
-  if(!QUIET_MODE) { std::clog << std::endl << TAB << "Sum of the angular positions (before adjustment): " << norm << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl << TAB << "Sum of the angular positions (before adjustment): " << norm << std::endl; }
   // Rescales the angles to limit their span in the [0, 2 PI) range.
   norm /= 2 * PI;
   for(int v(0); v<nb_vertices; ++v)
@@ -1975,13 +2600,13 @@ void embeddingSD_t::infer_initial_positions()
   // The angle of the "last" vertex will be 2pi, moves it to 0.
   theta[v1] = 0;
   if(!QUIET_MODE)
-    std::clog << "                                     .................................................done.\n\n";
+    logstream << "                                     .................................................done.\n\n";
 }
 
 void embeddingSD_t::infer_kappas_given_beta_for_all_vertices(int dim)
 {
-  if(!QUIET_MODE) { std::clog << "Updating values of kappa based on inferred positions..." << std::endl; }
-  if(!QUIET_MODE) { std::clog.flush(); }
+  if(!QUIET_MODE) { logstream << "Updating values of kappa based on inferred positions..." << std::endl; }
+  if(!QUIET_MODE) { logstream.flush(); }
   // Finds the values of kappa generating the degree classes, given the parameters.
   int cnt = 0;
   bool keep_going = true;
@@ -2014,14 +2639,14 @@ void embeddingSD_t::infer_kappas_given_beta_for_all_vertices(int dim)
   // Resets the values of kappa since convergence has not been reached.
   if(cnt >= KAPPA_MAX_NB_ITER_CONV)
   {
-    if(!QUIET_MODE) { std::clog << TAB << "WARNING: maximum number of iterations reached before convergence. This limit can be"  << std::endl; }
-    if(!QUIET_MODE) { std::clog << TAB << "         adjusted by setting the parameters KAPPA_MAX_NB_ITER_CONV to desired value." << std::endl; }
+    if(!QUIET_MODE) { logstream << TAB << "WARNING: maximum number of iterations reached before convergence. This limit can be"  << std::endl; }
+    if(!QUIET_MODE) { logstream << TAB << "         adjusted by setting the parameters KAPPA_MAX_NB_ITER_CONV to desired value." << std::endl; }
   }
   else
   {
-    if(!QUIET_MODE) { std::clog << TAB << "Convergence reached after " << cnt << " iterations." << std::endl; }
+    if(!QUIET_MODE) { logstream << TAB << "Convergence reached after " << cnt << " iterations." << std::endl; }
   }
-  if(!QUIET_MODE) { std::clog << "                                                       ...............................done." << std::endl; }
+  if(!QUIET_MODE) { logstream << "                                                       ...............................done." << std::endl; }
 }
 
 
@@ -2034,9 +2659,9 @@ void embeddingSD_t::infer_kappas_beta_for_all_vertices(int dim)
   while(true)
   {
     if(!QUIET_MODE) {
-      std::clog << TAB;
-      std::clog << std::fixed << std::setw(11) << beta << " ";
-      std::clog.flush();
+      logstream << TAB;
+      logstream << std::fixed << std::setw(11) << beta << " ";
+      logstream.flush();
     }
     mu = calculate_mu(dim);
     // Readjust the values of kappa.
@@ -2046,26 +2671,24 @@ void embeddingSD_t::infer_kappas_beta_for_all_vertices(int dim)
     const int NTIMES = 5;
     random_ensemble_average_clustering = 0;
 
-    for (int i=0; i<NTIMES; ++i) {
-      generate_simulated_adjacency_list(dim, false);
-      analyze_simulated_adjacency_list();
+    generate_simulated_graphs(dim, false, NTIMES, [&](const simulated_graph_t &graph) {
       double current_clustering = 0;
 
       for(int v1(0); v1<nb_vertices; ++v1)
       {
-        int d1 = simulated_degree[v1];
+        int d1 = graph.degree[v1];
         if(d1 > 1)
         {
-          auto value = simulated_nb_triangles[v1];
+          auto value = graph.nb_triangles[v1];
           value /= d1 * (d1 - 1) / 2;
           current_clustering += value;
         }
       }
       random_ensemble_average_clustering += current_clustering / nb_vertices_degree_gt_one;
-    }
+    });
     random_ensemble_average_clustering /= NTIMES;
     
-    if(!QUIET_MODE) { std::clog << std::fixed << std::setw(20) << random_ensemble_average_clustering << " \n"; }
+    if(!QUIET_MODE) { logstream << std::fixed << std::setw(20) << random_ensemble_average_clustering << " \n"; }
 
     if(std::fabs(random_ensemble_average_clustering - average_clustering) < 0.05)
       break;
@@ -2077,7 +2700,7 @@ void embeddingSD_t::infer_kappas_beta_for_all_vertices(int dim)
       if(beta < BETA_ABS_MIN_DIM)
       {
         if(!QUIET_MODE)
-          std::clog << "WARNING: value too close to 1, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
+          logstream << "WARNING: value too close to 1, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
         break;
       }
     }
@@ -2092,7 +2715,7 @@ void embeddingSD_t::infer_kappas_beta_for_all_vertices(int dim)
     if(beta > BETA_ABS_MAX_DIM)
     {
       if(!QUIET_MODE)
-        std::clog << "WARNING: value too high, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
+        logstream << "WARNING: value too high, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
       break;
     }
   }
@@ -2106,9 +2729,9 @@ void embeddingSD_t::infer_kappas_beta_for_all_vertices()
   while(true)
   {
     if(!QUIET_MODE) {
-      std::clog << TAB;
-      std::clog << std::fixed << std::setw(11) << beta << " ";
-      std::clog.flush();
+      logstream << TAB;
+      logstream << std::fixed << std::setw(11) << beta << " ";
+      logstream.flush();
     }
     mu = calculateMu();
     // Readjust the values of kappa.
@@ -2118,26 +2741,24 @@ void embeddingSD_t::infer_kappas_beta_for_all_vertices()
     const int NTIMES = 5;
     random_ensemble_average_clustering = 0;
 
-    for (int i=0; i<NTIMES; ++i) {
-      generate_simulated_adjacency_list();
-      analyze_simulated_adjacency_list();
+    generate_simulated_graphs(NTIMES, [&](const simulated_graph_t &graph) {
       double current_clustering = 0;
 
       for(int v1(0); v1<nb_vertices; ++v1)
       {
-        int d1 = simulated_degree[v1];
+        int d1 = graph.degree[v1];
         if(d1 > 1)
         {
-          auto value = simulated_nb_triangles[v1];
+          auto value = graph.nb_triangles[v1];
           value /= d1 * (d1 - 1) / 2;
           current_clustering += value;
         }
       }
       random_ensemble_average_clustering += current_clustering / nb_vertices_degree_gt_one;
-    }
+    });
     random_ensemble_average_clustering /= NTIMES;
     
-    if(!QUIET_MODE) { std::clog << std::fixed << std::setw(20) << random_ensemble_average_clustering << " \n"; }
+    if(!QUIET_MODE) { logstream << std::fixed << std::setw(20) << random_ensemble_average_clustering << " \n"; }
 
     if( std::fabs(random_ensemble_average_clustering - average_clustering) < 0.05)
       break;
@@ -2149,7 +2770,7 @@ void embeddingSD_t::infer_kappas_beta_for_all_vertices()
       if(beta < BETA_ABS_MIN)
       {
         if(!QUIET_MODE)
-          std::clog << "WARNING: value too close to 1, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
+          logstream << "WARNING: value too close to 1, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
         break;
       }
     }
@@ -2164,7 +2785,7 @@ void embeddingSD_t::infer_kappas_beta_for_all_vertices()
     if(beta > BETA_ABS_MAX)
     {
       if(!QUIET_MODE)
-        std::clog << "WARNING: value too high, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
+        logstream << "WARNING: value too high, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
       break;
     }
   }
@@ -2174,8 +2795,8 @@ void embeddingSD_t::infer_kappas_beta_for_all_vertices()
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::infer_kappas_given_beta_for_all_vertices()
 {
-  if(!QUIET_MODE) { std::clog << "Updating values of kappa based on inferred positions..." << std::endl; }
-  if(!QUIET_MODE) { std::clog.flush(); }
+  if(!QUIET_MODE) { logstream << "Updating values of kappa based on inferred positions..." << std::endl; }
+  if(!QUIET_MODE) { logstream.flush(); }
   // Finds the values of kappa generating the degree classes, given the parameters.
   int cnt = 0;
   bool keep_going = true;
@@ -2207,32 +2828,45 @@ void embeddingSD_t::infer_kappas_given_beta_for_all_vertices()
   // Resets the values of kappa since convergence has not been reached.
   if(cnt >= KAPPA_MAX_NB_ITER_CONV)
   {
-    if(!QUIET_MODE) { std::clog << TAB << "WARNING: maximum number of iterations reached before convergence. This limit can be"  << std::endl; }
-    if(!QUIET_MODE) { std::clog << TAB << "         adjusted by setting the parameters KAPPA_MAX_NB_ITER_CONV to desired value." << std::endl; }
+    if(!QUIET_MODE) { logstream << TAB << "WARNING: maximum number of iterations reached before convergence. This limit can be"  << std::endl; }
+    if(!QUIET_MODE) { logstream << TAB << "         adjusted by setting the parameters KAPPA_MAX_NB_ITER_CONV to desired value." << std::endl; }
   }
   else
   {
-    if(!QUIET_MODE) { std::clog << TAB << "Convergence reached after " << cnt << " iterations." << std::endl; }
+    if(!QUIET_MODE) { logstream << TAB << "Convergence reached after " << cnt << " iterations." << std::endl; }
   }
-  if(!QUIET_MODE) { std::clog << "                                                       ...............................done." << std::endl; }
+  if(!QUIET_MODE) { logstream << "                                                       ...............................done." << std::endl; }
 }
 
 
 void embeddingSD_t::infer_kappas_given_beta_for_degree_class(int dim)
 {
-  // Variable.
-  double prob_conn;
   const auto radius = compute_radius(dim, nb_vertices);
   mu = calculate_mu(dim);
-  // Iterators.
-  std::set<int>::iterator it1, it2, end;
-  // Initializes the kappas for each degree class.
-  it1 = degree_class.begin();
-  end = degree_class.end();
-  // 1. Initialize
-  for(; it1!=end; ++it1)
+  // Degree classes, number of vertices and kappa of each class (contiguous copies of the maps).
+  const std::vector<int> classes(degree_class.begin(), degree_class.end());
+  const int nb_classes = classes.size();
+  std::vector<double> class_size(nb_classes);
+  std::vector<double> class_kappa(nb_classes);
+  std::vector<double> class_expected_degree(nb_classes);
+  // Integrals between every pair of classes (upper triangle of the symmetric matrix, row by row).
+  std::vector<double> integrals(static_cast<std::size_t>(nb_classes) * (nb_classes + 1) / 2);
+  auto pair_index = [nb_classes](std::size_t c1, std::size_t c2) {
+    return c1 * nb_classes - c1 * (c1 + 1) / 2 + c2;
+  };
+
+  // 1. Initialize (from the kappas of the closest value of beta already solved, if any).
+  for(int c(0); c<nb_classes; ++c)
   {
-    random_ensemble_kappa_per_degree_class[*it1] = *it1;
+    class_size[c] = degree2vertices[classes[c]].size();
+    class_kappa[c] = classes[c];
+  }
+  if(MEMOIZED_BETA_SEARCH_MODE && !beta_trials.empty())
+  {
+    auto closest = beta_trials.lower_bound(beta);
+    if(closest == beta_trials.end() || (closest != beta_trials.begin() && (beta - std::prev(closest)->first) < (closest->first - beta)))
+      --closest;
+    class_kappa = closest->second.kappas;
   }
 
   // 2. Finds the values of kappa generating the degree classes, given the parameters.
@@ -2240,43 +2874,41 @@ void embeddingSD_t::infer_kappas_given_beta_for_degree_class(int dim)
   bool keep_going = true;
   while (keep_going && (cnt < KAPPA_MAX_NB_ITER_CONV_2))
   {
-    // Initializes the expected degree of each degree class.
-    it1 = degree_class.begin();
-    end = degree_class.end();
-    for(; it1!=end; ++it1)
+    // Fills the lookup table beforehand since it is read concurrently.
+    if(TABULATED_INTEGRALS_MODE)
     {
-      random_ensemble_expected_degree_per_degree_class[*it1] = 0;
+      auto minmax = std::minmax_element(class_kappa.begin(), class_kappa.end());
+      pkk_table.reset(dim, beta);
+      pkk_table.prepare(radius / std::pow(mu * (*minmax.second) * (*minmax.second), 1.0 / dim),
+                        radius / std::pow(mu * (*minmax.first) * (*minmax.first), 1.0 / dim));
     }
-    // Computes the expected degrees given the actual kappas.
-    //it1 = degree_class.begin();
-    end = degree_class.end();
-    for(it1=degree_class.begin(); it1!=end; ++it1)
-    // std::for_each(std::execution::seq, degree_class.begin(), degree_class.end(), [&](const auto &it1)
+    // Computes the integrals between all pairs of classes (each thread fills whole rows).
+    #pragma omp parallel for schedule(dynamic)
+    for(int c1 = 0; c1<nb_classes; ++c1)
     {
-      it2 = it1;
-      auto kappa_i = random_ensemble_kappa_per_degree_class[*it1];
-      auto kappa_j = random_ensemble_kappa_per_degree_class[*it2];
-      auto integral = compute_integral_expected_degree_dimensions(dim, radius, mu, beta, kappa_i, kappa_j);
-      prob_conn = integral;
-     
-      random_ensemble_expected_degree_per_degree_class[*it1] += prob_conn * (degree2vertices[*it2].size() - 1);
-      for(++it2; it2!=end; ++it2)
+      for(int c2(c1); c2<nb_classes; ++c2)
       {
-        kappa_i = random_ensemble_kappa_per_degree_class[*it1];
-        kappa_j = random_ensemble_kappa_per_degree_class[*it2];
-        integral = compute_integral_expected_degree_dimensions(dim, radius, mu, beta, kappa_i, kappa_j);
-        prob_conn = integral;
-        random_ensemble_expected_degree_per_degree_class[*it1] += prob_conn * degree2vertices[*it2].size();
-        random_ensemble_expected_degree_per_degree_class[*it2] += prob_conn * degree2vertices[*it1].size();
+        integrals[pair_index(c1, c2)] = integral_expected_degree(dim, radius, class_kappa[c1], class_kappa[c2]);
+      }
+    }
+    // Computes the expected degrees given the actual kappas (the terms are always summed in the same
+    //   order, such that the result does not depend on the number of threads).
+    #pragma omp parallel for schedule(static)
+    for(int c1 = 0; c1<nb_classes; ++c1)
+    {
+      double expected_degree = 0;
+      for(int c2(0); c2<nb_classes; ++c2)
+      {
+        const double prob_conn = (c2 < c1) ? integrals[pair_index(c2, c1)] : integrals[pair_index(c1, c2)];
+        expected_degree += prob_conn * ((c2 == c1) ? class_size[c2] - 1 : class_size[c2]);
       }
+      class_expected_degree[c1] = expected_degree;
     }
     // Verifies convergence.
     keep_going = false;
-    it1 = degree_class.begin();
-    end = degree_class.end();
-    for(; it1!=end; ++it1)
+    for(int c(0); c<nb_classes; ++c)
     {
-      if(std::fabs(random_ensemble_expected_degree_per_degree_class[*it1] - *it1) > NUMERICAL_CONVERGENCE_THRESHOLD_1) {
+      if(std::fabs(class_expected_degree[c] - classes[c]) > NUMERICAL_CONVERGENCE_THRESHOLD_1) {
         keep_going = true;
         break;
       }
@@ -2284,23 +2916,40 @@ void embeddingSD_t::infer_kappas_given_beta_for_degree_class(int dim)
     // Modifies the value of the kappas prior to the next iteration, if required.
     if(keep_going)
     {
-      it1 = degree_class.begin();
-      end = degree_class.end();
-      for(; it1!=end; ++it1) {
-        random_ensemble_kappa_per_degree_class[*it1] += (*it1 - random_ensemble_expected_degree_per_degree_class[*it1]) * uniform_01(engine);
-        random_ensemble_kappa_per_degree_class[*it1] = std::fabs(random_ensemble_kappa_per_degree_class[*it1]);
+      for(int c(0); c<nb_classes; ++c)
+      {
+        if(DETERMINISTIC_KAPPA_UPDATE_MODE)
+        {
+          // Fixed-point update (the expected degree is nearly proportional to kappa).
+          class_kappa[c] *= classes[c] / class_expected_degree[c];
+        }
+        else
+        {
+          class_kappa[c] += (classes[c] - class_expected_degree[c]) * uniform_01(engine);
+          class_kappa[c] = std::fabs(class_kappa[c]);
+        }
       }
     }
     ++cnt;
+  }
+  // Copies the results back into the maps.
+  for(int c(0); c<nb_classes; ++c)
+  {
+    random_ensemble_kappa_per_degree_class[classes[c]] = class_kappa[c];
+    random_ensemble_expected_degree_per_degree_class[classes[c]] = class_expected_degree[c];
+  }
+  if(MEMOIZED_BETA_SEARCH_MODE)
+  {
+    beta_trials[beta].kappas = class_kappa;
+  }
+  if (cnt >= KAPPA_MAX_NB_ITER_CONV_2) {
+    if (!QUIET_MODE) {
+      logstream << std::endl;
+      logstream << TAB << "WARNING: maximum number of iterations reached before convergence. This limit can be"  << std::endl;
+      logstream << TAB << "         adjusted by setting the parameters KAPPA_MAX_NB_ITER_CONV_2 to desired value." << std::endl;
+      logstream << TAB << std::fixed << std::setw(11) << " " << " ";
     }
-    if (cnt >= KAPPA_MAX_NB_ITER_CONV_2) {
-      if (!QUIET_MODE) {
-        std::clog << std::endl;
-        std::clog << TAB << "WARNING: maximum number of iterations reached before convergence. This limit can be"  << std::endl;
-        std::clog << TAB << "         adjusted by setting the parameters KAPPA_MAX_NB_ITER_CONV_2 to desired value." << std::endl;
-        std::clog << TAB << std::fixed << std::setw(11) << " " << " ";
-      }
-    }
+  }
 }
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
@@ -2376,26 +3025,64 @@ void embeddingSD_t::infer_kappas_given_beta_for_degree_class()
   if(cnt >= KAPPA_MAX_NB_ITER_CONV)
   {
     if(!QUIET_MODE) {
-      std::clog << std::endl;
-      std::clog << TAB << "WARNING: maximum number of iterations reached before convergence. This limit can be"  << std::endl;
-      std::clog << TAB << "         adjusted by setting the parameters KAPPA_MAX_NB_ITER_CONV to desired value." << std::endl;
-      std::clog << TAB << std::fixed << std::setw(11) << " " << " ";
+      logstream << std::endl;
+      logstream << TAB << "WARNING: maximum number of iterations reached before convergence. This limit can be"  << std::endl;
+      logstream << TAB << "         adjusted by setting the parameters KAPPA_MAX_NB_ITER_CONV to desired value." << std::endl;
+      logstream << TAB << std::fixed << std::setw(11) << " " << " ";
     }
   }
 }
 
 
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double embeddingSD_t::propose_beta(double beta_min, double beta_max)
+{
+  // Without memoization: bisection, or increase by 50% until an upper bound is found.
+  if(!MEMOIZED_BETA_SEARCH_MODE)
+  {
+    return (beta_max == -1) ? 1.5 * beta_min : (beta_max + beta_min) / 2;
+  }
+  auto lower = beta_trials.find(beta_min);
+  if(beta_max == -1)
+  {
+    // Secant step extrapolated from the two largest values tried (increase between 10% and 100%).
+    double proposal = 1.5 * beta_min;
+    if(beta_trials.size() > 1 && lower == std::prev(beta_trials.end()))
+    {
+      auto previous = std::prev(lower);
+      const double slope = (lower->second.clustering - previous->second.clustering) / (lower->first - previous->first);
+      if(slope > 0)
+        proposal = beta_min + (average_clustering - lower->second.clustering) / slope;
+      proposal = std::min(std::max(proposal, 1.1 * beta_min), 2 * beta_min);
+    }
+    return proposal;
+  }
+  // Secant (false position) step between the bounds when the clustering is known at both ends,
+  //   kept away from the bounds such that the bracket always shrinks by at least 10%.
+  auto upper = beta_trials.find(beta_max);
+  double proposal = (beta_max + beta_min) / 2;
+  if(lower != beta_trials.end() && upper != beta_trials.end() && upper->second.clustering > lower->second.clustering)
+  {
+    proposal = beta_min + (average_clustering - lower->second.clustering) * (beta_max - beta_min) / (upper->second.clustering - lower->second.clustering);
+    const double margin = 0.1 * (beta_max - beta_min);
+    proposal = std::min(std::max(proposal, beta_min + margin), beta_max - margin);
+  }
+  return proposal;
+}
+
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::infer_parameters(int dim)
 {
-  if(!QUIET_MODE) { std::clog << "Inferring parameters..."; }
+  if(!QUIET_MODE) { logstream << "Inferring parameters..."; }
 
   if (!QUIET_MODE) {
-    std::clog << std::endl;
-    std::clog << TAB;
-    std::clog << std::fixed << std::setw(11) << "beta" << " ";
-    std::clog << std::fixed << std::setw(20) << "avg. clustering" << " \n";
+    logstream << std::endl;
+    logstream << TAB;
+    logstream << std::fixed << std::setw(11) << "beta" << " ";
+    logstream << std::fixed << std::setw(20) << "avg. clustering" << " ";
+    logstream << std::fixed << std::setw(12) << "std. error" << " \n";
   }
 
   const double BETA_ABS_MIN_DIM = dim + 0.01;
@@ -2408,12 +3095,13 @@ void embeddingSD_t::infer_parameters(int dim)
     double beta_max = -1;
     double beta_min = dim;
     random_ensemble_average_clustering = 10; 
+    beta_trials.clear();
 
     while(true) {
       if(!QUIET_MODE) {
-        std::clog << TAB;
-        std::clog << std::fixed << std::setw(11) << beta << " ";
-        std::clog.flush();
+        logstream << TAB;
+        logstream << std::fixed << std::setw(11) << beta << " ";
+        logstream.flush();
       }
       // 1. Infers the values of kappa
       infer_kappas_given_beta_for_degree_class(dim);
@@ -2421,7 +3109,11 @@ void embeddingSD_t::infer_parameters(int dim)
       build_cumul_dist_for_mc_integration(dim);
       // Computes the ensemble clustering.
       compute_random_ensemble_clustering(dim);
-      if(!QUIET_MODE) { std::clog << std::fixed << std::setw(20) << random_ensemble_average_clustering << " \n"; }
+      if(MEMOIZED_BETA_SEARCH_MODE)
+      {
+        beta_trials[beta].clustering = random_ensemble_average_clustering;
+      }
+      if(!QUIET_MODE) { logstream << std::fixed << std::setw(20) << random_ensemble_average_clustering << " " << std::setw(12) << random_ensemble_average_clustering_error << " \n"; }
 
       // Checks if the expected clustering is close enough. (A.3. last paragraph)
       if (std::fabs(random_ensemble_average_clustering - average_clustering) < NUMERICAL_CONVERGENCE_THRESHOLD_1)
@@ -2431,27 +3123,24 @@ void embeddingSD_t::infer_parameters(int dim)
       if(random_ensemble_average_clustering > average_clustering)
       {
         beta_max = beta;
-        beta = (beta_max + beta_min) / 2;
+        beta = propose_beta(beta_min, beta_max);
         if(beta < BETA_ABS_MIN_DIM)
         {
           beta = BETA_ABS_MIN_DIM;
           if(!QUIET_MODE)
-            std::clog << "WARNING: value too close to D, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
+            logstream << "WARNING: value too close to D, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
           break;
         }
       }
       else
       {
         beta_min = beta;
-        if(beta_max == -1)
-          beta *= 1.5;
-        else
-          beta = (beta_max + beta_min) / 2;
+        beta = propose_beta(beta_min, beta_max);
       }
       if(beta > BETA_ABS_MAX_DIM)
       {
         if(!QUIET_MODE)
-          std::clog << "WARNING: value too high, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
+          logstream << "WARNING: value too high, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
         break;
       }
     }
@@ -2472,22 +3161,28 @@ void embeddingSD_t::infer_parameters(int dim)
   const auto radius = compute_radius(dim, nb_vertices);
   if(!QUIET_MODE) {
     if(!CUSTOM_BETA)
-      std::clog << "                       ";
-    std::clog << "...............................................................done."                                         << std::endl;
-    std::clog                                                                                                                   << std::endl;
-    std::clog << "Inferred ensemble (random positions)"                                                                         << std::endl;
-    std::clog << TAB << "Average degree:                 " << random_ensemble_average_degree                                    << std::endl;
-    std::clog << TAB << "Minimum degree:                 " << random_ensemble_expected_degree_per_degree_class.begin()->first   << std::endl;
-    std::clog << TAB << "Maximum degree:                 " << (--random_ensemble_expected_degree_per_degree_class.end())->first << std::endl;
-    std::clog << TAB << "Average clustering:             " << random_ensemble_average_clustering                                << std::endl;
-    std::clog << TAB << "Parameters"                                                                                            << std::endl;
+      logstream << "                       ";
+    logstream << "...............................................................done."                                         << std::endl;
+    logstream                                                                                                                   << std::endl;
+    logstream << "Inferred ensemble (random positions)"                                                                         << std::endl;
+    logstream << TAB << "Average degree:                 " << random_ensemble_average_degree                                    << std::endl;
+    logstream << TAB << "Minimum degree:                 " << random_ensemble_expected_degree_per_degree_class.begin()->first   << std::endl;
+    logstream << TAB << "Maximum degree:                 " << (--random_ensemble_expected_degree_per_degree_class.end())->first << std::endl;
+    logstream << TAB << "Average clustering:             " << random_ensemble_average_clustering << " (std. error: " << random_ensemble_average_clustering_error << ")" << std::endl;
+    logstream << TAB << "Parameters"                                                                                            << std::endl;
     if(!CUSTOM_BETA)
-      std::clog << TAB << "  - beta:                       " << beta                                                            << std::endl;
+      logstream << TAB << "  - beta:                       " << beta                                                            << std::endl;
     else
-      std::clog << TAB << "  - beta:                       " << beta  << " (custom)"                                            << std::endl;
-    std::clog << TAB << "  - mu:                           " << mu                                                              << std::endl;
-    std::clog << TAB << "  - radius_S^D (R):               " << radius                              << std::endl;
-    std::clog                                                                                                                   << std::endl;
+      logstream << TAB << "  - beta:                       " << beta  << " (custom)"                                            << std::endl;
+    logstream << TAB << "  - mu:                           " << mu                                                              << std::endl;
+    logstream << TAB << "  - radius_S^D (R):               " << radius                              << std::endl;
+    if(TABULATED_INTEGRALS_MODE)
+    {
+      logstream << TAB << "Tabulated integrals"                                                                                 << std::endl;
+      logstream << TAB << "  - nb. of exact integrals:     " << pkk_table.size()                                                << std::endl;
+      logstream << TAB << "  - max. relative error:        " << pkk_table.error_bound()                                         << std::endl;
+    }
+    logstream                                                                                                                   << std::endl;
   }
 
   // Cleans containers that are no longer useful.
@@ -2496,24 +3191,24 @@ void embeddingSD_t::infer_parameters(int dim)
   // random_ensemble_expected_degree_per_degree_class.clear();
 
   // Initialize random positions
-  d_positions.clear();
-  d_positions.resize(nb_vertices);
+  d_positions.resize(nb_vertices, dim);
   for (int i=0; i<nb_vertices; ++i)
-    d_positions[i] = generate_random_d_vector(dim, radius);
+    d_positions.set(i, generate_random_d_vector(dim, radius));
 }
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::infer_parameters()
 {
-  if(!QUIET_MODE) { std::clog << "Inferring parameters..."; }
+  if(!QUIET_MODE) { logstream << "Inferring parameters..."; }
   if(!CUSTOM_BETA)
   {
     if (!QUIET_MODE) {
-      std::clog << std::endl;
-      std::clog << TAB;
-      std::clog << std::fixed << std::setw(11) << "beta" << " ";
-      std::clog << std::fixed << std::setw(20) << "avg. clustering" << " \n";
+      logstream << std::endl;
+      logstream << TAB;
+      logstream << std::fixed << std::setw(11) << "beta" << " ";
+      logstream << std::fixed << std::setw(20) << "avg. clustering" << " ";
+      logstream << std::fixed << std::setw(12) << "std. error" << " \n";
     }
     // Sets initial value to beta.
     beta = 2 + uniform_01(engine);
@@ -2524,9 +3219,9 @@ void embeddingSD_t::infer_parameters()
     while( true )
     {
       if(!QUIET_MODE) {
-        std::clog << TAB;
-        std::clog << std::fixed << std::setw(11) << beta << " ";
-        std::clog.flush();
+        logstream << TAB;
+        logstream << std::fixed << std::setw(11) << beta << " ";
+        logstream.flush();
       }
       // Infers the values of kappa.
       infer_kappas_given_beta_for_degree_class();
@@ -2534,7 +3229,7 @@ void embeddingSD_t::infer_parameters()
       build_cumul_dist_for_mc_integration();
       // Computes the ensemble clustering.
       compute_random_ensemble_clustering();
-      if(!QUIET_MODE) { std::clog << std::fixed << std::setw(20) << random_ensemble_average_clustering << " \n"; }
+      if(!QUIET_MODE) { logstream << std::fixed << std::setw(20) << random_ensemble_average_clustering << " " << std::setw(12) << random_ensemble_average_clustering_error << " \n"; }
 
       // Checks if the expected clustering is close enough. (A.3. last paragraph)
       if( std::fabs(random_ensemble_average_clustering - average_clustering) < NUMERICAL_CONVERGENCE_THRESHOLD_1 )
@@ -2548,7 +3243,7 @@ void embeddingSD_t::infer_parameters()
         if(beta < BETA_ABS_MIN)
         {
           if(!QUIET_MODE)
-            std::clog << "WARNING: value too close to 1, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
+            logstream << "WARNING: value too close to 1, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
           break;
         }
       }
@@ -2563,7 +3258,7 @@ void embeddingSD_t::infer_parameters()
       if(beta > BETA_ABS_MAX)
       {
         if(!QUIET_MODE)
-          std::clog << "WARNING: value too high, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
+          logstream << "WARNING: value too high, using beta = " << std::fixed << std::setw(11) << beta << ".\n";
         break;
       }
     }
@@ -2588,22 +3283,22 @@ void embeddingSD_t::infer_parameters()
 
   if(!QUIET_MODE) {
     if(!CUSTOM_BETA)
-      std::clog << "                       ";
-    std::clog << "...............................................................done."                                         << std::endl;
-    std::clog                                                                                                                   << std::endl;
-    std::clog << "Inferred ensemble (random positions)"                                                                         << std::endl;
-    std::clog << TAB << "Average degree:                 " << random_ensemble_average_degree                                    << std::endl;
-    std::clog << TAB << "Minimum degree:                 " << random_ensemble_expected_degree_per_degree_class.begin()->first   << std::endl;
-    std::clog << TAB << "Maximum degree:                 " << (--random_ensemble_expected_degree_per_degree_class.end())->first << std::endl;
-    std::clog << TAB << "Average clustering:             " << random_ensemble_average_clustering                                << std::endl;
-    std::clog << TAB << "Parameters"                                                                                            << std::endl;
+      logstream << "                       ";
+    logstream << "...............................................................done."                                         << std::endl;
+    logstream                                                                                                                   << std::endl;
+    logstream << "Inferred ensemble (random positions)"                                                                         << std::endl;
+    logstream << TAB << "Average degree:                 " << random_ensemble_average_degree                                    << std::endl;
+    logstream << TAB << "Minimum degree:                 " << random_ensemble_expected_degree_per_degree_class.begin()->first   << std::endl;
+    logstream << TAB << "Maximum degree:                 " << (--random_ensemble_expected_degree_per_degree_class.end())->first << std::endl;
+    logstream << TAB << "Average clustering:             " << random_ensemble_average_clustering << " (std. error: " << random_ensemble_average_clustering_error << ")" << std::endl;
+    logstream << TAB << "Parameters"                                                                                            << std::endl;
     if(!CUSTOM_BETA)
-      std::clog << TAB << "  - beta:                       " << beta                                                            << std::endl;
+      logstream << TAB << "  - beta:                       " << beta                                                            << std::endl;
     else
-      std::clog << TAB << "  - beta:                       " << beta  << " (custom)"                                            << std::endl;
-    std::clog << TAB << "  - mu:                         " << mu                                                                << std::endl;
-    std::clog << TAB << "  - radius_S1 (R):              " << nb_vertices / (2 * PI)                                            << std::endl;
-    std::clog                                                                                                                   << std::endl;
+      logstream << TAB << "  - beta:                       " << beta  << " (custom)"                                            << std::endl;
+    logstream << TAB << "  - mu:                         " << mu                                                                << std::endl;
+    logstream << TAB << "  - radius_S1 (R):              " << nb_vertices / (2 * PI)                                            << std::endl;
+    logstream                                                                                                                   << std::endl;
   }
 
   // Cleans containers that are no longer useful.
@@ -2618,6 +3313,11 @@ void embeddingSD_t::infer_parameters()
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::initialize()
 {
+  // Nothing is written to the log file in the in-memory mode.
+  if(IN_MEMORY_MODE && !VERBOSE_MODE)
+  {
+    QUIET_MODE = true;
+  }
   // Sets the default rootname for output files.
   if(!CUSTOM_OUTPUT_ROOTNAME_MODE)
   {
@@ -2636,60 +3336,59 @@ void embeddingSD_t::initialize()
     SEED = std::time(nullptr);
   }
   engine.seed(SEED);
-  // Change the stream std::clog to a file.
+  // Directs the log of this embedding to a file (std::clog itself is left untouched).
   if(!QUIET_MODE)
   {
     if(!VERBOSE_MODE)
     {
      logfile.open(ROOTNAME_OUTPUT + ".inf_log");
-     // Get the rdbuf of clog.
-     // We need it to reset the value before exiting.
-     old_rdbuf = std::clog.rdbuf();
-     // Set the rdbuf of clog.
-     std::clog.rdbuf(logfile.rdbuf());
+     logstream.rdbuf(logfile.rdbuf());
     }
   }
   // Outputs options and parameters on screen.
-  if(!QUIET_MODE) { std::clog                                                                                                  << std::endl; }
-  if(!QUIET_MODE) { std::clog << "===========================================================================================" << std::endl; }
-  if(!QUIET_MODE) { std::clog << "D-Mercator: accurate embeddings of graphs in the SD space"                                     << std::endl; }
-  if(!QUIET_MODE) { std::clog << "version: "           << VERSION                                                              << std::endl; }
-  if(!QUIET_MODE) { std::clog << "started on: "        << format_time(time_started)                                            << std::endl; }
-  if(!QUIET_MODE) { std::clog << "edgelist filename: " << EDGELIST_FILENAME                                                    << std::endl; }
+  if(!QUIET_MODE) { logstream                                                                                                  << std::endl; }
+  if(!QUIET_MODE) { logstream << "===========================================================================================" << std::endl; }
+  if(!QUIET_MODE) { logstream << "D-Mercator: accurate embeddings of graphs in the SD space"                                     << std::endl; }
+  if(!QUIET_MODE) { logstream << "version: "           << VERSION                                                              << std::endl; }
+  if(!QUIET_MODE) { logstream << "started on: "        << format_time(time_started)                                            << std::endl; }
+  if(!QUIET_MODE) { logstream << "edgelist filename: " << EDGELIST_FILENAME                                                    << std::endl; }
   if(REFINE_MODE)
   {
-    if(!QUIET_MODE) { std::clog << "inferred positions filename: " << ALREADY_INFERRED_PARAMETERS_FILENAME                     << std::endl; }
+    if(!QUIET_MODE) { logstream << "inferred positions filename: " << ALREADY_INFERRED_PARAMETERS_FILENAME                     << std::endl; }
   }
-  if(!QUIET_MODE) { std::clog << "seed: "              << SEED                                                                 << std::endl; }
+  if(!QUIET_MODE) { logstream << "seed: "              << SEED                                                                 << std::endl; }
 
-  if(!QUIET_MODE) { std::clog                                                                                                  << std::endl; }
-  if(!QUIET_MODE) { std::clog << "Loading edgelist..."; }
-  load_edgelist();
-  if(!QUIET_MODE) { std::clog << "...................................................................done."                    << std::endl; }
+  if(!QUIET_MODE) { logstream                                                                                                  << std::endl; }
+  if(!QUIET_MODE) { logstream << "Loading edgelist..."; }
+  if(!IN_MEMORY_MODE)
+  {
+    load_edgelist();
+  }
+  if(!QUIET_MODE) { logstream << "...................................................................done."                    << std::endl; }
 
-  if(!QUIET_MODE) { std::clog                                                                                                  << std::endl; }
-  if(!QUIET_MODE) { std::clog << "Checking number of connected components..."; }
+  if(!QUIET_MODE) { logstream                                                                                                  << std::endl; }
+  if(!QUIET_MODE) { logstream << "Checking number of connected components..."; }
   check_connected_components();
-  if(!QUIET_MODE) { std::clog << "............................................done."                                           << std::endl; }
+  if(!QUIET_MODE) { logstream << "............................................done."                                           << std::endl; }
 
-  if(!QUIET_MODE) { std::clog                                                                                                  << std::endl; }
-  if(!QUIET_MODE) { std::clog << "Analyzing degrees..."; }
+  if(!QUIET_MODE) { logstream                                                                                                  << std::endl; }
+  if(!QUIET_MODE) { logstream << "Analyzing degrees..."; }
   analyze_degrees();
-  if(!QUIET_MODE) { std::clog << "..................................................................done."                     << std::endl; }
+  if(!QUIET_MODE) { logstream << "..................................................................done."                     << std::endl; }
 
-  if(!QUIET_MODE) { std::clog                                                                                                  << std::endl; }
-  if(!QUIET_MODE) { std::clog << "Computing local clustering..."; }
+  if(!QUIET_MODE) { logstream                                                                                                  << std::endl; }
+  if(!QUIET_MODE) { logstream << "Computing local clustering..."; }
   compute_clustering();
-  if(!QUIET_MODE) { std::clog << ".........................................................done."                              << std::endl; }
+  if(!QUIET_MODE) { logstream << ".........................................................done."                              << std::endl; }
 
-  if(!QUIET_MODE) { std::clog                                                                                                  << std::endl; }
-  if(!QUIET_MODE) { std::clog << "Ordering vertices..."; }
+  if(!QUIET_MODE) { logstream                                                                                                  << std::endl; }
+  if(!QUIET_MODE) { logstream << "Ordering vertices..."; }
   order_vertices();
-  if(!QUIET_MODE) { std::clog << "..................................................................done."                     << std::endl; }
-  if(!QUIET_MODE) { std::clog                                                                                                  << std::endl; }
+  if(!QUIET_MODE) { logstream << "..................................................................done."                     << std::endl; }
+  if(!QUIET_MODE) { logstream                                                                                                  << std::endl; }
 
   // Sets the decimal precision of the log.
-  std::clog.precision(4);
+  logstream.precision(4);
 
   // Sets the width of the columns in the output files.
   width_values = 15;
@@ -2705,15 +3404,15 @@ void embeddingSD_t::initialize()
   width_names += 1;
 
   if (!QUIET_MODE) {
-      std::clog << "Properties of the graph" << std::endl;
-      std::clog << TAB << "Nb vertices:                    " << nb_vertices << std::endl;
-      std::clog << TAB << "Nb edges:                       " << nb_edges << std::endl;
-      std::clog << TAB << "Average degree:                 " << average_degree << std::endl;
-      std::clog << TAB << "Minimum degree:                 " << *(degree_class.begin()) << std::endl;
-      std::clog << TAB << "Maximum degree:                 " << *(--degree_class.end()) << std::endl;
-      std::clog << TAB << "Nb of degree class:             " << degree_class.size() << std::endl;
-      std::clog << TAB << "Average clustering:             " << average_clustering << std::endl;
-      std::clog << std::endl;
+      logstream << "Properties of the graph" << std::endl;
+      logstream << TAB << "Nb vertices:                    " << nb_vertices << std::endl;
+      logstream << TAB << "Nb edges:                       " << nb_edges << std::endl;
+      logstream << TAB << "Average degree:                 " << average_degree << std::endl;
+      logstream << TAB << "Minimum degree:                 " << *(degree_class.begin()) << std::endl;
+      logstream << TAB << "Maximum degree:                 " << *(--degree_class.end()) << std::endl;
+      logstream << TAB << "Nb of degree class:             " << degree_class.size() << std::endl;
+      logstream << TAB << "Average clustering:             " << average_clustering << std::endl;
+      logstream << std::endl;
   }
 }
 
@@ -2803,8 +3502,7 @@ void embeddingSD_t::load_already_inferred_parameters(int dim)
   // Resets the containers.
   kappa.clear();
   kappa.resize(nb_vertices);
-  d_positions.clear();
-  d_positions.resize(nb_vertices);
+  d_positions.resize(nb_vertices, dim);
   // Opens the stream and terminates if the operation did not succeed.
   std::fstream hidden_variables_file(ALREADY_INFERRED_PARAMETERS_FILENAME.c_str(), std::fstream::in);
   if( !hidden_variables_file.is_open() )
@@ -2863,7 +3561,7 @@ void embeddingSD_t::load_already_inferred_parameters(int dim)
       one_line >> name3_str >> std::ws;
       tmp_positions.push_back(stod(name3_str));
     }
-    d_positions[Name2Num[name1_str]] = tmp_positions;
+    d_positions.set(Name2Num[name1_str], tmp_positions);
     one_line.clear();
   }
   // Closes the stream.
@@ -2876,96 +3574,49 @@ void embeddingSD_t::load_already_inferred_parameters(int dim)
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::load_edgelist()
 {
-  // Stream objects.
-  std::ifstream edgelist_file;
-  std::stringstream one_line;
-  // Variables.
-  int v1, v2;
-  // String objects.
-  std::string full_line, name1_str, name2_str;
-  // Iterator objects.
-  std::map< std::string, int >::iterator name_it;
-  // Resets the number of vertices and of edges.
-  nb_vertices = 0;
-  nb_edges = 0;
-  // Resets the containers.
-  adjacency_list.clear();
-  // Opens the stream and terminates if the operation did not succeed.
-  edgelist_file.open(EDGELIST_FILENAME.c_str(), std::ios_base::in);
-  if( !edgelist_file.is_open() )
-  {
-    std::cerr << "Could not open file: " << EDGELIST_FILENAME << "." << std::endl;
-    std::terminate();
-  }
-  else
+  // Reads the edgelist (binary or text file).
+  edgelist_t edgelist;
+  edgelist.load(EDGELIST_FILENAME);
+  build_adjacency_list(edgelist);
+  if(REFINE_MODE)
   {
-    // Reads the edgelist file line by line.
-    while( !edgelist_file.eof() )
+    // Maps the names to the numerical IDs (used to load the already inferred parameters).
+    Name2Num.clear();
+    for(int v(0); v<nb_vertices; ++v)
     {
-      // Reads a line of the file.
-      std::getline(edgelist_file, full_line); edgelist_file >> std::ws;
-      one_line.str(full_line); one_line >> std::ws;
-      one_line >> name1_str >> std::ws;
-      // Skips lines of comment.
-      if(name1_str == "#")
-      {
-        one_line.clear();
-        continue;
-      }
-      one_line >> name2_str >> std::ws;
-      one_line.clear();
-      // Does not consider self-loops.
-      if(name1_str != name2_str)
-      {
-        // Is name1 new?
-        name_it = Name2Num.find(name1_str);
-        if( name_it == Name2Num.end() )
-        {
-          // New vertex.
-          v1 = nb_vertices;
-          Name2Num[name1_str] = v1;
-          Num2Name.push_back(name1_str);
-          adjacency_list.emplace_back();
-          ++nb_vertices;
-        }
-        else
-        {
-          // Known vertex.
-          v1 = name_it->second;
-        }
-        // Is name2 new?
-        name_it = Name2Num.find(name2_str);
-        if( name_it == Name2Num.end() )
-        {
-          // New vertex.
-          v2 = nb_vertices;
-          Name2Num[name2_str] = v2;
-          Num2Name.push_back(name2_str);
-          adjacency_list.emplace_back();
-          ++nb_vertices;
-        }
-        else
-        {
-          // Known vertex.
-          v2 = name_it->second;
-        }
-        // Adds the edge to the adjacency list (multiedges are ignored due to std::set).
-        std::pair< std::set<int>::iterator, bool > add1 = adjacency_list[v1].insert(v2);
-        std::pair< std::set<int>::iterator, bool > add2 = adjacency_list[v2].insert(v1);
-        if(add1.second && add2.second) // Both bool should always agree.
-        {
-          ++nb_edges;
-        }
-      }
+      Name2Num[Num2Name[v]] = v;
     }
   }
-  // Closes the stream.
-  edgelist_file.close();
-  if(!REFINE_MODE)
-  {
-    // Clears unused objects.
-    Name2Num.clear();
-  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+template<typename T>
+void embeddingSD_t::load_edgelist(const T *sources, const T *targets, std::size_t nb_pairs)
+{
+  edgelist_t edgelist;
+  edgelist.load(sources, targets, nb_pairs);
+  build_adjacency_list(edgelist);
+  // The graph is neither read from nor written to a file.
+  IN_MEMORY_MODE = true;
+  REFINE_MODE = false;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::build_adjacency_list(edgelist_t &edgelist)
+{
+  // Compresses the edges into a sorted CSR adjacency (removes the multiedges).
+  std::vector<int> offsets, neighbors;
+  edgelist.build_csr(offsets, neighbors);
+  std::vector<int>().swap(edgelist.edges);
+  // Sets the number of vertices and of edges.
+  nb_vertices = edgelist.nb_vertices();
+  nb_edges = neighbors.size() / 2;
+  Num2Name = std::move(edgelist.names);
+  adjacency_list.assign(std::move(offsets), std::move(neighbors));
 }
 
 
@@ -2973,40 +3624,71 @@ void embeddingSD_t::load_edgelist()
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::order_vertices()
 {
-  // Containers related to the results of the onion decomposition.
-  std::vector<int> coreness(nb_vertices);
-  std::vector<int> od_layer(nb_vertices);
   // Extracts the onion decomposition.
-  extract_onion_decomposition(coreness, od_layer);
-  // Orders the vertices based on their layer.
-  std::set< std::pair<int, std::pair<double, int> > > layer_set;
+  extract_onion_decomposition(onion_coreness, onion_layer);
+  // Draws the random numbers breaking the ties between the vertices of a same layer.
+  std::vector< std::pair<double, int> > random_keys(nb_vertices);
+  int nb_layers = 0;
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    random_keys[v] = std::make_pair(uniform_01(engine), v);
+    nb_layers = std::max(nb_layers, onion_layer[v]);
+  }
+  // Places the vertices by decreasing layer (counting sort).
+  std::vector<int> layer_offsets(nb_layers + 2, 0);
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    ++layer_offsets[nb_layers - onion_layer[v] + 1];
+  }
+  for(int l(0); l<=nb_layers; ++l)
+  {
+    layer_offsets[l + 1] += layer_offsets[l];
+  }
+  std::vector< std::pair<double, int> > ordered_keys(nb_vertices);
+  std::vector<int> cursor(layer_offsets);
   for(int v(0); v<nb_vertices; ++v)
   {
-    layer_set.insert(std::make_pair(od_layer[v], std::make_pair(uniform_01(engine), v)));
+    ordered_keys[cursor[nb_layers - onion_layer[v]]++] = random_keys[v];
+  }
+  // Orders the vertices of each layer by decreasing random number.
+  for(int l(0); l<=nb_layers; ++l)
+  {
+    std::sort(ordered_keys.begin() + layer_offsets[l], ordered_keys.begin() + layer_offsets[l + 1],
+              std::greater< std::pair<double, int> >());
   }
   // Fills the ordered list of vertices.
   ordered_list_of_vertices.resize(nb_vertices);
-  auto it = layer_set.rbegin();
-  auto end = layer_set.rend();
-  for(int v(0); it!=end; ++it, ++v)
+  for(int v(0); v<nb_vertices; ++v)
   {
-    ordered_list_of_vertices[v] = it->second.second;
+    ordered_list_of_vertices[v] = ordered_keys[v].second;
   }
-  layer_set.clear();
 }
 
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 int embeddingSD_t::refine_angle(int v1)
+{
+  double best_angle;
+  int has_moved = propose_angle(v1, best_angle, engine, normal_01);
+  // Registers the best position found.
+  theta[v1] = best_angle;
+  // Returns 1 if the vertex changed position, and 0 otherwise.
+  return has_moved;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+int embeddingSD_t::propose_angle(int v1, double &best_angle, std::mt19937 &_engine, std::normal_distribution<double> &_normal_01)
 {
   // Variables.
   int has_moved = 0;
   double tmp_angle;
   double tmp_loglikelihood;
-  double best_angle = theta[v1];
+  best_angle = theta[v1];
   // Iterators.
-  std::set<int>::iterator it2, end;
+  csr_adjacency_t::iterator it2, end;
   // Computes the current loglikelihood.
   double previous_loglikelihood = 0;
   for(int v2(0); v2<nb_vertices; ++v2)
@@ -3061,7 +3743,7 @@ int embeddingSD_t::refine_angle(int v1)
   for(int e(0); e<_nb_new_angles_to_try; ++e)
   {
     // Gets the angle in the standard range.
-    tmp_angle = (normal_01(engine) * max_angle) + average_theta;
+    tmp_angle = (_normal_01(_engine) * max_angle) + average_theta;
     while(tmp_angle > (2 * PI))
       tmp_angle = tmp_angle - (2 * PI);
     while(tmp_angle < 0)
@@ -3087,9 +3769,24 @@ int embeddingSD_t::refine_angle(int v1)
       has_moved = 1;
     }
   }
+  // Returns 1 if the vertex should change position, and 0 otherwise.
+  return has_moved;
+}
 
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+int embeddingSD_t::refine_angle(int dim, int v1, double radius)
+{
+  // The vertex is taken out of the spatial index while it is being moved.
+  if(APPROXIMATE_LIKELIHOOD_MODE)
+    position_cells.remove(v1);
+  std::vector<double> best_position;
+  int has_moved = propose_position(dim, v1, radius, best_position, engine, normal_01);
   // Registers the best position found.
-  theta[v1] = best_angle;
+  d_positions.set(v1, best_position);
+  if(APPROXIMATE_LIKELIHOOD_MODE)
+    position_cells.insert(v1, d_positions[v1]);
   // Returns 1 if the vertex changed position, and 0 otherwise.
   return has_moved;
 }
@@ -3097,28 +3794,13 @@ int embeddingSD_t::refine_angle(int v1)
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
-int embeddingSD_t::refine_angle(int dim, int v1, double radius)
+int embeddingSD_t::propose_position(int dim, int v1, double radius, std::vector<double> &best_position, std::mt19937 &_engine, std::normal_distribution<double> &_normal_01)
 {
   // Variables.
   int has_moved = 0;
-  double tmp_angle;
-  double tmp_loglikelihood;
-  auto best_position = d_positions[v1];
+  best_position = d_positions.get(v1);
   // Iterators.
-  std::set<int>::iterator it2, end;
-  // Computes the current loglikelihood.
-  double previous_loglikelihood = 0;
-  for(int v2(0); v2<nb_vertices; ++v2)
-  {
-    previous_loglikelihood += compute_pairwise_loglikelihood(dim, v1, best_position, v2, d_positions[v2], false, radius);
-  }
-  it2 = adjacency_list[v1].begin();
-  end = adjacency_list[v1].end();
-  for(; it2!=end; ++it2)
-  {
-    previous_loglikelihood += compute_pairwise_loglikelihood(dim, v1, best_position, *it2, d_positions[*it2], true, radius);
-  }
-  double best_loglikelihood = previous_loglikelihood;
+  csr_adjacency_t::iterator it2, end;
 
   // Compute the weighted average positions of the neighbors
   std::vector<double> mean_vector(dim + 1, 0);
@@ -3127,67 +3809,183 @@ int embeddingSD_t::refine_angle(int dim, int v1, double radius)
   for(; it2!=end; ++it2)
   {
     // Identifies the neighbor.
-    const auto pos2 = d_positions[*it2];
+    const auto *pos2 = d_positions[*it2];
     const auto k2 = kappa[*it2];
 
     for (int i=0; i<dim+1; ++i)
       mean_vector[i] += pos2[i] / (k2 * k2);
   }
   normalize_and_rescale_vector(mean_vector, radius);
+  std::vector<double> mean_unit_vector(mean_vector);
+  normalize_and_rescale_vector(mean_unit_vector, 1);
 
   // Finds the largest angular distance between the neighbor and the average position.
   double max_angle = MIN_TWO_SIGMAS_NORMAL_DIST;
   it2 = adjacency_list[v1].begin();
   for(; it2!=end; ++it2)
   {
-    double dtheta = compute_angle_d_vectors(mean_vector, d_positions[*it2]);
+    double dtheta = d_positions.angle(*it2, mean_unit_vector.data());
     if(dtheta > max_angle)
       max_angle = dtheta;
   }
   max_angle /= 2;
 
-  // Considers various wisely chosen new angular positions and keeps the best.
+  // Draws various wisely chosen new angular positions (unit vectors). The first column is the
+  //   current position.
   int _nb_new_angles_to_try = MIN_NB_ANGLES_TO_TRY * std::max(1.0, std::log(nb_vertices));
-  for(int e(0); e<_nb_new_angles_to_try; ++e)
+  Eigen::MatrixXd candidates(dim + 1, _nb_new_angles_to_try + 1);
+  candidates.col(0) = Eigen::Map<const Eigen::VectorXd>(d_positions.unit(v1), dim + 1);
+  for(int e(1); e<=_nb_new_angles_to_try; ++e)
   {
     // Get the position in the standard range.
-    std::vector<double> proposed_position(dim + 1, 0);
     for (int i=0; i<dim+1; ++i)
-      proposed_position[i] = max_angle * normal_01(engine) + mean_vector[i] / radius; // multivariate normal distribution
-    normalize_and_rescale_vector(proposed_position, radius);
+      candidates(i, e) = max_angle * _normal_01(_engine) + mean_vector[i] / radius; // multivariate normal distribution
+    candidates.col(e).normalize();
+  }
 
-    // Computes the local loglikelihood.
-    tmp_loglikelihood = 0;
-    for(int v2(0); v2<nb_vertices; ++v2)
+  // Computes the local loglikelihood of all positions at once and keeps the best.
+  Eigen::VectorXd loglikelihood = compute_candidates_loglikelihood(dim, v1, candidates, radius);
+  double best_loglikelihood = loglikelihood(0);
+  for(int e(1); e<=_nb_new_angles_to_try; ++e)
+  {
+    // Preserves the optimal angular sector.
+    if(loglikelihood(e) > best_loglikelihood)
     {
-      tmp_loglikelihood += compute_pairwise_loglikelihood(dim, v1, proposed_position, v2, d_positions[v2], false, radius);
+      best_loglikelihood = loglikelihood(e);
+      for (int i=0; i<dim+1; ++i)
+        best_position[i] = candidates(i, e) * radius;
+      has_moved = 1;
     }
-    it2 = adjacency_list[v1].begin();
-    end = adjacency_list[v1].end();
-    for(; it2!=end; ++it2)
+  }
+  // Returns 1 if the vertex should change position, and 0 otherwise.
+  return has_moved;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::color_vertices_for_parallel_refinement()
+{
+  // Greedy coloring following the order in which the vertices are refined.
+  refinement_color.assign(nb_vertices, -1);
+  std::vector<bool> color_used_by_neighbor;
+  for(int i(0), v1; i<nb_vertices; ++i)
+  {
+    v1 = ordered_list_of_vertices[i];
+    color_used_by_neighbor.assign(adjacency_list[v1].size() + 1, false);
+    for(const auto &v2 : adjacency_list[v1])
     {
-      tmp_loglikelihood += compute_pairwise_loglikelihood(dim, v1, proposed_position, *it2, d_positions[*it2], true, radius);
+      if(refinement_color[v2] != -1 && refinement_color[v2] < static_cast<int>(color_used_by_neighbor.size()))
+        color_used_by_neighbor[refinement_color[v2]] = true;
     }
-    // Preserves the optimal angular sector.
-    if(tmp_loglikelihood > best_loglikelihood)
+    int c = 0;
+    while(color_used_by_neighbor[c])
+      ++c;
+    refinement_color[v1] = c;
+  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+int embeddingSD_t::refine_angles_in_parallel(int v_i, int v_f)
+{
+  // Groups the vertices by color (vertices with the same color are not adjacent).
+  std::map<int, std::vector<int>> batches;
+  for(int i(v_i); i<v_f; ++i)
+    batches[refinement_color[ordered_list_of_vertices[i]]].push_back(ordered_list_of_vertices[i]);
+#ifdef _OPENMP
+  const int nb_threads = (NB_THREADS > 0) ? NB_THREADS : omp_get_max_threads();
+#endif
+  int nb_moved = 0;
+  for(const auto &batch : batches)
+  {
+    const auto &vertices = batch.second;
+    const int n = vertices.size();
+    // Seeds are drawn sequentially such that the outcome does not depend on the scheduling of the threads.
+    std::vector<unsigned int> seeds(n);
+    for(auto &seed : seeds)
+      seed = engine();
+    // Every vertex of the batch is moved according to the positions at the beginning of the batch.
+    std::vector<double> best_angles(n);
+    std::vector<int> has_moved(n);
+    #pragma omp parallel num_threads(nb_threads)
     {
-      best_loglikelihood = tmp_loglikelihood;
-      best_position = proposed_position;
-      has_moved = 1;
+      std::mt19937 thread_engine;
+      std::normal_distribution<double> thread_normal_01;
+      #pragma omp for schedule(dynamic)
+      for(int i=0; i<n; ++i)
+      {
+        thread_engine.seed(seeds[i]);
+        thread_normal_01.reset();
+        has_moved[i] = propose_angle(vertices[i], best_angles[i], thread_engine, thread_normal_01);
+      }
+    }
+    // Registers the best positions found.
+    for(int i(0); i<n; ++i)
+    {
+      theta[vertices[i]] = best_angles[i];
+      nb_moved += has_moved[i];
     }
   }
-  // Registers the best position found.
-  d_positions[v1] = best_position;
-  // Returns 1 if the vertex changed position, and 0 otherwise.
-  return has_moved;
+  return nb_moved;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+int embeddingSD_t::refine_angles_in_parallel(int dim, int v_i, int v_f, double radius)
+{
+  // Groups the vertices by color (vertices with the same color are not adjacent).
+  std::map<int, std::vector<int>> batches;
+  for(int i(v_i); i<v_f; ++i)
+    batches[refinement_color[ordered_list_of_vertices[i]]].push_back(ordered_list_of_vertices[i]);
+#ifdef _OPENMP
+  const int nb_threads = (NB_THREADS > 0) ? NB_THREADS : omp_get_max_threads();
+#endif
+  int nb_moved = 0;
+  for(const auto &batch : batches)
+  {
+    const auto &vertices = batch.second;
+    const int n = vertices.size();
+    // Seeds are drawn sequentially such that the outcome does not depend on the scheduling of the threads.
+    std::vector<unsigned int> seeds(n);
+    for(auto &seed : seeds)
+      seed = engine();
+    // Every vertex of the batch is moved according to the positions at the beginning of the batch
+    //   (the spatial index of the approximate log-likelihood is only read during the batch).
+    std::vector<std::vector<double>> best_positions(n);
+    std::vector<int> has_moved(n);
+    #pragma omp parallel num_threads(nb_threads)
+    {
+      std::mt19937 thread_engine;
+      std::normal_distribution<double> thread_normal_01;
+      #pragma omp for schedule(dynamic)
+      for(int i=0; i<n; ++i)
+      {
+        thread_engine.seed(seeds[i]);
+        thread_normal_01.reset();
+        has_moved[i] = propose_position(dim, vertices[i], radius, best_positions[i], thread_engine, thread_normal_01);
+      }
+    }
+    // Registers the best positions found.
+    for(int i(0); i<n; ++i)
+    {
+      d_positions.set(vertices[i], best_positions[i]);
+      if(APPROXIMATE_LIKELIHOOD_MODE)
+        position_cells.insert(vertices[i], d_positions[vertices[i]]);
+      nb_moved += has_moved[i];
+    }
+  }
+  return nb_moved;
 }
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::refine_positions(int dim)
 {
-  if(!QUIET_MODE) { std::clog << "Refining the positions..."; }
-  if(!QUIET_MODE) { std::clog << std::endl; }
+  if(!QUIET_MODE) { logstream << "Refining the positions..."; }
+  if(!QUIET_MODE) { logstream << std::endl; }
 
   double start_time, stop_time;
   std::string vertices_range;
@@ -3195,32 +3993,67 @@ void embeddingSD_t::refine_positions(int dim)
   if(delta_nb_vertices < 1) { delta_nb_vertices = 1; }
   int width = 2 * (std::log10(nb_vertices) + 1) + 6;
   const auto radius = compute_radius(dim, nb_vertices);
-  for(int v_i(0), v_f(0), v_m, n_v; v_f<nb_vertices;)
+  // kappa^(-1/D) used to score the new positions to try.
+  inverse_kappa_root.resize(nb_vertices);
+  for(int v(0); v<nb_vertices; ++v)
+    inverse_kappa_root[v] = std::pow(kappa[v], -1.0 / dim);
+  // Builds the spatial index used to approximate the contribution of far away vertices.
+  if(APPROXIMATE_LIKELIHOOD_MODE)
+  {
+    std::vector<double> weights(nb_vertices);
+    for(int v(0); v<nb_vertices; ++v)
+      weights[v] = std::pow(kappa[v], beta / dim);
+    position_cells.build(dim, nb_vertices, d_positions.data().data(), weights);
+    if(!QUIET_MODE) { logstream << TAB << "approximate log-likelihood with " << position_cells.nb_occupied_cells() << " occupied cells (accuracy " << APPROXIMATE_LIKELIHOOD_ACCURACY << ")" << std::endl; }
+  }
+  // Builds the batches of non-adjacent vertices refined concurrently.
+  if(PARALLEL_REFINEMENT_MODE)
+  {
+    color_vertices_for_parallel_refinement();
+    if(!QUIET_MODE) { logstream << TAB << "parallel refinement with " << *std::max_element(refinement_color.begin(), refinement_color.end()) + 1 << " batches of non-adjacent vertices per range" << std::endl; }
+  }
+  // Resumes the refinement where the checkpoint was written, if any.
+  const int first_vertex = (resumed_stage == CHECKPOINT_REFINEMENT) ? resumed_cursor : 0;
+  for(int v_i(first_vertex), v_f(first_vertex), v_m, n_v, nb_ranges(0); v_f<nb_vertices;)
   {
     v_f = (v_i + delta_nb_vertices);
     v_f = (v_f > nb_vertices) ? nb_vertices : v_f;
     n_v = v_f - v_i;
     start_time = time_since_epoch_in_seconds();
     if(!QUIET_MODE) { vertices_range = "[" + std::to_string(v_i+1) + "," + std::to_string(v_f) + "]..."; }
-    if(!QUIET_MODE) { std::clog << TAB << "...of vertices " << std::setw(width) << vertices_range; }
-    for(v_m = 0; v_i<v_f; ++v_i)
+    if(!QUIET_MODE) { logstream << TAB << "...of vertices " << std::setw(width) << vertices_range; }
+    if(PARALLEL_REFINEMENT_MODE)
+    {
+      v_m = refine_angles_in_parallel(dim, v_i, v_f, radius);
+      v_i = v_f;
+    }
+    else
     {
-      v_m += refine_angle(dim, ordered_list_of_vertices[v_i], radius);
+      for(v_m = 0; v_i<v_f; ++v_i)
+      {
+        v_m += refine_angle(dim, ordered_list_of_vertices[v_i], radius);
+      }
     }
     stop_time = time_since_epoch_in_seconds();
-    if(!QUIET_MODE) { std::clog << "...done in " << std::setw(6) << std::fixed << stop_time - start_time << " seconds (" << std::setw(std::log10(delta_nb_vertices) + 1) << v_m << "/" << std::setw(std::log10(delta_nb_vertices) + 1) << n_v << " changed position)" << std::endl; }
+    if(!QUIET_MODE) { logstream << "...done in " << std::setw(6) << std::fixed << stop_time - start_time << " seconds (" << std::setw(std::log10(delta_nb_vertices) + 1) << v_m << "/" << std::setw(std::log10(delta_nb_vertices) + 1) << n_v << " changed position)" << std::endl; }
+    // Writes a checkpoint every CHECKPOINT_INTERVAL ranges and at the end of the refinement.
+    ++nb_ranges;
+    if(CHECKPOINT_MODE && (nb_ranges % CHECKPOINT_INTERVAL == 0 || v_f == nb_vertices))
+    {
+      save_checkpoint(dim, CHECKPOINT_REFINEMENT, v_f);
+    }
   }
 
-  if(!QUIET_MODE) { std::clog << "                         .............................................................done." << std::endl; }
-  if(!QUIET_MODE) { std::clog << std::endl; }
+  if(!QUIET_MODE) { logstream << "                         .............................................................done." << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
 }
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::refine_positions()
 {
-  if(!QUIET_MODE) { std::clog << "Refining the positions..."; }
-  if(!QUIET_MODE) { std::clog << std::endl; }
+  if(!QUIET_MODE) { logstream << "Refining the positions..."; }
+  if(!QUIET_MODE) { logstream << std::endl; }
 
   // // Imposes a global random shift on the angular positions.
   // double theta_shift = 2 * PI * uniform_01(engine);
@@ -3234,51 +4067,74 @@ void embeddingSD_t::refine_positions()
   //     theta[i] = theta[i] + (2 * PI);
   // }
 
+  // Builds the batches of non-adjacent vertices refined concurrently.
+  if(PARALLEL_REFINEMENT_MODE)
+  {
+    color_vertices_for_parallel_refinement();
+    if(!QUIET_MODE) { logstream << TAB << "parallel refinement with " << *std::max_element(refinement_color.begin(), refinement_color.end()) + 1 << " batches of non-adjacent vertices per range" << std::endl; }
+  }
+
   double start_time, stop_time;
   std::string vertices_range;
   int delta_nb_vertices = nb_vertices / 19.999999;
   if(delta_nb_vertices < 1) { delta_nb_vertices = 1; }
   int width = 2 * (std::log10(nb_vertices) + 1) + 6;
-  for(int v_i(0), v_f(0), v_m, n_v; v_f<nb_vertices;)
+  // Resumes the refinement where the checkpoint was written, if any.
+  const int first_vertex = (resumed_stage == CHECKPOINT_REFINEMENT) ? resumed_cursor : 0;
+  for(int v_i(first_vertex), v_f(first_vertex), v_m, n_v, nb_ranges(0); v_f<nb_vertices;)
   {
     v_f = (v_i + delta_nb_vertices);
     v_f = (v_f > nb_vertices) ? nb_vertices : v_f;
     n_v = v_f - v_i;
     start_time = time_since_epoch_in_seconds();
     if(!QUIET_MODE) { vertices_range = "[" + std::to_string(v_i+1) + "," + std::to_string(v_f) + "]..."; }
-    if(!QUIET_MODE) { std::clog << TAB << "...of vertices " << std::setw(width) << vertices_range; }
-    for(v_m = 0; v_i<v_f; ++v_i)
+    if(!QUIET_MODE) { logstream << TAB << "...of vertices " << std::setw(width) << vertices_range; }
+    if(PARALLEL_REFINEMENT_MODE)
+    {
+      v_m = refine_angles_in_parallel(v_i, v_f);
+      v_i = v_f;
+    }
+    else
     {
-      v_m += refine_angle( ordered_list_of_vertices[v_i] );
+      for(v_m = 0; v_i<v_f; ++v_i)
+      {
+        v_m += refine_angle( ordered_list_of_vertices[v_i] );
+      }
     }
     stop_time = time_since_epoch_in_seconds();
-    if(!QUIET_MODE) { std::clog << "...done in " << std::setw(6) << std::fixed << stop_time - start_time << " seconds (" << std::setw(std::log10(delta_nb_vertices) + 1) << v_m << "/" << std::setw(std::log10(delta_nb_vertices) + 1) << n_v << " changed position)" << std::endl; }
+    if(!QUIET_MODE) { logstream << "...done in " << std::setw(6) << std::fixed << stop_time - start_time << " seconds (" << std::setw(std::log10(delta_nb_vertices) + 1) << v_m << "/" << std::setw(std::log10(delta_nb_vertices) + 1) << n_v << " changed position)" << std::endl; }
+    // Writes a checkpoint every CHECKPOINT_INTERVAL ranges and at the end of the refinement.
+    ++nb_ranges;
+    if(CHECKPOINT_MODE && (nb_ranges % CHECKPOINT_INTERVAL == 0 || v_f == nb_vertices))
+    {
+      save_checkpoint(1, CHECKPOINT_REFINEMENT, v_f);
+    }
   }
   // for(int j(0); j<5; ++j)
   // {
   //   start_time = std::time(NULL);
-  //   if(!QUIET_MODE) { std::clog << TAB << "refining the positions of the core vertices (" + ( (nb_vertices>NB_VERTICES_IN_CORE) ? std::to_string(NB_VERTICES_IN_CORE) : std::to_string(nb_vertices) ) + " vertices, iteration #" + std::to_string(j+1) + ")"; std::clog.clear(); }
+  //   if(!QUIET_MODE) { logstream << TAB << "refining the positions of the core vertices (" + ( (nb_vertices>NB_VERTICES_IN_CORE) ? std::to_string(NB_VERTICES_IN_CORE) : std::to_string(nb_vertices) ) + " vertices, iteration #" + std::to_string(j+1) + ")"; logstream.clear(); }
   //   for(int i(0); (i<nb_vertices) && (i<NB_VERTICES_IN_CORE); ++i)
   //   {
   //     refine_angle( ordered_list_of_vertices[i] );
   //   }
   //   stop_time = std::time(NULL);
-  //   if(!QUIET_MODE) { std::clog << TAB << "[done in " << stop_time - start_time << " seconds]" << std::endl; }
+  //   if(!QUIET_MODE) { logstream << TAB << "[done in " << stop_time - start_time << " seconds]" << std::endl; }
   // }
   // start_time = std::time(NULL);
   // if(nb_vertices > NB_VERTICES_IN_CORE)
   // {
-  //   if(!QUIET_MODE) { std::clog << TAB << "refining the positions of the remaining vertices (" + std::to_string(nb_vertices - NB_VERTICES_IN_CORE) + " vertices)"; std::clog.clear(); }
+  //   if(!QUIET_MODE) { logstream << TAB << "refining the positions of the remaining vertices (" + std::to_string(nb_vertices - NB_VERTICES_IN_CORE) + " vertices)"; logstream.clear(); }
   //   for(int i(NB_VERTICES_IN_CORE); i<nb_vertices; ++i)
   //   {
   //     refine_angle( ordered_list_of_vertices[i] );
   //   }
   //   stop_time = std::time(NULL);
-  //   if(!QUIET_MODE) { std::clog << TAB << "[done in " << stop_time - start_time << " seconds]" << std::endl; }
+  //   if(!QUIET_MODE) { logstream << TAB << "[done in " << stop_time - start_time << " seconds]" << std::endl; }
   // }
 
-  if(!QUIET_MODE) { std::clog << "                         .............................................................done." << std::endl; }
-  if(!QUIET_MODE) { std::clog << std::endl; }
+  if(!QUIET_MODE) { logstream << "                         .............................................................done." << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
 }
 
 void embeddingSD_t::save_inferred_connection_probability(int dim)
@@ -3306,10 +4162,9 @@ void embeddingSD_t::save_inferred_connection_probability(int dim)
   for(int v1(0), i; v1<nb_vertices; ++v1)
   {
     k1 = kappa[v1];
-    const auto pos1 = d_positions[v1];
     for(int v2(v1 + 1); v2<nb_vertices; ++v2)
     {
-      da = compute_angle_d_vectors(pos1, d_positions[v2]);
+      da = d_positions.angle(v1, v2);
       dist = (radius * da) / std::pow(mu * k1 * kappa[v2], 1.0 / dim);
       i = bins.lower_bound(dist)->second;
       n[i] += 1;
@@ -3345,8 +4200,8 @@ void embeddingSD_t::save_inferred_connection_probability(int dim)
   }
   // Closes the stream.
   pconn_file.close();
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  if(!QUIET_MODE) { std::clog << TAB << "=> Inferred connection probability saved to " << ROOTNAME_OUTPUT + ".inf_pconn" << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "=> Inferred connection probability saved to " << ROOTNAME_OUTPUT + ".inf_pconn" << std::endl; }
 }
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
@@ -3414,25 +4269,18 @@ void embeddingSD_t::save_inferred_connection_probability()
   }
   // Closes the stream.
   pconn_file.close();
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  if(!QUIET_MODE) { std::clog << TAB << "=> Inferred connection probability saved to " << ROOTNAME_OUTPUT + ".inf_pconn" << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "=> Inferred connection probability saved to " << ROOTNAME_OUTPUT + ".inf_pconn" << std::endl; }
 }
 
 void embeddingSD_t::save_inferred_coordinates(int dim)
 {
   const auto R = compute_radius(dim, nb_vertices);
-  // Finds the minimal and maximal values of kappa.
+  // Finds the minimal value of kappa.
   double kappa_min = *std::min_element(kappa.begin(), kappa.end());
-  double kappa_max = *std::max_element(kappa.begin(), kappa.end());
   // Computes the hyperbolic radius (adjusts it in case some vertices have a negative radial position).
-  double hyp_radius = 2 * std::log(2 * R / std::pow(mu * kappa_min * kappa_min, 1.0 / dim));
-  double min_radial_position = hyp_radius - (2.0 / dim) * std::log(kappa_max / kappa_min);
   bool warning = false;
-  if(min_radial_position < 0)
-  {
-    hyp_radius += std::fabs(min_radial_position);
-    warning = true;
-  }
+  double hyp_radius = compute_hyperbolic_radius(dim, warning);
   // Sets the name of the file to write the hidden variables into.
   std::string coordinates_filename = ROOTNAME_OUTPUT + ".inf_coord";
   // // Gets the current time.
@@ -3514,37 +4362,59 @@ void embeddingSD_t::save_inferred_coordinates(int dim)
   coordinates_file << "# =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~="        << std::endl;
   coordinates_file << "# Internal parameters and options"                                                                          << std::endl;
   coordinates_file << "# " << TAB << "ALREADY_INFERRED_PARAMETERS_FILENAME   " << ALREADY_INFERRED_PARAMETERS_FILENAME             << std::endl;
+  coordinates_file << "# " << TAB << "APPROXIMATE_LIKELIHOOD_ACCURACY        " << APPROXIMATE_LIKELIHOOD_ACCURACY                  << std::endl;
+  coordinates_file << "# " << TAB << "APPROXIMATE_LIKELIHOOD_MODE            " << (APPROXIMATE_LIKELIHOOD_MODE ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "BETA_ABS_MAX                           " << BETA_ABS_MAX                                     << std::endl;
   coordinates_file << "# " << TAB << "BETA_ABS_MIN                           " << BETA_ABS_MIN                                     << std::endl;
   coordinates_file << "# " << TAB << "CHARACTERIZATION_MODE                  " << (CHARACTERIZATION_MODE       ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "CHARACTERIZATION_NB_GRAPHS             " << CHARACTERIZATION_NB_GRAPHS                       << std::endl;
+  coordinates_file << "# " << TAB << "CHECKPOINT_INTERVAL                    " << CHECKPOINT_INTERVAL                              << std::endl;
+  coordinates_file << "# " << TAB << "CHECKPOINT_MODE                        " << (CHECKPOINT_MODE             ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "CLEAN_RAW_OUTPUT_MODE                  " << (CLEAN_RAW_OUTPUT_MODE       ? "true" : "false") << std::endl;
   // coordinates_file << "# " << TAB << "CLOSE_ANGULAR_RANGE_FACTOR             " << CLOSE_ANGULAR_RANGE_FACTOR                       << std::endl;
   coordinates_file << "# " << TAB << "CUSTOM_BETA                            " << (CUSTOM_BETA                 ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "CUSTOM_INFERRED_COORDINATES            " << (CUSTOM_INFERRED_COORDINATES ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "CUSTOM_OUTPUT_ROOTNAME_MODE            " << (CUSTOM_OUTPUT_ROOTNAME_MODE ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "CUSTOM_SEED                            " << (CUSTOM_SEED                 ? "true" : "false") << std::endl;
+  coordinates_file << "# " << TAB << "DETERMINISTIC_KAPPA_UPDATE_MODE        " << (DETERMINISTIC_KAPPA_UPDATE_MODE ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "EDGELIST_FILENAME:                     " << EDGELIST_FILENAME                                << std::endl;
+  coordinates_file << "# " << TAB << "EIGENVECTORS_FILENAME:                 " << EIGENVECTORS_FILENAME                            << std::endl;
+  coordinates_file << "# " << TAB << "EXP_CLUST_MAX_NB_INTEGRATION_MC_STEPS  " << EXP_CLUST_MAX_NB_INTEGRATION_MC_STEPS            << std::endl;
   coordinates_file << "# " << TAB << "EXP_CLUST_NB_INTEGRATION_MC_STEPS      " << EXP_CLUST_NB_INTEGRATION_MC_STEPS                << std::endl;
+  coordinates_file << "# " << TAB << "EXP_CLUST_TARGET_STANDARD_ERROR        " << EXP_CLUST_TARGET_STANDARD_ERROR                  << std::endl;
   coordinates_file << "# " << TAB << "EXP_DIST_NB_INTEGRATION_STEPS          " << EXP_DIST_NB_INTEGRATION_STEPS                    << std::endl;
   coordinates_file << "# " << TAB << "KAPPA_MAX_NB_ITER_CONV                 " << KAPPA_MAX_NB_ITER_CONV                           << std::endl;
   coordinates_file << "# " << TAB << "KAPPA_POST_INFERENCE_MODE              " << (KAPPA_POST_INFERENCE_MODE   ? "true" : "false") << std::endl;
+  coordinates_file << "# " << TAB << "LARGEST_COMPONENT_MODE                 " << (LARGEST_COMPONENT_MODE      ? "true" : "false") << std::endl;
+  coordinates_file << "# " << TAB << "LOGLIKELIHOOD_BLOCK_SIZE               " << LOGLIKELIHOOD_BLOCK_SIZE                         << std::endl;
   // coordinates_file << "# " << TAB << "LIMIT_FOR_CONVERGENCE_CRITERION        " << LIMIT_FOR_CONVERGENCE_CRITERION                  << std::endl;
   // coordinates_file << "# " << TAB << "MAX_NB_ITER_MAXIMIZATION               " << MAX_NB_ITER_MAXIMIZATION                         << std::endl;
   coordinates_file << "# " << TAB << "MAXIMIZATION_MODE                      " << (MAXIMIZATION_MODE           ? "true" : "false") << std::endl;
   // coordinates_file << "# " << TAB << "MINIMAL_ANGULAR_CONVERGENCE_THRESHOLD  " << MINIMAL_ANGULAR_CONVERGENCE_THRESHOLD            << std::endl;
   // coordinates_file << "# " << TAB << "MINIMAL_ANGULAR_RESOLUTION             " << MINIMAL_ANGULAR_RESOLUTION                       << std::endl;
   // coordinates_file << "# " << TAB << "NB_VERTICES_IN_CORE                    " << NB_VERTICES_IN_CORE                              << std::endl;
+  coordinates_file << "# " << TAB << "MEMOIZED_BETA_SEARCH_MODE              " << (MEMOIZED_BETA_SEARCH_MODE   ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "MIN_NB_ANGLES_TO_TRY                   " << MIN_NB_ANGLES_TO_TRY                             << std::endl;
+  coordinates_file << "# " << TAB << "MULTILEVEL_COARSEST_SIZE               " << MULTILEVEL_COARSEST_SIZE                         << std::endl;
+  coordinates_file << "# " << TAB << "MULTILEVEL_MODE                        " << (MULTILEVEL_MODE             ? "true" : "false") << std::endl;
+  coordinates_file << "# " << TAB << "MULTILEVEL_NB_SMOOTHING_STEPS          " << MULTILEVEL_NB_SMOOTHING_STEPS                    << std::endl;
   coordinates_file << "# " << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_1      " << NUMERICAL_CONVERGENCE_THRESHOLD_1                << std::endl;
   coordinates_file << "# " << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_2      " << NUMERICAL_CONVERGENCE_THRESHOLD_2                << std::endl;
   coordinates_file << "# " << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_3      " << NUMERICAL_CONVERGENCE_THRESHOLD_3                << std::endl;
+  coordinates_file << "# " << TAB << "NB_THREADS                             " << NB_THREADS                                       << std::endl;
   coordinates_file << "# " << TAB << "NUMERICAL_ZERO                         " << NUMERICAL_ZERO                                   << std::endl;
+  coordinates_file << "# " << TAB << "OTHER_COMPONENTS_MIN_SIZE              " << OTHER_COMPONENTS_MIN_SIZE                        << std::endl;
+  coordinates_file << "# " << TAB << "OTHER_COMPONENTS_MODE                  " << (OTHER_COMPONENTS_MODE       ? "true" : "false") << std::endl;
+  coordinates_file << "# " << TAB << "PARALLEL_REFINEMENT_MODE               " << (PARALLEL_REFINEMENT_MODE    ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "QUIET_MODE                             " << (QUIET_MODE                  ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "REFINE_MODE                            " << (REFINE_MODE                 ? "true" : "false") << std::endl;
+  coordinates_file << "# " << TAB << "RESUME_FILENAME:                       " << RESUME_FILENAME                                  << std::endl;
+  coordinates_file << "# " << TAB << "RESUME_MODE                            " << (RESUME_MODE                 ? "true" : "false") << std::endl;
   // coordinates_file << "# " << TAB << "REFINED_MAX_STEP_LENGTH_DIVISOR        " << REFINED_MAX_STEP_LENGTH_DIVISOR                  << std::endl;
   coordinates_file << "# " << TAB << "ROOTNAME_OUTPUT:                       " << ROOTNAME_OUTPUT                                  << std::endl;
   coordinates_file << "# " << TAB << "SEED                                   " << SEED                                             << std::endl;
+  coordinates_file << "# " << TAB << "SYMMETRIC_EIGENSOLVER_MODE             " << (SYMMETRIC_EIGENSOLVER_MODE  ? "true" : "false") << std::endl;
+  coordinates_file << "# " << TAB << "TABULATED_INTEGRALS_MODE               " << (TABULATED_INTEGRALS_MODE    ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "VALIDATION_MODE                        " << (VALIDATION_MODE             ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "VERBOSE_MODE                           " << (VERBOSE_MODE                ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "DIMENSION                              " << dim                                          << std::endl;
@@ -3553,8 +4423,8 @@ void embeddingSD_t::save_inferred_coordinates(int dim)
   // Closes the stream.
   coordinates_file.close();
 
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  if(!QUIET_MODE) { std::clog << TAB << "=> Inferred coordinates saved to " << ROOTNAME_OUTPUT + ".inf_coord" << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "=> Inferred coordinates saved to " << ROOTNAME_OUTPUT + ".inf_coord" << std::endl; }
 
   if(CLEAN_RAW_OUTPUT_MODE)
   {
@@ -3585,13 +4455,13 @@ void embeddingSD_t::save_inferred_coordinates(int dim)
     // Closes the stream.
     coordinates_file.close();
 
-    if(!QUIET_MODE) { std::clog << std::endl; }
-    if(!QUIET_MODE) { std::clog << TAB << "=> Raw inferred coordinates also saved to " << ROOTNAME_OUTPUT + ".inf_coord_raw" << std::endl; }
+    if(!QUIET_MODE) { logstream << std::endl; }
+    if(!QUIET_MODE) { logstream << TAB << "=> Raw inferred coordinates also saved to " << ROOTNAME_OUTPUT + ".inf_coord_raw" << std::endl; }
   }
 
   if(warning)
   {
-    if(!QUIET_MODE) { std::clog << "WARNING: Hyperbolic radius has been adjusted to account for negative radial positions." << std::endl; }
+    if(!QUIET_MODE) { logstream << "WARNING: Hyperbolic radius has been adjusted to account for negative radial positions." << std::endl; }
   }
 }
 
@@ -3599,18 +4469,11 @@ void embeddingSD_t::save_inferred_coordinates(int dim)
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::save_inferred_coordinates()
 {
-  // Finds the minimal and maximal values of kappa.
+  // Finds the minimal value of kappa.
   double kappa_min = *std::min_element(kappa.begin(), kappa.end());
-  double kappa_max = *std::max_element(kappa.begin(), kappa.end());
   // Computes the hyperbolic radius (adjusts it in case some vertices have a negative radial position).
-  double hyp_radius = 2 * std::log( nb_vertices / (PI * mu * kappa_min * kappa_min) );
-  double min_radial_position = hyp_radius - 2 * std::log( kappa_min / kappa_max );
   bool warning = false;
-  if(min_radial_position < 0)
-  {
-    hyp_radius += std::fabs(min_radial_position);
-    warning = true;
-  }
+  double hyp_radius = compute_hyperbolic_radius(warning);
   // Sets the name of the file to write the hidden variables into.
   std::string coordinates_filename = ROOTNAME_OUTPUT + ".inf_coord";
   // // Gets the current time.
@@ -3691,6 +4554,8 @@ void embeddingSD_t::save_inferred_coordinates()
   coordinates_file << "# " << TAB << "BETA_ABS_MIN                           " << BETA_ABS_MIN                                     << std::endl;
   coordinates_file << "# " << TAB << "CHARACTERIZATION_MODE                  " << (CHARACTERIZATION_MODE       ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "CHARACTERIZATION_NB_GRAPHS             " << CHARACTERIZATION_NB_GRAPHS                       << std::endl;
+  coordinates_file << "# " << TAB << "CHECKPOINT_INTERVAL                    " << CHECKPOINT_INTERVAL                              << std::endl;
+  coordinates_file << "# " << TAB << "CHECKPOINT_MODE                        " << (CHECKPOINT_MODE             ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "CLEAN_RAW_OUTPUT_MODE                  " << (CLEAN_RAW_OUTPUT_MODE       ? "true" : "false") << std::endl;
   // coordinates_file << "# " << TAB << "CLOSE_ANGULAR_RANGE_FACTOR             " << CLOSE_ANGULAR_RANGE_FACTOR                       << std::endl;
   coordinates_file << "# " << TAB << "CUSTOM_BETA                            " << (CUSTOM_BETA                 ? "true" : "false") << std::endl;
@@ -3698,10 +4563,14 @@ void embeddingSD_t::save_inferred_coordinates()
   coordinates_file << "# " << TAB << "CUSTOM_OUTPUT_ROOTNAME_MODE            " << (CUSTOM_OUTPUT_ROOTNAME_MODE ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "CUSTOM_SEED                            " << (CUSTOM_SEED                 ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "EDGELIST_FILENAME:                     " << EDGELIST_FILENAME                                << std::endl;
+  coordinates_file << "# " << TAB << "EIGENVECTORS_FILENAME:                 " << EIGENVECTORS_FILENAME                            << std::endl;
+  coordinates_file << "# " << TAB << "EXP_CLUST_MAX_NB_INTEGRATION_MC_STEPS  " << EXP_CLUST_MAX_NB_INTEGRATION_MC_STEPS            << std::endl;
   coordinates_file << "# " << TAB << "EXP_CLUST_NB_INTEGRATION_MC_STEPS      " << EXP_CLUST_NB_INTEGRATION_MC_STEPS                << std::endl;
+  coordinates_file << "# " << TAB << "EXP_CLUST_TARGET_STANDARD_ERROR        " << EXP_CLUST_TARGET_STANDARD_ERROR                  << std::endl;
   coordinates_file << "# " << TAB << "EXP_DIST_NB_INTEGRATION_STEPS          " << EXP_DIST_NB_INTEGRATION_STEPS                    << std::endl;
   coordinates_file << "# " << TAB << "KAPPA_MAX_NB_ITER_CONV                 " << KAPPA_MAX_NB_ITER_CONV                           << std::endl;
   coordinates_file << "# " << TAB << "KAPPA_POST_INFERENCE_MODE              " << (KAPPA_POST_INFERENCE_MODE   ? "true" : "false") << std::endl;
+  coordinates_file << "# " << TAB << "LARGEST_COMPONENT_MODE                 " << (LARGEST_COMPONENT_MODE      ? "true" : "false") << std::endl;
   // coordinates_file << "# " << TAB << "LIMIT_FOR_CONVERGENCE_CRITERION        " << LIMIT_FOR_CONVERGENCE_CRITERION                  << std::endl;
   // coordinates_file << "# " << TAB << "MAX_NB_ITER_MAXIMIZATION               " << MAX_NB_ITER_MAXIMIZATION                         << std::endl;
   coordinates_file << "# " << TAB << "MAXIMIZATION_MODE                      " << (MAXIMIZATION_MODE           ? "true" : "false") << std::endl;
@@ -3709,15 +4578,23 @@ void embeddingSD_t::save_inferred_coordinates()
   // coordinates_file << "# " << TAB << "MINIMAL_ANGULAR_RESOLUTION             " << MINIMAL_ANGULAR_RESOLUTION                       << std::endl;
   // coordinates_file << "# " << TAB << "NB_VERTICES_IN_CORE                    " << NB_VERTICES_IN_CORE                              << std::endl;
   coordinates_file << "# " << TAB << "MIN_NB_ANGLES_TO_TRY                   " << MIN_NB_ANGLES_TO_TRY                             << std::endl;
+  coordinates_file << "# " << TAB << "MULTILEVEL_COARSEST_SIZE               " << MULTILEVEL_COARSEST_SIZE                         << std::endl;
+  coordinates_file << "# " << TAB << "MULTILEVEL_MODE                        " << (MULTILEVEL_MODE             ? "true" : "false") << std::endl;
+  coordinates_file << "# " << TAB << "MULTILEVEL_NB_SMOOTHING_STEPS          " << MULTILEVEL_NB_SMOOTHING_STEPS                    << std::endl;
   coordinates_file << "# " << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_1      " << NUMERICAL_CONVERGENCE_THRESHOLD_1                << std::endl;
   coordinates_file << "# " << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_2      " << NUMERICAL_CONVERGENCE_THRESHOLD_2                << std::endl;
   coordinates_file << "# " << TAB << "NUMERICAL_CONVERGENCE_THRESHOLD_3      " << NUMERICAL_CONVERGENCE_THRESHOLD_3                << std::endl;
   coordinates_file << "# " << TAB << "NUMERICAL_ZERO                         " << NUMERICAL_ZERO                                   << std::endl;
+  coordinates_file << "# " << TAB << "OTHER_COMPONENTS_MIN_SIZE              " << OTHER_COMPONENTS_MIN_SIZE                        << std::endl;
+  coordinates_file << "# " << TAB << "OTHER_COMPONENTS_MODE                  " << (OTHER_COMPONENTS_MODE       ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "QUIET_MODE                             " << (QUIET_MODE                  ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "REFINE_MODE                            " << (REFINE_MODE                 ? "true" : "false") << std::endl;
+  coordinates_file << "# " << TAB << "RESUME_FILENAME:                       " << RESUME_FILENAME                                  << std::endl;
+  coordinates_file << "# " << TAB << "RESUME_MODE                            " << (RESUME_MODE                 ? "true" : "false") << std::endl;
   // coordinates_file << "# " << TAB << "REFINED_MAX_STEP_LENGTH_DIVISOR        " << REFINED_MAX_STEP_LENGTH_DIVISOR                  << std::endl;
   coordinates_file << "# " << TAB << "ROOTNAME_OUTPUT:                       " << ROOTNAME_OUTPUT                                  << std::endl;
   coordinates_file << "# " << TAB << "SEED                                   " << SEED                                             << std::endl;
+  coordinates_file << "# " << TAB << "SYMMETRIC_EIGENSOLVER_MODE             " << (SYMMETRIC_EIGENSOLVER_MODE  ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "VALIDATION_MODE                        " << (VALIDATION_MODE             ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "VERBOSE_MODE                           " << (VERBOSE_MODE                ? "true" : "false") << std::endl;
   coordinates_file << "# " << TAB << "VERSION                                " << VERSION                                          << std::endl;
@@ -3725,8 +4602,8 @@ void embeddingSD_t::save_inferred_coordinates()
   // Closes the stream.
   coordinates_file.close();
 
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  if(!QUIET_MODE) { std::clog << TAB << "=> Inferred coordinates saved to " << ROOTNAME_OUTPUT + ".inf_coord" << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "=> Inferred coordinates saved to " << ROOTNAME_OUTPUT + ".inf_coord" << std::endl; }
 
   if(CLEAN_RAW_OUTPUT_MODE)
   {
@@ -3754,13 +4631,13 @@ void embeddingSD_t::save_inferred_coordinates()
     // Closes the stream.
     coordinates_file.close();
 
-    if(!QUIET_MODE) { std::clog << std::endl; }
-    if(!QUIET_MODE) { std::clog << TAB << "=> Raw inferred coordinates also saved to " << ROOTNAME_OUTPUT + ".inf_coord_raw" << std::endl; }
+    if(!QUIET_MODE) { logstream << std::endl; }
+    if(!QUIET_MODE) { logstream << TAB << "=> Raw inferred coordinates also saved to " << ROOTNAME_OUTPUT + ".inf_coord_raw" << std::endl; }
   }
 
   if(warning)
   {
-    if(!QUIET_MODE) { std::clog << "WARNING: Hyperbolic radius has been adjusted to account for negative radial positions." << std::endl; }
+    if(!QUIET_MODE) { logstream << "WARNING: Hyperbolic radius has been adjusted to account for negative radial positions." << std::endl; }
   }
 }
 
@@ -3773,8 +4650,8 @@ void embeddingSD_t::save_inferred_ensemble_characterization()
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::save_inferred_ensemble_characterization(int dim, bool random_positions=true)
 {
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  if(!QUIET_MODE) { std::clog << "Characterizing the inferred ensemble..." << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << "Characterizing the inferred ensemble..." << std::endl; }
   // Iterators.
   std::map<int, double>::iterator it2, end2;
   std::map<int, std::vector<double> >::iterator it3, end3;
@@ -3792,6 +4669,22 @@ void embeddingSD_t::save_inferred_ensemble_characterization(int dim, bool random
   std::vector<double> avg_comp_cumul_degree_dist;
   std::vector<double> std_comp_cumul_degree_dist;
   std::vector<int> nb_comp_cumul_degree_dist;
+  // Objects to compile the statistics of one graph by degree class.
+  std::vector<double> single_stat_degree;
+  std::vector<double> single_stat_sum_degree_neighbors;
+  std::vector<double> single_stat_avg_degree_neighbors;
+  std::vector<double> single_stat_nb_triangles;
+  std::vector<double> single_stat_clustering;
+  // Adds a value to a running mean and sum of squared deviations (Welford's algorithm).
+  auto add_observation = [](double &mean, double &sum_squared_deviations, double value, double nb_observations) {
+    const double delta = value - mean;
+    mean += delta / nb_observations;
+    sum_squared_deviations += delta * (value - mean);
+  };
+  // Standard deviation given the sum of squared deviations.
+  auto standard_deviation = [](double sum_squared_deviations, double nb_observations) {
+    return (nb_observations > 1) ? std::sqrt(std::max(sum_squared_deviations, 0.0) / (nb_observations - 1)) : 0.0;
+  };
   // Sets the number of graphs to be generated in function of the size of the original graph.
   if(!CUSTOM_CHARACTERIZATION_NB_GRAPHS)
   {
@@ -3800,199 +4693,154 @@ void embeddingSD_t::save_inferred_ensemble_characterization(int dim, bool random
     else if(nb_vertices < 10000) { CHARACTERIZATION_NB_GRAPHS = 100;  }
     else                         { CHARACTERIZATION_NB_GRAPHS = 10;   }
   }
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  if(!QUIET_MODE) { std::clog << TAB << "A total of " << CHARACTERIZATION_NB_GRAPHS << " graphs will be generated (chosen in function of the total number" << std::endl; }
-  if(!QUIET_MODE) { std::clog << TAB << "of vertices). To change this value, set the flag 'CUSTOM_CHARACTERIZATION_NB_GRAPHS'" << std::endl; }
-  if(!QUIET_MODE) { std::clog << TAB << "to 'true' and set the variable 'CHARACTERIZATION_NB_GRAPHS' to the desired value." << std::endl; }
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  // Performs the simulations.
-  int delta_nb_graphs = CHARACTERIZATION_NB_GRAPHS / 19.999999;
-  if(delta_nb_graphs < 1) { delta_nb_graphs = 1; }
-  int width = 2 * (std::log10(CHARACTERIZATION_NB_GRAPHS) + 1) + 6;
-  double d1, value;
-  std::string graph_range;
-  double start_time, stop_time;
-  for(int g_i(0), g_f, d_max; g_i<CHARACTERIZATION_NB_GRAPHS;)
-  {
-    g_f = (g_i + delta_nb_graphs);
-    g_f = (g_f > CHARACTERIZATION_NB_GRAPHS) ? CHARACTERIZATION_NB_GRAPHS : g_f;
-    start_time = time_since_epoch_in_seconds();
-    if(!QUIET_MODE) { graph_range = "[" + std::to_string(g_i+1) + "," + std::to_string(g_f) + "]..."; }
-    if(!QUIET_MODE) { std::clog << TAB << "Generating and analyzing graphs " << std::setw(width) << graph_range; }
-    for(; g_i<g_f; ++g_i)
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "A total of " << CHARACTERIZATION_NB_GRAPHS << " graphs will be generated (chosen in function of the total number" << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "of vertices). To change this value, set the flag 'CUSTOM_CHARACTERIZATION_NB_GRAPHS'" << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "to 'true' and set the variable 'CHARACTERIZATION_NB_GRAPHS' to the desired value." << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
+  // Adds the properties of a simulated graph to the statistics of the ensemble. Only the running
+  //   statistics are kept, such that the memory does not depend on the number of graphs.
+  int nb_graphs_analyzed = 0;
+  auto accumulate = [&](const simulated_graph_t &graph) {
+    ++nb_graphs_analyzed;
+    double value;
+    int d_max = 0;
+    for(int v1(0); v1<nb_vertices; ++v1)
     {
-      single_comp_cumul_degree_dist.clear();
-      if (dim == 1)
-        generate_simulated_adjacency_list();
-      else
-        generate_simulated_adjacency_list(dim, random_positions);
-      analyze_simulated_adjacency_list();
-      for(int v1(0); v1<nb_vertices; ++v1)
+      // Degree.
+      const double d1 = graph.degree[v1];
+      d_max = std::max(d_max, static_cast<int>(d1));
+      auto &vprops = characterizing_inferred_ensemble_vprops;
+      add_observation(vprops[0][v1][0], vprops[0][v1][1], d1, nb_graphs_analyzed);
+      // Sum of the degree of neighbors (zero for isolated vertices).
+      value = (d1 > 0) ? graph.sum_degree_of_neighbors[v1] : 0;
+      add_observation(vprops[1][v1][0], vprops[1][v1][1], value, nb_graphs_analyzed);
+      // Average degree of neighbors.
+      value = (d1 > 0) ? value / d1 : 0;
+      add_observation(vprops[2][v1][0], vprops[2][v1][1], value, nb_graphs_analyzed);
+      // Number of triangles attached on the vertex (zero for vertices of degree 0 or 1).
+      value = (d1 > 1) ? graph.nb_triangles[v1] : 0;
+      add_observation(vprops[3][v1][0], vprops[3][v1][1], value, nb_graphs_analyzed);
+      // Clustering coefficient.
+      value = (d1 > 1) ? value / (d1 * (d1 - 1) / 2) : 0;
+      add_observation(vprops[4][v1][0], vprops[4][v1][1], value, nb_graphs_analyzed);
+    }
+    // Compiles the average quantities by degree class.
+    single_stat_degree.assign(d_max + 1, 0);
+    single_stat_sum_degree_neighbors.assign(d_max + 1, 0);
+    single_stat_avg_degree_neighbors.assign(d_max + 1, 0);
+    single_stat_nb_triangles.assign(d_max + 1, 0);
+    single_stat_clustering.assign(d_max + 1, 0);
+    for(int v1(0), d1; v1<nb_vertices; ++v1)
+    {
+      d1 = graph.degree[v1];
+      single_stat_degree[d1] += 1;
+      if(d1 > 0)
       {
-        // Degree.
-        d1 = simulated_degree[v1];
-        characterizing_inferred_ensemble_vprops[0][v1][0] += d1;
-        characterizing_inferred_ensemble_vprops[0][v1][1] += d1 * d1;
-        if(d1 > 0)
-        {
-          // Sum of the degree of neighbors.
-          value = simulated_sum_degree_of_neighbors[v1];
-          characterizing_inferred_ensemble_vprops[1][v1][0] += value;
-          characterizing_inferred_ensemble_vprops[1][v1][1] += value * value;
-          // Average degree of neighbors.
-          value /= d1;
-          characterizing_inferred_ensemble_vprops[2][v1][0] += value;
-          characterizing_inferred_ensemble_vprops[2][v1][1] += value * value;
-        }
-        if(d1 > 1)
-        {
-          // Number of triangles attached on the vertex.
-          value = simulated_nb_triangles[v1];
-          characterizing_inferred_ensemble_vprops[3][v1][0] += value;
-          characterizing_inferred_ensemble_vprops[3][v1][1] += value * value;
-          // Clustering coefficient.
-          value /= d1 * (d1 - 1) / 2;
-          characterizing_inferred_ensemble_vprops[4][v1][0] += value;
-          characterizing_inferred_ensemble_vprops[4][v1][1] += value * value;
-        }
+        single_stat_sum_degree_neighbors[d1] += graph.sum_degree_of_neighbors[v1];
+        single_stat_avg_degree_neighbors[d1] += graph.sum_degree_of_neighbors[v1] / d1;
       }
-      // Compiles the various statistics about the degree classes.
-      it2 = simulated_stat_degree.begin();
-      end2 = simulated_stat_degree.end();
-      d_max = -1;
-      // single_comp_cumul_degree_dist.clear();
-      for(int d, norm; it2!=end2; ++it2)
+      if(d1 > 1)
       {
-        // Gets the degree class.
-        d = it2->first;
-        // Initializes the degree class if it has not been encountered yet.
-        if( characterizing_inferred_ensemble_vstat.find(d) == characterizing_inferred_ensemble_vstat.end() )
-        {
-          characterizing_inferred_ensemble_vstat[d] = std::vector<double>((2 * 5) + 1, 0);
-        }
-        // // Adjusts the size of the vector containing the complementary cumulative distribution if necessary.
-        if(d > d_max)
-        {
-          d_max = d;
-          single_comp_cumul_degree_dist.resize(d_max + 1, 0);
-        }
-        // Gets the number of vertices in this degree class.
-        norm = it2->second;
-        // Degree distribution.
-        value = simulated_stat_degree[d] / nb_vertices;
-        characterizing_inferred_ensemble_vstat[d][0] += value;
-        characterizing_inferred_ensemble_vstat[d][1] += value * value;
-        // Complementary cumulative degree distribution.
-        for(int q(0); q<=d; ++q)
-        {
-          single_comp_cumul_degree_dist[q] += value;
-          // comp_cumul_degree_dist_n[q] += 1;
-        }
-        // Sum of the degree of neighbors.
-        value = simulated_stat_sum_degree_neighbors[d] / norm;
-        characterizing_inferred_ensemble_vstat[d][2] += value;
-        characterizing_inferred_ensemble_vstat[d][3] += value * value;
-        // Average of the degree of neighbors.
-        value = simulated_stat_avg_degree_neighbors[d] / norm;
-        characterizing_inferred_ensemble_vstat[d][4] += value;
-        characterizing_inferred_ensemble_vstat[d][5] += value * value;
-        // Number of triangles attached on the vertex.
-        value = simulated_stat_nb_triangles[d] / norm;
-        characterizing_inferred_ensemble_vstat[d][6] += value;
-        characterizing_inferred_ensemble_vstat[d][7] += value * value;
-        // Clustering coefficient.
-        value = simulated_stat_clustering[d] / norm;
-        characterizing_inferred_ensemble_vstat[d][8] += value;
-        characterizing_inferred_ensemble_vstat[d][9] += value * value;
-        // Counts the number of time the degree class has been observed.
-        characterizing_inferred_ensemble_vstat[d][10] += 1;
+        single_stat_nb_triangles[d1] += graph.nb_triangles[v1];
+        single_stat_clustering[d1] += 2 * graph.nb_triangles[v1] / d1 / (d1 - 1);
       }
-      // Counts which degree classes have been reached.
-      if((d_max + 1) > nb_comp_cumul_degree_dist.size())
+    }
+    // Complementary cumulative degree distribution (from the number of vertices of degree d or more).
+    single_comp_cumul_degree_dist.assign(d_max + 1, 0);
+    for(int d(d_max), nb_vertices_above(0); d>=0; --d)
+    {
+      nb_vertices_above += single_stat_degree[d];
+      single_comp_cumul_degree_dist[d] = static_cast<double>(nb_vertices_above) / nb_vertices;
+    }
+    // Compiles the various statistics about the degree classes.
+    for(int d(0), norm; d<=d_max; ++d)
+    {
+      // Gets the number of vertices in this degree class.
+      norm = single_stat_degree[d];
+      if(norm == 0)
       {
-        avg_comp_cumul_degree_dist.resize(d_max + 1, 0);
-        std_comp_cumul_degree_dist.resize(d_max + 1, 0);
-        nb_comp_cumul_degree_dist.resize(d_max + 1, 0);
+        continue;
       }
-      for(int r(0); r<=d_max; ++r)
+      // Initializes the degree class if it has not been encountered yet.
+      std::vector<double> &vstat = characterizing_inferred_ensemble_vstat[d];
+      if(vstat.empty())
       {
-        avg_comp_cumul_degree_dist[r] += single_comp_cumul_degree_dist[r];
-        std_comp_cumul_degree_dist[r] += single_comp_cumul_degree_dist[r] * single_comp_cumul_degree_dist[r];
-        nb_comp_cumul_degree_dist[r] += 1;
+        vstat.resize((2 * 5) + 1, 0);
       }
+      // Counts the number of time the degree class has been observed.
+      vstat[10] += 1;
+      // Degree distribution.
+      add_observation(vstat[0], vstat[1], single_stat_degree[d] / nb_vertices, vstat[10]);
+      // Sum of the degree of neighbors.
+      add_observation(vstat[2], vstat[3], single_stat_sum_degree_neighbors[d] / norm, vstat[10]);
+      // Average of the degree of neighbors.
+      add_observation(vstat[4], vstat[5], single_stat_avg_degree_neighbors[d] / norm, vstat[10]);
+      // Number of triangles attached on the vertex.
+      add_observation(vstat[6], vstat[7], single_stat_nb_triangles[d] / norm, vstat[10]);
+      // Clustering coefficient.
+      add_observation(vstat[8], vstat[9], single_stat_clustering[d] / norm, vstat[10]);
+    }
+    // Counts which degree classes have been reached.
+    if((d_max + 1) > nb_comp_cumul_degree_dist.size())
+    {
+      avg_comp_cumul_degree_dist.resize(d_max + 1, 0);
+      std_comp_cumul_degree_dist.resize(d_max + 1, 0);
+      nb_comp_cumul_degree_dist.resize(d_max + 1, 0);
+    }
+    for(int r(0); r<=d_max; ++r)
+    {
+      nb_comp_cumul_degree_dist[r] += 1;
+      add_observation(avg_comp_cumul_degree_dist[r], std_comp_cumul_degree_dist[r], single_comp_cumul_degree_dist[r], nb_comp_cumul_degree_dist[r]);
+    }
+  };
+  // Performs the simulations.
+  int delta_nb_graphs = CHARACTERIZATION_NB_GRAPHS / 19.999999;
+  if(delta_nb_graphs < 1) { delta_nb_graphs = 1; }
+  int width = 2 * (std::log10(CHARACTERIZATION_NB_GRAPHS) + 1) + 6;
+  std::string graph_range;
+  double start_time, stop_time;
+  for(int g_i(0), g_f; g_i<CHARACTERIZATION_NB_GRAPHS; g_i=g_f)
+  {
+    g_f = (g_i + delta_nb_graphs);
+    g_f = (g_f > CHARACTERIZATION_NB_GRAPHS) ? CHARACTERIZATION_NB_GRAPHS : g_f;
+    start_time = time_since_epoch_in_seconds();
+    if(!QUIET_MODE) { graph_range = "[" + std::to_string(g_i+1) + "," + std::to_string(g_f) + "]..."; }
+    if(!QUIET_MODE) { logstream << TAB << "Generating and analyzing graphs " << std::setw(width) << graph_range; }
+    if(dim == 1)
+    {
+      generate_simulated_graphs(g_f - g_i, accumulate);
+    }
+    else
+    {
+      generate_simulated_graphs(dim, random_positions, g_f - g_i, accumulate);
     }
-    // Compiles the complementary cumulative degree distribution.
     stop_time = time_since_epoch_in_seconds();
-    if(!QUIET_MODE) { std::clog << "...done in " << std::setw(6) << std::fixed << stop_time - start_time << " seconds" << std::endl; }
+    if(!QUIET_MODE) { logstream << "...done in " << std::setw(6) << std::fixed << stop_time - start_time << " seconds" << std::endl; }
   }
   // Finalizes the characterization.
   for(int i(0); i<characterizing_inferred_ensemble_vprops.size(); ++i)
   {
     for(int v1(0); v1<nb_vertices; ++v1)
     {
-      characterizing_inferred_ensemble_vprops[i][v1][0] /= CHARACTERIZATION_NB_GRAPHS;
-      characterizing_inferred_ensemble_vprops[i][v1][1] /= CHARACTERIZATION_NB_GRAPHS;
-      characterizing_inferred_ensemble_vprops[i][v1][1] -= characterizing_inferred_ensemble_vprops[i][v1][0] * characterizing_inferred_ensemble_vprops[i][v1][0];
-      characterizing_inferred_ensemble_vprops[i][v1][1] *= CHARACTERIZATION_NB_GRAPHS / (CHARACTERIZATION_NB_GRAPHS - 1);
-      characterizing_inferred_ensemble_vprops[i][v1][1] = std::sqrt( characterizing_inferred_ensemble_vprops[i][v1][1] );
+      characterizing_inferred_ensemble_vprops[i][v1][1] = standard_deviation(characterizing_inferred_ensemble_vprops[i][v1][1], nb_graphs_analyzed);
     }
   }
   it3 = characterizing_inferred_ensemble_vstat.begin();
   end3 = characterizing_inferred_ensemble_vstat.end();
-  for(int norm, d; it3!=end3; ++it3)
+  for(; it3!=end3; ++it3)
   {
-    d = it3->first;
-    norm = characterizing_inferred_ensemble_vstat[d][10];
     for(int i(0); i<10; ++++i)
     {
-      characterizing_inferred_ensemble_vstat[d][i + 0] /= norm;
-      if(norm > 1)
-      {
-        characterizing_inferred_ensemble_vstat[d][i + 1] /= norm;
-        characterizing_inferred_ensemble_vstat[d][i + 1] -= characterizing_inferred_ensemble_vstat[d][i + 0] * characterizing_inferred_ensemble_vstat[d][i + 0];
-        characterizing_inferred_ensemble_vstat[d][i + 1] *= norm / (norm - 1);
-        if( characterizing_inferred_ensemble_vstat[d][i + 1] < 0 )
-        {
-          characterizing_inferred_ensemble_vstat[d][i + 1] = 0;
-        }
-        else
-        {
-          characterizing_inferred_ensemble_vstat[d][i + 1] = std::sqrt( characterizing_inferred_ensemble_vstat[d][i + 1] );
-        }
-      }
-      else
-      {
-        characterizing_inferred_ensemble_vstat[d][i + 1] = 0;
-      }
+      it3->second[i + 1] = standard_deviation(it3->second[i + 1], it3->second[10]);
     }
   }
   // Complete the characterization of the complementary cumulative degree distribution.
   for(int i(0), ii(nb_comp_cumul_degree_dist.size()); i<ii; ++i)
   {
-    if(nb_comp_cumul_degree_dist[i] > 0)
-    {
-      avg_comp_cumul_degree_dist[i] /= nb_comp_cumul_degree_dist[i];
-      if(nb_comp_cumul_degree_dist[i] > 1)
-      {
-        std_comp_cumul_degree_dist[i] /= nb_comp_cumul_degree_dist[i];
-        std_comp_cumul_degree_dist[i] -= avg_comp_cumul_degree_dist[i] * avg_comp_cumul_degree_dist[i];
-        std_comp_cumul_degree_dist[i] *= nb_comp_cumul_degree_dist[i] / (nb_comp_cumul_degree_dist[i] - 1);
-        if(std_comp_cumul_degree_dist[i] < 0)
-        {
-          std_comp_cumul_degree_dist[i] = 0;
-        }
-        else
-        {
-          std_comp_cumul_degree_dist[i] = std::sqrt(std_comp_cumul_degree_dist[i]);
-        }
-      }
-      else
-      {
-        std_comp_cumul_degree_dist[i] = 0;
-      }
-    }
+    std_comp_cumul_degree_dist[i] = standard_deviation(std_comp_cumul_degree_dist[i], nb_comp_cumul_degree_dist[i]);
   }
-  if(!QUIET_MODE) { std::clog << "                                       ...............................................done." << std::endl; }
+  if(!QUIET_MODE) { logstream << "                                       ...............................................done." << std::endl; }
   // Sets the name of the file to write the vertices properties into.
   std::string vertex_properties_filename = ROOTNAME_OUTPUT + ".inf_vprop";
   // Opens the stream and terminates if the operation did not succeed.
@@ -4088,8 +4936,8 @@ void embeddingSD_t::save_inferred_ensemble_characterization(int dim, bool random
     vertex_properties_file << std::endl;
   }
   vertex_properties_file.close();
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  if(!QUIET_MODE) { std::clog << TAB << "=> Vertices properties of the inferred ensemble saved to " << ROOTNAME_OUTPUT + ".inf_vprop" << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "=> Vertices properties of the inferred ensemble saved to " << ROOTNAME_OUTPUT + ".inf_vprop" << std::endl; }
 
   // Sets the name of the file to write the vertices properties into.
   std::string vertex_stat_filename = ROOTNAME_OUTPUT + ".inf_vstat";
@@ -4145,12 +4993,12 @@ void embeddingSD_t::save_inferred_ensemble_characterization(int dim, bool random
     inf_degree_ccdf.insert(std::make_pair(d, avg_comp_cumul_degree_dist[d]));
   }
   vertex_stat_file.close();
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  if(!QUIET_MODE) { std::clog << TAB << "=> Inferred ensemble statistics by degree class saved to " << ROOTNAME_OUTPUT + ".inf_vstat" << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "=> Inferred ensemble statistics by degree class saved to " << ROOTNAME_OUTPUT + ".inf_vstat" << std::endl; }
 
 
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  if(!QUIET_MODE) { std::clog << "Extracting the original graph statistics by degree class..."; }
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << "Extracting the original graph statistics by degree class..."; }
 
 
   // Extracts the vertex statistics of the original edgelist by degree class.
@@ -4185,7 +5033,7 @@ void embeddingSD_t::save_inferred_ensemble_characterization(int dim, bool random
       original_stat_clustering[d1] += 2 * nbtriangles[v1] / d1 / (d1 - 1);
     }
   }
-  if(!QUIET_MODE) { std::clog << "...........................done." << std::endl; }
+  if(!QUIET_MODE) { logstream << "...........................done." << std::endl; }
 
   // Sets the name of the file to write the vertices properties into.
   std::string graph_stat_filename = ROOTNAME_OUTPUT + ".obs_vstat";
@@ -4229,25 +5077,25 @@ void embeddingSD_t::save_inferred_ensemble_characterization(int dim, bool random
   }
   graph_stat_file.close();
 
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  if(!QUIET_MODE) { std::clog << TAB << "=> Original graph statistics by degree class saved to " << ROOTNAME_OUTPUT + ".obs_vstat" << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "=> Original graph statistics by degree class saved to " << ROOTNAME_OUTPUT + ".obs_vstat" << std::endl; }
   // // Gets the current time.
   // time2 = std::time(NULL);
 
   // Compute KS test
   double alpha = 0.05;
   if (!QUIET_MODE) {
-    std::clog << std::endl;
-    std::clog << "Computing two-sample Kolmogorov-Smirnov test......" << std::endl;
+    logstream << std::endl;
+    logstream << "Computing two-sample Kolmogorov-Smirnov test......" << std::endl;
   }
   const auto ks_result = ks_test(inf_degree_ccdf, obs_degree_ccdf, alpha);
   if (!QUIET_MODE) {
     if (ks_result) {
-      std::clog << "The null hypothesis is rejected at level " << alpha << std::endl;
-      std::clog << "Two data samples does NOT come from the same distribution" << std::endl;  
+      logstream << "The null hypothesis is rejected at level " << alpha << std::endl;
+      logstream << "Two data samples does NOT come from the same distribution" << std::endl;  
     } else {
-      std::clog << "The null hypothesis is not rejected at level " << alpha << std::endl;
-      std::clog << "Two data samples does come from the same distribution" << std::endl;
+      logstream << "The null hypothesis is not rejected at level " << alpha << std::endl;
+      logstream << "Two data samples does come from the same distribution" << std::endl;
     }
   }
 }
@@ -4297,8 +5145,8 @@ void embeddingSD_t::save_inferred_theta_density()
   }
   // Closes the stream.
   theta_density_file.close();
-  if(!QUIET_MODE) { std::clog << std::endl; }
-  if(!QUIET_MODE) { std::clog << TAB << "=> Inferred theta density saved to " << ROOTNAME_OUTPUT + ".inf_theta_density" << std::endl; }
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "=> Inferred theta density saved to " << ROOTNAME_OUTPUT + ".inf_theta_density" << std::endl; }
 }
 
 
@@ -4331,29 +5179,23 @@ int embeddingSD_t::get_root(int i, std::vector<int> &clust_id)
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void embeddingSD_t::merge_clusters(std::vector<int> &size, std::vector<int> &clust_id)
 {
-  // Variables.
-  int v1, v2, v3, v4;
-  // Iterators.
-  std::set<int>::iterator it, end;
-  // Loops over the vertices.
-  for(int i(0); i<nb_vertices; ++i)
+  // Loops over the edges (each one being considered once).
+  for(int v1(0), r1, r2; v1<nb_vertices; ++v1)
   {
-    // Loops over the neighbors.
-    it  = adjacency_list[i].begin();
-    end = adjacency_list[i].end();
-    for(; it!=end; ++it)
+    for(int v2 : adjacency_list[v1])
     {
-      if(get_root(i, clust_id) != get_root(*it, clust_id))
+      if(v1 < v2)
       {
-        // Adjust the root of vertices.
-        v1 = i;
-        v2 = *it;
-        if(size[v2] > size[v1])
-          std::swap(v1, v2);
-        v3 = get_root(v1, clust_id);
-        v4 = get_root(v2, clust_id);
-        clust_id[v4] = v3;
-        size[v3] += size[v4];
+        r1 = get_root(v1, clust_id);
+        r2 = get_root(v2, clust_id);
+        if(r1 != r2)
+        {
+          // Attaches the smallest cluster to the largest one.
+          if(size[r2] > size[r1])
+            std::swap(r1, r2);
+          clust_id[r2] = r1;
+          size[r1] += size[r2];
+        }
       }
     }
   }
@@ -4362,17 +5204,180 @@ void embeddingSD_t::merge_clusters(std::vector<int> &size, std::vector<int> &clu
 
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
-void embeddingSD_t::check_connected_components()
+void embeddingSD_t::save_checkpoint(int dim, int stage, int cursor)
 {
-  // Vector containing the ID of the component to which each node belongs.
-  std::vector<double> Vertex2Prop(nb_vertices, -1);
+  // The checkpoint is first written into a temporary file such that an interruption while writing
+  //   does not corrupt the previous checkpoint.
+  const std::string checkpoint_filename = ROOTNAME_OUTPUT + ".inf_checkpoint";
+  const std::string tmp_filename = checkpoint_filename + ".tmp";
+  std::ofstream checkpoint_file(tmp_filename, std::ios::binary);
+  if( !checkpoint_file.is_open() )
+  {
+    std::cerr << "Could not open file: " << tmp_filename << "." << std::endl;
+    std::terminate();
+  }
+  auto write = [&checkpoint_file](const auto &value) {
+    checkpoint_file.write(reinterpret_cast<const char*>(&value), sizeof(value));
+  };
+  auto write_array = [&checkpoint_file](const auto *values, std::size_t n) {
+    checkpoint_file.write(reinterpret_cast<const char*>(values), n * sizeof(*values));
+  };
+  auto write_map = [&write](const std::map<int, double> &values) {
+    write(static_cast<int>(values.size()));
+    for(const auto &p : values)
+    {
+      write(p.first);
+      write(p.second);
+    }
+  };
+  // Header.
+  checkpoint_file.write(CHECKPOINT_MAGIC, sizeof(CHECKPOINT_MAGIC) - 1);
+  write(dim);
+  write(nb_vertices);
+  write(nb_edges);
+  write(stage);
+  write(cursor);
+  write(SEED);
+  // Parameters of the ensemble.
+  write(beta);
+  write(mu);
+  write(random_ensemble_average_degree);
+  write(random_ensemble_average_clustering);
+  write_map(random_ensemble_kappa_per_degree_class);
+  write_map(random_ensemble_expected_degree_per_degree_class);
+  // States of the random number generator and of the distributions (text representation).
+  std::stringstream rng_state;
+  rng_state << engine << " " << uniform_01 << " " << normal_01;
+  const std::string rng = rng_state.str();
+  write(static_cast<std::int64_t>(rng.size()));
+  checkpoint_file.write(rng.data(), rng.size());
+  // Order in which the vertices are refined, kappas and positions.
+  write_array(ordered_list_of_vertices.data(), nb_vertices);
+  write_array(kappa.data(), nb_vertices);
+  if(stage >= CHECKPOINT_INITIAL_POSITIONS)
+  {
+    if(dim == 1)
+      write_array(theta.data(), nb_vertices);
+    else
+      write_array(d_positions.data().data(), d_positions.data().size());
+  }
+  checkpoint_file.close();
+  if( !checkpoint_file )
+  {
+    std::cerr << "Could not write the checkpoint: " << tmp_filename << "." << std::endl;
+    std::terminate();
+  }
+  std::filesystem::rename(tmp_filename, checkpoint_filename);
+}
 
-  // Vector containing the size of the components.
-  std::vector<int> connected_components_size;
 
-  // Set ordering the component according to their size.
-  std::set< std::pair<int, int> > ordered_connected_components;
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::load_checkpoint(int dim)
+{
+  std::ifstream checkpoint_file(RESUME_FILENAME, std::ios::binary);
+  if( !checkpoint_file.is_open() )
+  {
+    std::cerr << "Could not open file: " << RESUME_FILENAME << "." << std::endl;
+    std::terminate();
+  }
+  auto read = [&checkpoint_file](auto &value) {
+    checkpoint_file.read(reinterpret_cast<char*>(&value), sizeof(value));
+  };
+  auto read_array = [&checkpoint_file](auto *values, std::size_t n) {
+    checkpoint_file.read(reinterpret_cast<char*>(values), n * sizeof(*values));
+  };
+  auto read_map = [&read](std::map<int, double> &values) {
+    int n = 0, key;
+    double value;
+    read(n);
+    values.clear();
+    for(int i(0); i<n; ++i)
+    {
+      read(key);
+      read(value);
+      values[key] = value;
+    }
+  };
+  // Header.
+  char magic[sizeof(CHECKPOINT_MAGIC) - 1];
+  checkpoint_file.read(magic, sizeof(magic));
+  if( !checkpoint_file || !std::equal(magic, magic + sizeof(magic), CHECKPOINT_MAGIC) )
+  {
+    std::cerr << "Not a checkpoint file: " << RESUME_FILENAME << "." << std::endl;
+    std::terminate();
+  }
+  int _dim, _nb_vertices, _nb_edges;
+  read(_dim);
+  read(_nb_vertices);
+  read(_nb_edges);
+  if(_dim != dim || _nb_vertices != nb_vertices || _nb_edges != nb_edges)
+  {
+    std::cerr << "The checkpoint " << RESUME_FILENAME << " does not match the graph and/or the dimension of the embedding." << std::endl;
+    std::terminate();
+  }
+  read(resumed_stage);
+  read(resumed_cursor);
+  read(SEED);
+  // Parameters of the ensemble.
+  read(beta);
+  read(mu);
+  read(random_ensemble_average_degree);
+  read(random_ensemble_average_clustering);
+  read_map(random_ensemble_kappa_per_degree_class);
+  read_map(random_ensemble_expected_degree_per_degree_class);
+  // States of the random number generator and of the distributions.
+  std::int64_t rng_size = 0;
+  read(rng_size);
+  std::string rng(rng_size, ' ');
+  checkpoint_file.read(&rng[0], rng_size);
+  std::stringstream rng_state(rng);
+  rng_state >> engine >> uniform_01 >> normal_01;
+  // Order in which the vertices are refined, kappas and positions.
+  ordered_list_of_vertices.resize(nb_vertices);
+  read_array(ordered_list_of_vertices.data(), nb_vertices);
+  kappa.resize(nb_vertices);
+  read_array(kappa.data(), nb_vertices);
+  if(resumed_stage >= CHECKPOINT_INITIAL_POSITIONS)
+  {
+    if(dim == 1)
+    {
+      theta.resize(nb_vertices);
+      read_array(theta.data(), nb_vertices);
+    }
+    else
+    {
+      std::vector<double> coordinates(nb_vertices * (dim + 1));
+      read_array(coordinates.data(), coordinates.size());
+      d_positions.resize(nb_vertices, dim);
+      for(int v(0); v<nb_vertices; ++v)
+        d_positions.set(v, coordinates.data() + v * (dim + 1));
+    }
+  }
+  if( !checkpoint_file || rng_state.fail() )
+  {
+    std::cerr << "The checkpoint " << RESUME_FILENAME << " is truncated or corrupted." << std::endl;
+    std::terminate();
+  }
+  checkpoint_file.close();
+  if(!QUIET_MODE)
+  {
+    logstream << "Resuming from checkpoint " << RESUME_FILENAME << " (";
+    if(resumed_stage == CHECKPOINT_PARAMETERS)
+      logstream << "parameters inferred";
+    else if(resumed_stage == CHECKPOINT_INITIAL_POSITIONS)
+      logstream << "initial positions found";
+    else
+      logstream << resumed_cursor << "/" << nb_vertices << " vertices refined";
+    logstream << ")." << std::endl << std::endl;
+  }
+}
+
 
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::check_connected_components()
+{
   // Starts with every vertex as an isolated cluster.
   std::vector<int> clust_id(nb_vertices);
   std::vector<int> clust_size(nb_vertices, 1);
@@ -4382,98 +5387,285 @@ void embeddingSD_t::check_connected_components()
   }
   // Merges clusters until the minimal set is obtained.
   merge_clusters(clust_size, clust_id);
-  clust_size.clear();
-  // Identifies the connected component to which each vertex belongs.
-  int nb_conn_comp = 0;
-  int comp_id;
-  std::map<int, int> CompID;
-  for(int v(0); v<nb_vertices; ++v)
+  // Identifies the connected component to which each vertex belongs (components are numbered in
+  //   order of appearance, the ID of the component of each root being stored in clust_size).
+  std::vector<int> component(nb_vertices);
+  std::vector<int> connected_components_size;
+  std::fill(clust_size.begin(), clust_size.end(), -1);
+  for(int v(0), root; v<nb_vertices; ++v)
   {
-    comp_id = get_root(v, clust_id);
-    if(CompID.find(comp_id) == CompID.end())
+    root = get_root(v, clust_id);
+    if(clust_size[root] == -1)
     {
-      CompID[comp_id] = nb_conn_comp;
+      clust_size[root] = connected_components_size.size();
       connected_components_size.push_back(0);
-      ++nb_conn_comp;
     }
-    Vertex2Prop[v] = CompID[comp_id];
-    connected_components_size[CompID[comp_id]] += 1;
+    component[v] = clust_size[root];
+    connected_components_size[component[v]] += 1;
+  }
+  std::vector<int>().swap(clust_id);
+  std::vector<int>().swap(clust_size);
+  const int nb_conn_comp = connected_components_size.size();
+  if(nb_conn_comp == 1)
+  {
+    return;
   }
 
-  // Orders the size of the components.
+  // Orders the components by decreasing size.
+  std::vector<int> ordered_connected_components(nb_conn_comp);
   for(int c(0); c<nb_conn_comp; ++c)
   {
-    ordered_connected_components.insert( std::make_pair(connected_components_size[c], c) );
+    ordered_connected_components[c] = c;
   }
+  std::stable_sort(ordered_connected_components.begin(), ordered_connected_components.end(), [&](int c1, int c2) {
+    return connected_components_size[c1] > connected_components_size[c2];
+  });
+  int lcc_id = ordered_connected_components[0];
+  int lcc_size = connected_components_size[lcc_id];
 
-  int lcc_id = (--ordered_connected_components.end())->second;
-  int lcc_size = (--ordered_connected_components.end())->first;
+  if(!QUIET_MODE) { logstream << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "- More than one component found!!" << std::endl; }
+  if(!QUIET_MODE) { logstream << TAB << "- " << lcc_size << "/" << nb_vertices << " vertices in the largest component." << std::endl; }
+
+  // No file can be written in the in-memory mode: the caller must extract the largest component.
+  if(IN_MEMORY_MODE && !LARGEST_COMPONENT_MODE)
+  {
+    throw std::runtime_error("More than one component found (" + std::to_string(lcc_size) + "/" + std::to_string(nb_vertices) + " vertices in the largest component).");
+  }
+
+  std::string edgelist_rootname;
+  size_t lastdot = EDGELIST_FILENAME.find_last_of(".");
+  if(lastdot == std::string::npos)
+  {
+    edgelist_rootname = EDGELIST_FILENAME;
+  }
+  edgelist_rootname = EDGELIST_FILENAME.substr(0, lastdot);
 
-  if(lcc_size != nb_vertices)
+  if(!IN_MEMORY_MODE)
+  {
+    save_component_edgelist(component, lcc_id, edgelist_rootname + "_GC.edge");
+    if(!QUIET_MODE) { logstream << TAB << "- Edges belonging to the largest component saved to " << edgelist_rootname + "_GC.edge." << std::endl; }
+  }
+
+  if(!LARGEST_COMPONENT_MODE)
   {
-    if(!QUIET_MODE) { std::clog << std::endl; }
-    if(!QUIET_MODE) { std::clog << TAB << "- More than one component found!!" << std::endl; }
-    if(!QUIET_MODE) { std::clog << TAB << "- " << lcc_size << "/" << nb_vertices << " vertices in the largest component." << std::endl; }
     std::cerr << std::endl;
     std::cerr << "More than one component found (" << lcc_size << "/" << nb_vertices << ") vertices in the largest component." << std::endl;
+    if(!QUIET_MODE) { logstream << TAB << "- Please rerun the program using this new edgelist." << std::endl; }
+    if(!QUIET_MODE) { logstream << std::endl; }
+    // if(!QUIET_MODE) { logstream << "                                          "; }
 
-    std::string edgelist_rootname;
-    size_t lastdot = EDGELIST_FILENAME.find_last_of(".");
-    if(lastdot == std::string::npos)
+    if(QUIET_MODE)  { logstream << std::endl; }
+    std::cerr << "Edges belonging to the largest component saved to " << edgelist_rootname + "_GC.edge. Please rerun the program using this new edgelist." << std::endl;
+    std::cerr << std::endl;
+    // std::terminate();
+    std::exit(12); // Custom exist code to rerun Mercator with only GCC
+  }
+
+  // Saves the other components large enough to be embedded afterwards (numbered by decreasing size).
+  //   The eigensolver giving the initial positions needs at least DIMENSION + 4 vertices of degree
+  //   larger than one, such that components with fewer of them (e.g., stars) are skipped.
+  other_components.clear();
+  if(OTHER_COMPONENTS_MODE && !IN_MEMORY_MODE)
+  {
+    std::vector<int> nb_vertices_degree_gt_one_per_component(nb_conn_comp, 0);
+    for(int v(0); v<nb_vertices; ++v)
     {
-      edgelist_rootname = EDGELIST_FILENAME;
+      if(adjacency_list[v].size() > 1)
+      {
+        ++nb_vertices_degree_gt_one_per_component[component[v]];
+      }
     }
-    edgelist_rootname = EDGELIST_FILENAME.substr(0, lastdot);
+    for(int i(1), c; i<nb_conn_comp; ++i)
+    {
+      c = ordered_connected_components[i];
+      if(connected_components_size[c] < OTHER_COMPONENTS_MIN_SIZE)
+      {
+        break;
+      }
+      if(nb_vertices_degree_gt_one_per_component[c] < DIMENSION + 4)
+      {
+        if(!QUIET_MODE) { logstream << TAB << "- Component " << i << " skipped (" << nb_vertices_degree_gt_one_per_component[c] << " vertices of degree larger than one, at least " << DIMENSION + 4 << " are needed)." << std::endl; }
+        continue;
+      }
+      const std::string suffix = "_C" + std::to_string(i);
+      save_component_edgelist(component, c, edgelist_rootname + suffix + ".edge");
+      other_components.push_back(std::make_pair(edgelist_rootname + suffix + ".edge", ROOTNAME_OUTPUT + suffix));
+    }
+    if(!QUIET_MODE) { logstream << TAB << "- " << other_components.size() << " other component(s) with at least " << OTHER_COMPONENTS_MIN_SIZE << " vertices saved to " << edgelist_rootname + "_C*.edge." << std::endl; }
+  }
 
-    // Sets the name of the file to write the hidden variables into.
-    std::string edgelist_filename = edgelist_rootname + "_GC.edge";
-    // Opens the stream and terminates if the operation did not succeed.
-    std::fstream edgelist_file(edgelist_filename.c_str(), std::fstream::out);
-    if( !edgelist_file.is_open() )
+  // Embeds the largest component directly (the output files are named as if its edgelist had been
+  //   provided).
+  extract_component(component, lcc_id);
+  if(!CUSTOM_OUTPUT_ROOTNAME_MODE && !IN_MEMORY_MODE)
+  {
+    const std::string previous_rootname = ROOTNAME_OUTPUT;
+    ROOTNAME_OUTPUT = edgelist_rootname + "_GC";
+    // Moves the log file opened in initialize() under the new rootname.
+    if(logfile.is_open())
     {
-      std::cerr << "Could not open file: " << edgelist_filename << "." << std::endl;
-      std::terminate();
+      logfile.close();
+      std::filesystem::rename(previous_rootname + ".inf_log", ROOTNAME_OUTPUT + ".inf_log");
+      logfile.open(ROOTNAME_OUTPUT + ".inf_log", std::ofstream::app);
+      logstream.rdbuf(logfile.rdbuf());
     }
+  }
+  if(!QUIET_MODE) { logstream << TAB << "- Embedding the largest component." << std::endl; }
+  if(!QUIET_MODE) { logstream << "                                          "; }
+}
 
-    std::set<int>::iterator it, end;
-    width_names = 14;
-    for(int v1(0), v2, c1, c2; v1<nb_vertices; ++v1)
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::extract_component(const std::vector<int> &component, int c)
+{
+  // New IDs of the vertices of the component (in the same order).
+  std::vector<int> new_id(nb_vertices, -1);
+  int nb_vertices_component = 0;
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    if(component[v] == c)
+    {
+      new_id[v] = nb_vertices_component++;
+    }
+  }
+  // Builds the adjacency list of the component (the neighbors remain sorted since the order of the
+  //   IDs is preserved).
+  std::vector<int> offsets(1, 0), neighbors;
+  std::vector<std::string> names;
+  offsets.reserve(nb_vertices_component + 1);
+  names.reserve(nb_vertices_component);
+  for(int v1(0); v1<nb_vertices; ++v1)
+  {
+    if(new_id[v1] != -1)
+    {
+      for(int v2 : adjacency_list[v1])
+      {
+        neighbors.push_back(new_id[v2]);
+      }
+      offsets.push_back(neighbors.size());
+      names.push_back(std::move(Num2Name[v1]));
+    }
+  }
+  nb_vertices = nb_vertices_component;
+  nb_edges = neighbors.size() / 2;
+  Num2Name = std::move(names);
+  adjacency_list.assign(std::move(offsets), std::move(neighbors));
+  if(REFINE_MODE)
+  {
+    // Maps the names to the numerical IDs (used to load the already inferred parameters).
+    Name2Num.clear();
+    for(int v(0); v<nb_vertices; ++v)
+    {
+      Name2Num[Num2Name[v]] = v;
+    }
+  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::save_component_edgelist(const std::vector<int> &component, int c, const std::string &edgelist_filename)
+{
+  // Opens the stream and terminates if the operation did not succeed.
+  std::fstream edgelist_file(edgelist_filename.c_str(), std::fstream::out);
+  if( !edgelist_file.is_open() )
+  {
+    std::cerr << "Could not open file: " << edgelist_filename << "." << std::endl;
+    std::terminate();
+  }
+  width_names = 14;
+  for(int v1(0); v1<nb_vertices; ++v1)
+  {
+    if(component[v1] == c)
     {
-      c1 = Vertex2Prop[v1];
-      if(c1 == lcc_id)
+      for(int v2 : adjacency_list[v1])
       {
-        it  = adjacency_list[v1].begin();
-        end = adjacency_list[v1].end();
-        for(; it!=end; ++it)
+        if(v1 < v2)
         {
-          v2 = *it;
-          c2 = Vertex2Prop[v2];
-          if(c2 == lcc_id)
-          {
-            if(v1 < v2)
-            {
-              edgelist_file << std::setw(width_names) << Num2Name[v1] << " ";
-              edgelist_file << std::setw(width_names) << Num2Name[v2] << " ";
-              edgelist_file << std::endl;
-            }
-          }
+          edgelist_file << std::setw(width_names) << Num2Name[v1] << " ";
+          edgelist_file << std::setw(width_names) << Num2Name[v2] << " ";
+          edgelist_file << std::endl;
         }
       }
     }
-    // Closes the stream.
-    edgelist_file.close();
+  }
+  // Closes the stream.
+  edgelist_file.close();
+}
 
-    if(!QUIET_MODE) { std::clog << TAB << "- Edges belonging to the largest component saved to " << edgelist_rootname + "_GC.edge." << std::endl; }
-    if(!QUIET_MODE) { std::clog << TAB << "- Please rerun the program using this new edgelist." << std::endl; }
-    if(!QUIET_MODE) { std::clog << std::endl; }
-    // if(!QUIET_MODE) { std::clog << "                                          "; }
 
-    if(QUIET_MODE)  { std::clog << std::endl; }
-    std::cerr << "Edges belonging to the largest component saved to " << edgelist_rootname + "_GC.edge. Please rerun the program using this new edgelist." << std::endl;
-    std::cerr << std::endl;
-    // std::terminate();
-    std::exit(12); // Custom exist code to rerun Mercator with only GCC
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void embeddingSD_t::set_component(const std::pair<std::string, std::string> &component)
+{
+  EDGELIST_FILENAME = component.first;
+  CUSTOM_OUTPUT_ROOTNAME_MODE = true;
+  ROOTNAME_OUTPUT = component.second;
+  // The inferred coordinates, checkpoint and eigenvectors provided refer to the whole graph.
+  REFINE_MODE = false;
+  RESUME_MODE = false;
+  EIGENVECTORS_FILENAME.clear();
+  OTHER_COMPONENTS_MODE = false;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double embeddingSD_t::compute_hyperbolic_radius(bool &adjusted) const
+{
+  // Finds the minimal and maximal values of kappa.
+  double kappa_min = *std::min_element(kappa.begin(), kappa.end());
+  double kappa_max = *std::max_element(kappa.begin(), kappa.end());
+  // Computes the hyperbolic radius (adjusts it in case some vertices have a negative radial position).
+  double hyp_radius = 2 * std::log( nb_vertices / (PI * mu * kappa_min * kappa_min) );
+  double min_radial_position = hyp_radius - 2 * std::log( kappa_min / kappa_max );
+  adjusted = false;
+  if(min_radial_position < 0)
+  {
+    hyp_radius += std::fabs(min_radial_position);
+    adjusted = true;
+  }
+  return hyp_radius;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double embeddingSD_t::compute_hyperbolic_radius(int dim, bool &adjusted) const
+{
+  const auto R = compute_radius(dim, nb_vertices);
+  // Finds the minimal and maximal values of kappa.
+  double kappa_min = *std::min_element(kappa.begin(), kappa.end());
+  double kappa_max = *std::max_element(kappa.begin(), kappa.end());
+  // Computes the hyperbolic radius (adjusts it in case some vertices have a negative radial position).
+  double hyp_radius = 2 * std::log(2 * R / std::pow(mu * kappa_min * kappa_min, 1.0 / dim));
+  double min_radial_position = hyp_radius - (2.0 / dim) * std::log(kappa_max / kappa_min);
+  adjusted = false;
+  if(min_radial_position < 0)
+  {
+    hyp_radius += std::fabs(min_radial_position);
+    adjusted = true;
+  }
+  return hyp_radius;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+std::vector<double> embeddingSD_t::get_hyperbolic_radii() const
+{
+  const int dim = (DIMENSION > 1) ? DIMENSION : 1;
+  double kappa_min = *std::min_element(kappa.begin(), kappa.end());
+  bool adjusted;
+  double hyp_radius = (dim > 1) ? compute_hyperbolic_radius(dim, adjusted) : compute_hyperbolic_radius(adjusted);
+  std::vector<double> radii(nb_vertices);
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    radii[v] = hyp_radius - (2.0 / dim) * std::log(kappa[v] / kappa_min);
   }
+  return radii;
 }
 
 inline double embeddingSD_t::calculateMu() const
@@ -4569,7 +5761,7 @@ bool embeddingSD_t::ks_test(const std::map<int, double> &inf_ccdf,
   const double c_alpha = std::sqrt(-std::log(alpha / 2) * 0.5);
   const double critical_value = c_alpha * std::sqrt((n + m) / (n * m));
   if (!QUIET_MODE) {
-    std::clog << "Test statistic: " << statistic << ", critical_value: " << critical_value << std::endl;
+    logstream << "Test statistic: " << statistic << ", critical_value: " << critical_value << std::endl;
   }
   return statistic > critical_value;
 }
@@ -56,6 +56,7 @@ INPUT
         - Directed graphs will be converted to undirected.
         - Multiple edges, self-loops and weights will be ignored.
         - Lines starting with '# ' are ignored (i.e., comments).
+      Binary edgelists (see README.md) are also accepted and recognized automatically.
   )";
   std::cout << usage << '\n';
 }
@@ -80,9 +81,24 @@ The following options are available:
                    programs.
     -f             Fast mode. Does not infer the positions based on likelihood
                    maximization, rather uses only the EigenMap method.
+    -g             Largest component mode. If the graph has several connected components,
+                   the largest one is saved into <edgelist_rootname>_GC.edge and is
+                   embedded directly (output files <rootname>_GC.*) instead of exiting.
+    -i             Exact integrals mode (dimension > 1). The integrals of the connection
+                   probability are computed for every pair of kappas instead of being
+                   interpolated from lookup tables. Slower; for comparisons only.
+    -j             Plain beta search mode (dimension > 1). Beta is searched by bisection
+                   and the kappas of every trial start from the degrees, instead of the
+                   secant steps warm started from the closest beta already tried.
     -k             No post-processing of the values of kappa based on the inferred
                    angular positions (theta) resulting in every vertices with the same
                    degree ending at the same radial position in the hyperbolic disk.
+    -n [SIZE]      Other components mode (implies -g). The other connected components
+                   with at least SIZE vertices are saved into
+                   <edgelist_rootname>_C<k>.edge (k-th largest after the largest one) and
+                   are embedded after the largest one (output files <rootname>_C<k>.*).
+                   Components with fewer than DIMENSION+4 vertices of degree larger
+                   than one (e.g., stars) cannot be embedded and are skipped.
     -o [ROOTNAME]  Specify the rootname used for all output files. Default: uses the
                    rootname of the edgelist file as (i.e., rootname.edge).
     -r [FILENAME]  Refine mode. Reads the inferred positions from a previous run of
@@ -97,6 +113,31 @@ The following options are available:
     -p             Beta+kappas post-processing step.
     -e             Only infer kappas for a given input network. Then exit and save these 
                    hidden degrees to file.
+    -m             Multilevel mode. The eigenvectors giving the initial positions are
+                   computed on a coarsened network and are then prolonged and smoothed
+                   level by level. Intended for very large networks.
+    -l [VALUE]     Approximate log-likelihood mode (dimension > 1). Far away vertices are
+                   grouped in cells of a spatial index and their contribution is
+                   aggregated. VALUE is the opening ratio controlling the accuracy
+                   (lower is more accurate but slower, e.g. 0.5).
+    -t [THREADS]   Parallel refinement mode. Batches of non-adjacent vertices are refined
+                   concurrently using THREADS threads (0: all available). Results are
+                   reproducible for a given seed.
+    -u             Deterministic fixed-point update of the kappas of the degree classes
+                   when inferring the parameters (dimension > 1), instead of the
+                   randomized relaxation. Usually converges in fewer iterations.
+    -w [FILENAME]  Warm start of the eigensolver finding the initial positions from the
+                   eigenvectors stored in FILENAME by a previous run (if it exists). The
+                   new eigenvectors are then written to FILENAME.
+    -x [K]         Checkpoint mode. Writes the state of the embedding in the binary file
+                   <rootname>.inf_checkpoint after the inference of the parameters, after
+                   the initial positions and every K ranges of refined vertices (K >= 1).
+    -y             Symmetric eigensolver mode. The initial positions are found with a
+                   Lanczos solver applied to the normalized Laplacian (shift-invert mode
+                   with a sparse Cholesky factorization). Faster on large networks.
+    -z [FILENAME]  Resume mode. Resumes an interrupted embedding from the checkpoint in
+                   FILENAME (same edgelist and options). Checkpoints keep being written if
+                   the checkpoint mode is also set.
   )";
   std::cout << help << '\n';
 }
@@ -118,9 +159,10 @@ void parse_options(int argc , char *argv[], embeddingSD_t &the_graph)
   // <edgelist_filename>
   the_graph.EDGELIST_FILENAME = argv[argc - 1];
 
-  // Parsing options.
+  // Parsing options (getopt is reset such that the options can be parsed again for another graph).
   int opt;
-  while ((opt = getopt(argc,argv,"ab:cfkpo:r:qs:vd:e")) != -1)
+  optind = 1;
+  while ((opt = getopt(argc,argv,"ab:cfgkmn:po:r:qs:t:uvw:x:yz:d:el:ij")) != -1)
   {
     switch(opt)
     {
@@ -141,6 +183,10 @@ void parse_options(int argc , char *argv[], embeddingSD_t &the_graph)
         the_graph.MAXIMIZATION_MODE = false;
         break;
 
+      case 'g':
+        the_graph.LARGEST_COMPONENT_MODE = true;
+        break;
+
       // case 'h':
       //   print_usage();
       //   print_help();
@@ -149,6 +195,15 @@ void parse_options(int argc , char *argv[], embeddingSD_t &the_graph)
       case 'k':
         the_graph.KAPPA_POST_INFERENCE_MODE = false;
         break;
+      case 'm':
+        the_graph.MULTILEVEL_MODE = true;
+        break;
+      case 'n':
+        the_graph.LARGEST_COMPONENT_MODE = true;
+        the_graph.OTHER_COMPONENTS_MODE = true;
+        the_graph.OTHER_COMPONENTS_MIN_SIZE = std::stoi(optarg);
+        break;
+
       case 'p':
         the_graph.KAPPA_BETA_POST_INFERENCE_MODE = true;
         break;
@@ -172,16 +227,59 @@ void parse_options(int argc , char *argv[], embeddingSD_t &the_graph)
         the_graph.SEED = std::stoi(optarg);
         break;
 
+      case 't':
+        the_graph.PARALLEL_REFINEMENT_MODE = true;
+        the_graph.NB_THREADS = std::stoi(optarg);
+        break;
+
+      case 'u':
+        the_graph.DETERMINISTIC_KAPPA_UPDATE_MODE = true;
+        break;
+
       case 'v':
         the_graph.VALIDATION_MODE = true;
         the_graph.CHARACTERIZATION_MODE = true;
         break;
+
+      case 'w':
+        the_graph.EIGENVECTORS_FILENAME = optarg;
+        break;
+
+      case 'x':
+        the_graph.CHECKPOINT_MODE = true;
+        the_graph.CHECKPOINT_INTERVAL = std::stoi(optarg);
+        if(the_graph.CHECKPOINT_INTERVAL < 1)
+        {
+          std::cerr << "The checkpoint interval (option -x) must be at least 1." << std::endl;
+          std::terminate();
+        }
+        break;
+
+      case 'y':
+        the_graph.SYMMETRIC_EIGENSOLVER_MODE = true;
+        break;
+
+      case 'z':
+        the_graph.RESUME_MODE = true;
+        the_graph.RESUME_FILENAME = optarg;
+        break;
+
       case 'd':
         the_graph.DIMENSION = std::stoi(optarg);
         break;
       case 'e':
         the_graph.ONLY_KAPPAS = true;
         break;
+      case 'i':
+        the_graph.TABULATED_INTEGRALS_MODE = false;
+        break;
+      case 'j':
+        the_graph.MEMOIZED_BETA_SEARCH_MODE = false;
+        break;
+      case 'l':
+        the_graph.APPROXIMATE_LIKELIHOOD_MODE = true;
+        the_graph.APPROXIMATE_LIKELIHOOD_ACCURACY = std::stod(optarg);
+        break;
       default:
         print_usage();
         print_help();
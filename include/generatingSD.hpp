@@ -41,6 +41,12 @@
 #include <sstream>
 #include <string>
 #include <vector>
+// OpenMP
+#ifdef _OPENMP
+  #include <omp.h>
+#endif
+// Near-linear-time sampler of the edges.
+#include "edge_sampler.hpp"
 
 
 
@@ -67,6 +73,9 @@ class generatingSD_t
     std::string HIDDEN_VARIABLES_FILENAME;
     // Dimension of the model S^D
     int DIMENSION = 1;
+    // Number of threads used to sample the edges and compute the expected degrees (0: all available).
+    //   The generated graph only depends on the seed.
+    int NB_THREADS = 1;
   // General internal objects.
   private:
     // pi
@@ -102,11 +111,29 @@ class generatingSD_t
     // Generates an edgelist and writes it into a file.
     void generate_edgelist(int width = 15);
     void generate_edgelist_dim(int width = 15); 
+    // Sets the hidden variables from arrays: the kappas and, optionally, the positions (angles in S^1,
+    //   one row of D+1 values per vertex in S^D). Positions are drawn uniformly if not provided.
+    void set_hidden_variables(const std::vector<double> &kappas, const double *positions = nullptr);
+    // Generates a graph in memory (edge e links edges[2e] and edges[2e+1]) with the real and, if
+    //   required, expected degrees of the vertices. Unlike generate_edgelist(_dim), the kappas are
+    //   used as given (no vertex is added and the kappas are not adjusted to the positions).
+    std::vector<int> generate_edges(std::vector<int> &rdegree, std::vector<double> &edegree, bool expected_degrees = true);
+    // Positions used to generate the graph (angles in S^1, one row of D+1 values per vertex in S^D)
+    //   and radius of the sphere.
+    std::vector<double> get_positions() const;
+    double get_radius() const { return (DIMENSION > 1) ? compute_radius(DIMENSION, nb_vertices) : nb_vertices / (2 * PI); };
   // Private functions linked to the generation of a random edgelist.
   private:
     // Saves the values of the hidden variables (i.e., kappa and theta).
     void save_vertices_properties(std::vector<int>& rdegree, std::vector<double>& edegree, int width);
     void save_vertices_properties_dim(std::vector<int>& rdegree, std::vector<double>& edegree, int width);
+    // Samples the edges given the positions (one row of D+1 values per vertex) and the radius (edge e
+    //   links edges[2e] and edges[2e+1]).
+    std::vector<int> sample_edges(int dim, const std::vector<double> &positions, double radius);
+    // Writes the edges into the edgelist file through a buffer.
+    void write_edges(std::fstream &edgelist_file, const std::vector<int> &edges, int width);
+    // Number of threads actually used.
+    int nb_threads() const;
     // Generate random coordiantes in D dimensional space
     std::vector<double> generate_random_d_vector(int dim);
     double compute_angle_d_vectors(const std::vector<double> &v1, const std::vector<double> &v2);
@@ -204,33 +231,23 @@ void generatingSD_t::generate_edgelist(int width)
   edgelist_file << std::setw(width)     << "Vertex2" << " ";
   edgelist_file << std::endl;
   // Generates the edgelist.
-  double kappa1, theta1, dtheta, prob;
-  double prefactor = nb_vertices / (2 * PI * MU);
-  for(int v1(0); v1<nb_vertices; ++v1)
+  std::vector<double> positions(2 * nb_vertices);
+  for(int v(0); v<nb_vertices; ++v)
+  {
+    positions[2 * v] = std::cos(theta[v]);
+    positions[2 * v + 1] = std::sin(theta[v]);
+  }
+  std::vector<int> edges = sample_edges(1, positions, nb_vertices / (2 * PI));
+  write_edges(edgelist_file, edges, width);
+  // Computes the real and expected degrees, if required.
+  if(OUTPUT_VERTICES_PROPERTIES)
   {
-    kappa1 = kappa[v1];
-    theta1 = theta[v1];
-    for(int v2(v1 + 1); v2<nb_vertices; ++v2)
+    for(auto v : edges)
     {
-      dtheta = PI - std::fabs(PI - std::fabs(theta1 - theta[v2]));
-      prob = 1 / (1 + std::pow((prefactor * dtheta) / (kappa1 * kappa[v2]), BETA));
-      if(uniform_01(engine) < prob)
-      {
-        edgelist_file << std::setw(width) << Num2Name[v1] << " ";
-        edgelist_file << std::setw(width) << Num2Name[v2] << " ";
-        edgelist_file << std::endl;
-        if(OUTPUT_VERTICES_PROPERTIES)
-        {
-          rdegree[v1] += 1;
-          rdegree[v2] += 1;
-        }
-      }
-      if(OUTPUT_VERTICES_PROPERTIES)
-      {
-        edegree[v1] += prob;
-        edegree[v2] += prob;
-      }
+      rdegree[v] += 1;
     }
+    compute_inferred_ensemble_expected_degrees();
+    edegree = inferred_ensemble_expected_degree;
   }
   // Closes the stream.
   edgelist_file.close();
@@ -320,28 +337,17 @@ void generatingSD_t::generate_edgelist_dim(int width)
   edgelist_file << std::setw(width)     << "Vertex2" << " ";
   edgelist_file << std::endl;
   // Generates the edgelist.
-  for(int v1(0); v1<nb_vertices; ++v1) {
-    for(int v2(v1 + 1); v2<nb_vertices; ++v2) {
-      const auto dtheta = compute_angle_d_vectors(d_positions[v1], d_positions[v2]);
-      const auto inside = radius * dtheta / std::pow(MU * kappa[v1] * kappa[v2], 1.0 / DIMENSION);
-      const auto prob = 1 / (1 + std::pow(inside, BETA));
-      if(uniform_01(engine) < prob)
-      {
-        edgelist_file << std::setw(width) << Num2Name[v1] << " ";
-        edgelist_file << std::setw(width) << Num2Name[v2] << " ";
-        edgelist_file << std::endl;
-        if(OUTPUT_VERTICES_PROPERTIES)
-        {
-          rdegree[v1] += 1;
-          rdegree[v2] += 1;
-        }
-      }
-      if(OUTPUT_VERTICES_PROPERTIES)
-      {
-        edegree[v1] += prob;
-        edegree[v2] += prob;
-      }
+  std::vector<int> edges = sample_edges(DIMENSION, get_positions(), radius);
+  write_edges(edgelist_file, edges, width);
+  // Computes the real and expected degrees, if required.
+  if(OUTPUT_VERTICES_PROPERTIES)
+  {
+    for(auto v : edges)
+    {
+      rdegree[v] += 1;
     }
+    compute_inferred_ensemble_expected_degrees(DIMENSION, radius);
+    edegree = inferred_ensemble_expected_degree;
   }
   // Closes the stream.
   edgelist_file.close();
@@ -354,6 +360,196 @@ void generatingSD_t::generate_edgelist_dim(int width)
 
 
 
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void generatingSD_t::set_hidden_variables(const std::vector<double> &kappas, const double *positions)
+{
+  nb_vertices = kappas.size();
+  kappa = kappas;
+  degree = kappas;
+  theta.clear();
+  d_positions.clear();
+  if(positions != nullptr)
+  {
+    if(DIMENSION == 1)
+    {
+      theta.assign(positions, positions + nb_vertices);
+    }
+    else
+    {
+      d_positions.resize(nb_vertices);
+      for(int v(0); v<nb_vertices; ++v)
+      {
+        d_positions[v].assign(positions + v * (DIMENSION + 1), positions + (v + 1) * (DIMENSION + 1));
+      }
+    }
+  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+std::vector<int> generatingSD_t::generate_edges(std::vector<int> &rdegree, std::vector<double> &edegree, bool expected_degrees)
+{
+  // Initializes the random number generator.
+  engine.seed(SEED);
+  // Makes sure the value of beta has been provided.
+  if(BETA < 0)
+  {
+    std::cerr << "ERROR: The value of parameter beta must be provided." << std::endl;
+    std::terminate();
+  }
+  // Sets the value of mu, if not provided.
+  if(MU < 0)
+  {
+    double average_kappa = 0;
+    for(int v(0); v<nb_vertices; ++v)
+    {
+      average_kappa += kappa[v];
+    }
+    average_kappa /= nb_vertices;
+    if(DIMENSION == 1)
+    {
+      MU = BETA * std::sin(PI / BETA) / (2.0 * PI * average_kappa);
+    }
+    else
+    {
+      const auto top = BETA * std::tgamma(DIMENSION / 2.0) * std::sin(DIMENSION * PI / BETA);
+      const auto bottom = average_kappa * 2 * std::pow(PI, 1 + DIMENSION / 2.0);
+      MU = top / bottom;
+    }
+  }
+  // Generates the positions, if not provided (as generate_edgelist(_dim)).
+  std::vector<double> positions;
+  if(DIMENSION == 1)
+  {
+    if(static_cast<int>(theta.size()) != nb_vertices)
+    {
+      theta.resize(nb_vertices);
+      for(int v(0); v<nb_vertices; ++v)
+      {
+        theta[v] = 2 * PI * uniform_01(engine);
+      }
+    }
+    positions.resize(2 * nb_vertices);
+    for(int v(0); v<nb_vertices; ++v)
+    {
+      positions[2 * v] = std::cos(theta[v]);
+      positions[2 * v + 1] = std::sin(theta[v]);
+    }
+  }
+  else
+  {
+    if(static_cast<int>(d_positions.size()) != nb_vertices)
+    {
+      d_positions.resize(nb_vertices);
+      for(int v(0); v<nb_vertices; ++v)
+      {
+        d_positions[v] = generate_random_d_vector(DIMENSION);
+      }
+    }
+    positions = get_positions();
+  }
+  // Generates the edges.
+  std::vector<int> edges = sample_edges(DIMENSION, positions, get_radius());
+  // Computes the real and expected degrees.
+  rdegree.assign(nb_vertices, 0);
+  for(auto v : edges)
+  {
+    rdegree[v] += 1;
+  }
+  edegree.clear();
+  if(expected_degrees)
+  {
+    if(DIMENSION == 1)
+    {
+      compute_inferred_ensemble_expected_degrees();
+    }
+    else
+    {
+      compute_inferred_ensemble_expected_degrees(DIMENSION, get_radius());
+    }
+    edegree = inferred_ensemble_expected_degree;
+  }
+  return edges;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+std::vector<double> generatingSD_t::get_positions() const
+{
+  if(DIMENSION == 1)
+  {
+    return theta;
+  }
+  std::vector<double> positions;
+  positions.reserve(static_cast<long>(d_positions.size()) * (DIMENSION + 1));
+  for(const auto &position : d_positions)
+  {
+    positions.insert(positions.end(), position.begin(), position.end());
+  }
+  return positions;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+int generatingSD_t::nb_threads() const
+{
+#ifdef _OPENMP
+  return (NB_THREADS > 0) ? NB_THREADS : omp_get_max_threads();
+#else
+  return 1;
+#endif
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+std::vector<int> generatingSD_t::sample_edges(int dim, const std::vector<double> &positions, double radius)
+{
+  // Every pair of vertices is connected with its exact probability, but only the pairs likely to be
+  //   connected are considered (see edge_sampler_t). The vertices are processed by blocks seeded from
+  //   the main random number generator, such that the graph does not depend on the number of threads.
+  edge_sampler_t sampler;
+  sampler.NB_THREADS = nb_threads();
+  sampler.build(dim, nb_vertices, positions.data(), kappa, radius, MU, BETA);
+  return sampler.sample(engine());
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void generatingSD_t::write_edges(std::fstream &edgelist_file, const std::vector<int> &edges, int width)
+{
+  // Formats the lines in a buffer written by chunks (same layout as std::setw(width)).
+  const std::size_t chunk_size = 1 << 20;
+  std::string buffer;
+  buffer.reserve(chunk_size + 2 * width + 64);
+  auto append = [&](const std::string &name) {
+    if(static_cast<int>(name.size()) < width)
+    {
+      buffer.append(width - name.size(), ' ');
+    }
+    buffer += name;
+    buffer += ' ';
+  };
+  for(std::size_t e(0); e<edges.size(); e+=2)
+  {
+    append(Num2Name[edges[e]]);
+    append(Num2Name[edges[e + 1]]);
+    buffer += '\n';
+    if(buffer.size() >= chunk_size)
+    {
+      edgelist_file.write(buffer.data(), buffer.size());
+      buffer.clear();
+    }
+  }
+  edgelist_file.write(buffer.data(), buffer.size());
+}
+
+
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 // =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
 void generatingSD_t::load_hidden_variables()
@@ -713,7 +909,7 @@ void generatingSD_t::fix_error_with_zero_degree_nodes(std::vector<int>& rdegree,
 
   std::cout << "Adding N_0 = " << N_0 << " nodes to the original network" << std::endl;  
   std::vector<double> new_kappas;
-  std::sample(kappa.begin(), kappa.end(), std::back_inserter(new_kappas), N_0, std::mt19937{std::random_device{}()});
+  std::sample(kappa.begin(), kappa.end(), std::back_inserter(new_kappas), N_0, engine);
 
   for (const auto &k: new_kappas)
     kappa.push_back(k);
@@ -728,37 +924,43 @@ void generatingSD_t::fix_error_with_zero_degree_nodes(std::vector<int>& rdegree,
 
 void generatingSD_t::compute_inferred_ensemble_expected_degrees(int dim, double radius)
 {
-  // Computes the new expected degrees given the inferred values of theta.
+  // Computes the new expected degrees given the inferred values of theta (every vertex sums over all
+  //   the others, in the same order as a sequential loop over the pairs).
   inferred_ensemble_expected_degree.clear();
   inferred_ensemble_expected_degree.resize(nb_vertices, 0);
+  #pragma omp parallel for schedule(dynamic, 64) num_threads(nb_threads())
   for(int v1=0; v1<nb_vertices; ++v1) {
-    for(int v2(v1 + 1); v2<nb_vertices; ++v2) {
+    double expected_degree = 0;
+    for(int v2(0); v2<nb_vertices; ++v2) {
+      if(v2 == v1)
+        continue;
       const auto dtheta = compute_angle_d_vectors(d_positions[v1], d_positions[v2]);
       const auto chi = radius * dtheta / std::pow(MU * kappa[v1] * kappa[v2], 1.0 / dim);
-      const auto prob = 1 / (1 + std::pow(chi, BETA));
-      inferred_ensemble_expected_degree[v1] += prob;
-      inferred_ensemble_expected_degree[v2] += prob;  
+      expected_degree += 1 / (1 + std::pow(chi, BETA));
     }
+    inferred_ensemble_expected_degree[v1] = expected_degree;
   }
 }
 
 void generatingSD_t::compute_inferred_ensemble_expected_degrees()
 {
-  double kappa1, theta1, dtheta, prob;
   double prefactor = nb_vertices / (2 * PI * MU);
   inferred_ensemble_expected_degree.clear();
   inferred_ensemble_expected_degree.resize(nb_vertices, 0);
-  for(int v1(0); v1<nb_vertices; ++v1)
+  #pragma omp parallel for schedule(dynamic, 64) num_threads(nb_threads())
+  for(int v1=0; v1<nb_vertices; ++v1)
   {
-    kappa1 = kappa[v1];
-    theta1 = theta[v1];
-    for(int v2(v1 + 1); v2<nb_vertices; ++v2)
+    double kappa1 = kappa[v1];
+    double theta1 = theta[v1];
+    double expected_degree = 0;
+    for(int v2(0); v2<nb_vertices; ++v2)
     {
-      dtheta = PI - std::fabs(PI - std::fabs(theta1 - theta[v2]));
-      prob = 1 / (1 + std::pow((prefactor * dtheta) / (kappa1 * kappa[v2]), BETA));
-      inferred_ensemble_expected_degree[v1] += prob;
-      inferred_ensemble_expected_degree[v2] += prob;
+      if(v2 == v1)
+        continue;
+      double dtheta = PI - std::fabs(PI - std::fabs(theta1 - theta[v2]));
+      expected_degree += 1 / (1 + std::pow((prefactor * dtheta) / (kappa1 * kappa[v2]), BETA));
     }
+    inferred_ensemble_expected_degree[v1] = expected_degree;
   }
 }
 
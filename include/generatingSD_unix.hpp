@@ -68,12 +68,13 @@ The following options are available:
   -a             Indicates that the file containing the hidden variables comes from the networkS1 embedding program (gets BETA and MU from the file).
   -b [VALUE]     Specifies the value for parameter beta.
   -h             Print this message on screen and exit.
+  -j [THREADS]   Number of threads used to generate the network (0: all available). The network only depends on the seed. Default: 1.
   -m [VALUE]     Specifies the value for parameter mu. Default: MU = BETA * std::sin(PI / BETA) / (2.0 * PI * average_kappa).
   -n             Indicates that the first column of the hidden variables file provides the name of the vertices.
   -o [ROOTNAME]  Specifies the rootname used for all output files. Uses the filename of the hidden variables file as rootname if not specified.
   -s [SEED]      Program uses a custom seed for the random number generator. Default: EPOCH.
   -t             Indicates that the last column of the hidden variables file provides the angular position (i.e., theta) of the vertices.
-  -v             Outputs the hidden variables (kappa and theta) used to the generate the network into a file (uses the edgelist's rootname).
+  -v             Outputs the hidden variables (kappa and theta) used to the generate the network into a file (uses the edgelist's rootname). The expected degrees written in this file take a time quadratic in the number of vertices.
   -d [DIMENSION] Specify model's dimension (S^D).
   )""";
   std::cout << help << std::endl;
@@ -103,7 +104,7 @@ bool parse_options(int argc , char *argv[], generatingSD_t &the_graph)
 
   // Parsing options.
   int opt;
-  while ((opt = getopt(argc,argv,"ab:hm:no:s:tvd:")) != -1)
+  while ((opt = getopt(argc,argv,"ab:hj:m:no:s:tvd:")) != -1)
   {
     switch(opt)
     {
@@ -122,6 +123,10 @@ bool parse_options(int argc , char *argv[], generatingSD_t &the_graph)
         print_help();
         return false;
 
+      case 'j':
+        the_graph.NB_THREADS = std::stoi(optarg);
+        break;
+
       case 'm':
         the_graph.MU = std::stod(optarg);
         break;
@@ -0,0 +1,202 @@
+#ifndef MERCATOR_PKK_TABLE_H
+#define MERCATOR_PKK_TABLE_H
+
+#include <algorithm>
+#include <array>
+#include <cmath>
+#include <limits>
+#include <vector>
+#include "integrate_expected_degree.hpp"
+
+/**
+ * Lookup table of the integrals computed by pkk_ (or pkk_expected_) from 0 to PI for a fixed dimension
+ * and value of beta. The integral only depends on c = R / (mu * kappa1 * kappa2)^(1/D), is tabulated
+ * in log-log scale on a uniform grid in log c and is interpolated with monotone piecewise cubic
+ * Hermite polynomials (Fritsch-Carlson slopes), such that the interpolant is monotone between
+ * consecutive nodes. Nodes are computed lazily when a value of c is first requested. The error of the
+ * interpolation is bounded by comparing it to the exact integral at the middle of every interval
+ * used (the Hermite error being maximal around the midpoint).
+ */
+class pkk_table_t
+{
+  public:
+    // Spacing of the nodes in log c.
+    double LOG_C_STEP = 0.05;
+
+  private:
+    // Parameters of the tabulated integral.
+    int dim = -1;
+    double beta = -1;
+    bool theta_weighted = false;
+    // Index of the first node/interval (node i is located at log c = i * LOG_C_STEP).
+    int first_index = 0;
+    // Values of log(integral) at the nodes (NaN if not computed yet).
+    std::vector<double> nodes;
+    // Coefficients of the cubic polynomial of each interval (NaN if not computed yet).
+    std::vector< std::array<double, 4> > intervals;
+    // Largest relative error measured at the middle of the intervals.
+    double max_error = 0;
+    // Number of exact integrals computed.
+    int nb_integrals = 0;
+
+  private:
+    // Exact value of the integral.
+    double integral(double c);
+    // Value of log(integral) at a node.
+    double node(int i);
+    // Extends the containers to include the nodes/intervals i_min to i_max.
+    void extend(int i_min, int i_max);
+    // Computes the coefficients of the cubic polynomial of an interval.
+    const std::array<double, 4>& interval(int i);
+
+  public:
+    // Sets the parameters of the integral (clears the table if they changed).
+    void reset(int _dim, double _beta, bool _theta_weighted = false);
+    // Are the parameters those of the table?
+    bool matches(int _dim, double _beta) const { return (_dim == dim) && (_beta == beta); };
+    // Interpolated value of the integral.
+    double operator()(double c);
+    // Computes beforehand every interval needed for c_min <= c <= c_max (the table can then be read
+    //   concurrently within this range).
+    void prepare(double c_min, double c_max);
+    // Largest relative error measured and number of exact integrals computed.
+    double error_bound() const { return max_error; };
+    int size() const { return nb_integrals; };
+};
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void pkk_table_t::reset(int _dim, double _beta, bool _theta_weighted)
+{
+  if(matches(_dim, _beta) && (_theta_weighted == theta_weighted))
+  {
+    return;
+  }
+  dim = _dim;
+  beta = _beta;
+  theta_weighted = _theta_weighted;
+  first_index = 0;
+  nodes.clear();
+  intervals.clear();
+  max_error = 0;
+  nb_integrals = 0;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double pkk_table_t::integral(double c)
+{
+  double result = 0;
+  double upper_bound = M_PI;
+  if(theta_weighted)
+  {
+    pkk_expected_(&result, &dim, &beta, &c);
+  }
+  else
+  {
+    pkk_(&result, &dim, &beta, &c, &upper_bound);
+  }
+  ++nb_integrals;
+  return result;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void pkk_table_t::extend(int i_min, int i_max)
+{
+  const double nan = std::numeric_limits<double>::quiet_NaN();
+  if(nodes.empty())
+  {
+    first_index = i_min;
+  }
+  if(i_min < first_index)
+  {
+    const int nb_new = first_index - i_min;
+    nodes.insert(nodes.begin(), nb_new, nan);
+    intervals.insert(intervals.begin(), nb_new, {nan, nan, nan, nan});
+    first_index = i_min;
+  }
+  if(i_max >= first_index + static_cast<int>(nodes.size()))
+  {
+    nodes.resize(i_max - first_index + 1, nan);
+    intervals.resize(i_max - first_index + 1, {nan, nan, nan, nan});
+  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double pkk_table_t::node(int i)
+{
+  double &value = nodes[i - first_index];
+  if(std::isnan(value))
+  {
+    value = std::log(integral(std::exp(i * LOG_C_STEP)));
+  }
+  return value;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+const std::array<double, 4>& pkk_table_t::interval(int i)
+{
+  extend(i - 1, i + 2);
+  std::array<double, 4> &coefficients = intervals[i - first_index];
+  if(!std::isnan(coefficients[0]))
+  {
+    return coefficients;
+  }
+  // Values at the four surrounding nodes.
+  const double y0 = node(i - 1);
+  const double y1 = node(i);
+  const double y2 = node(i + 1);
+  const double y3 = node(i + 2);
+  // Fritsch-Carlson slopes (in units of the spacing) at both ends of the interval.
+  auto slope = [](double d_left, double d_right) {
+    return (d_left * d_right <= 0) ? 0.0 : 2 * d_left * d_right / (d_left + d_right);
+  };
+  const double m1 = slope(y1 - y0, y2 - y1);
+  const double m2 = slope(y2 - y1, y3 - y2);
+  // Coefficients of y(t) = a + b t + c t^2 + d t^3 for 0 <= t <= 1.
+  coefficients[0] = y1;
+  coefficients[1] = m1;
+  coefficients[2] = 3 * (y2 - y1) - 2 * m1 - m2;
+  coefficients[3] = 2 * (y1 - y2) + m1 + m2;
+  // Measures the error in the middle of the interval.
+  const double interpolated = std::exp(y1 + 0.5 * m1 + 0.25 * coefficients[2] + 0.125 * coefficients[3]);
+  const double exact = integral(std::exp((i + 0.5) * LOG_C_STEP));
+  max_error = std::max(max_error, std::fabs(interpolated - exact) / exact);
+  return coefficients;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double pkk_table_t::operator()(double c)
+{
+  const double x = std::log(c) / LOG_C_STEP;
+  const double i = std::floor(x);
+  const double t = x - i;
+  const auto &coefficients = interval(static_cast<int>(i));
+  return std::exp(coefficients[0] + t * (coefficients[1] + t * (coefficients[2] + t * coefficients[3])));
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void pkk_table_t::prepare(double c_min, double c_max)
+{
+  const int i_min = static_cast<int>(std::floor(std::log(c_min) / LOG_C_STEP));
+  const int i_max = static_cast<int>(std::floor(std::log(c_max) / LOG_C_STEP));
+  extend(i_min - 1, i_max + 2);
+  for(int i(i_min); i<=i_max; ++i)
+  {
+    interval(i);
+  }
+}
+
+#endif // MERCATOR_PKK_TABLE_H
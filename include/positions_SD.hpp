@@ -0,0 +1,106 @@
+#ifndef MERCATOR_POSITIONS_SD_H
+#define MERCATOR_POSITIONS_SD_H
+
+#include <algorithm>
+#include <cmath>
+#include <vector>
+#include "Eigen/Core"
+
+/**
+ * Positions of the vertices in S^D stored in a single contiguous, aligned N x (D+1) buffer (one row
+ * per vertex), along with the cached unit vectors (same layout) and norms. Angular distances are
+ * therefore obtained from a single dot product without any allocation or renormalization.
+ */
+class positions_SD_t
+{
+  public:
+    typedef Eigen::Matrix<double, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor> matrix_t;
+    // Cosines closer to 1 than this value correspond to an angular distance of zero.
+    double NUMERICAL_ZERO = 1e-10;
+
+  private:
+    // Coordinates of the vertices (norm equal to the radius of the sphere).
+    matrix_t coordinates;
+    // Unit vectors of the positions.
+    matrix_t unit_vectors;
+    // Norm of the positions.
+    Eigen::VectorXd norms;
+
+  public:
+    // Allocates the buffer for nb_vertices vertices in S^dim (all coordinates set to zero).
+    void resize(int nb_vertices, int dim);
+    // Number of vertices and dimension of the sphere.
+    int size() const { return coordinates.rows(); };
+    int dimension() const { return coordinates.cols() - 1; };
+    // Sets the position of a vertex (and updates its unit vector and norm).
+    void set(int v, const double *x);
+    void set(int v, const std::vector<double> &x) { set(v, x.data()); };
+    // Position of a vertex (D+1 contiguous values).
+    const double* operator[](int v) const { return coordinates.row(v).data(); };
+    std::vector<double> get(int v) const { return std::vector<double>((*this)[v], (*this)[v] + coordinates.cols()); };
+    // Unit vector and norm of the position of a vertex.
+    const double* unit(int v) const { return unit_vectors.row(v).data(); };
+    double norm(int v) const { return norms(v); };
+    // Whole buffers.
+    const matrix_t& data() const { return coordinates; };
+    matrix_t& data() { return coordinates; };
+    const matrix_t& units() const { return unit_vectors; };
+    // Angular distance between two vertices, or between a vertex and a unit vector.
+    double angle(int v1, int v2) const { return angle_from_cosine(unit_vectors.row(v1).dot(unit_vectors.row(v2))); };
+    double angle(int v1, const double *unit_x) const;
+    // Angular distance between two unit vectors given the cosine of the angle.
+    double angle_from_cosine(double cosine) const;
+};
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void positions_SD_t::resize(int nb_vertices, int dim)
+{
+  coordinates.setZero(nb_vertices, dim + 1);
+  unit_vectors.setZero(nb_vertices, dim + 1);
+  norms.setZero(nb_vertices);
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void positions_SD_t::set(int v, const double *x)
+{
+  const int n = coordinates.cols();
+  double norm = 0;
+  for(int i(0); i<n; ++i)
+  {
+    coordinates(v, i) = x[i];
+    norm += x[i] * x[i];
+  }
+  norm = std::sqrt(norm);
+  norms(v) = norm;
+  for(int i(0); i<n; ++i)
+    unit_vectors(v, i) = x[i] / norm;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double positions_SD_t::angle(int v1, const double *unit_x) const
+{
+  const int n = unit_vectors.cols();
+  const double *unit_v1 = unit(v1);
+  double cosine = 0;
+  for(int i(0); i<n; ++i)
+    cosine += unit_v1[i] * unit_x[i];
+  return angle_from_cosine(cosine);
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+double positions_SD_t::angle_from_cosine(double cosine) const
+{
+  if(cosine > 1 - NUMERICAL_ZERO)
+    return 0; // the same vectors
+  return std::acos(std::max(-1.0, cosine));
+}
+
+#endif // MERCATOR_POSITIONS_SD_H
@@ -0,0 +1,337 @@
+#ifndef MERCATOR_SPHERE_CELLS_H
+#define MERCATOR_SPHERE_CELLS_H
+
+#include <algorithm>
+#include <cmath>
+#include <vector>
+
+/**
+ * Hierarchical partition of the sphere S^D into "cube-sphere" cells (in the spirit of HEALPix).
+ *
+ * A point x of R^(D+1) is projected on the face of the cube [-1,1]^(D+1) pointed by its largest
+ * coordinate (in absolute value), and the D remaining coordinates of the face are recursively
+ * halved. The root level has 2(D+1) cells (the faces) and each cell of level l has 2^D children
+ * at level l+1. Every cell keeps the number of points it contains, the sum of their weights and the
+ * sum of their unit vectors, so that the contribution of a group of far away points can be
+ * aggregated. Points are only listed in the cells of the finest level.
+ *
+ * Since the radial projection of the face onto the sphere does not increase distances, the angular
+ * distance between the center of a cell of level l and any of its points is bounded by
+ * 2 * asin(sqrt(D) / 2^(l+1)), which is used in the opening criterion of `traverse`.
+ */
+class sphere_cells_t
+{
+  public:
+    // Target number of points per cell of the finest level.
+    int NB_POINTS_PER_CELL = 8;
+
+  private:
+    // Dimension of the sphere (points live in R^(D+1)).
+    int dim = 0;
+    // Number of faces of the cube (2(D+1)).
+    int nb_faces = 0;
+    // Index of the finest level.
+    int nb_levels = 0;
+    // Offsets of each level in the flat arrays below.
+    std::vector<long> level_offset;
+    // Upper bound on the angular radius of the cells of each level.
+    std::vector<double> level_max_angle;
+    // Number of points, sum of their weights and sum of their unit vectors in every cell.
+    std::vector<int> cell_count;
+    std::vector<double> cell_weight;
+    std::vector<double> cell_centroid;
+    // Points in the cells of the finest level.
+    std::vector<std::vector<int>> cell_members;
+    // Unit vector, weight, cell (finest level) and position in that cell of every point.
+    std::vector<double> point_unit;
+    std::vector<double> point_weight;
+    std::vector<long> point_cell;
+    std::vector<int> point_slot;
+    // Whether the point is currently stored in the cells.
+    std::vector<bool> point_inserted;
+
+  public:
+    // Builds the cells for the given positions (any norm, one row of D+1 values per point) and weights.
+    void build(int _dim, int nb_points, const double *positions, const std::vector<double> &weights);
+    // Adds/removes a point (using its last known position and weight).
+    void insert(int v, const double *position);
+    void remove(int v);
+    // Number of non-empty cells at the finest level.
+    int nb_occupied_cells() const;
+    // Visits the cells, calling near(v) for every point of cells that are too close to the unit
+    //   vector x (i.e., angular radius >= opening * angular distance to x) and
+    //   far(count, weight, centroid) for the cells that are far enough. The point excluded (if it is
+    //   stored, -1 for none) is left out of both, such that a point can be moved without removing it.
+    template<typename Near, typename Far>
+    void traverse(const double *x, double opening, int excluded, Near &&near, Far &&far) const;
+
+  private:
+    // Finest level coordinates of the cell containing the unit vector x.
+    int locate(const double *x, std::vector<int> &coords) const;
+    // Index in the flat arrays of the cell (face, coords) of level l.
+    long cell_index(int l, int face, const std::vector<int> &coords) const;
+    // Unit vector pointing to the center of the cell (face, coords) of level l.
+    void cell_center(int l, int face, const std::vector<int> &coords, double *center) const;
+    // Adds (sign=1) or removes (sign=-1) the contribution of a point to the cells containing it.
+    void update_cells(int v, int sign);
+    template<typename Near, typename Far>
+    void traverse_cell(int l, int face, std::vector<int> &coords, const double *x,
+                       const std::vector<double> &cos_threshold, int excluded,
+                       const std::vector<long> &excluded_cells, Near &near, Far &far) const;
+};
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void sphere_cells_t::build(int _dim, int nb_points, const double *positions, const std::vector<double> &weights)
+{
+  dim = _dim;
+  nb_faces = 2 * (dim + 1);
+  // Finds the finest level such that cells contain about NB_POINTS_PER_CELL points.
+  nb_levels = 0;
+  while(nb_faces * std::pow(2.0, (nb_levels + 1) * dim) * NB_POINTS_PER_CELL <= nb_points && (nb_levels + 1) * dim < 24)
+    ++nb_levels;
+  // Allocates the cells of every level.
+  level_offset.assign(nb_levels + 2, 0);
+  level_max_angle.assign(nb_levels + 1, 0);
+  for(int l(0); l<=nb_levels; ++l)
+  {
+    level_offset[l + 1] = level_offset[l] + (static_cast<long>(nb_faces) << (l * dim));
+    level_max_angle[l] = 2 * std::asin(std::min(1.0, std::sqrt(dim) / std::pow(2.0, l + 1)));
+  }
+  cell_count.assign(level_offset[nb_levels + 1], 0);
+  cell_weight.assign(level_offset[nb_levels + 1], 0);
+  cell_centroid.assign(level_offset[nb_levels + 1] * (dim + 1), 0);
+  cell_members.assign(level_offset[nb_levels + 1] - level_offset[nb_levels], std::vector<int>());
+  // Inserts the points.
+  point_unit.assign(nb_points * (dim + 1), 0);
+  point_weight = weights;
+  point_cell.assign(nb_points, 0);
+  point_slot.assign(nb_points, 0);
+  point_inserted.assign(nb_points, false);
+  for(int v(0); v<nb_points; ++v)
+    insert(v, positions + static_cast<long>(v) * (dim + 1));
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void sphere_cells_t::insert(int v, const double *position)
+{
+  if(point_inserted[v])
+    remove(v);
+  // Stores the unit vector.
+  double norm = 0;
+  for(int i(0); i<dim+1; ++i)
+    norm += position[i] * position[i];
+  norm = std::sqrt(norm);
+  double *unit = &point_unit[v * (dim + 1)];
+  for(int i(0); i<dim+1; ++i)
+    unit[i] = position[i] / norm;
+  update_cells(v, 1);
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void sphere_cells_t::remove(int v)
+{
+  if(point_inserted[v])
+    update_cells(v, -1);
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+int sphere_cells_t::nb_occupied_cells() const
+{
+  int nb_cells = 0;
+  for(long c(level_offset[nb_levels]); c<level_offset[nb_levels + 1]; ++c)
+    if(cell_count[c] > 0)
+      ++nb_cells;
+  return nb_cells;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+int sphere_cells_t::locate(const double *x, std::vector<int> &coords) const
+{
+  // Identifies the face of the cube.
+  int axis = 0;
+  for(int i(1); i<dim+1; ++i)
+    if(std::fabs(x[i]) > std::fabs(x[axis]))
+      axis = i;
+  const int face = 2 * axis + ((x[axis] < 0) ? 1 : 0);
+  // Coordinates on the face at the finest level.
+  const int side = 1 << nb_levels;
+  coords.resize(dim);
+  for(int i(0), j(0); i<dim+1; ++i)
+  {
+    if(i == axis)
+      continue;
+    const int g = (x[i] / std::fabs(x[axis]) + 1) / 2 * side;
+    coords[j++] = std::max(0, std::min(side - 1, g));
+  }
+  return face;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+long sphere_cells_t::cell_index(int l, int face, const std::vector<int> &coords) const
+{
+  long index = face;
+  for(int j(0); j<dim; ++j)
+    index = (index << l) + coords[j];
+  return level_offset[l] + index;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void sphere_cells_t::cell_center(int l, int face, const std::vector<int> &coords, double *center) const
+{
+  const int axis = face / 2;
+  const double side = 1 << l;
+  double norm = 1;
+  for(int i(0), j(0); i<dim+1; ++i)
+  {
+    if(i == axis)
+    {
+      center[i] = (face % 2 == 0) ? 1 : -1;
+      continue;
+    }
+    center[i] = -1 + (2 * coords[j++] + 1) / side;
+    norm += center[i] * center[i];
+  }
+  norm = std::sqrt(norm);
+  for(int i(0); i<dim+1; ++i)
+    center[i] /= norm;
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+void sphere_cells_t::update_cells(int v, int sign)
+{
+  const double *unit = &point_unit[v * (dim + 1)];
+  std::vector<int> coords, level_coords(dim);
+  const int face = locate(unit, coords);
+  // Updates the aggregated quantities at every level.
+  for(int l(0); l<=nb_levels; ++l)
+  {
+    for(int j(0); j<dim; ++j)
+      level_coords[j] = coords[j] >> (nb_levels - l);
+    const long c = cell_index(l, face, level_coords);
+    cell_count[c] += sign;
+    cell_weight[c] += sign * point_weight[v];
+    for(int i(0); i<dim+1; ++i)
+      cell_centroid[c * (dim + 1) + i] += sign * unit[i];
+  }
+  // Updates the list of points of the finest cell.
+  const long leaf = cell_index(nb_levels, face, coords) - level_offset[nb_levels];
+  std::vector<int> &members = cell_members[leaf];
+  if(sign > 0)
+  {
+    point_cell[v] = leaf;
+    point_slot[v] = members.size();
+    members.push_back(v);
+    point_inserted[v] = true;
+  }
+  else
+  {
+    const int last = members.back();
+    members[point_slot[v]] = last;
+    point_slot[last] = point_slot[v];
+    members.pop_back();
+    point_inserted[v] = false;
+  }
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+template<typename Near, typename Far>
+void sphere_cells_t::traverse(const double *x, double opening, int excluded, Near &&near, Far &&far) const
+{
+  // A cell of level l is far enough if the angle between x and its center is larger than
+  //   level_max_angle[l] / opening, that is if their dot product is smaller than cos_threshold[l].
+  std::vector<double> cos_threshold(nb_levels + 1);
+  for(int l(0); l<=nb_levels; ++l)
+  {
+    const double min_angle = level_max_angle[l] / opening;
+    cos_threshold[l] = (min_angle < M_PI) ? std::cos(min_angle) : -2;
+  }
+  // Cells of every level containing the excluded point (-1 if it is not stored).
+  std::vector<long> excluded_cells(nb_levels + 1, -1);
+  if(excluded >= 0 && point_inserted[excluded])
+  {
+    std::vector<int> excluded_coords, level_coords(dim);
+    const int excluded_face = locate(&point_unit[excluded * (dim + 1)], excluded_coords);
+    for(int l(0); l<=nb_levels; ++l)
+    {
+      for(int j(0); j<dim; ++j)
+        level_coords[j] = excluded_coords[j] >> (nb_levels - l);
+      excluded_cells[l] = cell_index(l, excluded_face, level_coords);
+    }
+  }
+  std::vector<int> coords(dim, 0);
+  for(int face(0); face<nb_faces; ++face)
+    traverse_cell(0, face, coords, x, cos_threshold, excluded, excluded_cells, near, far);
+}
+
+
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+// =~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=~=
+template<typename Near, typename Far>
+void sphere_cells_t::traverse_cell(int l, int face, std::vector<int> &coords, const double *x,
+                                   const std::vector<double> &cos_threshold, int excluded,
+                                   const std::vector<long> &excluded_cells, Near &near, Far &far) const
+{
+  const long c = cell_index(l, face, coords);
+  if(cell_count[c] == 0)
+    return;
+  // Checks whether the cell is far enough to be aggregated.
+  std::vector<double> center(dim + 1);
+  cell_center(l, face, coords, center.data());
+  double dot = 0;
+  for(int i(0); i<dim+1; ++i)
+    dot += x[i] * center[i];
+  if(dot < cos_threshold[l])
+  {
+    if(c != excluded_cells[l])
+    {
+      far(cell_count[c], cell_weight[c], &cell_centroid[c * (dim + 1)]);
+    }
+    // Subtracts the contribution of the excluded point from the aggregates of its cell.
+    else if(cell_count[c] > 1)
+    {
+      std::vector<double> centroid(dim + 1);
+      for(int i(0); i<dim+1; ++i)
+        centroid[i] = cell_centroid[c * (dim + 1) + i] - point_unit[excluded * (dim + 1) + i];
+      far(cell_count[c] - 1, cell_weight[c] - point_weight[excluded], centroid.data());
+    }
+    return;
+  }
+  // Visits the points individually at the finest level.
+  if(l == nb_levels)
+  {
+    for(const auto &v : cell_members[c - level_offset[nb_levels]])
+    {
+      if(v != excluded)
+        near(v);
+    }
+    return;
+  }
+  // Otherwise visits the 2^D children.
+  std::vector<int> child_coords(dim);
+  for(int b(0); b<(1<<dim); ++b)
+  {
+    for(int j(0); j<dim; ++j)
+      child_coords[j] = 2 * coords[j] + ((b >> j) & 1);
+    traverse_cell(l + 1, face, child_coords, x, cos_threshold, excluded, excluded_cells, near, far);
+  }
+}
+
+#endif // MERCATOR_SPHERE_CELLS_H
@@ -3,6 +3,7 @@
 #include <cmath>
 #include <ctime>
 #include <complex>
+#include <cstdint>
 #include <exception>
 #include <fstream>
 #include <functional>
@@ -17,6 +18,7 @@
 #include <vector>
 #include <filesystem>
 #include <list>
+#include <numeric>
 
 
 std::vector<std::string> Num2Name;
@@ -26,13 +28,16 @@ std::map<int, std::vector<int>> adjacency_list;
 
 void print_help() {
     constexpr auto help_message = R"(
-        ./greedy_routing_parallel [dim] [path_to_coords] [path_to_edgelist] [is_modified] [n_runs]
+        ./greedy_routing_parallel [dim] [path_to_coords] [path_to_edgelist] [is_modified] [n_runs] [seed]
         
         dim                          -- dimension of S^D model
         path_to_coords               -- path to the file with the nodes' coordinates (.inf_coord)
         path_to_edgelist             -- path to the edgelist (.edge) 
         is_modified                  -- whether to run modified version of greedy routing (0 or 1)
         n_runs                       -- number of greedy routing rounds (default=10*network size)
+        seed                         -- seed of the (source, target) pairs (default=random). The pairs
+                                        only depend on the seed and on the names of the nodes, so the
+                                        same pairs are routed in every embedding of a network.
 
 
         Compile with: `g++ --std=c++17 -O3 -fopenmp greedy_routing_parallel.cpp`
@@ -122,52 +127,162 @@ void load_edgelist(const std::string& edgelist_path) {
         adjacency_list[Name2Num[source_str]].push_back(Name2Num[target_str]);
         adjacency_list[Name2Num[target_str]].push_back(Name2Num[source_str]);    
     }
+    // Every node gets an entry, such that the adjacency list is only read during the routing.
+    for (int v=0; v<Num2Name.size(); ++v)
+        adjacency_list[v];
 }
 
-bool BFS(int source, int target, int *pred, int *dist) {
-    std::list<int> queue;
-    const int n = adjacency_list.size();
-    bool visited[n];
 
-    for (int i=0; i<n; ++i) {
-        visited[i] = false;
-        dist[i] = 1000000;
-        pred[i] = -1;
+// Counter-based random number generator (SplitMix64 finalizer): the value only depends on the seed,
+//   on the stream and on the position in the stream, such that streams can be consumed concurrently
+//   and reproducibly.
+uint64_t splitmix64(uint64_t x) {
+    x += 0x9e3779b97f4a7c15ULL;
+    x = (x ^ (x >> 30)) * 0xbf58476d1ce4e5b9ULL;
+    x = (x ^ (x >> 27)) * 0x94d049bb133111ebULL;
+    return x ^ (x >> 31);
+}
+
+int random_index(uint64_t seed, uint64_t stream, uint64_t counter, int n) {
+    const uint64_t bits = splitmix64(splitmix64(seed ^ splitmix64(stream)) + counter) >> 32;
+    return (int)((bits * (uint64_t)n) >> 32);
+}
+
+
+// Draws the (source, target) pairs, pair i using its own stream. Nodes are drawn among the names
+//   sorted, such that the pairs do not depend on the order of the nodes in the files.
+std::vector<std::pair<int, int>> generate_pairs(int n_runs, uint64_t seed) {
+    std::vector<int> sorted_nodes(Num2Name.size());
+    std::iota(sorted_nodes.begin(), sorted_nodes.end(), 0);
+    std::sort(sorted_nodes.begin(), sorted_nodes.end(), [](int v1, int v2) { return Num2Name[v1] < Num2Name[v2]; });
+    const int n = sorted_nodes.size();
+    if (n < 2) {
+        std::cerr << "At least two nodes are required." << std::endl;
+        std::terminate();
     }
 
-    visited[source] = true;
-    dist[source] = 0;
-    queue.push_back(source);
-
-    while(!queue.empty()) {
-        int u = queue.front();
-        queue.pop_front();
-        for (int i=0; i < adjacency_list[u].size(); ++i) {
-            int node = adjacency_list[u][i];
-            if (!visited[node]) {
-                visited[node] = true;
-                dist[node] = dist[u] + 1;
-                pred[node] = u;
-                queue.push_back(node);
-
-                if (node == target)
-                    return true;
-            }
+    std::vector<std::pair<int, int>> pairs(n_runs);
+#pragma omp parallel for
+    for (int i=0; i<n_runs; ++i) {
+        int source=0, target=0;
+        for (uint64_t c=0; source == target; c+=2) {
+            source = random_index(seed, i, c, n);
+            target = random_index(seed, i, c + 1, n);
         }
+        pairs[i] = {sorted_nodes[source], sorted_nodes[target]};
     }
-    return false;
+    return pairs;
 }
 
 
-int compute_shortest_path_length(int source, int target) {
-    const int n = adjacency_list.size();
-    int pred[n], dist[n];
+// Lengths of the shortest paths between the selected pairs (-1 for the other pairs or if the target
+//   is unreachable). The pairs are grouped by source and a single breadth-first search per source
+//   stops once all its targets are reached. The buffers are allocated once per thread and only the
+//   visited nodes are reset between two searches.
+std::vector<int> compute_shortest_path_lengths(const std::vector<std::pair<int, int>> &pairs, const std::vector<char> &selected) {
+    const int n = Num2Name.size();
+    const int n_pairs = pairs.size();
+
+    // Flattens the adjacency list (compressed sparse row format).
+    std::vector<int> offsets(n + 1, 0);
+    for (int v=0; v<n; ++v)
+        offsets[v + 1] = offsets[v] + adjacency_list[v].size();
+    std::vector<int> neighbors;
+    neighbors.reserve(offsets[n]);
+    for (int v=0; v<n; ++v)
+        neighbors.insert(neighbors.end(), adjacency_list[v].begin(), adjacency_list[v].end());
+
+    // Groups the selected pairs by source (counting sort).
+    std::vector<int> first_pair(n + 1, 0);
+    for (int i=0; i<n_pairs; ++i)
+        if (selected[i])
+            ++first_pair[pairs[i].first + 1];
+    for (int v=0; v<n; ++v)
+        first_pair[v + 1] += first_pair[v];
+    std::vector<int> cursor(first_pair.begin(), first_pair.end() - 1);
+    std::vector<int> grouped_pairs(first_pair[n]);
+    for (int i=0; i<n_pairs; ++i)
+        if (selected[i])
+            grouped_pairs[cursor[pairs[i].first]++] = i;
+
+    std::vector<int> lengths(n_pairs, -1);
+#pragma omp parallel
+    {
+        std::vector<int> dist(n, -1);
+        std::vector<char> is_target(n, 0);
+        std::vector<int> queue(n);
+
+#pragma omp for schedule(dynamic)
+        for (int source=0; source<n; ++source) {
+            if (first_pair[source] == first_pair[source + 1])
+                continue;
+
+            int n_targets = 0;
+            for (int j=first_pair[source]; j<first_pair[source + 1]; ++j) {
+                const int target = pairs[grouped_pairs[j]].second;
+                if (!is_target[target]) {
+                    is_target[target] = 1;
+                    ++n_targets;
+                }
+            }
+
+            int head = 0, tail = 0;
+            dist[source] = 0;
+            queue[tail++] = source;
+            while (head < tail && n_targets > 0) {
+                const int u = queue[head++];
+                for (int k=offsets[u]; k<offsets[u + 1]; ++k) {
+                    const int node = neighbors[k];
+                    if (dist[node] < 0) {
+                        dist[node] = dist[u] + 1;
+                        queue[tail++] = node;
+                        if (is_target[node])
+                            --n_targets;
+                    }
+                }
+            }
 
-    if (!BFS(source, target, pred, dist)) {
-        return -1;
+            for (int j=first_pair[source]; j<first_pair[source + 1]; ++j) {
+                const int target = pairs[grouped_pairs[j]].second;
+                lengths[grouped_pairs[j]] = dist[target];
+                is_target[target] = 0;
+            }
+            for (int k=0; k<tail; ++k)
+                dist[queue[k]] = -1;
+        }
     }
+    return lengths;
+}
+
 
-    return dist[target];
+// Computes the stretch of the delivered packages, then prints the success rate and the averages over
+//   the delivered packages (summed in the order of the pairs, such that the results do not depend on
+//   the number of threads).
+void print_results(const std::vector<std::pair<int, int>> &pairs, const std::vector<char> &delivered, const std::vector<double> &hop_length) {
+    const int n_runs = delivered.size();
+    double p_s = 0;
+    double mean_strech = 0;
+    double max_strech = 0;
+    double mean_hop_length = 0;
+    double gr_score = 0;
+    const auto shortest_path_lengths = compute_shortest_path_lengths(pairs, delivered);
+    for (int i=0; i<n_runs; ++i) {
+        if (!delivered[i])
+            continue;
+        ++p_s;
+        const double stretch = hop_length[i] / shortest_path_lengths[i];
+        mean_hop_length += hop_length[i];
+        mean_strech += stretch;
+        gr_score += 1 / stretch;
+        if (stretch > max_strech)
+            max_strech = stretch;
+    }
+    mean_strech /= p_s;
+    mean_hop_length /= p_s;
+    p_s /= n_runs;
+    gr_score /= n_runs;
+    std::cout << "p_s,mean_hop_length,mean_strech,max_strech,gr_score" << std::endl;
+    std::cout << p_s << "," << mean_hop_length << "," << mean_strech << "," << max_strech << "," << gr_score << std::endl;
 }
 
 double S1_distance(double r1, double r2, double theta1, double theta2) {
@@ -230,27 +345,16 @@ void run_original_greedy_routing(int dim,
                                  const std::vector<double> &radii, 
                                  const std::vector<double> &thetas, 
                                  const std::vector<std::vector<double>> &positions, 
-                                 int n_runs) {
-
-    std::random_device rd;
-    std::mt19937 gen(rd());
-    std::uniform_int_distribution<> distr(0, Num2Name.size() - 1);
+                                 const std::vector<std::pair<int, int>> &pairs) {
 
-    std::vector<double> all_stretch;
-    double p_s = 0;
-    double mean_strech = 0;
-    double max_strech = 0;
-    double mean_hop_length = 0;
-    double gr_score = 0;
+    const int n_runs = pairs.size();
+    std::vector<char> delivered(n_runs, 0);
+    std::vector<double> hop_length(n_runs, 0);
 
-#pragma omp parallel for reduction(+:p_s,mean_strech,mean_hop_length,gr_score)
+#pragma omp parallel for schedule(dynamic)
     for (int i=0; i<n_runs; ++i) {
-        int source=-1, target=-1;
-        while (source == target) {
-            source = distr(gen);
-            target = distr(gen);
-        }
-        const int org_source = source;
+        int source = pairs[i].first;
+        const int target = pairs[i].second;
 
         std::vector<int> hops = {source};
         bool is_package_dropped = false;
@@ -280,24 +384,11 @@ void run_original_greedy_routing(int dim,
         }
         found_target1:
         if (!is_package_dropped) {
-            ++p_s;
-            mean_hop_length += (double)hops.size();
-            double strech = (double)hops.size() / compute_shortest_path_length(org_source, target);
-            mean_strech += strech;
-            gr_score += 1 / strech;
-            #pragma omp critical
-            {
-                if (strech > max_strech)
-                    max_strech = strech;
-            }
+            delivered[i] = 1;
+            hop_length[i] = (double)hops.size();
         }
     }
-    mean_strech /= p_s;
-    mean_hop_length /= p_s;
-    p_s /= n_runs;
-    gr_score /= n_runs;
-    std::cout << "p_s,mean_hop_length,mean_strech,max_strech,gr_score" << std::endl;
-    std::cout << p_s << "," << mean_hop_length << "," << mean_strech << "," << max_strech << "," << gr_score << std::endl;
+    print_results(pairs, delivered, hop_length);
 }
 
 
@@ -305,27 +396,16 @@ void run_modified_greedy_routing(int dim,
                                  const std::vector<double> &radii, 
                                  const std::vector<double> &thetas, 
                                  const std::vector<std::vector<double>> &positions, 
-                                 int n_runs) {
+                                 const std::vector<std::pair<int, int>> &pairs) {
 
-    std::random_device rd;
-    std::mt19937 gen(rd());
-    std::uniform_int_distribution<> distr(0, Num2Name.size() - 1);
+    const int n_runs = pairs.size();
+    std::vector<char> delivered(n_runs, 0);
+    std::vector<double> hop_length(n_runs, 0);
 
-    std::vector<double> all_stretch;
-    double p_s = 0;
-    double mean_strech = 0;
-    double max_strech = 0;
-    double mean_hop_length = 0;
-    double gr_score = 0;
-
-#pragma omp parallel for reduction(+:p_s,mean_strech,mean_hop_length,gr_score)
+#pragma omp parallel for schedule(dynamic)
     for (int i=0; i<n_runs; ++i) {
-        int source=-1, target=-1;
-        while (source == target) {
-            source = distr(gen);
-            target = distr(gen);
-        }
-        const int org_source = source;
+        int source = pairs[i].first;
+        const int target = pairs[i].second;
 
         std::vector<int> hops = {source};
         bool is_package_dropped = false;
@@ -358,24 +438,11 @@ void run_modified_greedy_routing(int dim,
         found_target2: // goto statement
 
         if (!is_package_dropped) {
-            ++p_s;
-            mean_hop_length += (double)hops.size();
-            double strech = (double)hops.size() / compute_shortest_path_length(org_source, target);
-            mean_strech += strech;
-            gr_score += 1 / strech;
-            #pragma omp critical
-            {
-                if (strech > max_strech)
-                    max_strech = strech;
-            }
+            delivered[i] = 1;
+            hop_length[i] = (double)hops.size();
         }
     }
-    mean_strech /= p_s;
-    mean_hop_length /= p_s;
-    p_s /= n_runs;
-    gr_score /= n_runs;
-    std::cout << "p_s,mean_hop_length,mean_strech,max_strech,gr_score" << std::endl;
-    std::cout << p_s << "," << mean_hop_length << "," << mean_strech << "," << max_strech << "," << gr_score << std::endl;
+    print_results(pairs, delivered, hop_length);
 }
 
 
@@ -402,12 +469,17 @@ int main(int argc , char *argv[]) {
     int is_modified = std::stoi(argv[4]);
     
     int n_runs = 10 * adjacency_list.size();
-    if (argc == 6)
+    if (argc >= 6)
         n_runs = std::stoi(argv[5]);
 
+    uint64_t seed = std::random_device{}();
+    if (argc >= 7)
+        seed = std::stoull(argv[6]);
+    const auto pairs = generate_pairs(n_runs, seed);
+
     if (is_modified == 1)
-        run_modified_greedy_routing(dim, radii, thetas, positions, n_runs);
+        run_modified_greedy_routing(dim, radii, thetas, positions, pairs);
     else
-        run_original_greedy_routing(dim, radii, thetas, positions, n_runs);
+        run_original_greedy_routing(dim, radii, thetas, positions, pairs);
 }
     
\ No newline at end of file
@@ -1,8 +1,76 @@
 #include "../include/embeddingSD.hpp"
+#include "../include/generatingSD.hpp"
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+#include <pybind11/stl.h>
 
+namespace py = pybind11;
+
+
+// Hands the buffer of the positions over to a NumPy array (without copying it).
+py::array_t<double> positions_to_array(positions_SD_t &positions)
+{
+  auto *buffer = new positions_SD_t(std::move(positions));
+  py::capsule owner(buffer, [](void *p) { delete reinterpret_cast<positions_SD_t*>(p); });
+  const auto &data = buffer->data();
+  return py::array_t<double>({static_cast<py::ssize_t>(data.rows()), static_cast<py::ssize_t>(data.cols())},
+                             {static_cast<py::ssize_t>(data.cols() * sizeof(double)), static_cast<py::ssize_t>(sizeof(double))},
+                             data.data(), owner);
+}
+
+
+// Hands a vector over to a NumPy array (without copying it).
+template<typename T>
+py::array_t<T> vector_to_array(std::vector<T> &&values)
+{
+  auto *buffer = new std::vector<T>(std::move(values));
+  py::capsule owner(buffer, [](void *p) { delete reinterpret_cast<std::vector<T>*>(p); });
+  return py::array_t<T>({static_cast<py::ssize_t>(buffer->size())}, {static_cast<py::ssize_t>(sizeof(T))},
+                        buffer->data(), owner);
+}
+
+
+// Number of triangles attached to every vertex, as integers.
+py::array_t<int64_t> triangles_to_array(const std::vector<double> &nb_triangles)
+{
+  return vector_to_array(std::vector<int64_t>(nb_triangles.begin(), nb_triangles.end()));
+}
+
+
+// Passes the edges given as two 1D arrays of integer IDs to a loader (int32 arrays are read directly,
+//   other integer types as int64).
+template<typename T, typename Loader>
+void load_edge_arrays(const py::array &src, const py::array &dst, Loader &&load)
+{
+  auto sources = py::array_t<T, py::array::c_style | py::array::forcecast>::ensure(src);
+  auto targets = py::array_t<T, py::array::c_style | py::array::forcecast>::ensure(dst);
+  if(!sources || !targets || sources.ndim() != 1 || targets.ndim() != 1 || sources.size() != targets.size())
+  {
+    throw py::value_error("src and dst must be 1D arrays of the same length.");
+  }
+  load(sources.data(), targets.data(), static_cast<std::size_t>(sources.size()));
+}
+
+template<typename Loader>
+void load_edge_arrays(const py::array &src, const py::array &dst, Loader &&load)
+{
+  auto is_integer = [](const py::array &a) { return a.dtype().kind() == 'i' || a.dtype().kind() == 'u'; };
+  if(!is_integer(src) || !is_integer(dst))
+  {
+    throw py::type_error("src and dst must be arrays of integers.");
+  }
+  if(src.dtype().is(py::dtype::of<int32_t>()) && dst.dtype().is(py::dtype::of<int32_t>()))
+  {
+    load_edge_arrays<int32_t>(src, dst, load);
+  }
+  else
+  {
+    load_edge_arrays<int64_t>(src, dst, load);
+  }
+}
 
-void embed(std::string edgelist_filename, 
+
+py::dict embed(std::string edgelist_filename, 
            std::string rootname_output, 
            std::string already_inferred_parameters_filename, 
            bool fast_mode, 
@@ -13,7 +81,19 @@ void embed(std::string edgelist_filename,
            bool clean_mode, 
            int seed, 
            double beta,
-           int dimension)
+           int dimension,
+           double approximate_likelihood,
+           int nb_threads,
+           bool deterministic_kappas,
+           bool symmetric_eigensolver,
+           std::string eigenvectors_filename,
+           bool multilevel,
+           int checkpoint_interval,
+           std::string resume,
+           bool largest_component,
+           int other_components_min_size,
+           bool tabulated_integrals,
+           bool memoized_beta_search)
 {
   // Initialize graph object.
   embeddingSD_t the_graph;
@@ -89,11 +169,398 @@ void embed(std::string edgelist_filename,
   // Sets a value of dimension
   the_graph.DIMENSION = dimension;
 
-  // Performs the embedding.
-  the_graph.embed();
+  // Activates the approximate log-likelihood, if required.
+  if(approximate_likelihood > 0)
+  {
+    the_graph.APPROXIMATE_LIKELIHOOD_MODE = true;
+    the_graph.APPROXIMATE_LIKELIHOOD_ACCURACY = approximate_likelihood;
+  }
+
+  // Activates the parallel refinement, if required.
+  if(nb_threads != 1)
+  {
+    the_graph.PARALLEL_REFINEMENT_MODE = true;
+    the_graph.NB_THREADS = nb_threads;
+  }
+
+  // Activates the deterministic update of the kappas, if required.
+  if(deterministic_kappas)
+  {
+    the_graph.DETERMINISTIC_KAPPA_UPDATE_MODE = true;
+  }
+
+  // Activates the symmetric eigensolver, if required.
+  if(symmetric_eigensolver)
+  {
+    the_graph.SYMMETRIC_EIGENSOLVER_MODE = true;
+  }
+
+  // Computes the integrals of the connection probability exactly instead of interpolating them from
+  //   lookup tables, if required.
+  if(!tabulated_integrals)
+  {
+    the_graph.TABULATED_INTEGRALS_MODE = false;
+  }
+
+  // Searches beta by bisection, every trial starting from the degrees, if required.
+  if(!memoized_beta_search)
+  {
+    the_graph.MEMOIZED_BETA_SEARCH_MODE = false;
+  }
+
+  // Activates the multilevel computation of the initial positions, if required.
+  if(multilevel)
+  {
+    the_graph.MULTILEVEL_MODE = true;
+  }
+
+  // Writes checkpoints every checkpoint_interval ranges of refined vertices, if required (0: no
+  //   checkpoints).
+  if(checkpoint_interval < 0)
+  {
+    throw py::value_error("checkpoint_interval must be positive (or 0 for no checkpoints).");
+  }
+  if(checkpoint_interval > 0)
+  {
+    the_graph.CHECKPOINT_MODE = true;
+    the_graph.CHECKPOINT_INTERVAL = checkpoint_interval;
+  }
+
+  // Resumes an interrupted embedding from a checkpoint, if required.
+  if(resume.length() != 0)
+  {
+    the_graph.RESUME_MODE = true;
+    the_graph.RESUME_FILENAME = resume;
+  }
+
+  // Warm starts the eigensolver from the eigenvectors of a previous run, if required.
+  if(eigenvectors_filename.length() != 0)
+  {
+    the_graph.EIGENVECTORS_FILENAME = eigenvectors_filename;
+  }
+
+  // Embeds the largest connected component directly, if required.
+  if(largest_component)
+  {
+    the_graph.LARGEST_COMPONENT_MODE = true;
+  }
+
+  // Also embeds the other connected components with at least other_components_min_size vertices, if
+  //   required.
+  if(other_components_min_size > 0)
+  {
+    the_graph.LARGEST_COMPONENT_MODE = true;
+    the_graph.OTHER_COMPONENTS_MODE = true;
+    the_graph.OTHER_COMPONENTS_MIN_SIZE = other_components_min_size;
+  }
+
+  // Performs the embedding (without holding the GIL so that embeddings can run in concurrent threads).
+  {
+    py::gil_scoped_release release;
+    the_graph.embed();
+  }
+
+  // Returns the names of the vertices, their positions, their number of triangles and their coreness
+  //   and layer in the onion decomposition.
+  py::dict result;
+  result["names"] = the_graph.get_vertex_names();
+  if(dimension > 1)
+  {
+    result["positions"] = positions_to_array(the_graph.get_positions());
+  }
+  else
+  {
+    result["positions"] = vector_to_array(std::vector<double>(the_graph.get_thetas()));
+  }
+  result["triangles"] = triangles_to_array(the_graph.get_nb_triangles());
+  result["coreness"] = vector_to_array(std::vector<int>(the_graph.get_coreness()));
+  result["od_layer"] = vector_to_array(std::vector<int>(the_graph.get_od_layer()));
+
+  // Embeds the other connected components with the same options (the files given for the whole graph
+  //   are not used), and returns their results in decreasing order of size. A component that cannot
+  //   be embedded is returned as its edgelist filename and the error message.
+  if(other_components_min_size > 0)
+  {
+    py::list components;
+    for(const auto &component : the_graph.get_other_components())
+    {
+      try
+      {
+        components.append(embed(component.first, component.second, "", fast_mode, screen_mode, post_kappa,
+                                quiet_mode, validation_mode, clean_mode, seed, beta, dimension,
+                                approximate_likelihood, nb_threads, deterministic_kappas, symmetric_eigensolver,
+                                "", multilevel, checkpoint_interval, "", false, 0, tabulated_integrals, memoized_beta_search));
+      }
+      catch(const std::exception &error)
+      {
+        py::dict failed;
+        failed["edgelist_filename"] = component.first;
+        failed["error"] = std::string(error.what());
+        components.append(failed);
+      }
+    }
+    result["components"] = components;
+  }
+  return result;
 }
 
-namespace py = pybind11;
+py::dict embed_arrays(py::array src,
+                      py::array dst,
+                      bool fast_mode,
+                      bool screen_mode,
+                      bool post_kappa,
+                      int seed,
+                      double beta,
+                      int dimension,
+                      double approximate_likelihood,
+                      int nb_threads,
+                      bool deterministic_kappas,
+                      bool symmetric_eigensolver,
+                      bool multilevel,
+                      bool largest_component,
+                      bool tabulated_integrals,
+                      bool memoized_beta_search)
+{
+  // Initialize graph object.
+  embeddingSD_t the_graph;
+
+  // Loads the edges.
+  load_edge_arrays(src, dst, [&](const auto *sources, const auto *targets, std::size_t nb_pairs) {
+    the_graph.load_edgelist(sources, targets, nb_pairs);
+  });
+
+  // Activates the fast mode.
+  if(fast_mode)
+  {
+    the_graph.MAXIMIZATION_MODE = false;
+  }
+
+  // Deactivates the post-processing of kappas.
+  if(!post_kappa)
+  {
+    the_graph.KAPPA_POST_INFERENCE_MODE = false;
+  }
+
+  // Activates the verbose mode (the log is otherwise discarded).
+  if(screen_mode)
+  {
+    the_graph.VERBOSE_MODE = true;
+  }
+
+  // Sets a custom seed, if required.
+  if(seed != -1)
+  {
+    the_graph.CUSTOM_SEED = true;
+    the_graph.SEED = seed;
+  }
+
+  // Sets a custom value of beta, if required.
+  if(beta != -1)
+  {
+    the_graph.CUSTOM_BETA = true;
+    the_graph.beta = beta;
+  }
+
+  // Sets a value of dimension
+  the_graph.DIMENSION = dimension;
+
+  // Activates the approximate log-likelihood, if required.
+  if(approximate_likelihood > 0)
+  {
+    the_graph.APPROXIMATE_LIKELIHOOD_MODE = true;
+    the_graph.APPROXIMATE_LIKELIHOOD_ACCURACY = approximate_likelihood;
+  }
+
+  // Activates the parallel refinement, if required.
+  if(nb_threads != 1)
+  {
+    the_graph.PARALLEL_REFINEMENT_MODE = true;
+    the_graph.NB_THREADS = nb_threads;
+  }
+
+  // Activates the deterministic update of the kappas, if required.
+  if(deterministic_kappas)
+  {
+    the_graph.DETERMINISTIC_KAPPA_UPDATE_MODE = true;
+  }
+
+  // Activates the symmetric eigensolver, if required.
+  if(symmetric_eigensolver)
+  {
+    the_graph.SYMMETRIC_EIGENSOLVER_MODE = true;
+  }
+
+  // Computes the integrals of the connection probability exactly instead of interpolating them from
+  //   lookup tables, if required.
+  if(!tabulated_integrals)
+  {
+    the_graph.TABULATED_INTEGRALS_MODE = false;
+  }
+
+  // Searches beta by bisection, every trial starting from the degrees, if required.
+  if(!memoized_beta_search)
+  {
+    the_graph.MEMOIZED_BETA_SEARCH_MODE = false;
+  }
+
+  // Activates the multilevel computation of the initial positions, if required.
+  if(multilevel)
+  {
+    the_graph.MULTILEVEL_MODE = true;
+  }
+
+  // Embeds the largest connected component directly, if required.
+  if(largest_component)
+  {
+    the_graph.LARGEST_COMPONENT_MODE = true;
+  }
+
+  // Performs the embedding (without holding the GIL so that embeddings can run in concurrent threads).
+  {
+    py::gil_scoped_release release;
+    the_graph.embed();
+  }
+
+  // IDs of the vertices (rows of the other arrays).
+  const auto &names = the_graph.get_vertex_names();
+  std::vector<int64_t> ids(names.size());
+  for(std::size_t v(0); v<names.size(); ++v)
+  {
+    ids[v] = std::stoll(names[v]);
+  }
+
+  // Returns the inferred coordinates and parameters.
+  py::dict result;
+  result["ids"] = vector_to_array(std::move(ids));
+  result["kappa"] = vector_to_array(std::vector<double>(the_graph.get_kappas()));
+  result["hyp_radius"] = vector_to_array(the_graph.get_hyperbolic_radii());
+  result["triangles"] = triangles_to_array(the_graph.get_nb_triangles());
+  result["coreness"] = vector_to_array(std::vector<int>(the_graph.get_coreness()));
+  result["od_layer"] = vector_to_array(std::vector<int>(the_graph.get_od_layer()));
+  if(dimension > 1)
+  {
+    result["positions"] = positions_to_array(the_graph.get_positions());
+  }
+  else
+  {
+    result["positions"] = vector_to_array(std::vector<double>(the_graph.get_thetas()));
+  }
+  result["beta"] = the_graph.beta;
+  result["mu"] = the_graph.get_mu();
+  result["R"] = the_graph.get_radius();
+  return result;
+}
+
+py::dict generate_graph(py::array_t<double, py::array::c_style | py::array::forcecast> kappas,
+                        int dimension,
+                        double beta,
+                        std::optional<double> mu,
+                        std::optional<py::array_t<double, py::array::c_style | py::array::forcecast>> positions,
+                        int seed,
+                        int nb_threads,
+                        bool expected_degrees)
+{
+  // Checks the arguments.
+  if(kappas.ndim() != 1)
+  {
+    throw py::value_error("kappas must be a 1D array.");
+  }
+  const py::ssize_t nb_vertices = kappas.size();
+  if(nb_vertices == 0)
+  {
+    throw py::value_error("kappas must not be empty.");
+  }
+  const double *kappa_data = kappas.data();
+  if(!std::all_of(kappa_data, kappa_data + nb_vertices, [](double k) { return k > 0; }))
+  {
+    throw py::value_error("kappas must all be positive.");
+  }
+  if(dimension < 1)
+  {
+    throw py::value_error("dimension must be at least 1.");
+  }
+  if(beta <= 0)
+  {
+    throw py::value_error("beta must be positive.");
+  }
+  if(mu && !(*mu > 0))
+  {
+    throw py::value_error("mu must be positive.");
+  }
+  if(!mu && beta <= dimension)
+  {
+    throw py::value_error("beta must be greater than dimension when mu is not provided.");
+  }
+  if(positions)
+  {
+    const bool valid = (dimension == 1) ? (positions->ndim() == 1 && positions->shape(0) == nb_vertices)
+                                        : (positions->ndim() == 2 && positions->shape(0) == nb_vertices && positions->shape(1) == dimension + 1);
+    if(!valid)
+    {
+      throw py::value_error("positions must be an array of N angles (dimension 1) or of shape (N, dimension+1).");
+    }
+  }
+
+  // Initialize graph object.
+  generatingSD_t the_graph;
+  the_graph.DIMENSION = dimension;
+  the_graph.BETA = beta;
+  the_graph.NB_THREADS = nb_threads;
+  if(mu)
+  {
+    the_graph.MU = *mu;
+  }
+  if(seed != -1)
+  {
+    the_graph.SEED = seed;
+  }
+  the_graph.set_hidden_variables(std::vector<double>(kappas.data(), kappas.data() + nb_vertices),
+                                 positions ? positions->data() : nullptr);
+
+  // Generates the graph (without holding the GIL so that graphs can be generated in concurrent threads).
+  std::vector<int> edges, degree;
+  std::vector<double> expected_degree;
+  {
+    py::gil_scoped_release release;
+    edges = the_graph.generate_edges(degree, expected_degree, expected_degrees);
+  }
+
+  // Returns the edges, the degrees, the positions and the parameters.
+  std::vector<int> sources(edges.size() / 2), targets(edges.size() / 2);
+  for(std::size_t e(0); e<sources.size(); ++e)
+  {
+    sources[e] = edges[2 * e];
+    targets[e] = edges[2 * e + 1];
+  }
+  py::dict result;
+  result["src"] = vector_to_array(std::move(sources));
+  result["dst"] = vector_to_array(std::move(targets));
+  result["degree"] = vector_to_array(std::move(degree));
+  if(expected_degrees)
+  {
+    result["expected_degree"] = vector_to_array(std::move(expected_degree));
+  }
+  if(dimension > 1)
+  {
+    result["positions"] = vector_to_array(the_graph.get_positions()).attr("reshape")(nb_vertices, dimension + 1);
+  }
+  else
+  {
+    result["positions"] = vector_to_array(the_graph.get_positions());
+  }
+  result["mu"] = the_graph.MU;
+  result["R"] = the_graph.get_radius();
+  return result;
+}
+
+void save_binary_edgelist(std::string edgelist_filename, py::array src, py::array dst)
+{
+  edgelist_t edgelist;
+  load_edge_arrays(src, dst, [&](const auto *sources, const auto *targets, std::size_t nb_pairs) {
+    edgelist.load(sources, targets, nb_pairs);
+  });
+  edgelist.save_binary(edgelist_filename);
+}
 
 PYBIND11_MODULE(dmercator, m) {
     m.doc() = R"pbdoc(
@@ -106,6 +573,9 @@ PYBIND11_MODULE(dmercator, m) {
            :toctree: _generate
 
            embed
+           embed_arrays
+           generate
+           save_binary_edgelist
     )pbdoc";
 
     m.def("embed", &embed, "",
@@ -120,7 +590,52 @@ PYBIND11_MODULE(dmercator, m) {
           py::arg("clean_mode") = false,
           py::arg("seed") = -1,
           py::arg("beta") = -1,
-          py::arg("dimension") = 1);
+          py::arg("dimension") = 1,
+          py::arg("approximate_likelihood") = -1,
+          py::arg("nb_threads") = 1,
+          py::arg("deterministic_kappas") = false,
+          py::arg("symmetric_eigensolver") = false,
+          py::arg("eigenvectors_filename") = "",
+          py::arg("multilevel") = false,
+          py::arg("checkpoint_interval") = 0,
+          py::arg("resume") = "",
+          py::arg("largest_component") = false,
+          py::arg("other_components_min_size") = 0,
+          py::arg("tabulated_integrals") = true,
+          py::arg("memoized_beta_search") = true);
+
+    m.def("embed_arrays", &embed_arrays, "",
+          py::arg("src"),
+          py::arg("dst"),
+          py::arg("fast_mode") = false,
+          py::arg("screen_mode") = false,
+          py::arg("post_kappa") = true,
+          py::arg("seed") = -1,
+          py::arg("beta") = -1,
+          py::arg("dimension") = 1,
+          py::arg("approximate_likelihood") = -1,
+          py::arg("nb_threads") = 1,
+          py::arg("deterministic_kappas") = false,
+          py::arg("symmetric_eigensolver") = false,
+          py::arg("multilevel") = false,
+          py::arg("largest_component") = false,
+          py::arg("tabulated_integrals") = true,
+          py::arg("memoized_beta_search") = true);
+
+    m.def("generate", &generate_graph, "",
+          py::arg("kappas"),
+          py::arg("dimension"),
+          py::arg("beta"),
+          py::arg("mu") = py::none(),
+          py::arg("positions") = py::none(),
+          py::arg("seed") = -1,
+          py::arg("nb_threads") = 1,
+          py::arg("expected_degrees") = true);
+
+    m.def("save_binary_edgelist", &save_binary_edgelist, "",
+          py::arg("edgelist_filename"),
+          py::arg("src"),
+          py::arg("dst"));
 
 
 #ifdef VERSION_INFO
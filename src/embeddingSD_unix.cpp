@@ -39,6 +39,23 @@ int main(int argc , char *argv[])
 
   // Performs the embedding. 
   the_graph.embed();
+
+  // Embeds the other connected components with the same options, if required (a component that
+  //   cannot be embedded does not prevent the others from being embedded).
+  for(const auto &component : the_graph.get_other_components())
+  {
+    embeddingSD_t the_component;
+    parse_options(argc, argv, the_component);
+    the_component.set_component(component);
+    try
+    {
+      the_component.embed();
+    }
+    catch(const std::exception &error)
+    {
+      std::cerr << "Could not embed the component in " << component.first << ": " << error.what() << std::endl;
+    }
+  }
   
   // Returns successfully.
   return EXIT_SUCCESS;
@@ -0,0 +1,117 @@
+import textwrap
+
+import numpy as np
+
+import dmercator
+
+from check_utils import make_parser
+from sweep_runner import sample_kappas
+
+
+def parse_args():
+    parser = make_parser(textwrap.dedent("""
+    Example:
+
+    Checks the near-linear edge sampler of dmercator.generate against the exact connection
+    probabilities. The kappas and the positions are fixed, graphs are generated with many seeds and
+    the frequency of every pair, the degree of every vertex and the average degree are compared with
+    their brute-force expectations. Exits with status 1 if a check fails.
+
+    > python test/check_edge_sampler.py \
+        -d 1,2,3
+        -s 300
+        -n 2000
+    """), ntimes=2000, ntimes_help="Number of generated graphs (seeds)",
+                         beta=1.5, beta_help="Value of beta (divided by the dimension)")
+    parser.add_argument('-d', '--dim', type=lambda x: [int(y) for y in x.split(',')],
+                        required=False, default=[1, 2, 3], help="Values of dimension")
+    parser.add_argument('-g', '--gamma', type=float, required=False,
+                        default=2.7, help="Exponent of the distribution of kappas")
+    parser.add_argument('-r', '--seed', type=int, required=False,
+                        default=0, help="Seed of the kappas and the positions")
+    args = parser.parse_args()
+    return args
+
+
+def sample_positions(n, dim, rng):
+    if dim == 1:
+        return rng.uniform(0, 2 * np.pi, n)
+    positions = rng.normal(size=(n, dim + 1))
+    return positions / np.linalg.norm(positions, axis=1, keepdims=True)
+
+
+def exact_probabilities(kappas, positions, dim, beta, mu, radius):
+    # Brute-force connection probabilities of all pairs, 1 / (1 + chi^beta).
+    if dim == 1:
+        dtheta = np.pi - np.abs(np.pi - np.abs(positions[:, None] - positions[None, :]))
+    else:
+        dtheta = np.arccos(np.clip(positions @ positions.T, -1, 1))
+    chi = radius * dtheta / (mu * np.outer(kappas, kappas)) ** (1 / dim)
+    p = 1 / (1 + chi ** beta)
+    np.fill_diagonal(p, 0)
+    return p
+
+
+def check_dimension(dim, args):
+    rng = np.random.default_rng([args.seed, dim])
+    n, beta = args.size, args.beta * dim
+    kappas = sample_kappas(n, args.gamma, 10, rng)
+    positions = sample_positions(n, dim, rng)
+
+    counts = np.zeros((n, n))
+    degrees = np.zeros(n)
+    for seed in range(args.ntimes):
+        graph = dmercator.generate(kappas, dim, beta, positions=positions, seed=seed, expected_degrees=False)
+        src, dst = np.minimum(graph['src'], graph['dst']), np.maximum(graph['src'], graph['dst'])
+        np.add.at(counts, (src, dst), 1)
+        degrees += graph['degree']
+    p = exact_probabilities(kappas, positions, dim, beta, graph['mu'], graph['R'])
+    iu = np.triu_indices(n, 1)
+    p_pairs, f_pairs = p[iu], counts[iu] / args.ntimes
+    expected_degree = p.sum(axis=1)
+    variance_degree = (p * (1 - p)).sum(axis=1)
+
+    failures = []
+    # Every pair must appear at most once per graph.
+    if counts.max() > args.ntimes:
+        failures.append('multiple edges')
+    # Average degree.
+    z_mean = ((degrees.sum() / args.ntimes - expected_degree.sum())
+              / np.sqrt(4 * (p_pairs * (1 - p_pairs)).sum() / args.ntimes))
+    # Degree of every vertex.
+    z_degree = (degrees / args.ntimes - expected_degree) / np.sqrt(variance_degree / args.ntimes)
+    # Frequency of every pair with enough expected occurrences (chi-square with one degree of freedom
+    #   per pair, normalized).
+    frequent = p_pairs * args.ntimes >= 5
+    chi2 = (args.ntimes * (f_pairs - p_pairs) ** 2 / (p_pairs * (1 - p_pairs) + 1e-300))[frequent]
+    z_chi2 = (chi2.sum() - chi2.size) / np.sqrt(2 * chi2.size)
+    # Pairs grouped by probability (catches biases too small to be seen on single pairs).
+    edges_bins = np.quantile(p_pairs, np.linspace(0, 1, 11))
+    groups = np.clip(np.searchsorted(edges_bins, p_pairs, side='right') - 1, 0, 9)
+    z_groups = np.array([
+        (f_pairs[groups == g].sum() - p_pairs[groups == g].sum())
+        / np.sqrt((p_pairs[groups == g] * (1 - p_pairs[groups == g])).sum() / args.ntimes + 1e-300)
+        for g in range(10)])
+
+    if abs(z_mean) > 4:
+        failures.append(f'average degree (z = {z_mean:.2f})')
+    if np.abs(z_degree).max() > 5:
+        failures.append(f'degree of vertex {np.abs(z_degree).argmax()} (z = {np.abs(z_degree).max():.2f})')
+    if abs(z_chi2) > 5:
+        failures.append(f'pair frequencies (normalized chi2 = {z_chi2:.2f})')
+    if np.abs(z_groups).max() > 4:
+        failures.append(f'pairs grouped by probability (z = {np.abs(z_groups).max():.2f})')
+
+    print(f'dim {dim}: average degree {degrees.sum() / args.ntimes / n:.4f} '
+          f'(exact {expected_degree.mean():.4f}, z = {z_mean:.2f}), '
+          f'max |z| degree {np.abs(z_degree).max():.2f}, '
+          f'normalized chi2 {z_chi2:.2f} over {chi2.size} pairs, '
+          f'max |z| groups {np.abs(z_groups).max():.2f}: {"FAILED " + ", ".join(failures) if failures else "ok"}')
+    return not failures
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = [check_dimension(dim, args) for dim in args.dim]
+    if not all(results):
+        raise SystemExit(1)
@@ -0,0 +1,71 @@
+import textwrap
+
+import numpy as np
+
+import dmercator
+
+from check_utils import generate_graph, make_parser
+
+
+def parse_args():
+    parser = make_parser(textwrap.dedent("""
+    Example:
+
+    Checks the coreness and the onion layer of every vertex (bucket queue of
+    embeddingSD_t::extract_onion_decomposition, returned as "coreness" and "od_layer" by
+    dmercator.embed_arrays) against a direct implementation of the onion decomposition, for graphs
+    of the S^1 model with heterogeneous degrees generated with many seeds. Exits with status 1 if a
+    value differs.
+
+    > python test/check_onion_decomposition.py \
+        -s 300
+        -n 20
+    """))
+    args = parser.parse_args()
+    return args
+
+
+def brute_force_onion_decomposition(n, src, dst):
+    # Hebert-Dufresne, Grochow and Allard: every layer contains all the remaining vertices of minimal
+    #   effective degree d, whose removal reduces the effective degree of their neighbors above d.
+    neighbors = [set() for _ in range(n)]
+    for v1, v2 in zip(src, dst):
+        neighbors[v1].add(v2)
+        neighbors[v2].add(v1)
+    degree = {v: len(neighbors[v]) for v in range(n)}
+    coreness, od_layer = np.zeros(n, dtype=int), np.zeros(n, dtype=int)
+    layer = 0
+    while degree:
+        d = min(degree.values())
+        layer += 1
+        current = [v for v, k in degree.items() if k == d]
+        for v in current:
+            coreness[v], od_layer[v] = d, layer
+            del degree[v]
+        for v1 in current:
+            for v2 in neighbors[v1]:
+                if v2 in degree and degree[v2] > d:
+                    degree[v2] -= 1
+    return coreness, od_layer
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    nb_failures = 0
+    for seed in range(args.ntimes):
+        graph = generate_graph(args.size, args.beta, seed)
+        # Only the largest component is embedded: the reference decomposition is restricted to it.
+        src, dst = graph['src'], graph['dst']
+        result = dmercator.embed_arrays(src, dst, fast_mode=True, seed=seed, beta=args.beta, largest_component=True)
+        ids = result['ids']
+        in_component = np.isin(src, ids)
+        mapping = np.full(args.size, -1)
+        mapping[ids] = np.arange(len(ids))
+        coreness, od_layer = brute_force_onion_decomposition(len(ids), mapping[src[in_component]],
+                                                             mapping[dst[in_component]])
+        nb_wrong = int(((result['coreness'] != coreness) | (result['od_layer'] != od_layer)).sum())
+        nb_failures += nb_wrong > 0
+        print(f'seed {seed}: {len(ids)} vertices, {coreness.max()} shells, {od_layer.max()} layers, '
+              f'{nb_wrong} wrong values: {"FAILED" if nb_wrong else "ok"}')
+    if nb_failures:
+        raise SystemExit(1)
@@ -0,0 +1,51 @@
+import textwrap
+
+import numpy as np
+
+import dmercator
+
+from check_utils import generate_graph, make_parser
+
+
+def parse_args():
+    parser = make_parser(textwrap.dedent("""
+    Example:
+
+    Checks the number of triangles attached to every vertex (degree-ordered kernel of
+    csr_adjacency_t::count_triangles, returned as "triangles" by dmercator.embed_arrays) against a
+    brute-force count on the dense adjacency matrix, for graphs of the S^1 model with heterogeneous
+    degrees and strong clustering generated with many seeds. The triangles are counted with several
+    threads (OpenMP builds) to also check the parallel kernel. Exits with status 1 if a count differs.
+
+    > python test/check_triangles.py \
+        -s 300
+        -n 20
+        -j 4
+    """))
+    parser.add_argument('-j', '--threads', type=int, required=False,
+                        default=4, help="Number of threads counting the triangles")
+    args = parser.parse_args()
+    return args
+
+
+def brute_force_triangles(n, src, dst):
+    adjacency = np.zeros((n, n), dtype=np.int64)
+    adjacency[src, dst] = 1
+    adjacency[dst, src] = 1
+    return np.diag(adjacency @ adjacency @ adjacency) // 2
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    nb_failures = 0
+    for seed in range(args.ntimes):
+        graph = generate_graph(args.size, args.beta, seed)
+        result = dmercator.embed_arrays(graph['src'], graph['dst'], fast_mode=True, seed=seed, beta=args.beta,
+                                        nb_threads=args.threads, largest_component=True)
+        expected = brute_force_triangles(args.size, graph['src'], graph['dst'])[result['ids']]
+        nb_wrong = int((result['triangles'] != expected).sum())
+        nb_failures += nb_wrong > 0
+        print(f'seed {seed}: {len(result["ids"])} vertices, {expected.sum() // 3} triangles, '
+              f'{nb_wrong} wrong counts: {"FAILED" if nb_wrong else "ok"}')
+    if nb_failures:
+        raise SystemExit(1)
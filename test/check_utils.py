@@ -0,0 +1,26 @@
+import argparse
+
+import numpy as np
+
+import dmercator
+
+
+def make_parser(description, size=300, ntimes=20, beta=3.0, ntimes_help="Number of graphs (seeds)",
+                beta_help="Value of beta of the generated graphs"):
+    # Arguments shared by the check_*.py scripts.
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description=description)
+    parser.add_argument('-s', '--size', type=int, required=False,
+                        default=size, help="Size of the networks")
+    parser.add_argument('-n', '--ntimes', type=int, required=False,
+                        default=ntimes, help=ntimes_help)
+    parser.add_argument('-b', '--beta', type=float, required=False,
+                        default=beta, help=beta_help)
+    return parser
+
+
+def generate_graph(n, beta, seed):
+    # Graph of the S^1 model with heavy-tailed kappas, such that it has hubs, many shells and layers.
+    rng = np.random.default_rng(seed)
+    kappas = 2 + 3 * rng.pareto(1.5, n)
+    return dmercator.generate(kappas, 1, beta, seed=seed, expected_degrees=False)
@@ -1,14 +1,19 @@
-import numpy as np
 import os
 import argparse
 import textwrap
 
+from sweep_runner import sample_kappas
+
 
 def parse_args():
     parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
                                      description=textwrap.dedent("""    
     Example:
 
+    Generates synthetic networks with the command line generator. The hidden variables and the
+    expected degrees of the vertices (.gen_coord) are only written with -v, since the expected
+    degrees take a time quadratic in the size of the networks.
+
     > python test/generate_synthetic_networks.py \
         -o [output_folder]
         -b 1.5,2.5
@@ -28,44 +33,30 @@ def parse_args():
                         default=1000, help="Size of the networks")
     parser.add_argument('-n', '--ntimes', type=int, required=False, 
                         default=10, help="Number of realizations")
+    parser.add_argument('-v', '--vertices_properties', action='store_true',
+                        help="Writes the hidden variables and the expected degrees (quadratic in the size of the networks)")
     args = parser.parse_args()
     return args
 
 
 def generate_kappas(n, gamma, mean_degree=10):
-    kappa_0 = (
-        (1 - 1 / n)
-        / (1 - n ** ((2 - gamma) / (gamma - 1)))
-        * (gamma - 2)
-        / (gamma - 1)
-        * mean_degree
-    )
-    kappa_c = kappa_0 * n ** (1 / (gamma - 1))
-
-    kappas = []
-    for _ in range(n):
-        kappas.append(
-            kappa_0
-            * (1 - np.random.uniform(0, 1) * (1 - (kappa_c / kappa_0) ** (1 - gamma)))
-            ** (1 / (1 - gamma))
-        )
-    return kappas
+    return list(sample_kappas(n, gamma, mean_degree))
 
 
-def generate_synthetic_network(folder, size, beta, gamma, dim, i):
+def generate_synthetic_network(folder, size, beta, gamma, dim, i, vertices_properties=False):
     kappas = generate_kappas(size, gamma)
     path = f'{folder}/kappas_i{i}.txt'
     with open(path, 'w') as f:
         for k in kappas:
             f.write(f'{k}\n')
     
-    command = f"./gen_net -b {beta*dim} -d {dim} -v {path}"
+    command = f"./gen_net -b {beta*dim} -d {dim} -j 0 {'-v ' if vertices_properties else ''}{path}"
     os.system(command)
 
 
 if __name__ == '__main__':
     args = parse_args()
-    os.system('g++ -O3 --std=c++17 -o gen_net src/generatingSD_unix.cpp')
+    os.system('g++ -O3 --std=c++17 -fopenmp -o gen_net src/generatingSD_unix.cpp')
 
     for b in args.beta:
         for g in args.gamma:
@@ -73,5 +64,5 @@ if __name__ == '__main__':
                 for i in range(args.ntimes):
                     folder = f'{args.output_folder}/beta_{str(b).replace(".", "_")}/gamma_{str(g).replace(".", "_")}/dim{d}/i{i}'
                     os.makedirs(folder)
-                    generate_synthetic_network(folder, args.size, b, g, d, i)
+                    generate_synthetic_network(folder, args.size, b, g, d, i, args.vertices_properties)
     
\ No newline at end of file
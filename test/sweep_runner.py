@@ -0,0 +1,216 @@
+import argparse
+import itertools
+import json
+import os
+import textwrap
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     description=textwrap.dedent("""
+    Example:
+
+    Generates synthetic networks for every combination of the parameters, in parallel. Each
+    realization has its own seed derived from the base seed and its parameters, such that a sweep can
+    be replayed (or extended) exactly. Realizations whose files already exist are skipped. The seed,
+    timing and status of every realization are kept in manifest.json, which is updated as the
+    realizations finish; failed realizations are recorded with their error and the script then
+    exits with status 1.
+
+    > python test/sweep_runner.py \
+        -o [output_folder]
+        -b 1.5,2.5
+        -d 1,2,3,4,5,6,7,8,9,10
+        -g 2.1,2.7,3.5
+        -s 1000
+        -n 10
+        -j 8
+    """))
+    parser.add_argument('-o', '--output_folder', type=str, required=True, help="Path to output folder")
+    parser.add_argument('-b', '--beta', type=lambda x: [float(y) for y in x.split(',')],
+                        required=True, help="Values of beta (divided by the dimension)")
+    parser.add_argument('-g', '--gamma', type=lambda x: [float(y) for y in x.split(',')],
+                        required=True, help="Values of gamma")
+    parser.add_argument('-d', '--dim', type=lambda x: [int(y) for y in x.split(',')],
+                        required=True, help="Values of dimension")
+    parser.add_argument('-s', '--size', type=int, required=False,
+                        default=1000, help="Size of the networks")
+    parser.add_argument('-n', '--ntimes', type=int, required=False,
+                        default=10, help="Number of realizations")
+    parser.add_argument('-k', '--mean_degree', type=float, required=False,
+                        default=10, help="Average degree of the networks")
+    parser.add_argument('-r', '--seed', type=int, required=False,
+                        default=0, help="Base seed of the sweep")
+    parser.add_argument('-j', '--workers', type=int, required=False,
+                        default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument('--no_expected_degrees', action='store_true',
+                        help="Skips the expected degrees (quadratic in the size of the networks)")
+    args = parser.parse_args()
+    return args
+
+
+def sample_kappas(n, gamma, mean_degree=10, rng=None):
+    # Inverse-CDF draw of the power-law distribution of test/generate_kappas.py (vectorized).
+    rng = np.random.default_rng() if rng is None else rng
+    kappa_0 = (
+        (1 - 1 / n)
+        / (1 - n ** ((2 - gamma) / (gamma - 1)))
+        * (gamma - 2)
+        / (gamma - 1)
+        * mean_degree
+    )
+    kappa_c = kappa_0 * n ** (1 / (gamma - 1))
+    u = rng.uniform(0, 1, n)
+    return kappa_0 * (1 - u * (1 - (kappa_c / kappa_0) ** (1 - gamma))) ** (1 / (1 - gamma))
+
+
+def task_folder(output_folder, beta, gamma, dim, i):
+    return (f'{output_folder}/beta_{str(beta).replace(".", "_")}/gamma_{str(gamma).replace(".", "_")}'
+            f'/dim{dim}/i{i}')
+
+
+def task_seed(base_seed, beta, gamma, dim, i):
+    # Depends only on the parameters of the realization (not on the other tasks of the sweep).
+    sequence = np.random.SeedSequence([base_seed, round(beta * 1e6), round(gamma * 1e6), dim, i])
+    return int(sequence.generate_state(1)[0] & 0x7fffffff)
+
+
+def make_tasks(args):
+    tasks = []
+    for beta, gamma, dim, i in itertools.product(args.beta, args.gamma, args.dim, range(args.ntimes)):
+        folder = task_folder(args.output_folder, beta, gamma, dim, i)
+        tasks.append({
+            'beta': beta, 'gamma': gamma, 'dim': dim, 'realization': i,
+            'size': args.size, 'mean_degree': args.mean_degree,
+            'seed': task_seed(args.seed, beta, gamma, dim, i),
+            'rootname': f'{folder}/kappas_i{i}',
+            'expected_degrees': not args.no_expected_degrees,
+        })
+    return tasks
+
+
+def is_done(task):
+    return all(os.path.exists(f"{task['rootname']}.{ext}") for ext in ('edge', 'gen_coord'))
+
+
+def write_files(task, kappas, graph):
+    # Same files and layout as the command line generator (kappas_i*.txt, .edge and .gen_coord).
+    rootname, dim, width = task['rootname'], task['dim'], 15
+    n = len(kappas)
+    names = np.char.add('v', np.arange(n).astype(str))
+    np.savetxt(f'{rootname}.txt', kappas)
+    header = '\n'.join([
+        '=~' * 48 + '=',
+        f"Generated on:           {time.strftime('%Y/%m/%d %H:%M UTC', time.gmtime())}",
+        f'Hidden variables file:  {rootname}.txt',
+        f"Seed:                   {task['seed']}",
+        '',
+        'Parameters',
+        f'  - nb. vertices:       {n}',
+        f"  - beta:               {task['beta'] * dim:g}",
+        f"  - mu:                 {graph['mu']:g}",
+        f"  - radius:             {graph['R']:g}",
+        '=~' * 48 + '=',
+        f"{'Vertex1':>{width - 2}} {'Vertex2':>{width}} ",
+    ])
+    edges = np.column_stack([names[graph['src']], names[graph['dst']]])
+    np.savetxt(f'{rootname}.edge', edges, fmt=f'%{width}s', delimiter=' ', header=header)
+    kappa_min = kappas.min()
+    expected_degree = graph.get('expected_degree', np.full(n, np.nan))
+    if dim == 1:
+        hyp_radius = 2 * np.log(n / (np.pi * graph['mu'] * kappa_min * kappas))
+        columns = ['Kappa', 'Theta', 'Hyp.Rad.']
+        values = [kappas, graph['positions'], hyp_radius]
+    else:
+        hyp_radius = (2 * np.log(2 * graph['R'] / (graph['mu'] * kappa_min ** 2) ** (1 / dim))
+                      - (2 / dim) * np.log(kappas / kappa_min))
+        columns = ['Kappa', 'Hyp.Rad.'] + [f'Pos.{i}' for i in range(dim + 1)]
+        values = [kappas, hyp_radius, graph['positions']]
+    columns += ['RealDeg.', 'Exp.Deg.']
+    values = np.column_stack(values + [graph['degree'], expected_degree])
+    # Written last and renamed once complete, such that an interrupted task is not considered done.
+    with open(f'{rootname}.gen_coord.tmp', 'w') as f:
+        f.write('#' + f"{'Vertex':>{width - 1}} " + ''.join(f'{c:>{width}} ' for c in columns) + '\n')
+        for name, row in zip(names, values):
+            f.write(f'{name:>{width}} ' + ''.join(f'{x:>{width}g} ' for x in row) + '\n')
+    os.replace(f'{rootname}.gen_coord.tmp', f'{rootname}.gen_coord')
+
+
+def run_task(task):
+    import dmercator
+
+    start = time.time()
+    os.makedirs(os.path.dirname(task['rootname']), exist_ok=True)
+    rng = np.random.default_rng(task['seed'])
+    kappas = sample_kappas(task['size'], task['gamma'], task['mean_degree'], rng)
+    graph = dmercator.generate(kappas, task['dim'], task['beta'] * task['dim'],
+                               seed=int(rng.integers(2 ** 31 - 1)),
+                               expected_degrees=task['expected_degrees'])
+    write_files(task, kappas, graph)
+    return {**task, 'status': 'generated', 'nb_edges': int(len(graph['src'])),
+            'seconds': round(time.time() - start, 3)}
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {entry['rootname']: entry for entry in json.load(f)['tasks']}
+
+
+def write_manifest(path, manifest):
+    # Written to a temporary file and renamed, such that an interruption never leaves a truncated manifest.
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+
+def run_sweep(args):
+    os.makedirs(args.output_folder, exist_ok=True)
+    manifest_path = f'{args.output_folder}/manifest.json'
+    previous = load_manifest(manifest_path)
+    tasks = make_tasks(args)
+    entries = {}
+    pending = []
+    for task in tasks:
+        if is_done(task):
+            entries[task['rootname']] = {**previous.get(task['rootname'], task), 'status': 'skipped'}
+        else:
+            entries[task['rootname']] = {**task, 'status': 'pending'}
+            pending.append(task)
+    start = time.time()
+
+    def manifest():
+        return {
+            'arguments': vars(args),
+            'seconds': round(time.time() - start, 3),
+            'tasks': [entries[task['rootname']] for task in tasks],
+        }
+
+    # The manifest is rewritten after every task, such that an interrupted sweep keeps its record.
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(run_task, task): task for task in pending}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    entry = future.result()
+                    print(f"{entry['rootname']}: {entry['nb_edges']} edges in {entry['seconds']} s")
+                except Exception as error:
+                    entry = {**task, 'status': 'failed', 'error': f'{type(error).__name__}: {error}'}
+                    print(f"{entry['rootname']}: failed ({entry['error']})")
+                entries[entry['rootname']] = entry
+                write_manifest(manifest_path, manifest())
+    finally:
+        write_manifest(manifest_path, manifest())
+    return manifest()
+
+
+if __name__ == '__main__':
+    manifest = run_sweep(parse_args())
+    if any(entry['status'] == 'failed' for entry in manifest['tasks']):
+        raise SystemExit(1)